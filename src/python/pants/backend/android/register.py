@@ -8,10 +8,6 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
 from pants.backend.android.targets.android_binary import AndroidBinary
 from pants.backend.android.targets.android_resources import AndroidResources
 from pants.backend.android.targets.keystore import Keystore
-from pants.backend.android.tasks.aapt_gen import AaptGen
-from pants.backend.android.tasks.aapt_builder import AaptBuilder
-from pants.backend.android.tasks.dx_compile import DxCompile
-from pants.backend.android.tasks.jarsigner_task import JarsignerTask
 from pants.base.build_file_aliases import BuildFileAliases
 from pants.goal.task_registrar import TaskRegistrar as task
 
@@ -26,13 +22,13 @@ def build_file_aliases():
   )
 
 def register_goals():
-  task(name='aapt', action=AaptGen).install('gen')
+  task(name='aapt', action='pants.backend.android.tasks.aapt_gen:AaptGen').install('gen')
 
-  task(name='dex', action=DxCompile,
+  task(name='dex', action='pants.backend.android.tasks.dx_compile:DxCompile',
        dependencies=['compile']).install('dex')
 
-  task(name='apk', action=AaptBuilder,
+  task(name='apk', action='pants.backend.android.tasks.aapt_builder:AaptBuilder',
        dependencies=['dex']).install('bundle')
 
-  task(name='sign', action=JarsignerTask,
+  task(name='sign', action='pants.backend.android.tasks.jarsigner_task:JarsignerTask',
        dependencies=['bundle']).install('sign')
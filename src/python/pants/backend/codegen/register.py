@@ -12,13 +12,6 @@ from pants.backend.codegen.targets.java_thrift_library import JavaThriftLibrary
 from pants.backend.codegen.targets.jaxb_library import JaxbLibrary
 from pants.backend.codegen.targets.python_antlr_library import PythonAntlrLibrary
 from pants.backend.codegen.targets.python_thrift_library import PythonThriftLibrary
-from pants.backend.codegen.tasks.antlr_gen import AntlrGen
-from pants.backend.codegen.tasks.apache_thrift_gen import ApacheThriftGen
-from pants.backend.codegen.tasks.jaxb_gen import JaxbGen
-from pants.backend.codegen.tasks.protobuf_gen import ProtobufGen
-from pants.backend.codegen.tasks.ragel_gen import RagelGen
-from pants.backend.codegen.tasks.scrooge_gen import ScroogeGen
-from pants.backend.codegen.tasks.thrift_linter import ThriftLinter
 from pants.base.build_file_aliases import BuildFileAliases
 from pants.goal.task_registrar import TaskRegistrar as task
 
@@ -38,22 +31,27 @@ def build_file_aliases():
 
 
 def register_goals():
-  task(name='thrift', action=ApacheThriftGen).install('gen').with_description('Generate code.')
+  task(name='thrift', action='pants.backend.codegen.tasks.apache_thrift_gen:ApacheThriftGen'
+  ).install('gen').with_description('Generate code.')
 
-  task(name='thrift-linter', action=ThriftLinter
+  task(name='thrift-linter', action='pants.backend.codegen.tasks.thrift_linter:ThriftLinter'
   ).install().with_description('Check thrift files for non-recommended usage patterns.')
 
-  task(name='scrooge', dependencies=['bootstrap'], action=ScroogeGen).install('gen')
+  task(name='scrooge', dependencies=['bootstrap'],
+       action='pants.backend.codegen.tasks.scrooge_gen:ScroogeGen'
+  ).install('gen')
 
   # TODO(Garrett Malmquist): 'protoc' depends on a nonlocal goal (imports is in the jvm register).
   # This should be cleaned up, with protobuf stuff moved to its own backend. (See John's comment on
   # RB 592).
-  task(name='protoc', dependencies=['imports'], action=ProtobufGen
+  task(name='protoc', dependencies=['imports'],
+       action='pants.backend.codegen.tasks.protobuf_gen:ProtobufGen'
   ).install('gen')
 
-  task(name='antlr', dependencies=['bootstrap'], action=AntlrGen
+  task(name='antlr', dependencies=['bootstrap'],
+       action='pants.backend.codegen.tasks.antlr_gen:AntlrGen'
   ).install('gen')
 
-  task(name='ragel', action=RagelGen).install('gen')
+  task(name='ragel', action='pants.backend.codegen.tasks.ragel_gen:RagelGen').install('gen')
 
-  task(name='jaxb', action=JaxbGen).install('gen')
+  task(name='jaxb', action='pants.backend.codegen.tasks.jaxb_gen:JaxbGen').install('gen')
@@ -5,16 +5,44 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+import hashlib
+
 from pants.backend.codegen.targets.java_thrift_library import JavaThriftLibrary
 
 from pants.base.exceptions import TaskError
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
 from pants.base.workunit import WorkUnit
 from pants.backend.core.tasks.console_task import ConsoleTask
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 
+
+class ThriftLinterFingerprintStrategy(DefaultFingerprintStrategy):
+  """Mixes the effective strictness of each target into its fingerprint.
+
+  Strictness can be flipped from the command line or pants.ini without touching the target, and
+  must still force a re-lint.
+  """
+
+  def __init__(self, is_strict):
+    self._is_strict = is_strict
+
+  @classmethod
+  def name(cls):
+    return 'thrift-linter'
+
+  def compute_fingerprint(self, target):
+    hasher = hashlib.sha1()
+    hasher.update(super(ThriftLinterFingerprintStrategy, self).compute_fingerprint(target))
+    hasher.update(bytes(self._is_strict(target)))
+    return hasher.hexdigest()
+
+
 class ThriftLinter(NailgunTask, JvmToolTaskMixin):
   """Print linter warnings for thrift files.
+
+  Only targets that changed since they were last linted are re-checked, and lint results are
+  shared through the artifact caches configured in the 'thrift-linter' section (or the defaults).
   """
 
   _CONFIG_SECTION = 'thrift-linter'
@@ -49,6 +77,8 @@ class ThriftLinter(NailgunTask, JvmToolTaskMixin):
                                                   default=['//:scrooge-linter'])
     self.register_jvm_tool(self._bootstrap_key, bootstrap_tools)
 
+    self.setup_artifact_cache_from_config(config_section=self._CONFIG_SECTION)
+
   @property
   def config_section(self):
     return self._CONFIG_SECTION
@@ -78,26 +108,41 @@ class ThriftLinter(NailgunTask, JvmToolTaskMixin):
     return self._to_bool(self.context.config.get(self._CONFIG_SECTION, 'strict',
                                                  default=ThriftLinter.STRICT_DEFAULT))
 
-  def lint(self, target, path):
-    self.context.log.debug('Linting %s' % path)
+  def lint(self, paths, strict):
+    """Lints the given thrift files in as few linter invocations as the command line allows."""
+    self.context.log.debug('Linting %s' % ' '.join(paths))
 
     classpath = self.tool_classpath(self._bootstrap_key)
-    args = [path, '--verbose']
-    if not self.is_strict(target):
+    args = ['--verbose']
+    if not strict:
       args.append('--ignore-errors')
 
     # If runjava returns non-zero, this marks the workunit as a
     # FAILURE, and there is no way to wrap this here.
-    returncode = self.runjava(classpath=classpath,
-                              main='com.twitter.scrooge.linter.Main',
-                              args=args,
-                              workunit_labels=[WorkUnit.COMPILER])  # to let stdout/err through.
-
+    # The COMPILER label lets stdout/err through.
+    returncode = self.runjava_xargs(classpath=classpath,
+                                    main='com.twitter.scrooge.linter.Main',
+                                    args=args,
+                                    xargs=paths,
+                                    workunit_labels=[WorkUnit.COMPILER])
     if returncode != 0:
-      raise TaskError('Lint errors in %s.' % path)
+      raise TaskError('Lint errors in %s.' % ' '.join(paths))
 
   def execute(self):
     thrift_targets = self.context.targets(self._is_thrift)
-    for target in thrift_targets:
-      for path in target.sources_relative_to_buildroot():
-        self.lint(target, path)
+    fingerprint_strategy = ThriftLinterFingerprintStrategy(self.is_strict)
+    with self.invalidated(thrift_targets,
+                          fingerprint_strategy=fingerprint_strategy) as invalidation_check:
+      invalid_vts = invalidation_check.invalid_vts
+
+      # Batch all files sharing a strictness setting into one linter run rather than paying a
+      # (nailgun) JVM round trip per thrift file.
+      paths_by_strictness = {True: [], False: []}
+      for vt in invalid_vts:
+        paths_by_strictness[self.is_strict(vt.target)].extend(
+            vt.target.sources_relative_to_buildroot())
+      for strict, paths in sorted(paths_by_strictness.items()):
+        if paths:
+          self.lint(paths, strict)
+
+      self.update_artifact_cache_with_markers(invalid_vts)
@@ -11,26 +11,7 @@ import sys
 from pants.backend.core.targets.dependencies import Dependencies, DeprecatedDependencies
 from pants.backend.core.targets.doc import Page, Wiki, WikiArtifact
 from pants.backend.core.targets.resources import Resources
-from pants.backend.core.tasks.build_lint import BuildLint
-from pants.backend.core.tasks.builddictionary import BuildBuildDictionary
-from pants.backend.core.tasks.check_exclusives import CheckExclusives
-from pants.backend.core.tasks.clean import Invalidator, Cleaner, AsyncCleaner
 from pants.backend.core.tasks.confluence_publish import ConfluencePublish
-from pants.backend.core.tasks.dependees import ReverseDepmap
-from pants.backend.core.tasks.filemap import Filemap
-from pants.backend.core.tasks.filter import Filter
-from pants.backend.core.tasks.list_goals import ListGoals
-from pants.backend.core.tasks.listtargets import ListTargets
-from pants.backend.core.tasks.markdown_to_html import MarkdownToHtml
-from pants.backend.core.tasks.minimal_cover import MinimalCover
-from pants.backend.core.tasks.pathdeps import PathDeps
-from pants.backend.core.tasks.paths import Path, Paths
-from pants.backend.core.tasks.prepare_resources import PrepareResources
-from pants.backend.core.tasks.reporting_server import RunServer, KillServer
-from pants.backend.core.tasks.roots import ListRoots
-from pants.backend.core.tasks.sorttargets import SortTargets
-from pants.backend.core.tasks.targets_help import TargetsHelp
-from pants.backend.core.tasks.what_changed import WhatChanged
 from pants.backend.core.wrapped_globs import Globs, RGlobs, ZGlobs
 from pants.base.build_environment import get_buildroot, pants_version
 from pants.base.build_file_aliases import BuildFileAliases
@@ -95,85 +76,93 @@ def register_commands():
 
 def register_goals():
   # Getting help.
-  task(name='goals', action=ListGoals
+  task(name='goals', action='pants.backend.core.tasks.list_goals:ListGoals'
   ).install().with_description('List all documented goals.')
 
-  task(name='targets', action=TargetsHelp
+  task(name='targets', action='pants.backend.core.tasks.targets_help:TargetsHelp'
   ).install().with_description('List all target types.')
 
-  task(name='builddict', action=BuildBuildDictionary
+  task(name='builddict', action='pants.backend.core.tasks.builddictionary:BuildBuildDictionary'
   ).install()
 
 
   # Cleaning.
-  invalidate = task(name='invalidate', action=Invalidator, dependencies=['ng-killall'])
+  invalidate = task(name='invalidate', action='pants.backend.core.tasks.clean:Invalidator',
+                    dependencies=['ng-killall'])
   invalidate.install().with_description('Invalidate all targets.')
 
-  clean_all = task(name='clean-all', action=Cleaner, dependencies=['invalidate']).install()
+  clean_all = task(name='clean-all', action='pants.backend.core.tasks.clean:Cleaner',
+                   dependencies=['invalidate']).install()
   clean_all.with_description('Clean all build output.')
   clean_all.install(invalidate, first=True)
 
-  clean_all_async = task(name='clean-all-async', action=AsyncCleaner, dependencies=['invalidate']
+  clean_all_async = task(name='clean-all-async',
+                         action='pants.backend.core.tasks.clean:AsyncCleaner',
+                         dependencies=['invalidate']
   ).install().with_description('Clean all build output in a background process.')
   clean_all_async.install(invalidate, first=True)
 
   # Reporting.
 
-  task(name='server', action=RunServer, serialize=False
+  task(name='server', action='pants.backend.core.tasks.reporting_server:RunServer', serialize=False
   ).install().with_description('Run the pants reporting server.')
 
-  task(name='killserver', action=KillServer, serialize=False
+  task(name='killserver', action='pants.backend.core.tasks.reporting_server:KillServer',
+       serialize=False
   ).install().with_description('Kill the reporting server.')
 
 
   # Bootstrapping.
-  task(name='prepare', action=PrepareResources
+  task(name='prepare', action='pants.backend.core.tasks.prepare_resources:PrepareResources'
   ).install('resources')
 
-  task(name='markdown', action=MarkdownToHtml
+  task(name='markdown', action='pants.backend.core.tasks.markdown_to_html:MarkdownToHtml'
   ).install('markdown').with_description('Generate html from markdown docs.')
 
 
   # Linting.
 
-  task(name='check-exclusives', dependencies=['gen'], action=CheckExclusives
+  task(name='check-exclusives', dependencies=['gen'],
+       action='pants.backend.core.tasks.check_exclusives:CheckExclusives'
   ).install('check-exclusives').with_description('Check for exclusivity violations.')
 
-  task(name='buildlint', action=BuildLint, dependencies=['compile']
+  task(name='buildlint', action='pants.backend.core.tasks.build_lint:BuildLint',
+       dependencies=['compile']
   ).install()
 
-  task(name='pathdeps', action=PathDeps).install('pathdeps').with_description(
+  task(name='pathdeps', action='pants.backend.core.tasks.pathdeps:PathDeps'
+  ).install('pathdeps').with_description(
     'Print out all paths containing BUILD files the target depends on.')
 
-  task(name='list', action=ListTargets
+  task(name='list', action='pants.backend.core.tasks.listtargets:ListTargets'
   ).install('list').with_description('List available BUILD targets.')
 
 
   # Build graph information.
 
-  task(name='path', action=Path
+  task(name='path', action='pants.backend.core.tasks.paths:Path'
   ).install().with_description('Find a dependency path from one target to another.')
 
-  task(name='paths', action=Paths
+  task(name='paths', action='pants.backend.core.tasks.paths:Paths'
   ).install().with_description('Find all dependency paths from one target to another.')
 
-  task(name='dependees', action=ReverseDepmap
+  task(name='dependees', action='pants.backend.core.tasks.dependees:ReverseDepmap'
   ).install().with_description("Print the target's dependees.")
 
-  task(name='filemap', action=Filemap
+  task(name='filemap', action='pants.backend.core.tasks.filemap:Filemap'
   ).install().with_description('Outputs a mapping from source file to owning target.')
 
-  task(name='minimize', action=MinimalCover
+  task(name='minimize', action='pants.backend.core.tasks.minimal_cover:MinimalCover'
   ).install().with_description('Print the minimal cover of the given targets.')
 
-  task(name='filter', action=Filter
+  task(name='filter', action='pants.backend.core.tasks.filter:Filter'
   ).install().with_description('Filter the input targets based on various criteria.')
 
-  task(name='sort', action=SortTargets
+  task(name='sort', action='pants.backend.core.tasks.sorttargets:SortTargets'
   ).install().with_description("Topologically sort the targets.")
 
-  task(name='roots', action=ListRoots
+  task(name='roots', action='pants.backend.core.tasks.roots:ListRoots'
   ).install('roots').with_description("Print the workspace's source roots and associated target types.")
 
-  task(name='changed', action=WhatChanged
+  task(name='changed', action='pants.backend.core.tasks.what_changed:WhatChanged'
   ).install().with_description('Print the targets changed since some prior commit.')
@@ -36,6 +36,11 @@ def _async_cautious_rmtree(root):
 
 class Invalidator(Task, QuietTaskMixin):
   """Invalidate the entire build."""
+
+  @classmethod
+  def requires_exclusive_workspace(cls):
+    return True
+
   def execute(self):
     build_invalidator_dir = os.path.join(
       self.context.config.get_option(Config.DEFAULT_PANTS_WORKDIR), 'build_invalidator')
@@ -44,6 +49,11 @@ class Invalidator(Task, QuietTaskMixin):
 
 class Cleaner(Task, QuietTaskMixin):
   """Clean all current build products."""
+
+  @classmethod
+  def requires_exclusive_workspace(cls):
+    return True
+
   def execute(self):
     _cautious_rmtree(self.context.config.getdefault('pants_workdir'))
 
@@ -52,6 +62,11 @@ class Cleaner(Task, QuietTaskMixin):
 # cleaning the renamed workdir taxes the filesystem.
 class AsyncCleaner(Task, QuietTaskMixin):
   """Clean all current build products in a background process."""
+
+  @classmethod
+  def requires_exclusive_workspace(cls):
+    return True
+
   def execute(self):
     _async_cautious_rmtree(self.context.config.getdefault('pants_workdir'))
 
@@ -5,7 +5,6 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
-from collections import defaultdict
 import os
 
 from twitter.common.collections import OrderedSet
@@ -13,12 +12,17 @@ from twitter.common.collections import OrderedSet
 from pants.backend.core.tasks.console_task import ConsoleTask
 from pants.base.build_environment import get_buildroot
 from pants.base.build_file import BuildFile
+from pants.base.dependee_index import DependeeIndex
 from pants.base.exceptions import TaskError
 from pants.base.source_root import SourceRoot
 
 
 class ReverseDepmap(ConsoleTask):
-  """Outputs all targets whose dependencies include at least one of the input targets."""
+  """Outputs all targets whose dependencies include at least one of the input targets.
+
+  Dependency edges are persisted in a `DependeeIndex` under the pants workdir so that only BUILD
+  files changed since the last run are re-parsed.
+  """
 
   @classmethod
   def setup_parser(cls, option_group, args, mkflag):
@@ -73,43 +77,18 @@ class ReverseDepmap(ConsoleTask):
     else:
       buildfiles = BuildFile.scan_buildfiles(get_buildroot())
 
-    build_graph = self.context.build_graph
-    build_file_parser = self.context.build_file_parser
-    address_mapper = self.context.address_mapper
-
-    dependees_by_target = defaultdict(set)
-    for build_file in buildfiles:
-      address_map = build_file_parser.parse_build_file(build_file)
-      for address in address_map.keys():
-        build_graph.inject_address_closure(address)
-      for address in address_map.keys():
-        target = build_graph.get_target(address)
-        # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
-        # user vs. targets created by pants at runtime.
-        target = self.get_concrete_target(target)
-        for dependency in target.dependencies:
-          dependency = self.get_concrete_target(dependency)
-          dependees_by_target[dependency].add(target)
-
+    index = DependeeIndex.from_config(self.context.config,
+                                      self.context.build_file_parser,
+                                      self.context.build_graph)
     roots = set(self.context.target_roots)
+    dependees = index.dependees(buildfiles,
+                                [root.address.spec for root in roots],
+                                transitive=self._transitive)
+    index.save()
+
     if self._closed:
       for root in roots:
         yield root.address.spec
 
-    for dependant in self.get_dependants(dependees_by_target, roots):
-      yield dependant.address.spec
-
-  def get_dependants(self, dependees_by_target, roots):
-    check = set(roots)
-    known_dependants = set()
-    while True:
-      dependants = set(known_dependants)
-      for target in check:
-        dependants.update(dependees_by_target[target])
-      check = dependants - known_dependants
-      if not check or not self._transitive:
-        return dependants - set(roots)
-      known_dependants = dependants
-
-  def get_concrete_target(self, target):
-    return target.concrete_derived_from
+    for spec in sorted(dependees):
+      yield spec
@@ -9,11 +9,14 @@ from abc import abstractmethod, abstractproperty
 from collections import defaultdict
 import os
 
+from twitter.common.lang import Compatibility
+
 from pants.backend.core.tasks.check_exclusives import ExclusivesMapping
 from pants.backend.core.tasks.task import TaskBase, Task
 from pants.base.build_graph import sort_targets
 from pants.base.workunit import WorkUnit
 from pants.goal.mkflag import Mkflag
+from pants.util.importutil import load_symbol
 
 
 class GroupMember(TaskBase):
@@ -257,12 +260,27 @@ class GroupTask(Task):
     return group_task
 
   @classmethod
-  def _member_types(cls):
-    member_types = getattr(cls, '_MEMBER_TYPES')
-    if member_types is None:
+  def _members(cls):
+    members = getattr(cls, '_MEMBER_TYPES')
+    if members is None:
       raise TypeError('New GroupTask types must be created via GroupTask.named.')
+    return members
+
+  @classmethod
+  def _member_types(cls):
+    member_types = cls._members()
+    for index, member_type in enumerate(member_types):
+      if isinstance(member_type, Compatibility.string):
+        member_types[index] = cls._check_member(load_symbol(member_type))
     return member_types
 
+  @staticmethod
+  def _check_member(group_member):
+    if not (isinstance(group_member, type) and issubclass(group_member, GroupMember)):
+      raise ValueError('Only GroupMember subclasses can join a GroupTask, '
+                       'given %s of type %s' % (group_member, type(group_member)))
+    return group_member
+
   @classmethod
   def add_member(cls, group_member):
     """Enlists a member in this group.
@@ -270,12 +288,13 @@ class GroupTask(Task):
     A group task delegates all its work to group members who act cooperatively on targets they
     claim. The order members are added affects the target claim process by setting the order the
     group members are asked to claim targets in on a first-come, first-served basis.
-    """
-    if not issubclass(group_member, GroupMember):
-      raise ValueError('Only GroupMember subclasses can join a GroupTask, '
-                       'given %s of type %s' % (group_member, type(group_member)))
 
-    cls._member_types().append(group_member)
+    :param group_member: A GroupMember subclass or a '[package.]module:symbol' string naming one;
+      named members are not imported until the group first needs them.
+    """
+    if not isinstance(group_member, Compatibility.string):
+      cls._check_member(group_member)
+    cls._members().append(group_member)
 
   def __init__(self, *args, **kwargs):
     super(GroupTask, self).__init__(*args, **kwargs)
@@ -5,8 +5,7 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
-from collections import defaultdict
-import copy
+from collections import deque
 
 from pants.backend.core.tasks.console_task import ConsoleTask
 from pants.base.exceptions import TaskError
@@ -18,65 +17,128 @@ class PathFinder(ConsoleTask):
     self.log = self.context.log
     self.target_roots = self.context.target_roots
 
-  @classmethod
-  def _find_paths(cls, from_target, to_target, log):
-    log.debug('Looking for all paths from %s to %s' % (from_target.address.reference(),
-                                                       to_target.address.reference()))
+  @staticmethod
+  def _reaches(from_target, to_target):
+    """Returns the set of targets in the closure of from_target with a path to to_target."""
+    reaches = set()
+    visited = set()
+    # An iterative post-order walk, so deep graphs can't blow the stack.
+    stack = [(from_target, iter(from_target.dependencies))]
+    visited.add(from_target)
+    if from_target == to_target:
+      reaches.add(from_target)
+    while stack:
+      target, dependencies = stack[-1]
+      dependency = next(dependencies, None)
+      if dependency is None:
+        stack.pop()
+        if target in reaches and stack:
+          reaches.add(stack[-1][0])
+      else:
+        if dependency in reaches:
+          reaches.add(target)
+        elif dependency not in visited:
+          visited.add(dependency)
+          if dependency == to_target:
+            reaches.add(dependency)
+            reaches.add(target)
+          else:
+            stack.append((dependency, iter(dependency.dependencies)))
+    return reaches
 
-    paths = cls._find_paths_rec(from_target, to_target)
-    print('Found %d paths' % len(paths))
-    print('')
-    for path in paths:
-      log.debug('\t[%s]' % ', '.join([target.address.reference() for target in path]))
+  @classmethod
+  def _count_paths(cls, from_target, to_target):
+    """Counts the distinct dependency paths from from_target to to_target without enumerating."""
+    reaches = cls._reaches(from_target, to_target)
+    if from_target not in reaches:
+      return 0
+
+    counts = {to_target: 1}
+    stack = [from_target]
+    while stack:
+      target = stack[-1]
+      if target in counts:
+        stack.pop()
+        continue
+      pending = [dep for dep in target.dependencies if dep in reaches and dep not in counts]
+      if pending:
+        stack.extend(pending)
+      else:
+        stack.pop()
+        counts[target] = sum(counts[dep] for dep in target.dependencies if dep in reaches)
+    return counts[from_target]
 
-  all_paths = defaultdict(lambda: defaultdict(list))
   @classmethod
-  def _find_paths_rec(cls, from_target, to_target):
-    if from_target == to_target:
-      return [[from_target]]
+  def _iter_paths(cls, from_target, to_target):
+    """Yields each dependency path from from_target to to_target as a tuple of targets.
 
-    if from_target not in cls.all_paths or to_target not in cls.all_paths[from_target]:
-      paths = []
-      for dep in from_target.dependencies:
-        for path in cls._find_paths_rec(dep, to_target):
-          new_path = copy.copy(path)
-          new_path.insert(0, from_target)
-          paths.append(new_path)
+    Only targets that can reach to_target are ever explored.
+    """
+    reaches = cls._reaches(from_target, to_target)
+    if from_target not in reaches:
+      return
 
-      cls.all_paths[from_target][to_target] = paths
+    path = [from_target]
+    stack = [iter(from_target.dependencies)]
+    if from_target == to_target:
+      yield tuple(path)
+      return
+    while stack:
+      dependency = next(stack[-1], None)
+      if dependency is None:
+        stack.pop()
+        path.pop()
+      elif dependency == to_target:
+        yield tuple(path) + (dependency,)
+      elif dependency in reaches:
+        path.append(dependency)
+        stack.append(iter(dependency.dependencies))
 
-    return cls.all_paths[from_target][to_target]
+  @classmethod
+  def _find_paths(cls, from_target, to_target, log, count_only=False):
+    log.debug('Looking for all paths from %s to %s' % (from_target.address.reference(),
+                                                       to_target.address.reference()))
 
-  examined_targets = set()
+    if count_only:
+      count = cls._count_paths(from_target, to_target)
+    else:
+      count = 0
+      for path in cls._iter_paths(from_target, to_target):
+        count += 1
+        log.debug('\t[%s]' % ', '.join([target.address.reference() for target in path]))
+    print('Found %d paths' % count)
+    print('')
 
   @classmethod
   def _find_path(cls, from_target, to_target, log):
     log.debug('Looking for path from %s to %s' % (from_target.address.reference(),
                                                   to_target.address.reference()))
 
-    queue = [([from_target], 0)]
-    while True:
-      if not queue:
-        print('no path found from %s to %s!' % (from_target.address.reference(),
-                                                to_target.address.reference()))
-        break
-
-      path, indent = queue.pop(0)
-      next_target = path[-1]
-      if next_target in cls.examined_targets:
-        continue
-      cls.examined_targets.add(next_target)
-
+    # A breadth first search recording each target's predecessor, so the shortest path can be
+    # recovered without copying partial paths.
+    predecessors = {from_target: None}
+    queue = deque([(from_target, 0)])
+    while queue:
+      next_target, indent = queue.popleft()
       log.debug('%sexamining %s' % ('  ' * indent, next_target))
 
       if next_target == to_target:
+        path = []
+        while next_target is not None:
+          path.append(next_target)
+          next_target = predecessors[next_target]
         print('')
-        for target in path:
+        for target in reversed(path):
           print('%s' % target.address.reference())
-        break
+        return
 
       for dep in next_target.dependencies:
-        queue.append((path + [dep], indent + 1))
+        if dep not in predecessors:
+          predecessors[dep] = next_target
+          queue.append((dep, indent + 1))
+
+    print('no path found from %s to %s!' % (from_target.address.reference(),
+                                            to_target.address.reference()))
 
 
 class Path(PathFinder):
@@ -88,8 +150,18 @@ class Path(PathFinder):
 
 
 class Paths(PathFinder):
+  @classmethod
+  def setup_parser(cls, option_group, args, mkflag):
+    super(Paths, cls).setup_parser(option_group, args, mkflag)
+
+    option_group.add_option(mkflag('count'), mkflag('count', negate=True),
+                            dest='paths_count', default=False,
+                            action='callback', callback=mkflag.set_bool,
+                            help='[%default] Only count the paths, without enumerating them.')
+
   def execute(self):
     if len(self.target_roots) != 2:
       raise TaskError('Specify two targets please (found %d)' % len(self.target_roots))
 
-    self._find_paths(self.target_roots[0], self.target_roots[1], self.log)
+    self._find_paths(self.target_roots[0], self.target_roots[1], self.log,
+                     count_only=self.context.options.paths_count)
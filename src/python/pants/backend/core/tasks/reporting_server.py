@@ -16,6 +16,7 @@ from pants import binary_util
 from pants.backend.core.tasks.task import QuietTaskMixin, Task
 from pants.base.build_environment import get_buildroot
 from pants.base.run_info import RunInfo
+from pants.base.timing_store import TimingStore
 from pants.reporting.reporting_server import ReportingServer, ReportingServerManager
 
 
@@ -70,9 +71,11 @@ class RunServer(Task, QuietTaskMixin):
           # they will be None, and we'll use the ones baked into this package.
           template_dir = self.context.config.get('reporting', 'reports_template_dir')
           assets_dir = self.context.config.get('reporting', 'reports_assets_dir')
+          timing_store = TimingStore.from_config(self.context.config).path
           settings = ReportingServer.Settings(info_dir=info_dir, template_dir=template_dir,
                                               assets_dir=assets_dir, root=get_buildroot(),
-                                              allowed_clients=self.context.options.allowed_clients)
+                                              allowed_clients=self.context.options.allowed_clients,
+                                              timing_store=timing_store)
           server = ReportingServer(self.context.options.port, settings)
           actual_port = server.server_port()
           ReportingServerManager.save_current_server_port(actual_port)
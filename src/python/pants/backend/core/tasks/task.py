@@ -24,6 +24,7 @@ from pants.base.workunit import WorkUnit
 from pants.cache.cache_setup import create_artifact_cache
 from pants.cache.read_write_artifact_cache import ReadWriteArtifactCache
 from pants.reporting.reporting_utils import items_to_report_element
+from pants.util.dirutil import safe_mkdir, touch
 
 
 class TaskBase(AbstractClass):
@@ -150,6 +151,49 @@ class TaskBase(AbstractClass):
     """
     return []
 
+  @classmethod
+  def supports_concurrent_execution(cls):
+    """Whether this task may execute concurrently with other tasks.
+
+    Tasks that return True must only depend on the work of other tasks via the products they
+    require, and must not mutate shared state other than the products they produce.  By default
+    tasks execute exclusively: after all the tasks ordered before them and before any ordered after.
+    """
+    return False
+
+  def execution_resources(self):
+    """The units of each resource this task occupies while executing concurrently.
+
+    Tasks that run tools in parallel, or that run memory hungry tools, should claim accordingly so
+    that concurrently executing tasks do not oversubscribe the machine.  Resource capacities are
+    configured for the round engine; see ``[round-engine] workers`` and
+    ``[round-engine] resources``.
+    """
+    return {'worker': 1}
+
+  @classmethod
+  def requires_exclusive_workspace(cls):
+    """Whether this task must execute with no other pants run using the workspace.
+
+    Only tasks that rewrite the workspace wholesale, like cleaning all build output, need this.
+    All others lock just the resources they write; see ``locked_resources``.
+    """
+    return False
+
+  def locked_resources(self):
+    """The paths of the resources this task writes, which no other pants run may write while it
+    executes.
+
+    By default a task locks its workdir and its build invalidation state.  Tasks that write to
+    locations shared with other tasks, like the dist directory, should extend this.  Tasks that
+    write shared locations for only part of their execution can instead lock them for just that
+    part using ``self.context.lock.locked``.
+
+    While a task executes, the workdirs of the tasks producing the products it requires are locked
+    for reading, so that other runs can't rewrite them until it's done.
+    """
+    return [self.workdir, self._build_invalidator_dir]
+
   def invalidate_for_files(self):
     """Provides extra files that participate in invalidation.
 
@@ -334,6 +378,22 @@ class TaskBase(AbstractClass):
       self.context.submit_background_work_chain([update_artifact_cache_work],
                                                 parent_workunit_name='cache')
 
+  def update_artifact_cache_with_markers(self, vts):
+    """Records a successful result for each of the given versioned targets in the artifact cache.
+
+    For tasks that produce no artifacts, like linters, an empty marker file keyed by the target's
+    cache key stands in for the result, so that a cache hit lets the target be skipped.
+    """
+    if vts and self.artifact_cache_writes_enabled():
+      results_dir = os.path.join(self.workdir, 'results')
+      safe_mkdir(results_dir)
+      vts_artifactfiles_pairs = []
+      for vt in vts:
+        marker = os.path.join(results_dir, vt.cache_key.hash)
+        touch(marker)
+        vts_artifactfiles_pairs.append((vt, [marker]))
+      self.update_artifact_cache(vts_artifactfiles_pairs)
+
   def get_update_artifact_cache_work(self, vts_artifactfiles_pairs, cache=None):
     """Create a Work instance to update the artifact cache, if we're configured to.
 
@@ -27,32 +27,6 @@ from pants.backend.jvm.targets.repository import Repository
 from pants.backend.jvm.targets.scala_library import ScalaLibrary
 from pants.backend.jvm.targets.scala_tests import ScalaTests
 from pants.backend.jvm.targets.scalac_plugin import ScalacPlugin
-from pants.backend.jvm.tasks.benchmark_run import BenchmarkRun
-from pants.backend.jvm.tasks.binary_create import BinaryCreate
-from pants.backend.jvm.tasks.bootstrap_jvm_tools import BootstrapJvmTools
-from pants.backend.jvm.tasks.bundle_create import BundleCreate
-from pants.backend.jvm.tasks.check_published_deps import CheckPublishedDeps
-from pants.backend.jvm.tasks.dependencies import Dependencies
-from pants.backend.jvm.tasks.depmap import Depmap
-from pants.backend.jvm.tasks.detect_duplicates import DuplicateDetector
-from pants.backend.jvm.tasks.eclipse_gen import EclipseGen
-from pants.backend.jvm.tasks.ensime_gen import EnsimeGen
-from pants.backend.jvm.tasks.filedeps import FileDeps
-from pants.backend.jvm.tasks.idea_gen import IdeaGen
-from pants.backend.jvm.tasks.ivy_imports import IvyImports
-from pants.backend.jvm.tasks.ivy_resolve import IvyResolve
-from pants.backend.jvm.tasks.jar_create import JarCreate
-from pants.backend.jvm.tasks.jar_publish import JarPublish
-from pants.backend.jvm.tasks.javadoc_gen import JavadocGen
-from pants.backend.jvm.tasks.junit_run import JUnitRun
-from pants.backend.jvm.tasks.jvm_compile.java.java_compile import JavaCompile
-from pants.backend.jvm.tasks.jvm_compile.scala.scala_compile import ScalaCompile
-from pants.backend.jvm.tasks.jvm_run import JvmRun
-from pants.backend.jvm.tasks.nailgun_task import NailgunKillall
-from pants.backend.jvm.tasks.provides import Provides
-from pants.backend.jvm.tasks.scala_repl import ScalaRepl
-from pants.backend.jvm.tasks.scaladoc_gen import ScaladocGen
-from pants.backend.jvm.tasks.specs_run import SpecsRun
 from pants.base.build_file_aliases import BuildFileAliases
 from pants.goal.task_registrar import TaskRegistrar as task
 from pants.goal.goal import Goal
@@ -92,41 +66,28 @@ def build_file_aliases():
 
 
 def register_goals():
-  ng_killall = task(name='ng-killall', action=NailgunKillall)
+  ng_killall = task(name='ng-killall', action='pants.backend.jvm.tasks.nailgun_task:NailgunKillall')
   ng_killall.install().with_description('Kill running nailgun servers.')
 
   Goal.by_name('invalidate').install(ng_killall, first=True)
   Goal.by_name('clean-all').install(ng_killall, first=True)
   Goal.by_name('clean-all-async').install(ng_killall, first=True)
 
-  task(name='bootstrap-jvm-tools', action=BootstrapJvmTools
+  task(name='bootstrap-jvm-tools',
+       action='pants.backend.jvm.tasks.bootstrap_jvm_tools:BootstrapJvmTools'
   ).install('bootstrap').with_description('Bootstrap tools needed for building.')
 
   # Dependency resolution.
-  task(name='ivy', action=IvyResolve,
+  task(name='ivy', action='pants.backend.jvm.tasks.ivy_resolve:IvyResolve',
        dependencies=['gen', 'check-exclusives', 'bootstrap']
   ).install('resolve').with_description('Resolve dependencies and produce dependency reports.')
 
-  task(name='ivy-imports', action=IvyImports,
+  task(name='ivy-imports', action='pants.backend.jvm.tasks.ivy_imports:IvyImports',
        dependencies=['bootstrap']
   ).install('imports')
 
   # Compilation.
 
-  # AnnotationProcessors are java targets, but we need to force them into their own compilation
-  # rounds so that they are on classpath of any dependees downstream that may use them. Without
-  # forcing a separate member type we could get a java chunk containing a mix of apt processors and
-  # code that relied on the un-compiled apt processor in the same javac invocation.  If so, javac
-  # would not be smart enough to compile the apt processors 1st and activate them.
-  class AptCompile(JavaCompile):
-    @classmethod
-    def name(cls):
-      return 'apt'
-
-    def select(self, target):
-      return super(AptCompile, self).select(target) and target.is_apt
-
-
   jvm_compile = GroupTask.named(
     'jvm-compilers',
     product_type=['classes_by_target', 'classes_by_source'],
@@ -138,13 +99,13 @@ def register_goals():
   # however if the JavaCompile group member were registered earlier, it would claim the ScalaLibrary
   # targets with mixed source sets leaving those targets un-compiled by scalac and resulting in
   # systemic compile errors.
-  jvm_compile.add_member(ScalaCompile)
+  jvm_compile.add_member('pants.backend.jvm.tasks.jvm_compile.scala.scala_compile:ScalaCompile')
 
   # Its important we add AptCompile before JavaCompile since it 1st selector wins and apt code is a
   # subset of java code
-  jvm_compile.add_member(AptCompile)
+  jvm_compile.add_member('pants.backend.jvm.tasks.jvm_compile.java.apt_compile:AptCompile')
 
-  jvm_compile.add_member(JavaCompile)
+  jvm_compile.add_member('pants.backend.jvm.tasks.jvm_compile.java.java_compile:JavaCompile')
 
   task(name='jvm', action=jvm_compile,
        dependencies=['gen', 'resolve', 'check-exclusives', 'bootstrap']
@@ -152,106 +113,110 @@ def register_goals():
 
   # Generate documentation.
 
-  task(name='javadoc', action=JavadocGen,
+  task(name='javadoc', action='pants.backend.jvm.tasks.javadoc_gen:JavadocGen',
        dependencies=['compile', 'bootstrap']
   ).install('doc').with_description('Create documentation.')
 
-  task(name='scaladoc', action=ScaladocGen,
+  task(name='scaladoc', action='pants.backend.jvm.tasks.scaladoc_gen:ScaladocGen',
        dependencies=['compile', 'bootstrap']
   ).install('doc')
 
   # Bundling.
 
-  task(name='jar', action=JarCreate,
+  task(name='jar', action='pants.backend.jvm.tasks.jar_create:JarCreate',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install('jar')
 
-  detect_duplicates = task(name='dup', action=DuplicateDetector,
+  detect_duplicates = task(name='dup',
+                           action='pants.backend.jvm.tasks.detect_duplicates:DuplicateDetector',
                            dependencies=['compile', 'resources'])
 
-  task(name='binary', action=BinaryCreate,
+  task(name='binary', action='pants.backend.jvm.tasks.binary_create:BinaryCreate',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install().with_description('Create a jvm binary jar.')
 
   detect_duplicates.install('binary')
 
-  task(name='bundle', action=BundleCreate,
+  task(name='bundle', action='pants.backend.jvm.tasks.bundle_create:BundleCreate',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install().with_description('Create an application bundle from binary targets.')
 
   detect_duplicates.install('bundle')
 
-  task(name='detect-duplicates', action=DuplicateDetector,
+  task(name='detect-duplicates',
+       action='pants.backend.jvm.tasks.detect_duplicates:DuplicateDetector',
        dependencies=['compile', 'resources'],
   ).install().with_description('Detect duplicate classes and resources on the classpath.')
 
  # Publishing.
 
-  task(name='check_published_deps', action=CheckPublishedDeps
+  task(name='check_published_deps',
+       action='pants.backend.jvm.tasks.check_published_deps:CheckPublishedDeps'
   ).install('check_published_deps').with_description('Find references to outdated artifacts.')
 
-  task(name='publish', action=JarPublish,
+  task(name='publish', action='pants.backend.jvm.tasks.jar_publish:JarPublish',
        dependencies=['jar', 'doc']
   ).install('publish').with_description('Publish artifacts.')
 
   # Testing.
 
-  task(name='junit', action=JUnitRun,
+  task(name='junit', action='pants.backend.jvm.tasks.junit_run:JUnitRun',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install('test').with_description('Test compiled code.')
 
-  task(name='specs', action=SpecsRun,
+  task(name='specs', action='pants.backend.jvm.tasks.specs_run:SpecsRun',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install('test')
 
-  task(name='bench', action=BenchmarkRun,
+  task(name='bench', action='pants.backend.jvm.tasks.benchmark_run:BenchmarkRun',
        dependencies=['compile', 'resources', 'bootstrap']
   ).install('bench')
 
   # Running.
 
-  task(name='jvm-run', action=JvmRun,
+  task(name='jvm-run', action='pants.backend.jvm.tasks.jvm_run:JvmRun',
        dependencies=['compile', 'resources', 'bootstrap'], serialize=False
   ).install('run').with_description('Run a binary target.')
 
-  task(name='jvm-run-dirty', action=JvmRun,
+  task(name='jvm-run-dirty', action='pants.backend.jvm.tasks.jvm_run:JvmRun',
        serialize=False
   ).install('run-dirty').with_description('Run a binary target, skipping compilation.')
 
-  task(name='scala-repl', action=ScalaRepl,
+  task(name='scala-repl', action='pants.backend.jvm.tasks.scala_repl:ScalaRepl',
        dependencies=['compile', 'resources', 'bootstrap'], serialize=False
   ).install('repl').with_description('Run a REPL.')
 
-  task(name='scala-repl-dirty', action=ScalaRepl,
+  task(name='scala-repl-dirty', action='pants.backend.jvm.tasks.scala_repl:ScalaRepl',
        serialize=False
   ).install('repl-dirty').with_description('Run a REPL, skipping compilation.')
 
   # IDE support.
 
-  task(name='idea', action=IdeaGen, dependencies=['bootstrap', 'resolve']
+  task(name='idea', action='pants.backend.jvm.tasks.idea_gen:IdeaGen',
+       dependencies=['bootstrap', 'resolve']
   ).install().with_description('Create an IntelliJ IDEA project from the given targets.')
 
-  task(name='eclipse', action=EclipseGen,
+  task(name='eclipse', action='pants.backend.jvm.tasks.eclipse_gen:EclipseGen',
        dependencies=['jar', 'bootstrap']
   ).install().with_description('Create an Eclipse project from the given targets.')
 
-  task(name='ensime', action=EnsimeGen,
+  task(name='ensime', action='pants.backend.jvm.tasks.ensime_gen:EnsimeGen',
        dependencies=['jar', 'bootstrap']
   ).install().with_description('Create an Ensime project from the given targets.')
 
   # Build graph information.
 
-  task(name='provides', action=Provides,
+  task(name='provides', action='pants.backend.jvm.tasks.provides:Provides',
        dependencies=['jar', 'bootstrap']
   ).install().with_description('Print the symbols provided by the given targets.')
 
   # XXX(pl): These should be core, but they have dependencies on JVM
-  task(name='depmap', action=Depmap
+  task(name='depmap', action='pants.backend.jvm.tasks.depmap:Depmap'
   ).install().with_description("Depict the target's dependencies.")
 
-  task(name='dependencies', action=Dependencies
+  task(name='dependencies', action='pants.backend.jvm.tasks.dependencies:Dependencies'
   ).install().with_description("Print the target's dependencies.")
 
-  task(name='filedeps', action=FileDeps
+  task(name='filedeps', action='pants.backend.jvm.tasks.filedeps:FileDeps'
   ).install('filedeps').with_description(
       'Print out the source and BUILD files the target depends on.')
@@ -30,5 +30,6 @@ class BinaryCreate(JvmBinaryTask):
     binary_jarpath = os.path.join(self._outdir, binary_jarname)
     self.context.log.info('creating %s' % os.path.relpath(binary_jarpath, get_buildroot()))
 
-    with self.monolithic_jar(binary, binary_jarpath, with_external_deps=True) as jar:
-      self.add_main_manifest_entry(jar, binary)
+    with self.context.lock.locked([binary_jarpath]):
+      with self.monolithic_jar(binary, binary_jarpath, with_external_deps=True) as jar:
+        self.add_main_manifest_entry(jar, binary)
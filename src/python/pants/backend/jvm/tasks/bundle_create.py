@@ -66,15 +66,17 @@ class BundleCreate(JvmBinaryTask):
     archiver = archive.archiver(self._archiver_type) if self._archiver_type else None
     for target in self.context.target_roots:
       for app in map(self.App, filter(self.App.is_app, [target])):
-        basedir = self.bundle(app)
-        if archiver:
-          archivepath = archiver.create(
-            basedir,
-            self._outdir,
-            app.basename,
-            prefix=app.basename if self._prefix else None
-          )
-          self.context.log.info('created %s' % os.path.relpath(archivepath, get_buildroot()))
+        # The app's bundle dir and archive in the dist dir are both named for its basename.
+        with self.context.lock.locked([os.path.join(self._outdir, app.basename)]):
+          basedir = self.bundle(app)
+          if archiver:
+            archivepath = archiver.create(
+              basedir,
+              self._outdir,
+              app.basename,
+              prefix=app.basename if self._prefix else None
+            )
+            self.context.log.info('created %s' % os.path.relpath(archivepath, get_buildroot()))
 
   def bundle(self, app):
     """Create a self-contained application bundle.
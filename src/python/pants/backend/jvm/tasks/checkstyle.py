@@ -10,7 +10,6 @@ import os
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.exceptions import TaskError
-from pants.process.xargs import Xargs
 from pants.util.dirutil import safe_open
 
 
@@ -25,6 +24,10 @@ class Checkstyle(NailgunTask, JvmToolTaskMixin):
   def _is_checked(target):
     return target.is_java and not target.is_synthetic
 
+  @classmethod
+  def supports_concurrent_execution(cls):
+    return True
+
   @classmethod
   def setup_parser(cls, option_group, args, mkflag):
     super(Checkstyle, cls).setup_parser(option_group, args, mkflag)
@@ -101,9 +104,5 @@ class Checkstyle(NailgunTask, JvmToolTaskMixin):
 
     # We've hit known cases of checkstyle command lines being too long for the system so we guard
     # with Xargs since checkstyle does not accept, for example, @argfile style arguments.
-    def call(xargs):
-      return self.runjava(classpath=classpath, main=CHECKSTYLE_MAIN,
-                          args=args + xargs, workunit_name='checkstyle')
-    checks = Xargs(call)
-
-    return checks.execute(sources)
+    return self.runjava_xargs(classpath=classpath, main=CHECKSTYLE_MAIN, args=args,
+                              xargs=list(sources), workunit_name='checkstyle')
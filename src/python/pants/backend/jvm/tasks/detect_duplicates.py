@@ -6,14 +6,11 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 from collections import defaultdict
-from contextlib import closing
 import os
-from zipfile import ZipFile
-
-from pex.compatibility import to_bytes
 
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.exceptions import TaskError
+from pants.java.jar.jar_index import JarEntryIndex
 from pants.java.jar.manifest import Manifest
 
 
@@ -53,28 +50,32 @@ class DuplicateDetector(JvmBinaryTask):
       excludes = EXCLUDED_FILES
     self._excludes = set([x.lower() for x in excludes.split(',')])
     self._max_dups = int(self.context.options.max_dups)
+    self._jar_index = JarEntryIndex.from_config(self.context.config)
 
   def prepare(self, round_manager):
     round_manager.require_data('resources_by_target')
     round_manager.require_data('classes_by_target')
 
   def execute(self):
-    for binary_target in filter(self.is_binary, self.context.targets()):
-      self.detect_duplicates_for_target(binary_target)
+    try:
+      for binary_target in filter(self.is_binary, self.context.targets()):
+        self.detect_duplicates_for_target(binary_target)
+    finally:
+      self._jar_index.save()
 
   def detect_duplicates_for_target(self, binary_target):
     artifacts_by_file_name = defaultdict(set)
 
-    # Extract external dependencies on libraries (jars)
-    external_deps = self._get_external_dependencies(binary_target)
-    for (file_name, targets) in external_deps.items():
-      artifacts_by_file_name[file_name].update(targets)
-
     # Extract internal dependencies on classes and resources
     internal_deps = self._get_internal_dependencies(binary_target)
     for (file_name, targets) in internal_deps.items():
       artifacts_by_file_name[file_name].update(targets)
 
+    # Extract external dependencies on libraries (jars)
+    external_deps = self._get_external_dependencies(binary_target, internal_deps.keys())
+    for (file_name, targets) in external_deps.items():
+      artifacts_by_file_name[file_name].update(targets)
+
     self._is_conflicts(artifacts_by_file_name, binary_target)
 
   def _is_conflicts(self, artifacts_by_file_name, binary_target):
@@ -106,25 +107,39 @@ class DuplicateDetector(JvmBinaryTask):
       artifacts_by_file_name[r].add(binary_target)
     return artifacts_by_file_name
 
-  def _get_external_dependencies(self, binary_target):
-    artifacts_by_file_name = defaultdict(set)
-    for basedir, externaljar in  self.list_external_jar_dependencies(binary_target):
+  def _get_external_dependencies(self, binary_target, candidates=()):
+    """Maps entry names to the names of the external jars holding them.
+
+    Only entries that could conflict are mapped: those held by more than one jar and those named in
+    ``candidates``.
+    """
+    ids_by_jar = []
+    seen = set()
+    duplicated = set()
+    for basedir, externaljar in self.list_external_jar_dependencies(binary_target):
       external_dep = os.path.join(basedir, externaljar)
       self.context.log.debug('  scanning %s' % external_dep)
-      with closing(ZipFile(external_dep)) as dep_zip:
-        for qualified_file_name in dep_zip.namelist():
-          # Zip entry names can come in any encoding and in practice we find some jars that have
-          # utf-8 encoded entry names, some not.  As a result we cannot simply decode in all cases
-          # and need to do this to_bytes(...).decode('utf-8') dance to stay safe across all entry
-          # name flavors and under all supported pythons.
-          decoded_file_name = to_bytes(qualified_file_name).decode('utf-8')
-          if os.path.basename(decoded_file_name).lower() in self._excludes:
-            continue
-          jar_name = os.path.basename(external_dep)
-          if (not self._isdir(decoded_file_name)) and Manifest.PATH != decoded_file_name:
-            artifacts_by_file_name[decoded_file_name].add(jar_name)
+      entry_ids = self._jar_index.entry_ids(external_dep)
+      duplicated.update(seen.intersection(entry_ids))
+      seen.update(entry_ids)
+      ids_by_jar.append((os.path.basename(external_dep), entry_ids))
+
+    candidate_ids = set(self._jar_index.entry_id(name) for name in candidates)
+    duplicated.update(seen.intersection(candidate_ids))
+    duplicated = set(entry_id for entry_id in duplicated
+                     if self._is_checked(self._jar_index.name(entry_id)))
+
+    artifacts_by_file_name = defaultdict(set)
+    for jar_name, entry_ids in ids_by_jar:
+      for entry_id in duplicated.intersection(entry_ids):
+        artifacts_by_file_name[self._jar_index.name(entry_id)].add(jar_name)
     return artifacts_by_file_name
 
+  def _is_checked(self, file_name):
+    return not (self._isdir(file_name)
+                or Manifest.PATH == file_name
+                or os.path.basename(file_name).lower() in self._excludes)
+
   def _get_conflicts_by_artifacts(self, artifacts_by_file_name):
     conflicts_by_artifacts = defaultdict(set)
     for (file_name, artifacts) in artifacts_by_file_name.items():
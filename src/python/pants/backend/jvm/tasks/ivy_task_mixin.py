@@ -77,56 +77,58 @@ class IvyTaskMixin(object):
 
     fingerprint_strategy = IvyResolveFingerprintStrategy()
 
-    with self.invalidated(targets,
-                          invalidate_dependents=True,
-                          silent=silent,
-                          fingerprint_strategy=fingerprint_strategy) as invalidation_check:
-      global_vts = VersionedTargetSet.from_versioned_targets(invalidation_check.all_vts)
-      target_workdir = os.path.join(ivy_workdir, global_vts.cache_key.hash)
-      target_classpath_file = os.path.join(target_workdir, 'classpath')
-      raw_target_classpath_file = target_classpath_file + '.raw'
-      raw_target_classpath_file_tmp = raw_target_classpath_file + '.tmp'
-      # A common dir for symlinks into the ivy2 cache. This ensures that paths to jars
-      # in artifact-cached analysis files are consistent across systems.
-      # Note that we have one global, well-known symlink dir, again so that paths are
-      # consistent across builds.
-      symlink_dir = os.path.join(ivy_workdir, 'jars')
-
-      # Note that it's possible for all targets to be valid but for no classpath file to exist at
-      # target_classpath_file, e.g., if we previously built a superset of targets.
-      if invalidation_check.invalid_vts or not os.path.exists(raw_target_classpath_file):
-        args = ['-cachepath', raw_target_classpath_file_tmp]
-
-        def exec_ivy():
-          ivy_utils.exec_ivy(
-              target_workdir=target_workdir,
-              targets=targets,
-              args=args,
-              ivy=ivy,
-              workunit_name='ivy',
-              workunit_factory=self.context.new_workunit,
-              symlink_ivyxml=symlink_ivyxml)
-
-        if workunit_name:
-          with self.context.new_workunit(name=workunit_name, labels=workunit_labels or []):
+    # The ivy workdir and cache are shared by every task resolving with ivy.
+    with self.context.lock.locked([ivy_workdir, Bootstrapper.instance().ivy_cache_dir]):
+      with self.invalidated(targets,
+                            invalidate_dependents=True,
+                            silent=silent,
+                            fingerprint_strategy=fingerprint_strategy) as invalidation_check:
+        global_vts = VersionedTargetSet.from_versioned_targets(invalidation_check.all_vts)
+        target_workdir = os.path.join(ivy_workdir, global_vts.cache_key.hash)
+        target_classpath_file = os.path.join(target_workdir, 'classpath')
+        raw_target_classpath_file = target_classpath_file + '.raw'
+        raw_target_classpath_file_tmp = raw_target_classpath_file + '.tmp'
+        # A common dir for symlinks into the ivy2 cache. This ensures that paths to jars
+        # in artifact-cached analysis files are consistent across systems.
+        # Note that we have one global, well-known symlink dir, again so that paths are
+        # consistent across builds.
+        symlink_dir = os.path.join(ivy_workdir, 'jars')
+
+        # Note that it's possible for all targets to be valid but for no classpath file to exist at
+        # target_classpath_file, e.g., if we previously built a superset of targets.
+        if invalidation_check.invalid_vts or not os.path.exists(raw_target_classpath_file):
+          args = ['-cachepath', raw_target_classpath_file_tmp]
+
+          def exec_ivy():
+            ivy_utils.exec_ivy(
+                target_workdir=target_workdir,
+                targets=targets,
+                args=args,
+                ivy=ivy,
+                workunit_name='ivy',
+                workunit_factory=self.context.new_workunit,
+                symlink_ivyxml=symlink_ivyxml)
+
+          if workunit_name:
+            with self.context.new_workunit(name=workunit_name, labels=workunit_labels or []):
+              exec_ivy()
+          else:
             exec_ivy()
-        else:
-          exec_ivy()
-
-        if not os.path.exists(raw_target_classpath_file_tmp):
-          raise TaskError('Ivy failed to create classpath file at %s'
-                          % raw_target_classpath_file_tmp)
-        shutil.move(raw_target_classpath_file_tmp, raw_target_classpath_file)
-        logger.debug('Copied ivy classfile file to {dest}'.format(dest=raw_target_classpath_file))
-
-        if self.artifact_cache_writes_enabled():
-          self.update_artifact_cache([(global_vts, [raw_target_classpath_file])])
-
-    # Make our actual classpath be symlinks, so that the paths are uniform across systems.
-    # Note that we must do this even if we read the raw_target_classpath_file from the artifact
-    # cache. If we cache the target_classpath_file we won't know how to create the symlinks.
-    symlink_map = IvyUtils.symlink_cachepath(self.context.ivy_home, raw_target_classpath_file,
-                                             symlink_dir, target_classpath_file)
+
+          if not os.path.exists(raw_target_classpath_file_tmp):
+            raise TaskError('Ivy failed to create classpath file at %s'
+                            % raw_target_classpath_file_tmp)
+          shutil.move(raw_target_classpath_file_tmp, raw_target_classpath_file)
+          logger.debug('Copied ivy classfile file to {dest}'.format(dest=raw_target_classpath_file))
+
+          if self.artifact_cache_writes_enabled():
+            self.update_artifact_cache([(global_vts, [raw_target_classpath_file])])
+
+      # Make our actual classpath be symlinks, so that the paths are uniform across systems.
+      # Note that we must do this even if we read the raw_target_classpath_file from the artifact
+      # cache. If we cache the target_classpath_file we won't know how to create the symlinks.
+      symlink_map = IvyUtils.symlink_cachepath(self.context.ivy_home, raw_target_classpath_file,
+                                               symlink_dir, target_classpath_file)
     with IvyTaskMixin.symlink_map_lock:
       all_symlinks_map = self.context.products.get_data('symlink_map') or defaultdict(list)
       for path, symlink in symlink_map.items():
@@ -14,11 +14,13 @@ from twitter.common.collections import maybe_list
 from twitter.common.lang import AbstractClass, Compatibility
 
 from pants.backend.jvm.targets.jvm_binary import Duplicate, Skip, JarRules
+from pants.backend.jvm.tasks.jar_writer import JarWriter
 from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.exceptions import TaskError
 from pants.base.workunit import WorkUnit
 from pants.java.jar.manifest import Manifest
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir, safe_rmtree
 
 
 class Jar(object):
@@ -53,6 +55,15 @@ class Jar(object):
       :returns: The path to the source data.
       """
 
+    def stage(self, writer, scratch_dir):
+      """Stages this entry with an in-process :class:`JarWriter`.
+
+      :param writer: The writer to stage this entry with.
+      :param string scratch_dir: A temporary directory as for ``materialize`` that will outlive the
+        write.
+      """
+      writer.add_file(self.materialize(scratch_dir), self.dest)
+
   class FileSystemEntry(Entry):
     """An entry backed by an existing file on disk."""
 
@@ -63,6 +74,12 @@ class Jar(object):
     def materialize(self, _):
       return self._src
 
+    def stage(self, writer, _):
+      if os.path.isdir(self._src):
+        writer.add_directory(self._src, self.dest)
+      else:
+        writer.add_file(self._src, self.dest)
+
   class MemoryEntry(Entry):
     """An entry backed by an in-memory sequence of bytes."""
 
@@ -78,6 +95,9 @@ class Jar(object):
         os.close(fd)
       return path
 
+    def stage(self, writer, _):
+      writer.add_bytes(self.dest, self._contents)
+
   def __init__(self):
     self._entries = []
     self._jars = []
@@ -180,12 +200,38 @@ class Jar(object):
 
       yield args
 
+  @contextmanager
+  def _stage(self, writer):
+    """Stages this jar's contents with an in-process :class:`JarWriter`.
+
+    Yields ``False`` if there is nothing to write.
+    """
+    if self._main:
+      writer.main(self._main)
+
+    if self._classpath:
+      writer.classpath(self._classpath)
+
+    with temporary_dir() as stage_dir:
+      if self._manifest:
+        with open(self._manifest.materialize(stage_dir), 'rb') as fp:
+          writer.manifest(fp.read())
+
+      for entry in self._entries:
+        entry.stage(writer, stage_dir)
+
+      for jar in self._jars:
+        writer.add_jar(jar)
+
+      yield bool(self._main or self._classpath or self._manifest or self._entries or self._jars)
+
 
 class JarTask(NailgunTask):
   """A baseclass for tasks that need to create or update jars.
 
-  All subclasses will share the same underlying nailgunned jar tool and thus benefit from fast
-  invocations.
+  Jars are written in-process; the jar tool is only used when ``[jar-tool] native: False`` is
+  configured.  In that case all subclasses share the same underlying nailgunned jar tool and thus
+  benefit from fast invocations.
   """
 
   _CONFIG_SECTION = 'jar-tool'
@@ -221,6 +267,11 @@ class JarTask(NailgunTask):
                                                       default=['//:jar-tool'])
     self.register_jvm_tool(self._JAR_TOOL_CLASSPATH_KEY, jar_bootstrap_tools)
 
+    self._native = self.context.config.getbool(self._CONFIG_SECTION, 'native', default=True)
+    self._compression_workers = self.context.config.getint(self._CONFIG_SECTION,
+                                                           'compression_workers',
+                                                           default=1)
+
   @property
   def config_section(self):
     return self._CONFIG_SECTION
@@ -245,12 +296,24 @@ class JarTask(NailgunTask):
     except jar.Error as e:
       raise TaskError('Failed to write to jar at %s: %s' % (path, e))
 
+    jar_rules = jar_rules or JarRules.default()
+    if self._native:
+      writer = JarWriter(jar_rules, compressed=compressed, workers=self._compression_workers)
+      with jar._stage(writer) as staged:
+        if staged:  # Don't build an empty jar
+          try:
+            writer.write(path, overwrite=overwrite)
+          except (writer.Error, Duplicate.Error) as e:
+            raise TaskError('Failed to write to jar at %s: %s' % (path, e))
+    else:
+      self._write_with_jar_tool(jar, path, overwrite, compressed, jar_rules)
+
+  def _write_with_jar_tool(self, jar, path, overwrite, compressed, jar_rules):
     with jar._render_jar_tool_args() as args:
       if args:  # Don't build an empty jar
         args.append('-update=%s' % self._flag(not overwrite))
         args.append('-compress=%s' % self._flag(compressed))
 
-        jar_rules = jar_rules or JarRules.default()
         args.append('-default_action=%s' % self._action_name(jar_rules.default_dup_action))
 
         skip_patterns = []
@@ -281,11 +344,46 @@ class JarTask(NailgunTask):
                      workunit_name='jar-tool',
                      workunit_labels=[WorkUnit.TOOL, WorkUnit.JVM, WorkUnit.NAILGUN])
 
+  def segment_jar(self, jar, segment_dir, jar_rules=None):
+    """Writes the contents staged in a Jar to a segment jar cached under ``segment_dir``.
+
+    Segments are meant to be grafted into larger jars with ``Jar.writejar``; the segment is only
+    rewritten when the staged contents change, and its already compressed entries are copied into
+    the larger jar as is.
+
+    :param jar: A Jar created with ``Jar()`` and staged with the segment's contents.
+    :param string segment_dir: A directory dedicated to caching this segment.
+    :param jar_rules: An optional set of rules for handling jar exclusions and duplicates.
+    :returns: The path of the segment jar or ``None`` if nothing was staged.
+    """
+    jar_rules = jar_rules or JarRules.default()
+    # The staged contents are always fingerprinted in-process, but like open_jar, the segment is
+    # only written in-process if the jar-tool is not configured in its place.
+    writer = JarWriter(jar_rules)
+    with jar._stage(writer) as staged:
+      if not staged:
+        return None
+
+      path = os.path.join(segment_dir, '%s.jar' % writer.fingerprint())
+      if not os.path.exists(path):
+        safe_rmtree(segment_dir)
+        if self._native:
+          try:
+            writer.write(path, overwrite=True)
+          except (writer.Error, Duplicate.Error) as e:
+            raise TaskError('Failed to write to jar at %s: %s' % (path, e))
+        else:
+          safe_mkdir(segment_dir)
+          self._write_with_jar_tool(jar, path, overwrite=True, compressed=True,
+                                    jar_rules=jar_rules)
+      return path
+
   class JarBuilder(AbstractClass):
     """A utility to aid in adding the classes and resources associated with targets to a jar."""
 
     @staticmethod
-    def _write_agent_manifest(agent, jar):
+    def write_agent_manifest(agent, jar):
+      """Writes the manifest for the given java agent target to the given open jar."""
       # TODO(John Sirois): refactor an agent model to support 'Boot-Class-Path' properly.
       manifest = Manifest()
       manifest.addentry(Manifest.MANIFEST_VERSION, '1.0')
@@ -305,13 +403,15 @@ class JarTask(NailgunTask):
     def _context(self):
       """Implementations must supply a context."""
 
-    def add_target(self, jar, target, recursive=False):
+    def add_target(self, jar, target, recursive=False, agent_manifest=True):
       """Adds the classes and resources for a target to an open jar.
 
       :param jar: An open jar to add to.
       :param target: The target to add generated classes and resources for.
       :param bool recursive: `True` to add classes and resources for the target's transitive
         internal dependency closure.
+      :param bool agent_manifest: `True` to write the manifest of java agent targets added to the
+        jar; `False` if the caller writes any agent manifest itself.
       :returns: The list of targets that actually contributed classes or resources or both to the
         jar.
       """
@@ -346,8 +446,8 @@ class JarTask(NailgunTask):
           for resources_target in target_resources:
             add_products(resources_target)
 
-          if tgt.is_java_agent:
-            self._write_agent_manifest(tgt, jar)
+          if agent_manifest and tgt.is_java_agent:
+            self.write_agent_manifest(tgt, jar)
 
       if recursive:
         target.walk(add_to_jar)
@@ -0,0 +1,381 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import namedtuple, OrderedDict
+from contextlib import closing
+import hashlib
+from multiprocessing.pool import ThreadPool
+import os
+import platform
+import struct
+import sys
+import time
+import zipfile
+import zlib
+
+from twitter.common.collections import maybe_list
+
+from pants.backend.jvm.targets.jvm_binary import Duplicate, JarRules, Skip
+from pants.java.jar.manifest import Manifest
+from pants.util.dirutil import safe_delete, safe_mkdir_for
+
+
+class JarWriter(object):
+  """Writes jars in-process, honoring the same jar rules the jar-tool does.
+
+  Entries are staged by reference and only read as the jar is streamed out, so at most a small
+  batch of entries is held in memory at any one time.  Entries of other jars that are already
+  compressed as needed are copied over as is, without being inflated and deflated again.  With more
+  than one worker, the remaining entries of each batch are deflated in parallel before being written
+  in order.
+  """
+
+  class Error(Exception):
+    """Indicates an error writing a jar."""
+
+  # The entry is the (open jar, ZipInfo) a source was read from if it came from another jar.
+  _Source = namedtuple('_Source', ['name', 'date_time', 'read', 'entry'])
+
+  # Generated entries get a fixed timestamp so jars built from the same inputs are identical.
+  _EPOCH = (1980, 1, 1, 0, 0, 0)
+
+  _CREATED_BY = 'pants'
+
+  _BATCH_SIZE_PER_WORKER = 8
+
+  # Copying compressed entries as is and deflating entries in parallel both write already
+  # compressed data, which the public ZipFile API does not support.  We do so via the internals of
+  # the CPython 2.7 ZipFile, and elsewhere fall back to having ZipFile compress every entry itself.
+  _RAW_WRITES = platform.python_implementation() == 'CPython' and sys.version_info[:2] == (2, 7)
+
+  def __init__(self, jar_rules=None, compressed=True, workers=1):
+    """
+    :param jar_rules: An optional set of rules for handling jar exclusions and duplicates.
+    :param bool compressed: ``True`` to deflate entries, ``False`` to store them as is.
+    :param int workers: The number of threads to deflate entries with.
+    """
+    self._jar_rules = jar_rules or JarRules.default()
+    for rule in self._jar_rules.rules:
+      if not isinstance(rule, (Skip, Duplicate)):
+        raise ValueError('Unrecognized rule: %s' % rule)
+    self._compression = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    self._workers = max(1, workers)
+
+    self._sources = []
+    self._keys = []
+    self._jars = []
+    self._manifest = None
+    self._main = None
+    self._classpath = None
+
+  def main(self, main):
+    """Specifies a Main-Class entry for the jar's manifest."""
+    self._main = main
+
+  def classpath(self, classpath):
+    """Specifies a Class-Path entry for the jar's manifest."""
+    self._classpath = maybe_list(classpath)
+
+  def manifest(self, contents):
+    """Specifies the raw contents of the jar's manifest."""
+    self._manifest = contents
+
+  def add_file(self, src, dest):
+    """Stages the file at ``src`` to be written to the ``dest`` path in the jar."""
+    def read():
+      with open(src, 'rb') as fp:
+        return fp.read()
+    self._keys.append('file|%s|%s' % (dest, self._stat_key(src)))
+    self._sources.append(self._Source(self._normalize(dest), self._date_time(src), read, None))
+
+  def add_directory(self, src, dest=None):
+    """Stages all the files under the ``src`` directory, optionally prefixed with ``dest``."""
+    for root, dirs, files in os.walk(src):
+      dirs.sort()
+      for f in sorted(files):
+        path = os.path.join(root, f)
+        relpath = os.path.relpath(path, src)
+        self.add_file(path, os.path.join(dest, relpath) if dest else relpath)
+
+  def add_bytes(self, dest, contents):
+    """Stages the given ``contents`` to be written to the ``dest`` path in the jar."""
+    self._keys.append('bytes|%s|%s' % (dest, hashlib.sha1(contents).hexdigest()))
+    self._sources.append(self._Source(self._normalize(dest), self._EPOCH, lambda: contents,
+                                      None))
+
+  def add_jar(self, path):
+    """Stages all the entries of the jar at ``path``, save for its manifest."""
+    self._keys.append('jar|%s' % self._stat_key(path))
+    self._jars.append(path)
+
+  def fingerprint(self):
+    """Returns a fingerprint of the jar the staged entries would be written to.
+
+    Staged files are fingerprinted by their size and modification time rather than their contents,
+    so this is cheap enough to decide whether a previously written jar can be reused.
+    """
+    hasher = hashlib.sha1()
+    hasher.update(('%d|%s|%s|%s\n' % (self._compression,
+                                      self._main,
+                                      self._classpath,
+                                      self._manifest and hashlib.sha1(self._manifest).hexdigest()))
+                  .encode('utf-8'))
+    actions = (Duplicate.SKIP, Duplicate.REPLACE, Duplicate.CONCAT, Duplicate.FAIL)
+    hasher.update(('default|%d\n' % actions.index(self._jar_rules.default_dup_action))
+                  .encode('utf-8'))
+    for rule in self._jar_rules.rules:
+      action = actions.index(rule.action) if isinstance(rule, Duplicate) else -1
+      hasher.update(('%s|%s|%d\n' % (type(rule).__name__, rule.apply_pattern.pattern, action))
+                    .encode('utf-8'))
+    for key in self._keys:
+      hasher.update(('%s\n' % key).encode('utf-8'))
+    return hasher.hexdigest()
+
+  def write(self, path, overwrite=False):
+    """Writes the staged entries to the jar at ``path``.
+
+    :param string path: The path of the jar to write.
+    :param bool overwrite: ``True`` to replace any existing jar at ``path``; ``False`` to update it,
+      in which case staged entries replace existing entries of the same name.
+    :raises: :class:`JarWriter.Error` if the jar could not be written.
+    :raises: :class:`pants.backend.jvm.targets.jvm_binary.Duplicate.Error` for duplicate entries
+      handled with ``Duplicate.FAIL``.
+    """
+    existing = None
+    jars = []
+    try:
+      update = not overwrite and os.path.exists(path) and os.path.getsize(path) > 0
+      existing = zipfile.ZipFile(path) if update else None
+      for jar in self._jars:
+        jars.append(zipfile.ZipFile(jar))
+
+      staged = self._sources[:]
+      for jar in jars:
+        staged.extend(self._jar_sources(jar))
+      entries = self._resolve(staged)
+
+      manifest = self._manifest
+      if existing:
+        if manifest is None and Manifest.PATH in existing.NameToInfo:
+          manifest = existing.read(Manifest.PATH)
+        updated = OrderedDict((source.name, source) for source in self._jar_sources(existing)
+                              if source.name not in entries)
+        updated.update(entries)
+        entries = updated
+
+      tmp_path = '%s.%d.tmp' % (path, os.getpid())
+      safe_mkdir_for(tmp_path)
+      try:
+        with closing(zipfile.ZipFile(tmp_path, 'w', self._compression, allowZip64=True)) as zf:
+          self._write_entries(zf, self._manifest_contents(manifest), entries.values())
+        os.rename(tmp_path, path)
+      finally:
+        safe_delete(tmp_path)
+    except (IOError, OSError, zipfile.BadZipfile, zlib.error) as e:
+      raise self.Error('Problem writing jar %s: %s' % (path, e))
+    finally:
+      if existing:
+        existing.close()
+      for jar in jars:
+        jar.close()
+
+  @staticmethod
+  def _normalize(name):
+    return name.replace(os.sep, '/').lstrip('/')
+
+  @staticmethod
+  def _stat_key(path):
+    stat = os.stat(path)
+    return '%s|%d|%r' % (os.path.realpath(path), stat.st_size, stat.st_mtime)
+
+  @classmethod
+  def _date_time(cls, path):
+    date_time = time.localtime(os.path.getmtime(path))[:6]
+    return max(date_time, cls._EPOCH)
+
+  @classmethod
+  def _jar_sources(cls, jar):
+    for info in jar.infolist():
+      if not info.filename.endswith('/') and info.filename != Manifest.PATH:
+        yield cls._Source(info.filename, info.date_time, lambda info=info: jar.read(info),
+                          (jar, info))
+
+  def _resolve(self, sources):
+    """Applies the jar rules to the staged sources, returning an ordered map of name to source."""
+    skip_patterns = [rule.apply_pattern for rule in self._jar_rules.rules
+                     if isinstance(rule, Skip)]
+    duplicate_rules = [rule for rule in self._jar_rules.rules if isinstance(rule, Duplicate)]
+
+    grouped = OrderedDict()
+    for source in sources:
+      if source.name == Manifest.PATH:
+        continue
+      if any(pattern.search(source.name) for pattern in skip_patterns):
+        continue
+      grouped.setdefault(source.name, []).append(source)
+
+    entries = OrderedDict()
+    for name, duplicates in grouped.items():
+      if len(duplicates) == 1:
+        entries[name] = duplicates[0]
+        continue
+
+      action = next((rule.action for rule in duplicate_rules if rule.apply_pattern.search(name)),
+                    self._jar_rules.default_dup_action)
+      if action is Duplicate.SKIP:
+        entries[name] = duplicates[0]
+      elif action is Duplicate.REPLACE:
+        entries[name] = duplicates[-1]
+      elif action is Duplicate.CONCAT:
+        entries[name] = self._concat(name, duplicates)
+      else:
+        raise Duplicate.Error(name)
+    return entries
+
+  @classmethod
+  def _concat(cls, name, duplicates):
+    def read():
+      return b''.join(duplicate.read() for duplicate in duplicates)
+    return cls._Source(name, cls._EPOCH, read, None)
+
+  def _manifest_contents(self, contents):
+    if contents is not None and not self._main and not self._classpath:
+      return contents
+
+    if contents is None:
+      manifest = Manifest()
+      manifest.addentry(Manifest.MANIFEST_VERSION, '1.0')
+      manifest.addentry(Manifest.CREATED_BY, self._CREATED_BY)
+    else:
+      replaced = [header for header, value in ((Manifest.MAIN_CLASS, self._main),
+                                               (Manifest.CLASS_PATH, self._classpath)) if value]
+      manifest = Manifest(self._without_headers(contents, replaced))
+    if self._main:
+      manifest.addentry(Manifest.MAIN_CLASS, self._main)
+    if self._classpath:
+      manifest.addentry(Manifest.CLASS_PATH, ' '.join(self._classpath))
+    return manifest.contents()
+
+  @staticmethod
+  def _without_headers(contents, headers):
+    """Strips the named headers, along with their continuation lines, from manifest contents."""
+    prefixes = tuple(('%s:' % header).encode('ascii') for header in headers)
+    lines = []
+    skipping = False
+    for line in contents.splitlines():
+      if line.startswith(b' '):
+        if not skipping:
+          lines.append(line)
+      else:
+        skipping = line.startswith(prefixes)
+        if not skipping:
+          lines.append(line)
+    return b'\n'.join(lines)
+
+  def _write_entries(self, zf, manifest, sources):
+    written_dirs = set()
+
+    def write_dirs(name):
+      parts = name.split('/')[:-1]
+      for i in range(1, len(parts) + 1):
+        dirname = '/'.join(parts[:i]) + '/'
+        if dirname not in written_dirs:
+          written_dirs.add(dirname)
+          info = zipfile.ZipInfo(dirname, self._EPOCH)
+          info.external_attr = (0o40755 << 16) | 0x10
+          zf.writestr(info, b'')
+
+    def write_file(source, data, deflated=None):
+      write_dirs(source.name)
+      info = zipfile.ZipInfo(source.name, source.date_time)
+      info.external_attr = 0o644 << 16
+      info.compress_type = self._compression
+      if deflated is None:
+        zf.writestr(info, data)
+      else:
+        info.file_size = len(data)
+        info.compress_size = len(deflated)
+        info.CRC = zlib.crc32(data) & 0xffffffff
+        self._write_compressed(zf, info, deflated)
+
+    def copy_entry(source):
+      write_dirs(source.name)
+      jar, src_info = source.entry
+      info = zipfile.ZipInfo(source.name, src_info.date_time)
+      info.external_attr = src_info.external_attr
+      info.compress_type = src_info.compress_type
+      info.file_size = src_info.file_size
+      info.compress_size = src_info.compress_size
+      info.CRC = src_info.CRC
+      self._write_compressed(zf, info, self._read_compressed(jar, src_info))
+
+    write_file(self._Source(Manifest.PATH, self._EPOCH, None, None), manifest)
+
+    parallel = (self._RAW_WRITES and self._workers > 1
+                and self._compression == zipfile.ZIP_DEFLATED)
+    pool = ThreadPool(self._workers) if parallel else None
+    try:
+      batch_size = self._workers * self._BATCH_SIZE_PER_WORKER
+      for start in range(0, len(sources), batch_size):
+        batch = [(source, None if self._can_copy(source) else source.read())
+                 for source in sources[start:start + batch_size]]
+        if pool:
+          deflated = pool.map_async(self._deflate, [data for _, data in batch])
+          deflated = deflated.get(timeout=1000000000)
+        else:
+          deflated = [None] * len(batch)
+        for (source, data), compressed in zip(batch, deflated):
+          if data is None:
+            copy_entry(source)
+          else:
+            write_file(source, data, compressed)
+    finally:
+      if pool:
+        pool.terminate()
+
+  def _can_copy(self, source):
+    """Returns ``True`` if the source is an entry of another jar that can be copied as is."""
+    if not self._RAW_WRITES or source.entry is None:
+      return False
+    _, info = source.entry
+    return info.compress_type == self._compression and not info.flag_bits & 0x1
+
+  @staticmethod
+  def _deflate(data):
+    if data is None:
+      return None
+    # zlib releases the GIL while compressing, so entries deflate in parallel across threads.
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+  @staticmethod
+  def _read_compressed(jar, info):
+    """Reads the still compressed data of the given entry of an open jar.
+
+    Only used if ``_RAW_WRITES``.
+    """
+    jar.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, jar.fp.read(zipfile.sizeFileHeader))
+    if header[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+      raise zipfile.BadZipfile('Bad local file header for %s' % info.filename)
+    jar.fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+    return jar.fp.read(info.compress_size)
+
+  @staticmethod
+  def _write_compressed(zf, info, data):
+    """Writes an entry whose data is already compressed; mirrors ``ZipFile.writestr``.
+
+    The ``info`` must carry the entry's uncompressed size and CRC.  Only used if ``_RAW_WRITES``.
+    """
+    info.header_offset = zf.fp.tell()
+    zf._writecheck(info)
+    zf._didModify = True
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    zf.fp.write(info.FileHeader(zip64))
+    zf.fp.write(data)
+    zf.filelist.append(info)
+    zf.NameToInfo[info.filename] = info
@@ -11,7 +11,7 @@ import os
 from twitter.common.collections.ordereddict import OrderedDict
 from twitter.common.collections.orderedset import OrderedSet
 
-from pants.backend.jvm.tasks.jar_task import JarTask
+from pants.backend.jvm.tasks.jar_task import Jar, JarTask
 from pants.backend.jvm.targets.jvm_binary import JvmBinary
 
 
@@ -56,6 +56,10 @@ class JvmBinaryTask(JarTask):
 
     Yields a handle to the open jarfile, so the caller can add to the jar if needed.
 
+    The classes and resources of each internal target are added by way of a segment jar cached
+    across runs, and along with the external jar deps are copied into the jar without being
+    recompressed where possible.
+
     :param binary: The jvm_binary target to operate on.
     :param path: Write the output jar here, overwriting an existing file, if any.
     :param with_external_deps: If True, unpack external jar deps and add their classes to the jar.
@@ -70,7 +74,13 @@ class JvmBinaryTask(JarTask):
                          compressed=True) as jar:
 
         with self.context.new_workunit(name='add-internal-classes'):
-          self._jar_builder.add_target(jar, binary, recursive=True)
+          def add_segment(target):
+            segment = self._internal_segment(target, binary.deploy_jar_rules)
+            if segment:
+              jar.writejar(segment)
+            if target.is_java_agent:
+              self._jar_builder.write_agent_manifest(target, jar)
+          binary.walk(add_segment)
 
         if with_external_deps:
           with self.context.new_workunit(name='add-dependency-jars'):
@@ -81,6 +91,20 @@ class JvmBinaryTask(JarTask):
 
         yield jar
 
+  def _internal_segment(self, target, jar_rules):
+    """Returns the path of a cached jar holding just the classes and resources of the target.
+
+    Monolithic jars are assembled from these per-target segments so that, after a small change,
+    only the segments of changed targets are recompressed.
+    """
+    segment = Jar()
+    # Manifests are dropped when segments are grafted into a jar, so any agent manifest is written
+    # to the monolithic jar directly instead.
+    self._jar_builder.add_target(segment, target, agent_manifest=False)
+    return self.segment_jar(segment,
+                            os.path.join(self.workdir, 'segments', target.id),
+                            jar_rules=jar_rules)
+
   def _mapped_dependencies(self, jardepmap, binary, confs):
     # TODO(John Sirois): rework product mapping towards well known types
 
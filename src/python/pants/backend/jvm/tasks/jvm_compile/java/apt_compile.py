@@ -0,0 +1,22 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from pants.backend.jvm.tasks.jvm_compile.java.java_compile import JavaCompile
+
+
+# AnnotationProcessors are java targets, but we need to force them into their own compilation
+# rounds so that they are on classpath of any dependees downstream that may use them. Without
+# forcing a separate member type we could get a java chunk containing a mix of apt processors and
+# code that relied on the un-compiled apt processor in the same javac invocation.  If so, javac
+# would not be smart enough to compile the apt processors 1st and activate them.
+class AptCompile(JavaCompile):
+  @classmethod
+  def name(cls):
+    return 'apt'
+
+  def select(self, target):
+    return super(AptCompile, self).select(target) and target.is_apt
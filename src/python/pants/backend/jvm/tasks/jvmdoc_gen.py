@@ -35,6 +35,10 @@ class JvmdocGen(JvmTask):
   def product_types(cls):
     return [cls.jvmdoc().product_type]
 
+  @classmethod
+  def supports_concurrent_execution(cls):
+    return True
+
   @classmethod
   def setup_parser_config(cls):
     return ParserConfig(*['%s_%s' % (cls.__name__, opt) for opt in ParserConfig._fields])
@@ -11,10 +11,12 @@ import os
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.backend.core.tasks.task import QuietTaskMixin, Task, TaskBase
 from pants.base.exceptions import TaskError
+from pants.base.workunit import WorkUnit
 from pants.java import util
 from pants.java.distribution.distribution import Distribution
 from pants.java.executor import SubprocessExecutor
 from pants.java.nailgun_executor import NailgunExecutor
+from pants.process.xargs import Xargs, args_size
 
 
 class NailgunTaskBase(TaskBase, JvmToolTaskMixin):
@@ -89,14 +91,14 @@ class NailgunTaskBase(TaskBase, JvmToolTaskMixin):
     return self.context.config.getlist('nailgun', 'jvm_args', default=[])
 
   def runjava(self, classpath, main, jvm_options=None, args=None, workunit_name=None,
-              workunit_labels=None):
+              workunit_labels=None, executor=None):
     """Runs the java main using the given classpath and args.
 
     If --no-ng-daemons is specified then the java main is run in a freshly spawned subprocess,
     otherwise a persistent nailgun server dedicated to this Task subclass is used to speed up
-    amortized run times.
+    amortized run times.  An executor from create_java_executor may be passed to reuse it.
     """
-    executor = self.create_java_executor()
+    executor = executor or self.create_java_executor()
     try:
       return util.execute_java(classpath=classpath,
                                main=main,
@@ -109,6 +111,64 @@ class NailgunTaskBase(TaskBase, JvmToolTaskMixin):
     except executor.Error as e:
       raise TaskError(e)
 
+  @property
+  def xargs_workers(self):
+    """The number of concurrent java invocations runjava_xargs may use.
+
+    Defaults to 1.  If a value for ``xargs_workers`` is specified in pants.ini globally in the
+    ``DEFAULT`` section or in this task's config section, then that value will be used.
+    """
+    return self.context.config.getint(self.config_section, 'xargs_workers', default=1)
+
+  def execution_resources(self):
+    """Claims a worker for each concurrent java invocation, and the jvms they run in.
+
+    With nailgun all the invocations share this task's nailgun server; otherwise each runs in a
+    jvm of its own.
+    """
+    workers = self.xargs_workers
+    uses_nailgun = self.nailgun_is_enabled and self.context.options.nailgun_daemon
+    return {'worker': workers, 'jvm': 1 if uses_nailgun else workers}
+
+  def runjava_xargs(self, classpath, main, xargs, jvm_options=None, args=None, workunit_name=None,
+                    workunit_labels=None):
+    """Runs the java main over xargs in as few chunks as the system argument limit allows.
+
+    Each chunk is appended to args for one runjava invocation, and when ``xargs_workers`` is more
+    than 1 chunks are run concurrently.  Returns the exit code of the first failing chunk, in
+    chunk order, or else 0.
+    """
+    jvm_options = jvm_options or []
+    args = args or []
+    # Leave room for the classpath and fixed args when not run via nailgun.
+    reserved_size = args_size(['-cp', os.pathsep.join(classpath), main] + jvm_options + args)
+
+    workers = self.xargs_workers
+    executor = self.create_java_executor()
+
+    def call(chunk):
+      return self.runjava(classpath=classpath, main=main, jvm_options=jvm_options,
+                          args=args + chunk, workunit_name=workunit_name,
+                          workunit_labels=workunit_labels, executor=executor)
+
+    if workers <= 1:
+      return Xargs(call, reserved_size=reserved_size).execute(xargs)
+
+    if isinstance(executor, NailgunExecutor):
+      # Bring the nailgun up here rather than racing to spawn it from each of the pool threads.
+      try:
+        executor.start(classpath, jvm_options=jvm_options)
+      except executor.Error as e:
+        raise TaskError(e)
+
+    with self.context.new_workunit(name=workunit_name or 'xargs',
+                                   labels=[WorkUnit.MULTITOOL]) as workunit:
+      def call_in_workunit(chunk):
+        # Chunks run on Xargs pool threads which must report under this workunit.
+        self.context.run_tracker.register_thread(workunit)
+        return call(chunk)
+      return Xargs(call_in_workunit, workers=workers, reserved_size=reserved_size).execute(xargs)
+
 
 class NailgunTask(NailgunTaskBase, Task):
   # TODO(John Sirois): This just prevents ripple - maybe inline
@@ -125,5 +185,10 @@ class NailgunKillall(Task, QuietTaskMixin):
                             help="[%default] Kill all nailguns servers launched by pants for "
                                  "all workspaces on the system.")
 
+  @classmethod
+  def requires_exclusive_workspace(cls):
+    # Other runs in the workspace may be using the nailguns.
+    return True
+
   def execute(self):
     NailgunTaskBase.killall(everywhere=self.context.options.ng_killall_everywhere)
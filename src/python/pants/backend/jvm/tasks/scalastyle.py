@@ -13,7 +13,6 @@ from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.config import Config
 from pants.base.exceptions import TaskError
 from pants.base.target import Target
-from pants.process.xargs import Xargs
 
 
 class Scalastyle(NailgunTask, JvmToolTaskMixin):
@@ -27,11 +26,18 @@ class Scalastyle(NailgunTask, JvmToolTaskMixin):
     from style checks. File names matched against these regular
     expressions are relative to the repository root
     (e.g.: com/twitter/mybird/MyBird.scala).
+
+  Only targets that changed since they last passed are re-checked, and passing results are
+  shared through the artifact caches configured in the 'scalastyle' section (or the defaults).
   """
 
   _CONFIG_SECTION = 'scalastyle'
   _MAIN = 'org.scalastyle.Main'
 
+  @classmethod
+  def supports_concurrent_execution(cls):
+    return True
+
   @classmethod
   def setup_parser(cls, option_group, args, mkflag):
     super(Scalastyle, cls).setup_parser(option_group, args, mkflag)
@@ -61,13 +67,15 @@ class Scalastyle(NailgunTask, JvmToolTaskMixin):
     self._scalastyle_bootstrap_key = 'scalastyle'
     self.register_jvm_tool(self._scalastyle_bootstrap_key, [':scalastyle'])
 
+    self.setup_artifact_cache_from_config(config_section=self._CONFIG_SECTION)
+
   @property
   def config_section(self):
     return self._CONFIG_SECTION
 
   def execute(self):
     if self.context.options.scalastyle_skip:
-      self.context.log.debug('Skipping checkstyle.')
+      self.context.log.debug('Skipping scalastyle.')
       return
 
     check_targets = list()
@@ -77,6 +85,20 @@ class Scalastyle(NailgunTask, JvmToolTaskMixin):
         if isinstance(tgt, Target) and tgt.has_sources('.scala'):
           check_targets.append(tgt)
 
+    with self.invalidated(check_targets) as invalidation_check:
+      invalid_vts = invalidation_check.invalid_vts
+      scala_sources = self.calculate_sources([vt.target for vt in invalid_vts])
+      if scala_sources:
+        cp = self.tool_classpath(self._scalastyle_bootstrap_key)
+        result = self.runjava_xargs(classpath=cp,
+                                    main=self._MAIN,
+                                    args=['-c', self._scalastyle_config],
+                                    xargs=scala_sources)
+        if result != 0:
+          raise TaskError('java %s ... exited non-zero (%i)' % (Scalastyle._MAIN, result))
+      self.update_artifact_cache_with_markers(invalid_vts)
+
+  def calculate_sources(self, targets):
     def filter_excludes(filename):
       if self._excludes:
         for exclude in self._excludes:
@@ -85,18 +107,9 @@ class Scalastyle(NailgunTask, JvmToolTaskMixin):
       return True
 
     scala_sources = list()
-    for target in check_targets:
+    for target in targets:
       def collect(filename):
         if filename.endswith('.scala'):
           scala_sources.append(os.path.join(target.target_base, filename))
       map(collect, filter(filter_excludes, target.sources))
-
-    if scala_sources:
-      def call(srcs):
-        cp = self.tool_classpath(self._scalastyle_bootstrap_key)
-        return self.runjava(classpath=cp,
-                            main=self._MAIN,
-                            args=['-c', self._scalastyle_config] + srcs)
-      result = Xargs(call).execute(scala_sources)
-      if result != 0:
-        raise TaskError('java %s ... exited non-zero (%i)' % (Scalastyle._MAIN, result))
+    return scala_sources
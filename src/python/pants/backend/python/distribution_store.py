@@ -0,0 +1,161 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from pex.common import open_zip
+from pex.util import CacheHelper, DistributionHelper
+
+from pants.backend.python.python_setup import PythonSetup
+from pants.backend.python.resolver import get_platforms, resolve_multi
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_rmtree
+
+
+class DistributionStore(object):
+  """A machine-wide store of resolved third party distributions.
+
+  Resolves are memoized by requirement set, interpreter identity and platforms, and each resolved
+  distribution is unpacked into the store and hashed just once, so dumping it into a chroot costs
+  no more than a hard link per file.
+  """
+
+  # Bump this whenever the layout of the store changes.
+  VERSION = 1
+
+  @classmethod
+  def from_config(cls, config):
+    return cls(PythonSetup(config).scratch_dir('distribution_store', default_name='distributions'))
+
+  def __init__(self, root, ttl=3600):
+    """
+    :param string root: The directory to store distributions and memoized resolves under.
+    :param int ttl: Time in seconds before a memoized resolve of any open-ended requirement, e.g.
+      "flask>=0.2", is considered stale and resolved again.
+    """
+    self._root = os.path.join(root, str(self.VERSION))
+    self._ttl = ttl
+
+  def resolve(self, config, requirements, interpreter, platforms=None, conn_timeout=None):
+    """Returns the same dict of platform to distributions `resolve_multi` would.
+
+    A memoized resolve is reused as long as all of its distributions still exist and, if any of the
+    requirements is open-ended, it is younger than the ttl.
+    """
+    platforms = get_platforms(platforms or config.getlist('python-setup', 'platforms', ['current']))
+    requirements = list(requirements)
+    memo_path = os.path.join(self._root, 'resolves',
+                             '%s.json' % self._resolve_key(requirements, interpreter, platforms))
+    pinned = all(len(req.specs) == 1 and req.specs[0][0] == '==' for req in requirements)
+
+    distributions = self._load_resolve(memo_path, None if pinned else self._ttl)
+    if distributions is None:
+      distributions = resolve_multi(config,
+                                    requirements,
+                                    interpreter=interpreter,
+                                    platforms=platforms,
+                                    conn_timeout=conn_timeout,
+                                    ttl=self._ttl)
+      self._save_resolve(memo_path, distributions)
+    return distributions
+
+  def add(self, builder, dist):
+    """Links the files of a resolved distribution into the given PEXBuilder's chroot.
+
+    The distribution is unpacked into the store the first time it is added to any chroot.
+    """
+    dist_name = os.path.basename(dist.location)
+    files_dir, dist_hash = self._materialize(dist.location)
+    for root, _, files in os.walk(files_dir):
+      for f in files:
+        path = os.path.join(root, f)
+        relpath = os.path.relpath(path, files_dir)
+        builder.chroot().link(path, os.path.join(builder.info.internal_cache, dist_name, relpath))
+    builder.info.add_distribution(dist_name, dist_hash)
+
+  @staticmethod
+  def _resolve_key(requirements, interpreter, platforms):
+    hasher = hashlib.sha1()
+    hasher.update(str(interpreter.identity).encode('utf-8'))
+    for platform in sorted(platforms):
+      hasher.update(('platform|%s\n' % platform).encode('utf-8'))
+    for req in sorted('%s|%s|%s' % (req.requirement, req.repository, req.use_2to3)
+                      for req in requirements):
+      hasher.update(('%s\n' % req).encode('utf-8'))
+    return hasher.hexdigest()
+
+  @staticmethod
+  def _load_resolve(memo_path, ttl):
+    try:
+      with open(memo_path, 'r') as fp:
+        memo = json.load(fp)
+    except (IOError, ValueError):
+      return None
+    if ttl is not None and time.time() - memo.get('timestamp', 0) > ttl:
+      return None
+
+    distributions = {}
+    for platform, locations in memo.get('distributions', {}).items():
+      dists = distributions[platform] = []
+      for location in locations:
+        if not os.path.exists(location):
+          return None
+        dist = DistributionHelper.distribution_from_path(location)
+        if dist is None:
+          return None
+        dists.append(dist)
+    return distributions
+
+  @staticmethod
+  def _save_resolve(memo_path, distributions):
+    memo = {'timestamp': time.time(),
+            'distributions': dict((platform, [dist.location for dist in dists])
+                                  for platform, dists in distributions.items())}
+    safe_mkdir_for(memo_path)
+    tmp_path = '%s.%d.tmp' % (memo_path, os.getpid())
+    with open(tmp_path, 'w') as fp:
+      json.dump(memo, fp)
+    os.rename(tmp_path, memo_path)
+
+  def _materialize(self, location):
+    """Returns the (files dir, hash) of the distribution at location, unpacked into the store."""
+    stat = os.stat(location)
+    key = hashlib.sha1(('%s|%d|%d' % (os.path.realpath(location), stat.st_size, stat.st_mtime))
+                       .encode('utf-8')).hexdigest()
+    entry = os.path.join(self._root, 'dists', '%s.%s' % (os.path.basename(location), key[:16]))
+    hash_path = os.path.join(entry, 'hash')
+    if not os.path.exists(hash_path):
+      safe_mkdir(os.path.dirname(entry))
+      tmp_entry = tempfile.mkdtemp(dir=os.path.dirname(entry), prefix='.tmp.')
+      try:
+        files_dir = os.path.join(tmp_entry, 'files')
+        if os.path.isdir(location):
+          shutil.copytree(location, files_dir)
+          dist_hash = CacheHelper.dir_hash(location)
+        else:
+          with open_zip(location) as zf:
+            for name in zf.namelist():
+              if not name.endswith('/'):
+                zf.extract(name, files_dir)
+            dist_hash = CacheHelper.zip_hash(zf)
+        with open(os.path.join(tmp_entry, 'hash'), 'w') as fp:
+          fp.write(dist_hash)
+        try:
+          os.rename(tmp_entry, entry)
+        except OSError:
+          # Another process unpacked the same distribution first; theirs is just as good.
+          if not os.path.exists(hash_path):
+            raise
+      finally:
+        safe_rmtree(tmp_entry)
+
+    with open(hash_path, 'r') as fp:
+      return os.path.join(entry, 'files'), fp.read().strip()
@@ -5,6 +5,7 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+import json
 import os
 from pkg_resources import Requirement
 import shutil
@@ -17,7 +18,7 @@ from pex.package import EggPackage, SourcePackage
 
 from pants.backend.python.python_setup import PythonSetup
 from pants.backend.python.resolver import crawler_from_config, fetchers_from_config
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for
 
 
 # TODO(wickman) Create a safer version of this and add to twitter.common.dirutil
@@ -102,7 +103,106 @@ def _resolve(config, interpreter, logger=print):
     return _resolve_interpreter(config, interpreter, wheel_requirement, logger=logger)
 
 
+class InterpreterIndex(object):
+  """A persistent index of interpreter binary path to identity.
+
+  Entries are validated against the stat signature - inode, mtime and size - of the binary, so an
+  interpreter is only launched to establish its identity when it is new or has changed.  A binary
+  that fails to identify is only trusted to be a non-interpreter once it fails again, unchanged,
+  on a later run.
+  """
+
+  # Bump this whenever the shape of index entries changes.
+  VERSION = 2
+
+  # The number of runs a binary must fail to identify in before we stop trying.
+  _MAX_FAILURES = 2
+
+  def __init__(self, path):
+    """
+    :param string path: The file the index is persisted to.
+    """
+    self._path = path
+    self._entries = self._load()
+    self._dirty = False
+    self._checked = set()  # Binaries already launched by this index.
+
+  def _load(self):
+    try:
+      with open(self._path, 'r') as fp:
+        index = json.load(fp)
+      if index.get('version') == self.VERSION:
+        return index['entries']
+    except (IOError, ValueError, KeyError, AttributeError):
+      pass
+    return {}
+
+  def save(self):
+    """Persists the index if it changed since it was loaded."""
+    if self._dirty:
+      safe_mkdir_for(self._path)
+      tmp_path = '%s.%d.tmp' % (self._path, os.getpid())
+      with open(tmp_path, 'w') as fp:
+        json.dump({'version': self.VERSION, 'entries': self._entries}, fp)
+      os.rename(tmp_path, self._path)
+      self._dirty = False
+
+  @staticmethod
+  def _signature(binary):
+    stat = os.stat(binary)
+    return [stat.st_ino, stat.st_mtime, stat.st_size]
+
+  def identify(self, binary):
+    """Returns the PythonInterpreter for the given binary, or None if it can't be identified."""
+    try:
+      signature = self._signature(binary)
+    except OSError:
+      return None
+
+    entry = self._entries.get(binary)
+    unchanged = entry is not None and entry['signature'] == signature
+    if not unchanged or (entry['identity'] is None and entry['failures'] < self._MAX_FAILURES
+                         and binary not in self._checked):
+      self._checked.add(binary)
+      try:
+        interpreter = PythonInterpreter.from_binary(binary)
+      except OSError:
+        # The binary could not be launched this time; that need not hold next time.
+        return None
+      except (PythonInterpreter.Error, PythonIdentity.Error):
+        # Remember binaries that aren't interpreters too, so they aren't launched on every run.
+        failures = entry['failures'] + 1 if unchanged else 1
+        entry = dict(signature=signature, identity=None, extras=[], failures=failures)
+      else:
+        entry = dict(signature=signature,
+                     identity=str(interpreter.identity),
+                     extras=sorted([name, version, location]
+                                   for (name, version), location in interpreter.extras.items()),
+                     failures=0)
+      self._entries[binary] = entry
+      self._dirty = True
+
+    if entry['identity'] is None:
+      return None
+    extras = dict(((name, version), location) for name, version, location in entry['extras'])
+    return PythonInterpreter(binary, PythonIdentity.from_path(entry['identity']), extras=extras)
+
+  def find(self, paths):
+    """Like `PythonInterpreter.all`, but only launching new or changed interpreter binaries."""
+    pythons = []
+    for path in paths:
+      for fn in PythonInterpreter.expand_path(path):
+        basefile = os.path.basename(fn)
+        if any(matcher.match(basefile) is not None for matcher in PythonInterpreter.REGEXEN):
+          interpreter = self.identify(fn)
+          if interpreter:
+            pythons.append(interpreter)
+    return PythonInterpreter.filter(pythons)
+
+
 class PythonInterpreterCache(object):
+  _INDEX = '.index.json'
+
   @staticmethod
   def _cache_dir(config):
     return PythonSetup(config).scratch_dir('interpreter_cache', default_name='interpreters')
@@ -135,6 +235,7 @@ class PythonInterpreterCache(object):
     self._config = config
     safe_mkdir(self._path)
     self._interpreters = set()
+    self._index = InterpreterIndex(os.path.join(self._path, self._INDEX))
     self._logger = logger or (lambda msg: True)
     self._default_filters = (PythonInterpreterCache._interpreter_requirement(config) or b'',)
 
@@ -150,6 +251,10 @@ class PythonInterpreterCache(object):
       executable = os.readlink(os.path.join(path, 'python'))
     except OSError:
       return None
+    # The binary may have been replaced by a different version since it was linked here.
+    identified = self._index.identify(executable)
+    if identified is None or str(identified.identity) != interpreter_dir:
+      return None
     interpreter = PythonInterpreter(executable, identity)
     if self._matches(interpreter, filters):
       return _resolve(self._config, interpreter, logger=self._logger)
@@ -164,13 +269,15 @@ class PythonInterpreterCache(object):
   def _setup_cached(self, filters):
     for interpreter_dir in os.listdir(self._path):
       path = os.path.join(self._path, interpreter_dir)
+      if not os.path.isdir(path):
+        continue
       pi = self._interpreter_from_path(path, filters)
       if pi:
         self._logger('Detected interpreter %s: %s' % (pi.binary, str(pi.identity)))
         self._interpreters.add(pi)
 
   def _setup_paths(self, paths, filters):
-    for interpreter in self._matching(PythonInterpreter.all(paths), filters):
+    for interpreter in self._matching(self._index.find(paths), filters):
       identity_str = str(interpreter.identity)
       path = os.path.join(self._path, identity_str)
       pi = self._interpreter_from_path(path, filters)
@@ -215,4 +322,5 @@ class PythonInterpreterCache(object):
       matches = list(self.matches(filters))
     if len(matches) == 0:
       self._logger('Found no valid interpreters!')
+    self._index.save()
     return matches
@@ -10,6 +10,7 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 
 from pex.interpreter import PythonInterpreter
 from pex.pex_builder import PEXBuilder
@@ -20,9 +21,9 @@ from pants.backend.codegen.targets.python_antlr_library import PythonAntlrLibrar
 from pants.backend.codegen.targets.python_thrift_library import PythonThriftLibrary
 from pants.backend.core.targets.dependencies import Dependencies
 from pants.backend.python.antlr_builder import PythonAntlrBuilder
+from pants.backend.python.distribution_store import DistributionStore
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.python_setup import PythonSetup
-from pants.backend.python.resolver import resolve_multi
 from pants.backend.python.targets.python_binary import PythonBinary
 from pants.backend.python.targets.python_library import PythonLibrary
 from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
@@ -46,6 +47,10 @@ class PythonChroot(object):
 
   MEMOIZED_THRIFTS = {}
 
+  # Generating and resolving requirements populates caches shared by all chroots, so chroots dumped
+  # concurrently take turns at it.
+  _REQUIREMENTS_LOCK = threading.RLock()
+
   class InvalidDependencyException(Exception):
     def __init__(self, target):
       Exception.__init__(self, "Not a valid Python dependency! Found: %s" % target)
@@ -70,6 +75,8 @@ class PythonChroot(object):
         PythonSetup(self._config).scratch_dir('artifact_cache', default_name='artifacts'),
         str(self._interpreter.identity))
 
+    self._distribution_store = DistributionStore.from_config(self._config)
+
     self._key_generator = CacheKeyGenerator()
     self._build_invalidator = BuildInvalidator( self._egg_cache_root)
 
@@ -94,19 +101,24 @@ class PythonChroot(object):
   def path(self):
     return self._builder.path()
 
-  def _dump_library(self, library):
-    def copy_to_chroot(base, path, add_function):
-      src = os.path.join(get_buildroot(), base, path)
-      add_function(src, path)
-
-    self.debug('  Dumping library: %s' % library)
+  def library_files(self, library):
+    """Yields a (path, chroot relpath, is_resource) tuple for each file the library contributes."""
     for relpath in library.sources_relative_to_source_root():
-      copy_to_chroot(library.target_base, relpath, self._builder.add_source)
+      yield os.path.join(get_buildroot(), library.target_base, relpath), relpath, False
 
     for resources_tgt in library.resources:
       for resource_file_from_source_root in resources_tgt.sources_relative_to_source_root():
-        copy_to_chroot(resources_tgt.target_base, resource_file_from_source_root,
-                       self._builder.add_resource)
+        path = os.path.join(get_buildroot(), resources_tgt.target_base,
+                            resource_file_from_source_root)
+        yield path, resource_file_from_source_root, True
+
+  def _dump_library(self, library):
+    self.debug('  Dumping library: %s' % library)
+    for path, relpath, is_resource in self.library_files(library):
+      if is_resource:
+        self._builder.add_resource(path, relpath)
+      else:
+        self._builder.add_source(path, relpath)
 
   def _dump_requirement(self, req, dynamic, repo):
     self.debug('  Dumping requirement: %s%s%s' % (str(req),
@@ -115,7 +127,7 @@ class PythonChroot(object):
 
   def _dump_distribution(self, dist):
     self.debug('  Dumping distribution: .../%s' % os.path.basename(dist.location))
-    self._builder.add_distribution(dist)
+    self._distribution_store.add(self._builder, dist)
 
   def _generate_requirement(self, library, builder_cls):
     library_key = self._key_generator.key_for_target(library)
@@ -157,6 +169,19 @@ class PythonChroot(object):
     for lib in targets['libraries'] | targets['binaries']:
       self._dump_library(lib)
 
+    self.dump_distributions(self.dump_requirements(targets))
+
+    if len(targets['binaries']) > 1:
+      print('WARNING: Target has multiple python_binary targets!', file=sys.stderr)
+
+    return self._builder
+
+  def dump_requirements(self, targets):
+    """Adds the requirements of the resolved targets to the builder and returns them."""
+    with self._REQUIREMENTS_LOCK:
+      return self._dump_requirements(targets)
+
+  def _dump_requirements(self, targets):
     generated_reqs = OrderedSet()
     if targets['thrifts']:
       for thr in set(targets['thrifts']):
@@ -181,13 +206,17 @@ class PythonChroot(object):
         continue
       reqs_to_build.add(req)
       self._dump_requirement(req._requirement, False, req._repository)
-
-    distributions = resolve_multi(
-         self._config,
-         reqs_to_build,
-         interpreter=self._interpreter,
-         platforms=self._platforms,
-         conn_timeout=self._conn_timeout)
+    return reqs_to_build
+
+  def dump_distributions(self, reqs_to_build):
+    """Resolves the given requirements and adds the resulting distributions to the builder."""
+    with self._REQUIREMENTS_LOCK:
+      distributions = self._distribution_store.resolve(
+           self._config,
+           reqs_to_build,
+           interpreter=self._interpreter,
+           platforms=self._platforms,
+           conn_timeout=self._conn_timeout)
 
     locations = set()
     for platform, dist_set in distributions.items():
@@ -195,8 +224,3 @@ class PythonChroot(object):
         if dist.location not in locations:
           self._dump_distribution(dist)
         locations.add(dist.location)
-
-    if len(targets['binaries']) > 1:
-      print('WARNING: Target has multiple python_binary targets!', file=sys.stderr)
-
-    return self._builder
@@ -0,0 +1,163 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import hashlib
+import json
+import os
+import tempfile
+
+from pex.pex_builder import PEXBuilder
+from pex.pex_info import PexInfo
+
+from pants.backend.python.python_chroot import PythonChroot
+from pants.base.hash_utils import hash_file
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_rmtree
+
+
+class PythonChrootCache(object):
+  """Persists frozen PEX chroots across runs, keyed by the set of targets they hold.
+
+  A chroot whose fingerprint - its interpreter, requirements, entry point and the content of every
+  source - is unchanged since it was last built is reused as is. A changed chroot is rebuilt from
+  its previous incarnation by source diff: unchanged sources keep their already compiled bytecode,
+  and the previously resolved distributions are carried over unless the requirements changed.
+  """
+
+  # Bump this whenever the layout of the manifest or chroots changes.
+  VERSION = 1
+
+  _MANIFEST = 'manifest.json'
+  _CHROOT = 'chroot'
+
+  def __init__(self, cache_dir):
+    """
+    :param string cache_dir: The directory to persist chroots under.
+    """
+    self._cache_dir = cache_dir
+
+  def chroot(self, name, targets, interpreter, entry_point, **kwargs):
+    """Returns the path of an up to date, frozen chroot holding the given targets.
+
+    :param string name: A name unique to the set of targets, safe for use in paths.
+    :param targets: The targets to dump into the chroot.
+    :param interpreter: The PythonInterpreter the chroot is built for.
+    :param string entry_point: The entry point of the chroot's PEX.
+    :param kwargs: Any additional keyword arguments to pass through to the PythonChroot.
+    """
+    root = os.path.join(self._cache_dir, name)
+    chroot_dir = os.path.join(root, self._CHROOT)
+    manifest_path = os.path.join(root, self._MANIFEST)
+    previous = self._load_manifest(manifest_path) if os.path.isdir(chroot_dir) else None
+
+    safe_mkdir(root)
+    builder = PEXBuilder(path=tempfile.mkdtemp(dir=root, prefix='%s.' % self._CHROOT),
+                         interpreter=interpreter)
+    builder.info.entry_point = entry_point
+    chroot = PythonChroot(targets=targets, builder=builder, interpreter=interpreter, **kwargs)
+    try:
+      resolved = chroot.resolve(targets)
+      files = []
+      for library in resolved['libraries'] | resolved['binaries']:
+        files.extend(chroot.library_files(library))
+      sources = dict((relpath, hash_file(path)) for path, relpath, _ in files)
+
+      reqs = chroot.dump_requirements(resolved)
+      requirements = hashlib.sha1()
+      requirements.update(str(interpreter.identity).encode('utf-8'))
+      requirements.update(repr(kwargs.get('platforms')).encode('utf-8'))
+      for req in reqs:
+        requirements.update(('%s|%s|%s\n' % (req._requirement, req._repository, req._use_2to3))
+                            .encode('utf-8'))
+      requirements_fingerprint = requirements.hexdigest()
+
+      fingerprint = hashlib.sha1()
+      fingerprint.update(requirements_fingerprint.encode('utf-8'))
+      fingerprint.update(entry_point.encode('utf-8'))
+      for path, relpath, is_resource in sorted(files, key=lambda f: f[1]):
+        fingerprint.update(('%s|%s|%s\n' % (relpath, is_resource, sources[relpath]))
+                           .encode('utf-8'))
+      fingerprint = fingerprint.hexdigest()
+
+      if previous and previous['fingerprint'] == fingerprint:
+        return chroot_dir
+
+      previous_sources = previous['sources'] if previous else {}
+      for path, relpath, is_resource in files:
+        if is_resource:
+          builder.add_resource(path, relpath)
+        elif not self._reuse_source(builder, chroot_dir, previous_sources, sources, path, relpath):
+          builder.add_source(path, relpath)
+
+      if previous and previous['requirements'] == requirements_fingerprint:
+        self._reuse_distributions(builder, chroot_dir)
+      else:
+        chroot.dump_distributions(reqs)
+
+      builder.freeze()
+      # The manifest describes the chroot being replaced, so it must not outlive it.
+      safe_delete(manifest_path)
+      self._replace(builder.path(), chroot_dir)
+      self._save_manifest(manifest_path, {'version': self.VERSION,
+                                          'fingerprint': fingerprint,
+                                          'requirements': requirements_fingerprint,
+                                          'sources': sources})
+      return chroot_dir
+    finally:
+      safe_rmtree(builder.path())
+
+  @staticmethod
+  def _reuse_source(builder, chroot_dir, previous_sources, sources, path, relpath):
+    """Adds a source unchanged since the previous chroot along with its already compiled pyc."""
+    if previous_sources.get(relpath) != sources[relpath]:
+      return False
+    if relpath.endswith('.py'):
+      pyc_relpath = os.path.splitext(relpath)[0] + '.pyc'
+      pyc_path = os.path.join(chroot_dir, pyc_relpath)
+      if not os.path.exists(pyc_path):
+        return False
+      builder.chroot().link(pyc_path, pyc_relpath, 'source')
+    builder.chroot().link(path, relpath, 'source')
+    return True
+
+  @staticmethod
+  def _reuse_distributions(builder, chroot_dir):
+    """Carries over the distributions resolved into the previous chroot."""
+    previous_info = PexInfo.from_pex(chroot_dir)
+    for dist_name, dist_hash in previous_info.distributions.items():
+      dist_relpath = os.path.join(previous_info.internal_cache, dist_name)
+      for root, _, files in os.walk(os.path.join(chroot_dir, dist_relpath)):
+        for f in files:
+          path = os.path.join(root, f)
+          builder.chroot().link(path, os.path.relpath(path, chroot_dir))
+      builder.info.add_distribution(dist_name, dist_hash)
+
+  @staticmethod
+  def _replace(new_dir, chroot_dir):
+    if os.path.exists(chroot_dir):
+      stale_dir = tempfile.mkdtemp(dir=os.path.dirname(chroot_dir), prefix='stale.')
+      os.rename(chroot_dir, os.path.join(stale_dir, 'chroot'))
+      os.rename(new_dir, chroot_dir)
+      safe_rmtree(stale_dir)
+    else:
+      os.rename(new_dir, chroot_dir)
+
+  def _load_manifest(self, manifest_path):
+    try:
+      with open(manifest_path, 'r') as fp:
+        manifest = json.load(fp)
+      if manifest.get('version') == self.VERSION:
+        return manifest
+    except (IOError, ValueError):
+      pass
+    return None
+
+  @staticmethod
+  def _save_manifest(manifest_path, manifest):
+    tmp_path = '%s.%d.tmp' % (manifest_path, os.getpid())
+    with open(tmp_path, 'w') as fp:
+      json.dump(manifest, fp)
+    os.rename(tmp_path, manifest_path)
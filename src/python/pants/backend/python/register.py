@@ -6,10 +6,6 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 from pants.backend.core.targets.dependencies import Dependencies
-from pants.backend.python.tasks.python_binary_create import PythonBinaryCreate
-from pants.backend.python.tasks.pytest_run import PytestRun
-from pants.backend.python.tasks.python_repl import PythonRepl
-from pants.backend.python.tasks.python_run import PythonRun
 from pants.backend.python.commands.build import Build
 from pants.backend.python.commands.py import Py
 from pants.backend.python.commands.setup_py import SetupPy
@@ -50,19 +46,20 @@ def register_commands():
 
 
 def register_goals():
-  task(name='python-binary-create', action=PythonBinaryCreate,
+  task(name='python-binary-create',
+       action='pants.backend.python.tasks.python_binary_create:PythonBinaryCreate',
        dependencies=['bootstrap', 'check-exclusives', 'resources']
   ).install('binary')
 
-  task(name='pytest', action=PytestRun,
+  task(name='pytest', action='pants.backend.python.tasks.pytest_run:PytestRun',
        dependencies=['bootstrap', 'check-exclusives', 'resources']
   ).install('test')
 
-  task(name='python-run', action=PythonRun,
+  task(name='python-run', action='pants.backend.python.tasks.python_run:PythonRun',
        dependencies=['bootstrap', 'check-exclusives', 'resources']
   ).install('run')
 
-  task(name='python-repl', action=PythonRepl,
+  task(name='python-repl', action='pants.backend.python.tasks.python_repl:PythonRepl',
        dependencies=['bootstrap', 'check-exclusives', 'resources']
   ).install('repl')
 
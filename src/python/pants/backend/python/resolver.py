@@ -5,12 +5,20 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import threading
+
+from pex.archiver import Archiver
 from pex.fetcher import Fetcher, PyPIFetcher
 from pex.http import Crawler
+from pex.http.http import FetchError
+from pex.installer import InstallerBase
 from pex.interpreter import PythonInterpreter
 from pex.obtainer import CachingObtainer
 from pex.platforms import Platform
 from pex.resolver import resolve
+from pex.tracer import TRACER
 from pex.translator import Translator
 
 from pants.backend.python.python_setup import PythonSetup
@@ -29,9 +37,50 @@ def fetchers_from_config(config):
   return fetchers
 
 
-def crawler_from_config(config, conn_timeout=None):
+class PantsCrawler(Crawler):
+  """A Crawler that shares an in-memory index of the remote pages it crawls with other crawlers.
+
+  Crawlers given the same Pages share the pages any of them crawls, so a resolve fetches each
+  remote index page once no matter how many platforms it resolves for.  Pages should not outlive
+  the resolve, so that later resolves see packages published since.
+
+  Local directories, like the install cache, are always listed afresh since resolves add to them.
+  """
+
+  class Pages(object):
+    """A thread-safe index of remote pages, by url."""
+
+    def __init__(self):
+      self._pages = {}
+      self._lock = threading.Lock()
+
+    def get(self, url):
+      with self._lock:
+        return self._pages.get(url)
+
+    def put(self, url, page):
+      with self._lock:
+        self._pages[url] = page
+
+  def __init__(self, pages=None, **kwargs):
+    super(PantsCrawler, self).__init__(**kwargs)
+    self._pages = pages or self.Pages()
+
+  def _remote_execute(self, url):
+    page = self._pages.get(url)
+    if page is None:
+      page = super(PantsCrawler, self)._remote_execute(url)
+      links, rel_links = page
+      # Failed fetches come back empty; leave those to be retried.
+      if links or rel_links:
+        self._pages.put(url, page)
+    return page
+
+
+def crawler_from_config(config, conn_timeout=None, threads=1, pages=None):
   download_cache = PythonSetup(config).scratch_dir('download_cache', default_name='downloads')
-  return Crawler(cache=download_cache, conn_timeout=conn_timeout)
+  return PantsCrawler(pages=pages, cache=download_cache, conn_timeout=conn_timeout,
+                      threads=threads)
 
 
 class PantsObtainer(CachingObtainer):
@@ -62,6 +111,10 @@ def resolve_multi(config,
      that must be included in order to satisfy them.  That may involve distributions for
      multiple platforms.
 
+     Platforms are resolved concurrently, as are the fetches and builds of the distributions
+     for each top-level requirement, on a pool of up to `resolver_workers` threads as configured
+     in the python-setup section (defaults to the number of cores).
+
      :param config: Pants :class:`Config` object.
      :param requirements: A list of :class:`PythonRequirement` objects to resolve.
      :param interpreter: :class:`PythonInterpreter` for which requirements should be resolved.
@@ -73,14 +126,18 @@ def resolve_multi(config,
                  "flask>=0.2" if a matching distribution is available on disk.  Defaults
                  to 3600.
   """
-  distributions = dict()
   interpreter = interpreter or PythonInterpreter.get()
   if not isinstance(interpreter, PythonInterpreter):
     raise TypeError('Expected interpreter to be a PythonInterpreter, got %s' % type(interpreter))
 
   install_cache = PythonSetup(config).scratch_dir('install_cache', default_name='eggs')
   platforms = get_platforms(platforms or config.getlist('python-setup', 'platforms', ['current']))
+  requirements = list(requirements)
+  workers = config.getint('python-setup', 'resolver_workers', default=multiprocessing.cpu_count())
 
+  # The remote pages crawled by this resolve, shared by the crawlers of all of its platforms.
+  pages = PantsCrawler.Pages()
+  obtainers = {}
   for platform in platforms:
     translator = Translator.default(
         install_cache=install_cache,
@@ -88,15 +145,37 @@ def resolve_multi(config,
         platform=platform,
         conn_timeout=conn_timeout)
 
-    obtainer = PantsObtainer(
+    obtainers[platform] = PantsObtainer(
         install_cache=install_cache,
-        crawler=crawler_from_config(config, conn_timeout=conn_timeout),
+        crawler=crawler_from_config(config, conn_timeout=conn_timeout, threads=workers,
+                                    pages=pages),
         fetchers=fetchers_from_config(config) or [PyPIFetcher()],
-        translators=translator)
-
-    distributions[platform] = resolve(requirements=requirements,
-                                      obtainer=obtainer,
-                                      interpreter=interpreter,
-                                      platform=platform)
-
-  return distributions
+        translators=translator,
+        ttl=ttl)
+
+  def prefetch(platform_and_requirement):
+    # Top-level requirements are independent of one another, so the best distribution for each is
+    # fetched and built concurrently. The resolve that follows then finds them in the install cache
+    # and only has to work through what they in turn require.
+    platform, requirement = platform_and_requirement
+    try:
+      obtainers[platform].obtain(requirement)
+    except (FetchError, InstallerBase.Error, Archiver.Error, IOError, OSError) as e:
+      # The resolve proper reports any requirement that can't be satisfied.
+      TRACER.log('Failed to prefetch %s for %s: %s' % (requirement, platform, e))
+
+  def resolve_platform(platform):
+    return platform, resolve(requirements=list(requirements),
+                             obtainer=obtainers[platform],
+                             interpreter=interpreter,
+                             platform=platform)
+
+  prefetches = [(platform, requirement) for platform in platforms for requirement in requirements]
+  pool = ThreadPool(processes=max(1, min(workers, max(len(prefetches), len(platforms)))))
+  try:
+    # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when waiting
+    # on a condition variable, so we won't be able to ctrl-c out.
+    pool.map_async(prefetch, prefetches, chunksize=1).get(timeout=1000000000)
+    return dict(pool.map_async(resolve_platform, platforms, chunksize=1).get(timeout=1000000000))
+  finally:
+    pool.terminate()
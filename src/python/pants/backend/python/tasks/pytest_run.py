@@ -5,18 +5,66 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+from contextlib import contextmanager
+import hashlib
+import multiprocessing
 import os
 import shlex
+import shutil
 
 from pants.base.exceptions import TaskError
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
 from pants.base.workunit import WorkUnit
 from pants.backend.python.test_builder import PythonTestBuilder
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.util.contextutil import environment_as
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_rmtree
+
+
+class PytestFingerprintStrategy(DefaultFingerprintStrategy):
+  """Mixes the inputs to a test run that live outside of its targets into their fingerprints.
+
+  A target's transitive sources and requirements are covered by invalidating dependents; the
+  interpreter, the pytest args and the shape of the recorded results are mixed in here.
+  """
+
+  def __init__(self, interpreter, args, fast, junit_xml):
+    self._interpreter = interpreter
+    self._args = args
+    self._fast = fast
+    self._junit_xml = junit_xml
+
+  @classmethod
+  def name(cls):
+    return 'pytest-run'
+
+  def compute_fingerprint(self, target):
+    fingerprint = super(PytestFingerprintStrategy, self).compute_fingerprint(target)
+    if fingerprint is None:
+      return None
+    hasher = hashlib.sha1()
+    hasher.update(fingerprint)
+    hasher.update(str(self._interpreter.identity).encode('utf-8'))
+    for arg in self._args:
+      hasher.update(arg.encode('utf-8'))
+      hasher.update(b'\0')
+    hasher.update(bytes(self._fast))
+    hasher.update(bytes(self._junit_xml))
+    return hasher.hexdigest()
 
 
 class PytestRun(PythonTask):
+  """Runs python tests.
+
+  Test targets whose tests passed before are skipped until their transitive sources or
+  requirements, the interpreter or the pytest args change. Passing results, along with their JUnit
+  XML, are shared through the artifact caches configured in the 'pytest-run' section (or the
+  defaults).
+  """
+
+  _CONFIG_SECTION = 'pytest-run'
+
   @classmethod
   def setup_parser(cls, option_group, args, mkflag):
     super(PytestRun, cls).setup_parser(option_group, args, mkflag)
@@ -24,13 +72,38 @@ class PytestRun(PythonTask):
                             dest='pytest_run_fast',
                             action='callback', callback=mkflag.set_bool, default=True,
                             help='[%default] Run all tests in a single chroot. If set to false, '
-                                 'each test target will create a new chroot, which will be much '
-                                 'slower.')
+                                 'each test target will run in its own chroot, which is slower '
+                                 'the first time but verifies each target declares all of its '
+                                 'dependencies.')
+    option_group.add_option(mkflag('workers'), dest='pytest_run_workers', type='int',
+                            default=multiprocessing.cpu_count(),
+                            help='[%default] When not running all tests in a single chroot, build '
+                                 'and run up to this many test targets concurrently.')
     # TODO(benjy): Support direct passthru of pytest flags.
     option_group.add_option(mkflag('options'),
                             dest='pytest_run_options',
                             action='append', default=[],
                             help='[%default] options to pass to the underlying pytest runner.')
+    option_group.add_option(mkflag('force'), mkflag('force', negate=True),
+                            dest='pytest_run_force',
+                            action='callback', callback=mkflag.set_bool, default=False,
+                            help='[%default] Run the tests of all targets, even those whose tests '
+                                 'already passed with the same inputs.')
+
+  def __init__(self, *args, **kwargs):
+    super(PytestRun, self).__init__(*args, **kwargs)
+    self.setup_artifact_cache_from_config(config_section=self._CONFIG_SECTION)
+
+  @property
+  def _rerun_all(self):
+    # Coverage data is only gathered for tests that actually run, so coverage forces a full run.
+    return self.context.options.pytest_run_force or 'PANTS_PY_COVERAGE' in os.environ
+
+  def artifact_cache_reads_enabled(self):
+    return not self._rerun_all and super(PytestRun, self).artifact_cache_reads_enabled()
+
+  def _results_dir(self, target):
+    return os.path.join(self.workdir, 'results', target.id)
 
   def execute(self):
     def is_python_test(target):
@@ -52,21 +125,96 @@ class PytestRun(PythonTask):
       if self.context.options.pytest_run_options:
         for options in self.context.options.pytest_run_options:
           args.extend(shlex.split(options))
-      test_builder = PythonTestBuilder(targets=test_targets,
-                                       args=args,
-                                       interpreter=self.interpreter,
-                                       conn_timeout=self.conn_timeout,
-                                       fast=self.context.options.pytest_run_fast,
-                                       debug=debug)
-      with self.context.new_workunit(name='run',
-                                     labels=[WorkUnit.TOOL, WorkUnit.TEST]) as workunit:
-        # pytest uses py.io.terminalwriter for output. That class detects the terminal
-        # width and attempts to use all of it. However we capture and indent the console
-        # output, leading to weird-looking line wraps. So we trick the detection code
-        # into thinking the terminal window is narrower than it is.
-        cols = os.environ.get('COLUMNS', 80)
-        with environment_as(COLUMNS=str(int(cols) - 30)):
-          stdout = workunit.output('stdout') if workunit else None
-          stderr = workunit.output('stderr') if workunit else None
-          if test_builder.run(stdout=stdout, stderr=stderr):
-            raise TaskError()
+      fast = self.context.options.pytest_run_fast
+      fingerprint_strategy = PytestFingerprintStrategy(self.interpreter, args, fast,
+                                                       junit_xml=bool(os.getenv('JUNIT_XML_BASE')))
+      with self.invalidated(test_targets,
+                            invalidate_dependents=True,
+                            partition_size_hint=0,
+                            fingerprint_strategy=fingerprint_strategy) as invalidation_check:
+        vts_by_target = dict((vt.target, vt) for vt in invalidation_check.all_vts)
+        if self._rerun_all:
+          invalid_targets = list(test_targets)
+        else:
+          invalid_targets = [vt.target for vt in invalidation_check.invalid_vts]
+
+        passed_targets = [target for target in test_targets if target not in invalid_targets]
+        if passed_targets:
+          self._report_targets('Skipping tests that already passed for ', passed_targets, '.')
+          for target in passed_targets:
+            self._restore_junit_xml(target)
+        if not invalid_targets:
+          return
+
+        for target in invalid_targets:
+          safe_rmtree(self._results_dir(target))
+
+        passed = []
+        def on_result(target, result):
+          if result.success:
+            self._record_success(target, fast)
+            passed.append(target)
+
+        test_builder = PythonTestBuilder(targets=invalid_targets,
+                                         args=args,
+                                         interpreter=self.interpreter,
+                                         conn_timeout=self.conn_timeout,
+                                         fast=fast,
+                                         debug=debug,
+                                         chroot_cache_dir=os.path.join(self.workdir, 'chroots'),
+                                         workers=self.context.options.pytest_run_workers)
+        try:
+          self._run_tests(test_builder, on_result)
+        finally:
+          # Targets that passed stay valid even if others failed, so a rerun only runs the failures.
+          passed_vts = [vts_by_target[target] for target in passed]
+          for vt in passed_vts:
+            vt.update()
+          for target in invalid_targets:
+            if target not in passed:
+              vts_by_target[target].force_invalidate()
+          if passed_vts and self.artifact_cache_writes_enabled():
+            self.update_artifact_cache([(vt, [self._results_dir(vt.target)]) for vt in passed_vts])
+
+  def _record_success(self, target, fast):
+    results_dir = self._results_dir(target)
+    safe_mkdir(results_dir)
+    with open(os.path.join(results_dir, 'outcome'), 'w') as fp:
+      fp.write('SUCCESS')
+    # In fast mode JUnit XML covers all the targets run together, so it can't be kept per target.
+    xml_path = None if fast else PythonTestBuilder.junit_xml_path([target])
+    if xml_path and os.path.exists(xml_path):
+      shutil.copy(xml_path, os.path.join(results_dir, 'junit.xml'))
+
+  def _restore_junit_xml(self, target):
+    xml_path = PythonTestBuilder.junit_xml_path([target])
+    recorded = os.path.join(self._results_dir(target), 'junit.xml')
+    if xml_path and os.path.exists(recorded):
+      safe_mkdir_for(xml_path)
+      shutil.copy(recorded, xml_path)
+
+  def _run_tests(self, test_builder, on_result):
+    with self.context.new_workunit(name='run',
+                                   labels=[WorkUnit.TOOL, WorkUnit.TEST]) as workunit:
+      # pytest uses py.io.terminalwriter for output. That class detects the terminal
+      # width and attempts to use all of it. However we capture and indent the console
+      # output, leading to weird-looking line wraps. So we trick the detection code
+      # into thinking the terminal window is narrower than it is.
+      cols = os.environ.get('COLUMNS', 80)
+      with environment_as(COLUMNS=str(int(cols) - 30)):
+        stdout = workunit.output('stdout') if workunit else None
+        stderr = workunit.output('stderr') if workunit else None
+
+        @contextmanager
+        def target_output(target):
+          # Each target's tests get their own workunit, so concurrent runs' output is kept apart.
+          with self.context.run_tracker.new_workunit_under_parent(
+              name=target.address.spec,
+              parent=workunit,
+              labels=[WorkUnit.TOOL, WorkUnit.TEST]) as target_workunit:
+            yield target_workunit.output('stdout'), target_workunit.output('stderr')
+
+        if test_builder.run(stdout=stdout, stderr=stderr,
+                            target_output=target_output if workunit else None,
+                            on_result=on_result):
+          raise TaskError()
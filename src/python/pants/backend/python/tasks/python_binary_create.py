@@ -59,4 +59,5 @@ class PythonBinaryCreate(PythonTask):
 
       pex_path = os.path.join(self._distdir, '%s.pex' % binary.name)
       chroot.dump()
-      builder.build(pex_path)
+      with self.context.lock.locked([pex_path]):
+        builder.build(pex_path)
@@ -10,11 +10,15 @@ try:
 except ImportError:
   import ConfigParser as configparser
 
+from collections import defaultdict
 from contextlib import contextmanager
 import itertools
+from multiprocessing.pool import ThreadPool
 import os
 import shutil
+import sys
 from textwrap import dedent
+import threading
 import traceback
 
 from pex.interpreter import PythonInterpreter
@@ -23,6 +27,7 @@ from pex.pex_builder import PEXBuilder
 from twitter.common.lang import Compatibility
 
 from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.python_chroot_cache import PythonChrootCache
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.base.config import Config
@@ -62,45 +67,133 @@ class PythonTestBuilder(object):
     PythonRequirement('unittest2py3k', version_filter=lambda py, pl: py.startswith('3'))
   ]
 
-  def __init__(self, targets, args, interpreter=None, conn_timeout=None, fast=False, debug=False):
+  _COVERAGE_ENTRY_POINT = 'coverage.cmdline:main'
+
+  # Guards the shared output streams when test targets are run concurrently.
+  _output_lock = threading.Lock()
+
+  def __init__(self, targets, args, interpreter=None, conn_timeout=None, fast=False, debug=False,
+               chroot_cache_dir=None, workers=1):
     self._targets = targets
     self._args = args
     self._interpreter = interpreter or PythonInterpreter.get()
     self._conn_timeout = conn_timeout
 
-    # If fast is true, we run all the tests in a single chroot. This is MUCH faster than
-    # creating a chroot for each test target. However running each test separately is more
-    # correct, as the isolation verifies that its dependencies are correctly declared.
+    # If fast is true, we run all the tests in a single chroot. This is faster than creating a
+    # chroot for each test target, especially when chroots are not cached. However running each
+    # test separately is more correct, as the isolation verifies that its dependencies are
+    # correctly declared.
     self._fast = fast
 
+    # If specified, test chroots are persisted under this dir and reused by subsequent runs.
+    # Otherwise a new chroot is built and thrown away for each test run.
+    self._chroot_cache = PythonChrootCache(chroot_cache_dir) if chroot_cache_dir else None
+
+    # When not in fast mode, up to this many test targets are built and run concurrently.
+    self._workers = workers
+
     self._debug = debug
 
-  def run(self, stdout=None, stderr=None):
+    # While coverage is being gathered, the directory each test run's coverage data is set aside in
+    # and the (targets, chroot) of each run that set data aside there.
+    self._coverage_dir = None
+    self._coverage_runs = []
+    self._coverage_lock = threading.Lock()
+
+  def run(self, stdout=None, stderr=None, target_output=None, on_result=None):
+    """Runs the tests, returning 0 if they all passed and 1 otherwise.
+
+    :param stdout: The stream to write test output and the per-target summary to.
+    :param stderr: The stream to write test errors to.
+    :param target_output: An optional context manager factory taking a test target and yielding a
+      (stdout, stderr) pair for that target's test run, used when not in fast mode.
+    :param on_result: An optional callable taking a test target and its PythonTestResult, called
+      as each target's tests complete. In fast mode every target shares the single run's result.
+    """
+    with self._maybe_combine_coverage(stdout, stderr):
+      return self._run(stdout, stderr, target_output, on_result)
+
+  def _run(self, stdout, stderr, target_output, on_result):
     if self._fast:
-      return 0 if self._run_tests(self._targets, stdout, stderr).success else 1
+      result = self._run_tests(self._targets, stdout, stderr)
+      if on_result:
+        for target in self._targets:
+          if isinstance(target, PythonTests):
+            on_result(target, result)
+      return 0 if result.success else 1
     else:
       results = {}
       # Coverage often throws errors despite tests succeeding, so force failsoft in that case.
-      fail_hard = ('PANTS_PYTHON_TEST_FAILSOFT' not in os.environ and
-                   'PANTS_PY_COVERAGE' not in os.environ)
-      for target in self._targets:
-        if isinstance(target, PythonTests):
-          rv = self._run_tests([target], stdout, stderr)
-          results[target.id] = rv
-          if not rv.success and fail_hard:
-            break
+      coverage = 'PANTS_PY_COVERAGE' in os.environ
+      fail_hard = 'PANTS_PYTHON_TEST_FAILSOFT' not in os.environ and not coverage
+      failed = threading.Event()
+
+      def run_target(target):
+        # On the first failure, targets not yet started are cancelled.
+        if fail_hard and failed.is_set():
+          return
+        with self._target_output(target, stdout, stderr, target_output) as (out, err):
+          rv = self._run_tests([target], out, err)
+        results[target.id] = rv
+        if on_result:
+          on_result(target, rv)
+        if not rv.success:
+          failed.set()
+
+      test_targets = [target for target in self._targets if isinstance(target, PythonTests)]
+      # pytest-cov always writes to .coverage in the working directory, so concurrent test runs
+      # would clobber each other's coverage data.
+      workers = 1 if coverage else min(self._workers, len(test_targets))
+      if workers > 1:
+        pool = ThreadPool(processes=workers)
+        try:
+          # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when
+          # waiting on a condition variable, so we won't be able to ctrl-c out.
+          pool.map_async(run_target, test_targets, chunksize=1).get(timeout=1000000000)
+        finally:
+          pool.terminate()
+      else:
+        for target in test_targets:
+          run_target(target)
+
       for target in sorted(results):
         # TODO: Replace print() calls in this file with logging.
         print('%-80s.....%10s' % (target, results[target]), file=stdout)
       return 0 if all(rc.success for rc in results.values()) else 1
 
   @contextmanager
-  def _maybe_emit_junit_xml(self, targets):
-    args = []
+  def _target_output(self, target, stdout, stderr, target_output):
+    if target_output:
+      with target_output(target) as outputs:
+        yield outputs
+    elif self._workers <= 1:
+      yield stdout, stderr
+    else:
+      # Buffer each concurrent test run's output, so runs don't interleave on the shared streams.
+      with temporary_file() as out:
+        with temporary_file() as err:
+          try:
+            yield out, err
+          finally:
+            with self._output_lock:
+              for buffered, stream in ((out, stdout or sys.stdout), (err, stderr or sys.stderr)):
+                buffered.seek(0)
+                stream.write(buffered.read())
+
+  @staticmethod
+  def junit_xml_path(targets):
+    """Returns the path JUnit XML is emitted to for a run of the targets, or None if it isn't."""
     xml_base = os.getenv('JUNIT_XML_BASE')
     if xml_base and targets:
       xml_base = os.path.realpath(xml_base)
-      xml_path = os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
+      return os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
+    return None
+
+  @contextmanager
+  def _maybe_emit_junit_xml(self, targets):
+    args = []
+    xml_path = self.junit_xml_path(targets)
+    if xml_path:
       safe_mkdir(os.path.dirname(xml_path))
       args.append('--junitxml=%s' % xml_path)
     yield args
@@ -128,17 +221,21 @@ class PythonTestBuilder(object):
     # See http://nedbatchelder.com/code/coverage/config.html for details.
     return '\n\t{values}'.format(values='\n\t'.join(values))
 
-  def _generate_coverage_config(self, source_mappings):
+  def _generate_coverage_config(self, source_mappings=None, data_file=None):
     cp = configparser.SafeConfigParser()
     cp.readfp(Compatibility.StringIO(self.DEFAULT_COVERAGE_CONFIG))
 
+    if data_file:
+      cp.set('run', 'data_file', data_file)
+
     # We use the source_mappings to setup the `combine` coverage command to transform paths in
     # coverage data files into canonical form.
     # See the "[paths]" entry here: http://nedbatchelder.com/code/coverage/config.html for details.
-    cp.add_section('paths')
-    for canonical, alternates in source_mappings.items():
-      key = canonical.replace(os.sep, '.')
-      cp.set('paths', key, self._format_string_list([canonical] + list(alternates)))
+    if source_mappings:
+      cp.add_section('paths')
+      for canonical, alternates in sorted(source_mappings.items()):
+        key = canonical.replace(os.sep, '.')
+        cp.set('paths', key, self._format_string_list([canonical] + sorted(alternates)))
 
     # See the debug options here: http://nedbatchelder.com/code/coverage/cmd.html#cmd-run-debug
     if self._debug:
@@ -152,7 +249,7 @@ class PythonTestBuilder(object):
     return cp
 
   @contextmanager
-  def _cov_setup(self, targets, chroot, coverage_modules=None):
+  def _cov_setup(self, targets, coverage_modules=None):
     def compute_coverage_modules(target):
       if target.coverage:
         return target.coverage
@@ -188,16 +285,7 @@ class PythonTestBuilder(object):
       pythonpath = os.environ.get('PYTHONPATH')
       existing_pythonpath = pythonpath.split(os.pathsep) if pythonpath else []
       with environment_as(PYTHONPATH=os.pathsep.join(existing_pythonpath + [plugin_root])):
-        def is_python_lib(tgt):
-          return tgt.has_sources('.py') and not isinstance(tgt, PythonTests)
-
-        source_mappings = {}
-        for target in targets:
-          libs = (tgt for tgt in target.closure() if is_python_lib(tgt))
-          for lib in libs:
-            source_mappings[lib.target_base] = [chroot]
-
-        cp = self._generate_coverage_config(source_mappings=source_mappings)
+        cp = self._generate_coverage_config()
         with temporary_file() as fp:
           cp.write(fp)
           fp.close()
@@ -208,7 +296,7 @@ class PythonTestBuilder(object):
           yield args, coverage_rc
 
   @contextmanager
-  def _maybe_emit_coverage_data(self, targets, chroot, pex, stdout, stderr):
+  def _maybe_emit_coverage_data(self, targets, chroot):
     coverage = os.environ.get('PANTS_PY_COVERAGE')
     if coverage is None:
       yield []
@@ -240,37 +328,126 @@ class PythonTestBuilder(object):
           path = os.path.join(chroot, path)
         coverage_modules.append(path)
 
-    with self._cov_setup(targets,
-                         chroot,
-                         coverage_modules=coverage_modules) as (args, coverage_rc):
+    with self._cov_setup(targets, coverage_modules=coverage_modules) as (args, _):
       try:
         yield args
       finally:
-        with environment_as(PEX_MODULE='coverage.cmdline:main'):
-          # Normalize .coverage.raw paths using combine and `paths` config in the rc file.
-          # This swaps the /tmp pex chroot source paths for the local original source paths
-          # the pex was generated from and which the user understands.
-          shutil.move('.coverage', '.coverage.raw')
-          pex.run(args=['combine', '--rcfile', coverage_rc], stdout=stdout, stderr=stderr)
-
-          pex.run(args=['report', '-i', '--rcfile', coverage_rc], stdout=stdout, stderr=stderr)
-
-          # TODO(wickman): If coverage is enabled and we are not using fast mode, write an
-          # intermediate .html that points to each of the coverage reports generated and
-          # webbrowser.open to that page.
-          # TODO(John Sirois): Possibly apply the same logic to the console report.  In fact,
-          # consider combining coverage files from all runs in this Tasks's execute and then
-          # producing just 1 console and 1 html report whether or not the tests are run in fast
-          # mode.
-          relpath = Target.maybe_readable_identify(targets)
-          pants_distdir = Config.load().getdefault('pants_distdir')
-          target_dir = os.path.join(pants_distdir, 'coverage', relpath)
-          safe_mkdir(target_dir)
-          pex.run(args=['html', '-i', '--rcfile', coverage_rc, '-d', target_dir],
-                  stdout=stdout, stderr=stderr)
+        # Set this run's data aside, to be combined with that of all the other runs once they're
+        # done.
+        if os.path.exists('.coverage'):
+          with self._coverage_lock:
+            data_file = os.path.join(self._coverage_dir, '.coverage.%d' % len(self._coverage_runs))
+            self._coverage_runs.append((targets, chroot))
+          shutil.move('.coverage', data_file)
 
   @contextmanager
-  def _test_runner(self, targets, stdout, stderr):
+  def _maybe_combine_coverage(self, stdout, stderr):
+    """Combines the coverage data of all the test runs in the context and reports on it once."""
+    if os.environ.get('PANTS_PY_COVERAGE') is None:
+      yield
+      return
+
+    with temporary_dir() as coverage_dir:
+      # The pex the reports are generated with is resolved while the tests run.
+      pool = ThreadPool(processes=1)
+      coverage_chroot = pool.apply_async(self._coverage_chroot,
+                                         (os.path.join(coverage_dir, 'chroot'),))
+      pool.close()
+      self._coverage_dir = coverage_dir
+      self._coverage_runs = []
+      try:
+        yield
+      finally:
+        self._coverage_dir = None
+        try:
+          # The owner deletes the chroot when collected, so we hold it until we're done reporting.
+          chroot, owner = coverage_chroot.get(timeout=1000000000)
+        finally:
+          pool.terminate()
+        try:
+          if self._coverage_runs:
+            self._report_coverage(PEX(chroot, interpreter=self._interpreter),
+                                  coverage_dir,
+                                  stdout,
+                                  stderr)
+        finally:
+          del owner
+
+  def _coverage_chroot(self, path):
+    """Returns the path of a frozen chroot whose entry point is the coverage command line.
+
+    Returns a (path, owner) pair, where owner is the PythonChroot that deletes the chroot at path
+    when it is collected, or None if the chroot is cached and so outlives this run.
+    """
+    requirements = [PythonRequirement('pytest-cov')]
+    if self._chroot_cache:
+      return self._chroot_cache.chroot('coverage-report',
+                                       [],
+                                       self._interpreter,
+                                       self._COVERAGE_ENTRY_POINT,
+                                       extra_requirements=requirements,
+                                       platforms=('current',),
+                                       conn_timeout=self._conn_timeout), None
+
+    builder = PEXBuilder(path=path, interpreter=self._interpreter)
+    builder.info.entry_point = self._COVERAGE_ENTRY_POINT
+    chroot = PythonChroot(
+      targets=[],
+      extra_requirements=requirements,
+      builder=builder,
+      platforms=('current',),
+      interpreter=self._interpreter,
+      conn_timeout=self._conn_timeout)
+    chroot.dump().freeze()
+    return path, chroot
+
+  def _report_coverage(self, pex, coverage_dir, stdout, stderr):
+    def is_python_lib(tgt):
+      return tgt.has_sources('.py') and not isinstance(tgt, PythonTests)
+
+    # Map each source root to all the chroots its sources were run from.
+    source_mappings = defaultdict(set)
+    for targets, chroot in self._coverage_runs:
+      for target in targets:
+        for lib in target.closure():
+          if is_python_lib(lib):
+            source_mappings[lib.target_base].add(chroot)
+
+    data_file = os.path.join(coverage_dir, '.coverage')
+    coverage_rc = os.path.join(coverage_dir, 'coveragerc')
+    with open(coverage_rc, 'w') as fp:
+      self._generate_coverage_config(source_mappings=source_mappings, data_file=data_file).write(fp)
+
+    # Normalize the runs' data using combine and the `paths` config in the rc file. This swaps the
+    # pex chroot source paths for the local original source paths the pexes were generated from
+    # and which the user understands.
+    pex.run(args=['combine', '--rcfile', coverage_rc], stdout=stdout, stderr=stderr)
+    shutil.copy(data_file, '.coverage')
+
+    pex.run(args=['report', '-i', '--rcfile', coverage_rc], stdout=stdout, stderr=stderr)
+
+    # TODO(wickman): Consider webbrowser.open'ing the html report.
+    test_targets = [target for target in self._targets if isinstance(target, PythonTests)]
+    relpath = Target.maybe_readable_identify(test_targets)
+    pants_distdir = Config.load().getdefault('pants_distdir')
+    target_dir = os.path.join(pants_distdir, 'coverage', relpath)
+    safe_mkdir(target_dir)
+    pex.run(args=['html', '-i', '--rcfile', coverage_rc, '-d', target_dir],
+            stdout=stdout, stderr=stderr)
+
+  @contextmanager
+  def _test_chroot(self, targets):
+    """Yields the path of a frozen chroot holding the targets and the testing requirements."""
+    if self._chroot_cache:
+      yield self._chroot_cache.chroot(Target.maybe_readable_identify(targets),
+                                      targets,
+                                      self._interpreter,
+                                      'pytest',
+                                      extra_requirements=self._TESTING_TARGETS,
+                                      platforms=('current',),
+                                      conn_timeout=self._conn_timeout)
+      return
+
     builder = PEXBuilder(interpreter=self._interpreter)
     builder.info.entry_point = 'pytest'
     chroot = PythonChroot(
@@ -283,17 +460,18 @@ class PythonTestBuilder(object):
     try:
       builder = chroot.dump()
       builder.freeze()
-      pex = PEX(builder.path(), interpreter=self._interpreter)
-      with self._maybe_emit_junit_xml(targets) as junit_args:
-        with self._maybe_emit_coverage_data(targets,
-                                            builder.path(),
-                                            pex,
-                                            stdout,
-                                            stderr) as coverage_args:
-          yield pex, junit_args + coverage_args
+      yield builder.path()
     finally:
       chroot.delete()
 
+  @contextmanager
+  def _test_runner(self, targets):
+    with self._test_chroot(targets) as chroot_path:
+      pex = PEX(chroot_path, interpreter=self._interpreter)
+      with self._maybe_emit_junit_xml(targets) as junit_args:
+        with self._maybe_emit_coverage_data(targets, chroot_path) as coverage_args:
+          yield pex, junit_args + coverage_args
+
   def _run_tests(self, targets, stdout, stderr):
     if not targets:
       return PythonTestResult.rc(0)
@@ -302,7 +480,7 @@ class PythonTestBuilder(object):
     if not sources:
       return PythonTestResult.rc(0)
 
-    with self._test_runner(targets, stdout, stderr) as (pex, test_args):
+    with self._test_runner(targets) as (pex, test_args):
       args = ['-s'] if self._debug else []
       args.extend(test_args)
       args.extend(self._args)
@@ -141,6 +141,10 @@ class BuildFileAddressMapper(object):
       self._spec_path_to_address_map_map[spec_path] = address_map
     return self._spec_path_to_address_map_map[spec_path]
 
+  def invalidate(self, spec_path):
+    """Forgets the addresses parsed from a "directory" so they are re-parsed when next needed."""
+    self._spec_path_to_address_map_map.pop(spec_path, None)
+
   def addresses_in_spec_path(self, spec_path):
     """Returns only the addresses gathered by `address_map_from_spec_path`, with no values."""
     return self.address_map_from_spec_path(spec_path).keys()
@@ -0,0 +1,132 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from abc import abstractmethod
+import hashlib
+import json
+import os
+
+from twitter.common.lang import AbstractClass
+
+from pants.base.hash_utils import hash_file
+from pants.util.dirutil import safe_mkdir_for
+
+
+class BuildFileIndex(AbstractClass):
+  """A persistent index of facts extracted from the targets declared in BUILD files.
+
+  Facts are recorded per BUILD file along with a digest of that BUILD file, so only BUILD files
+  that changed since the index was last saved need to be parsed and have their target closures
+  injected into the build graph.
+
+  Subclasses define the facts to record by implementing `extract`.
+  """
+
+  # Bump this in subclasses whenever the shape of extracted records changes.
+  VERSION = 1
+
+  @classmethod
+  def index_name(cls):
+    """The name this index is persisted under in the pants workdir."""
+    raise NotImplementedError()
+
+  @classmethod
+  def from_config(cls, config, build_file_parser, build_graph):
+    """Returns the index persisted in the pants workdir `config` describes."""
+    path = os.path.join(config.getdefault('pants_workdir'), 'indexes',
+                        '%s.json' % cls.index_name())
+    return cls(path, build_file_parser, build_graph)
+
+  def __init__(self, path, build_file_parser, build_graph):
+    """
+    :param string path: The file the index is persisted to.
+    :param build_file_parser: The BuildFileParser used to parse changed BUILD files.
+    :param build_graph: The BuildGraph changed BUILD files' targets are injected into.
+    """
+    self._path = path
+    self._build_file_parser = build_file_parser
+    self._build_graph = build_graph
+    self._entries = self._load()
+    self._dirty = False
+
+  def _load(self):
+    try:
+      with open(self._path, 'r') as fp:
+        index = json.load(fp)
+      if index.get('version') == self.VERSION:
+        return index['entries']
+    except (IOError, ValueError, KeyError, AttributeError):
+      pass
+    return {}
+
+  def save(self):
+    """Persists the index if it changed since it was loaded."""
+    if self._dirty:
+      safe_mkdir_for(self._path)
+      tmp_path = '%s.%d.tmp' % (self._path, os.getpid())
+      with open(tmp_path, 'w') as fp:
+        json.dump({'version': self.VERSION, 'entries': self._entries}, fp)
+      # Atomic, so a concurrent reader only ever sees a complete index.
+      os.rename(tmp_path, self._path)
+      self._dirty = False
+
+  def watched_dirs(self, record):
+    """Returns the buildroot relative dirs whose entries, besides the BUILD file, `record` reflects.
+
+    By default records only reflect the contents of the BUILD file.  Indexes whose facts depend on
+    the filesystem, like the expansion of source globs, should return the dirs that were read.
+    """
+    return []
+
+  def digest(self, build_file, record):
+    """Returns a digest that changes whenever the facts extracted for `build_file` may change.
+
+    :param build_file: The BuildFile to digest.
+    :param record: The record last extracted from `build_file`.
+    """
+    digest = hashlib.sha1()
+    digest.update(hash_file(build_file.full_path))
+    for relpath in self.watched_dirs(record):
+      path = os.path.join(build_file.root_dir, relpath)
+      digest.update(relpath.encode('utf-8'))
+      if os.path.isdir(path):
+        digest.update('\0'.join(sorted(os.listdir(path))).encode('utf-8'))
+    return digest.hexdigest()
+
+  @abstractmethod
+  def extract(self, build_file, targets):
+    """Returns a json-serializable record of the facts to index for a BUILD file.
+
+    :param build_file: The BuildFile that was parsed.
+    :param targets: The targets declared in `build_file`, with their closures injected.
+    """
+
+  def records(self, build_files):
+    """Returns a dict of BUILD file relpath to extracted record for each of `build_files`.
+
+    BUILD files that are new or changed since they were last indexed are parsed and re-indexed.
+    """
+    records = {}
+    for build_file in build_files:
+      entry = self._entries.get(build_file.relpath)
+      digest = self.digest(build_file, entry['record']) if entry else None
+      if digest is None or entry['digest'] != digest:
+        record = self.extract(build_file, self._parse(build_file))
+        # The digest taken before extracting is still good unless other dirs were read this time.
+        if digest is None or self.watched_dirs(record) != self.watched_dirs(entry['record']):
+          digest = self.digest(build_file, record)
+        entry = dict(digest=digest, record=record)
+        self._entries[build_file.relpath] = entry
+        self._dirty = True
+      records[build_file.relpath] = entry['record']
+    return records
+
+  def _parse(self, build_file):
+    address_map = self._build_file_parser.parse_build_file(build_file)
+    for address in address_map.keys():
+      self._build_graph.inject_address_closure(address)
+    return [self._build_graph.get_target(address) for address in address_map.keys()]
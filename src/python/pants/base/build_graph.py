@@ -300,6 +300,16 @@ class BuildGraph(object):
     target_addressable = mapper.resolve(address)
 
     self._addresses_already_closed.add(address)
+    try:
+      self._inject_closure(address, target_addressable)
+    except:
+      # Leave the address open so that a later attempt to inject it fails the same way instead of
+      # silently finding a partial closure.
+      self._addresses_already_closed.discard(address)
+      raise
+
+  def _inject_closure(self, address, target_addressable):
+    mapper = self._address_mapper
     try:
       dep_addresses = list(mapper.specs_to_addresses(target_addressable.dependency_specs,
                                                      relative_to=address.spec_path))
@@ -0,0 +1,74 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import deque
+
+from pants.base.build_file_index import BuildFileIndex
+
+
+class DependeeIndex(BuildFileIndex):
+  """A persistent reverse-dependency index.
+
+  Records the dependency specs of every target declared in a BUILD file and answers dependee
+  queries by walking the inverted edges over integer target ids.
+  """
+
+  @classmethod
+  def index_name(cls):
+    return 'dependees'
+
+  def extract(self, build_file, targets):
+    # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
+    # user vs. targets created by pants at runtime.
+    dependencies_by_spec = {}
+    for target in targets:
+      target = target.concrete_derived_from
+      dependencies_by_spec[target.address.spec] = sorted(
+          set(dependency.concrete_derived_from.address.spec for dependency in target.dependencies))
+    return dependencies_by_spec
+
+  def dependees(self, build_files, specs, transitive=False):
+    """Returns the set of specs for targets declared in `build_files` that depend on `specs`.
+
+    The input specs themselves are never included.
+
+    :param build_files: The BUILD files whose targets are candidate dependees.
+    :param specs: The specs of the targets to find dependees of.
+    :param bool transitive: True to find transitive dependees, False for direct dependees only.
+    """
+    ids = {}
+    names = []
+    dependees_by_id = []
+
+    def id_for(spec):
+      target_id = ids.get(spec)
+      if target_id is None:
+        target_id = ids[spec] = len(names)
+        names.append(spec)
+        dependees_by_id.append([])
+      return target_id
+
+    for record in self.records(build_files).values():
+      for spec, dependency_specs in record.items():
+        target_id = id_for(spec)
+        for dependency_spec in dependency_specs:
+          dependees_by_id[id_for(dependency_spec)].append(target_id)
+
+    roots = set(ids[spec] for spec in specs if spec in ids)
+    seen = bytearray(len(names))
+    for root in roots:
+      seen[root] = 1
+    found = []
+    queue = deque(roots)
+    while queue:
+      for dependee in dependees_by_id[queue.popleft()]:
+        if not seen[dependee]:
+          seen[dependee] = 1
+          found.append(dependee)
+          if transitive:
+            queue.append(dependee)
+    return set(names[target_id] for target_id in found)
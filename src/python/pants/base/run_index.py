@@ -0,0 +1,118 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import json
+import os
+import threading
+
+from pants.base.run_info import RunInfo
+from pants.util.dirutil import safe_append_jsonl
+
+
+class RunIndex(object):
+  """An index of the RunInfos of all the pants runs recorded under a run info directory.
+
+  Each pants run appends its final RunInfo as a single json record on its own line of an index file
+  when it ends, so that listing thousands of runs reads one file rather than thousands.  Runs not
+  yet indexed - those still in progress, and those that died before ending - are read from their
+  RunInfo files instead.
+
+  A RunIndex instance caches what it has read and, on each listing, only reads index records
+  appended since its last listing and only re-reads the RunInfo files of unindexed runs that
+  changed since.
+  """
+
+  INDEX_FILE = 'index.jsonl'
+
+  @classmethod
+  def for_info_dir(cls, info_dir):
+    """Returns the index of the runs under the given run info directory."""
+    return cls(info_dir, os.path.join(info_dir, cls.INDEX_FILE))
+
+  def __init__(self, info_dir, path):
+    self._info_dir = info_dir
+    self._path = path
+    self._lock = threading.Lock()
+    self._reset()
+
+  @property
+  def path(self):
+    return self._path
+
+  def _reset(self):
+    self._index_pos = 0
+    self._indexed = {}  # run id -> info dict.
+    self._unindexed = {}  # run id -> ((info file mtime, size), info dict).
+
+  def append(self, info):
+    """Records the final info of a run, as a dict, in the index."""
+    safe_append_jsonl(self._path, info)
+
+  def runs(self):
+    """Returns the info dicts of all the runs under the info dir, in no particular order.
+
+    Runs whose info does not yet have a timestamp are left out, to avoid racing their writing.
+    """
+    with self._lock:
+      if not os.path.isdir(self._info_dir):
+        self._reset()
+        return []
+      self._read_index()
+      run_ids = set(os.listdir(self._info_dir))
+
+      # Forget unindexed runs that were since indexed or removed.
+      for run_id in list(self._unindexed):
+        if run_id in self._indexed or run_id not in run_ids:
+          del self._unindexed[run_id]
+
+      infos = [info for run_id, info in self._indexed.items() if run_id in run_ids]
+      for run_id in run_ids - set(self._indexed):
+        info = self._read_unindexed(run_id)
+        if info:
+          infos.append(info)
+      return [info.copy() for info in infos if 'timestamp' in info]
+
+  def _read_index(self):
+    if not os.path.exists(self._path):
+      self._indexed.clear()
+      self._index_pos = 0
+      return
+
+    with open(self._path, 'r') as fp:
+      fp.seek(0, os.SEEK_END)
+      if fp.tell() < self._index_pos:
+        # The index was removed and re-created since, e.g., by a clean-all.
+        self._reset()
+      fp.seek(self._index_pos)
+      for line in iter(fp.readline, ''):
+        if not line.endswith('\n'):
+          break  # A record still being written; we'll read it next time.
+        self._index_pos += len(line)
+        try:
+          info = json.loads(line)
+        except ValueError:
+          continue  # A partially written record from an interrupted run.
+        self._indexed[info.get('id')] = info
+
+  def _read_unindexed(self, run_id):
+    run_dir = os.path.join(self._info_dir, run_id)
+    info_file = os.path.join(run_dir, 'info')
+    if os.path.islink(run_dir):
+      return None  # The 'latest' link.
+    try:
+      stat = os.stat(info_file)
+    except OSError:
+      return None  # Not a run dir.
+
+    # Info files are only ever appended to, so their size tells us if they changed.
+    version = (stat.st_mtime, stat.st_size)
+    cached = self._unindexed.get(run_id)
+    if cached and cached[0] == version:
+      return cached[1]
+    info = RunInfo(info_file).get_as_dict()
+    self._unindexed[run_id] = (version, info)
+    return info
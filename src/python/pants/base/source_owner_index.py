@@ -0,0 +1,135 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict
+import os
+import tokenize
+
+from twitter.common.collections import OrderedSet
+
+from pants.base.build_environment import get_buildroot
+from pants.base.build_file import BuildFile
+from pants.base.build_file_index import BuildFileIndex
+
+
+class SourceOwnerIndex(BuildFileIndex):
+  """A persistent index of source file to the targets that own it.
+
+  A BUILD file owns its own path on behalf of all the non-synthetic targets it declares.
+
+  Since source globs are expanded against the filesystem, a BUILD file is re-indexed not only when
+  its contents change but also when any directory its globs may have walked gains or loses
+  entries.
+  """
+
+  VERSION = 2
+
+  # Globs that walk the whole tree beneath the BUILD file.
+  _RECURSIVE_GLOBS = frozenset(['rglobs', 'zglobs'])
+
+  @classmethod
+  def index_name(cls):
+    return 'source_owners'
+
+  @classmethod
+  def _uses_recursive_globs(cls, build_file):
+    # Targets don't retain the globs their sources were expanded from, so we look for calls in the
+    # BUILD file itself.
+    with open(build_file.full_path, 'r') as fp:
+      try:
+        return any(token_type == tokenize.NAME and token in cls._RECURSIVE_GLOBS
+                   for token_type, token, _, _, _ in tokenize.generate_tokens(fp.readline))
+      except tokenize.TokenError:
+        return True
+
+  def __init__(self, *args, **kwargs):
+    super(SourceOwnerIndex, self).__init__(*args, **kwargs)
+    self._candidates_by_dir = {}
+
+  def watched_dirs(self, record):
+    return record['dirs']
+
+  def extract(self, build_file, targets):
+    owners_by_source = defaultdict(set)
+    declared = set()
+    for target in targets:
+      if not target.is_synthetic:
+        declared.add(target.address.spec)
+      owners = [target]
+      # HACK: Python targets currently wrap old-style file resources in a synthetic resources
+      # target, but they do so lazily, when target.resources is first accessed.
+      if target.has_resources:
+        owners.extend(resources for resources in target.resources if resources.is_synthetic)
+      for owner in owners:
+        # We call concrete_derived_from because of the python target resources hack mentioned
+        # above; It's really the original target that owns the resource files.
+        spec = owner.concrete_derived_from.address.spec
+        for source in owner.sources_relative_to_buildroot():
+          owners_by_source[source].add(spec)
+
+    # Globs are rooted at the BUILD file's directory, and rglobs and zglobs walk all of it.  For
+    # those we record every directory beneath it - not just those sources were found in - so that
+    # a new match anywhere they walked triggers a re-index.  Otherwise we record the directories
+    # sources were found in, up to the BUILD file's, which covers where globs may match anew.
+    build_dir = os.path.dirname(build_file.relpath)
+    dirs = set([build_dir])
+    if self._uses_recursive_globs(build_file):
+      for root, dirnames, _ in os.walk(build_file.parent_path):
+        # Skip hidden directories like .git and the workdir, whose churn would otherwise force
+        # constant re-indexing; any that sources were actually found in are still recorded below.
+        dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith('.')]
+        relpath = os.path.relpath(root, build_file.root_dir)
+        dirs.add('' if relpath == os.curdir else relpath)
+    for source in owners_by_source:
+      path = os.path.dirname(source)
+      while path not in dirs:
+        dirs.add(path)
+        if not path or (build_dir and not path.startswith(build_dir + os.sep)):
+          break
+        path = os.path.dirname(path)
+
+    sources = dict((source, sorted(specs)) for source, specs in owners_by_source.items())
+    return dict(sources=sources, declared=sorted(declared), dirs=sorted(dirs))
+
+  def candidate_build_files(self, path):
+    """Returns the BUILD files that may declare owners of the given buildroot relative path.
+
+    These are the BUILD files in the path's directory and in all of its ancestor directories.
+    """
+    dirname = os.path.dirname(path)
+    candidates = self._candidates_by_dir.get(dirname)
+    if candidates is None:
+      candidates = OrderedSet()
+      build_file = BuildFile.from_cache(get_buildroot(), dirname, must_exist=False)
+      if build_file.exists():
+        candidates.add(build_file)
+      candidates.update(build_file.siblings())
+      candidates.update(build_file.ancestors())
+      self._candidates_by_dir[dirname] = candidates
+    return candidates
+
+  def owners(self, paths):
+    """Returns a dict of each of the given buildroot relative paths to its owners' sorted specs.
+
+    :param paths: The buildroot relative paths of the files to look up owners for.
+    """
+    paths = list(paths)
+    build_files = OrderedSet()
+    for path in paths:
+      build_files.update(self.candidate_build_files(path))
+    records = self.records(build_files)
+
+    owners_by_path = {}
+    for path in paths:
+      owners = set()
+      for build_file in self.candidate_build_files(path):
+        record = records[build_file.relpath]
+        if build_file.relpath == path:
+          owners.update(record['declared'])
+        owners.update(record['sources'].get(path, ()))
+      owners_by_path[path] = sorted(owners)
+    return owners_by_path
@@ -0,0 +1,115 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict, deque
+import json
+import os
+
+from pants.base.run_info import RunInfo
+from pants.util.dirutil import safe_append_jsonl
+
+
+def _median(values):
+  values = sorted(values)
+  if not values:
+    return None
+  middle = len(values) // 2
+  if len(values) % 2:
+    return values[middle]
+  return (values[middle - 1] + values[middle]) / 2
+
+
+class TimingStore(object):
+  """An append-only store of per-run timings and artifact cache stats for a workspace.
+
+  Each pants run appends a single json record on its own line, so writing is cheap no matter how
+  many runs came before, and a record truncated by a crash only costs that one run.
+  """
+
+  @classmethod
+  def from_config(cls, config):
+    """Returns the configured timing store.
+
+    Defaults to a file alongside the run info directories; configure `timing_store` in the
+    DEFAULT section to keep history somewhere that survives a clean-all.
+    """
+    return cls(config.getdefault('timing_store',
+                                 default=os.path.join(RunInfo.dir(config), 'timings.jsonl')))
+
+  def __init__(self, path):
+    self._path = path
+
+  @property
+  def path(self):
+    return self._path
+
+  def append(self, record):
+    """Appends the given json-serializable run record to the store."""
+    safe_append_jsonl(self._path, record)
+
+  def runs(self, limit=None):
+    """Returns the stored run records, oldest first.
+
+    :param int limit: If specified, only the most recent `limit` runs are returned.
+    """
+    runs = deque(maxlen=limit)
+    if os.path.exists(self._path):
+      with open(self._path, 'r') as fp:
+        for line in fp:
+          try:
+            runs.append(json.loads(line))
+          except ValueError:
+            pass  # A partially written record from an interrupted run.
+    return list(runs)
+
+  @staticmethod
+  def trends(runs, since, key='cumulative'):
+    """Summarizes how each workunit's timing changed across runs.
+
+    Returns a list of dicts, one per workunit label, sorted by largest slowdown first:
+    { label, is_tool, series, recent, baseline, change }, where series holds the label's timing in
+    each of `runs` (None for runs it did not appear in), and recent and baseline are the median
+    timings of runs at or after and before `since` respectively.
+
+    :param list runs: Run records, oldest first.
+    :param float since: The timestamp splitting baseline runs from recent runs.
+    :param string key: 'cumulative' to compare timings including children, 'self' to exclude them.
+    """
+    tools = set()
+    for run in runs:
+      tools.update(run.get('tools', ()))
+    series_by_label = defaultdict(lambda: [None] * len(runs))
+    for index, run in enumerate(runs):
+      for label, secs in run.get(key, {}).items():
+        series_by_label[label][index] = secs
+
+    trends = []
+    for label, series in series_by_label.items():
+      recent, baseline = [], []
+      for run, secs in zip(runs, series):
+        if secs is not None:
+          (recent if run['timestamp'] >= since else baseline).append(secs)
+      recent_median = _median(recent)
+      baseline_median = _median(baseline)
+      change = None
+      if recent_median is not None and baseline_median is not None:
+        change = recent_median - baseline_median
+      trends.append({'label': label, 'is_tool': label in tools, 'series': series,
+                     'recent': recent_median, 'baseline': baseline_median, 'change': change})
+    trends.sort(key=lambda trend: (trend['change'] is None, -(trend['change'] or 0),
+                                   trend['label']))
+    return trends
+
+  @staticmethod
+  def cache_hit_rates(runs):
+    """Returns a dict of cache name to a list of its hit rate in each of `runs` (or None)."""
+    rates_by_cache = defaultdict(lambda: [None] * len(runs))
+    for index, run in enumerate(runs):
+      for cache_name, (hits, misses) in run.get('cache', {}).items():
+        if hits + misses:
+          rates_by_cache[cache_name][index] = hits / (hits + misses)
+    return dict(rates_by_cache)
@@ -5,6 +5,7 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+from collections import OrderedDict
 import os
 import re
 import time
@@ -83,7 +84,13 @@ class WorkUnit(object):
 
     self.run_tracker = run_tracker
     self.parent = parent
-    self.children = []
+    self._children = OrderedDict()  # id -> child workunit, in the order they were created.
+
+    # Ended children the run tracker has since dropped from children, to bound its memory use on
+    # long runs, and their total duration.  Children are added, dropped and summed under the run
+    # tracker's workunits lock, as child workunits are created and retired on many threads.
+    self._num_forgotten_children = 0
+    self._forgotten_children_duration = 0
 
     self.name = name
     self.labels = set(labels or ())
@@ -102,7 +109,14 @@ class WorkUnit(object):
     # done initializing ourselves.
     # TODO: Ensure that a parent can't be ended before all its children are.
     if self.parent:
-      self.parent.children.append(self)
+      with self.run_tracker.workunits_lock:
+        self.parent._children[self.id] = self
+
+  @property
+  def children(self):
+    """Returns the child workunits not yet forgotten, in the order they were created."""
+    with self.run_tracker.workunits_lock:
+      return list(self._children.values())
 
   def has_label(self, label):
     return label in self.labels
@@ -144,7 +158,7 @@ class WorkUnit(object):
     if not m or m.group(0) != name:
       raise Exception('Invalid output name: %s' % name)
     if name not in self._outputs:
-      path = os.path.join(self.run_tracker.info_dir, 'tool_outputs', '%s.%s' % (self.id, name))
+      path = self._output_path(name)
       safe_mkdir_for(path)
       self._outputs[name] = FileBackedRWBuf(path)
     return self._outputs[name]
@@ -153,6 +167,13 @@ class WorkUnit(object):
     """Returns the map of output name -> output buffer."""
     return self._outputs
 
+  def output_paths(self):
+    """Returns the map of output name -> path of the file backing the output buffer."""
+    return dict((name, self._output_path(name)) for name in self._outputs)
+
+  def _output_path(self, name):
+    return os.path.join(self.run_tracker.info_dir, 'tool_outputs', '%s.%s' % (self.id, name))
+
   def choose(self, aborted_val, failure_val, warning_val, success_val, unknown_val):
     """Returns one of the 5 arguments, depending on our outcome."""
     return WorkUnit.choose_for_outcome(self._outcome,
@@ -196,7 +217,16 @@ class WorkUnit(object):
     This assumes that all major work should be done in leaves.
     TODO: Is this assumption valid?
     """
-    return 0 if len(self.children) == 0 else self._self_time()
+    with self.run_tracker.workunits_lock:
+      has_children = self._children or self._num_forgotten_children
+      return self._self_time() if has_children else 0
+
+  def forget_child(self, child):
+    """Drops an ended child, and with it its subtree, remembering only its duration."""
+    with self.run_tracker.workunits_lock:
+      del self._children[child.id]
+      self._num_forgotten_children += 1
+      self._forgotten_children_duration += child.duration()
 
   def to_dict(self):
     """Useful for providing arguments to templates."""
@@ -210,4 +240,6 @@ class WorkUnit(object):
 
   def _self_time(self):
     """Returns the time spent in this workunit outside of any children."""
-    return self.duration() - sum([child.duration() for child in self.children])
+    with self.run_tracker.workunits_lock:
+      return (self.duration() - self._forgotten_children_duration -
+              sum([child.duration() for child in self._children.values()]))
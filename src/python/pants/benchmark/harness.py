@@ -0,0 +1,257 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict, namedtuple
+import json
+import optparse
+import os
+import subprocess
+import sys
+import time
+
+from pants.base.build_environment import get_buildroot
+from pants.base.timing_store import TimingStore
+from pants.benchmark.synthetic_repo import SyntheticRepo
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir, safe_rmtree
+
+
+def _median(values):
+  values = sorted(value for value in values if value is not None)
+  if not values:
+    return None
+  middle = len(values) // 2
+  if len(values) % 2:
+    return values[middle]
+  return (values[middle - 1] + values[middle]) / 2
+
+
+class BenchmarkHarness(object):
+  """Times scripted pants scenarios against a SyntheticRepo.
+
+  Each scenario first runs pants once, unmeasured, to build the repo, and then for each iteration
+  prepares the repo - editing a file, say - and runs pants again, measured.  Measured runs report
+  their wall time and the per-workunit timings the RunTracker stored for them in the repo's timing
+  store, and the summary of a scenario holds the median of each over its iterations.
+  """
+
+  Scenario = namedtuple('Scenario', ['name', 'description', 'prepare'])
+
+  SCENARIOS = [
+    Scenario('noop', 'Rebuilds with nothing changed.', lambda harness: None),
+    Scenario('edit_leaf', 'Rebuilds after editing a target nothing depends on.',
+             lambda harness: harness.repo.edit(harness.repo.targets - 1)),
+    Scenario('edit_shared', 'Rebuilds after editing the target the most targets depend on.',
+             lambda harness: harness.repo.edit(0)),
+    Scenario('warm_cache', 'Rebuilds from a clean workdir, with a warm artifact cache.',
+             lambda harness: harness.clean(clear_cache=False)),
+    Scenario('cold', 'Rebuilds from a clean workdir, with an empty artifact cache.',
+             lambda harness: harness.clean(clear_cache=True)),
+  ]
+
+  @classmethod
+  def scenario(cls, name):
+    for scenario in cls.SCENARIOS:
+      if scenario.name == name:
+        return scenario
+    raise ValueError('Unknown scenario %s, expected one of: %s'
+                     % (name, ', '.join(scenario.name for scenario in cls.SCENARIOS)))
+
+  @staticmethod
+  def compare(results, baseline, threshold=0.1, min_secs=0.1):
+    """Returns descriptions of the regressions in results relative to baseline results.
+
+    A timing regresses if its median grew by more than ``threshold``, as a fraction of its baseline
+    median, and by more than ``min_secs``, so that the noise in short timings is not flagged.  Any
+    failed run in results is reported too.
+    """
+    regressions = []
+    for name, scenario in sorted(results['scenarios'].items()):
+      failures = [outcome for outcome in scenario['outcomes'] if outcome != 'SUCCESS']
+      if failures:
+        regressions.append('%s: %d of %d runs did not succeed: %s'
+                           % (name, len(failures), len(scenario['outcomes']), ', '.join(failures)))
+      baseline_scenario = baseline.get('scenarios', {}).get(name)
+      if not baseline_scenario:
+        continue
+      timings = [('wall time', scenario['wall'], baseline_scenario['wall'])]
+      for path, timing in sorted(scenario['cumulative'].items()):
+        if path in baseline_scenario['cumulative']:
+          timings.append((path, timing, baseline_scenario['cumulative'][path]))
+      for label, timing, baseline_timing in timings:
+        median, baseline_median = timing['median'], baseline_timing['median']
+        if median is None or baseline_median is None:
+          continue
+        if median - baseline_median > max(baseline_median * threshold, min_secs):
+          regressions.append('%s: %s regressed from %.3fs to %.3fs'
+                             % (name, label, baseline_median, median))
+    return regressions
+
+  def __init__(self, repo, pants_cmd, goals, specs=None, iterations=3, env=None, log_dir=None):
+    """
+    :param repo: The generated SyntheticRepo to run pants in.
+    :param list pants_cmd: The command that runs pants, to which goals and specs are appended.
+    :param list goals: The goals each run runs.
+    :param list specs: The target specs each run runs goals for, by default all targets.
+    :param int iterations: The number of measured runs of each scenario.
+    :param dict env: Extra environment variables to run pants with.
+    :param string log_dir: The dir to write the output of each pants run to, by default under the
+      repo's benchmark dir.
+    """
+    self.repo = repo
+    self._pants_cmd = list(pants_cmd)
+    self._goals = list(goals)
+    self._specs = list(specs or ['src::'])
+    self._iterations = iterations
+    self._env = dict(os.environ, PANTS_BUILD_ROOT=repo.root, **(env or {}))
+    self._log_dir = log_dir or os.path.join(repo.benchmark_dir, 'logs')
+    self._timing_store = TimingStore(repo.timing_store_path)
+    self._run_count = 0
+
+  def clean(self, clear_cache):
+    """Cleans the repo's workdir, and optionally its artifact cache too."""
+    self.run_pants(['clean-all'])
+    if clear_cache:
+      safe_rmtree(self.repo.artifact_cache_dir)
+
+  def run_pants(self, args):
+    """Runs pants with the given args in the repo, returning the run's timing record.
+
+    The record is that stored by the RunTracker, with the run's wall time under ``wall``, or just
+    the wall time and a FAILURE outcome if pants died before storing one.
+    """
+    safe_mkdir(self._log_dir)
+    self._run_count += 1
+    log_path = os.path.join(self._log_dir, 'run-%d.log' % self._run_count)
+    stored = len(self._timing_store.runs())
+    with open(log_path, 'w') as log:
+      start = time.time()
+      subprocess.call(self._pants_cmd + args, cwd=self.repo.root, env=self._env, stdout=log,
+                      stderr=subprocess.STDOUT)
+      wall = time.time() - start
+    runs = self._timing_store.runs()
+    record = runs[-1] if len(runs) > stored else {'outcome': 'FAILURE'}
+    record['wall'] = wall
+    return record
+
+  def run_scenario(self, scenario):
+    """Runs the given scenario, returning its summary as a json-serializable dict."""
+    build = self._goals + self._specs
+    self.run_pants(build)
+    records = []
+    for _ in range(self._iterations):
+      scenario.prepare(self)
+      records.append(self.run_pants(build))
+
+    def summarize(values):
+      return {'runs': values, 'median': _median(values)}
+
+    summary = {
+      'description': scenario.description,
+      'outcomes': [record['outcome'] for record in records],
+      'wall': summarize([record['wall'] for record in records]),
+    }
+    for key in ('cumulative', 'self'):
+      timings = defaultdict(lambda: [None] * len(records))
+      for index, record in enumerate(records):
+        for path, secs in record.get(key, {}).items():
+          timings[path][index] = secs
+      summary[key] = dict((path, summarize(values)) for path, values in timings.items())
+    return summary
+
+  def run(self, scenarios):
+    """Runs the given scenarios in order, returning the results as a json-serializable dict."""
+    return {
+      'goals': self._goals,
+      'specs': self._specs,
+      'iterations': self._iterations,
+      'scenarios': dict((scenario.name, self.run_scenario(scenario)) for scenario in scenarios),
+    }
+
+
+def main():
+  """Benchmarks pants builds of a generated repo, printing per-phase timings as json.
+
+  To run:
+
+  ./pants py src/python/pants/benchmark:benchmark --targets=500 --baseline=baseline.json
+
+  Exits non-zero if any build failed or, given baseline results, if any timing regressed.
+  """
+  parser = optparse.OptionParser(usage='%prog [options]')
+  parser.add_option('--root', help='Generate the repo here, rather than in a temporary dir, and '
+                                   'keep it and the logs of its pants runs.')
+  parser.add_option('--targets', type='int', default=100)
+  parser.add_option('--files-per-target', type='int', default=5)
+  parser.add_option('--fan-out', type='int', default=3)
+  parser.add_option('--languages', default=','.join(SyntheticRepo.LANGUAGES))
+  parser.add_option('--seed', type='int', default=0)
+  parser.add_option('--scenarios',
+                    default=','.join(scenario.name for scenario in BenchmarkHarness.SCENARIOS))
+  parser.add_option('--iterations', type='int', default=3)
+  parser.add_option('--goal', dest='goals', action='append',
+                    help='A goal to run; may be repeated.  Defaults to compile.')
+  parser.add_option('--pants', help='The command to run pants with, by default the one in the '
+                                    'current build root, run from its sources.')
+  parser.add_option('--output', help='Write results here rather than to stdout.')
+  parser.add_option('--baseline', help='Fail on regressions relative to these results.')
+  parser.add_option('--threshold', type='float', default=0.1,
+                    help='The fraction a timing may grow by before it regresses.')
+  parser.add_option('--min-regression-secs', type='float', default=0.1,
+                    help='The seconds a timing may grow by before it regresses.')
+  options, _ = parser.parse_args()
+
+  try:
+    scenarios = [BenchmarkHarness.scenario(name) for name in options.scenarios.split(',')]
+  except ValueError as e:
+    parser.error(str(e))
+  env = {}
+  if options.pants:
+    pants_cmd = options.pants.split()
+  else:
+    pants_cmd = [os.path.join(get_buildroot(), 'pants')]
+    env['PANTS_DEV'] = '1'
+
+  def benchmark(root):
+    repo = SyntheticRepo(root, targets=options.targets, files_per_target=options.files_per_target,
+                         fan_out=options.fan_out, languages=options.languages.split(','),
+                         seed=options.seed)
+    repo.generate(get_buildroot())
+    harness = BenchmarkHarness(repo, pants_cmd, options.goals or ['compile'],
+                               iterations=options.iterations, env=env)
+    results = harness.run(scenarios)
+    results['repo'] = {'targets': options.targets, 'files_per_target': options.files_per_target,
+                       'fan_out': options.fan_out, 'languages': options.languages,
+                       'seed': options.seed}
+    return results
+
+  if options.root:
+    results = benchmark(options.root)
+  else:
+    with temporary_dir() as root:
+      results = benchmark(root)
+
+  output = json.dumps(results, indent=2, sort_keys=True)
+  if options.output:
+    with open(options.output, 'w') as fp:
+      fp.write(output + '\n')
+  else:
+    print(output)
+
+  baseline = {}
+  if options.baseline:
+    with open(options.baseline, 'r') as fp:
+      baseline = json.load(fp)
+  regressions = BenchmarkHarness.compare(results, baseline, threshold=options.threshold,
+                                         min_secs=options.min_regression_secs)
+  for regression in regressions:
+    print(regression, file=sys.stderr)
+  sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,214 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import ConfigParser
+import os
+import random
+import shutil
+
+from pants.util.dirutil import safe_mkdir, safe_mkdir_for
+
+
+class SyntheticRepo(object):
+  """Generates a pants repo of configurable size to benchmark pants against.
+
+  The repo holds ``targets`` library targets, cycling through ``languages``, each with
+  ``files_per_target`` sources.  Each target depends on up to ``fan_out`` targets generated before
+  it, chosen at random but reproducibly for a given ``seed``, and its first source references the
+  first source of each of its dependencies so that the dependencies are real.  So the first targets
+  are depended on by the most targets, and the last by none.
+
+  The repo runs pants with the host repo's pants.ini and tools, and with settings of its own that
+  keep its artifact cache and its timing store under its ``.benchmark`` dir.
+  """
+
+  LANGUAGES = ('java', 'scala', 'python')
+
+  # The languages each language's targets may depend on.
+  _DEPENDABLE = {
+    'java': ('java',),
+    'scala': ('java', 'scala'),
+    'python': ('python',),
+  }
+
+  _TARGET = {
+    'java': 'java_library',
+    'scala': 'scala_library',
+    'python': 'python_library',
+  }
+
+  # Host repo files copied into the repo, and host repo dirs linked to from it.
+  _SUPPORT_FILES = ('pants.ini', 'BUILD.tools')
+  _SUPPORT_DIRS = ('3rdparty', 'build-support')
+
+  def __init__(self, root, targets=100, files_per_target=5, fan_out=3, languages=LANGUAGES,
+               seed=0):
+    """
+    :param string root: The dir to generate the repo in.
+    :param int targets: The number of library targets to generate.
+    :param int files_per_target: The number of sources each target owns.
+    :param int fan_out: The most dependencies any one target has.
+    :param languages: The languages to generate targets in, some of 'java', 'scala' and 'python'.
+    :param int seed: Seeds the choice of dependencies.
+    """
+    unknown = set(languages) - set(self.LANGUAGES)
+    if unknown:
+      raise ValueError('Unknown languages: %s' % ', '.join(sorted(unknown)))
+    if targets < 1 or files_per_target < 1 or fan_out < 0:
+      raise ValueError('A repo needs at least 1 target of at least 1 file, and fan out of at least '
+                       '0, given %d, %d and %d.' % (targets, files_per_target, fan_out))
+    self._root = os.path.realpath(root)
+    self._files_per_target = files_per_target
+    self._languages = [languages[i % len(languages)] for i in range(targets)]
+
+    rng = random.Random(seed)
+    self._dependencies = []
+    for index, language in enumerate(self._languages):
+      dependable = self._DEPENDABLE[language]
+      candidates = [dep for dep in range(index) if self._languages[dep] in dependable]
+      self._dependencies.append(sorted(rng.sample(candidates, min(fan_out, len(candidates)))))
+    self._edits = [0] * targets
+
+  @property
+  def root(self):
+    return self._root
+
+  @property
+  def benchmark_dir(self):
+    """The dir holding the benchmark's own state, outside of pants' workdir."""
+    return os.path.join(self._root, '.benchmark')
+
+  @property
+  def artifact_cache_dir(self):
+    """The local stand-in for a shared artifact cache."""
+    return os.path.join(self.benchmark_dir, 'artifact_cache')
+
+  @property
+  def timing_store_path(self):
+    return os.path.join(self.benchmark_dir, 'timings.jsonl')
+
+  @property
+  def workdir(self):
+    return os.path.join(self._root, '.pants.d')
+
+  @property
+  def targets(self):
+    return len(self._languages)
+
+  def language(self, index):
+    return self._languages[index]
+
+  def dependencies(self, index):
+    """Returns the indexes of the targets the target at the given index depends on."""
+    return list(self._dependencies[index])
+
+  def address(self, index):
+    """Returns the spec of the target at the given index."""
+    target_dir = self._target_dir(index)
+    return '%s:%s' % (target_dir, os.path.basename(target_dir))
+
+  def generate(self, support_root):
+    """Writes the repo, with its pants.ini and tools based on those of the given host repo."""
+    safe_mkdir(self._root)
+    self._write_support(support_root)
+    self._write('BUILD', ''.join("source_root('src/%s', %s)\n" % (language, self._TARGET[language])
+                                 for language in sorted(set(self._languages))))
+    for index in range(self.targets):
+      self._write_target(index)
+
+  def edit(self, index):
+    """Edits the first source of the target at the given index, as a developer might."""
+    self._edits[index] += 1
+    self._write_source(index, 0)
+
+  def _write_support(self, support_root):
+    for name in self._SUPPORT_FILES:
+      if os.path.exists(os.path.join(support_root, name)):
+        shutil.copy(os.path.join(support_root, name), os.path.join(self._root, name))
+    for name in self._SUPPORT_DIRS:
+      link = os.path.join(self._root, name)
+      if os.path.exists(os.path.join(support_root, name)) and not os.path.lexists(link):
+        os.symlink(os.path.join(support_root, name), link)
+
+    # Appended sections merge with and override those of the host config.  Tasks read their
+    # artifact cache settings from their own section before DEFAULT, so override every section.
+    parser = ConfigParser.RawConfigParser()
+    parser.read(os.path.join(self._root, 'pants.ini'))
+    caches = repr([self.artifact_cache_dir])
+    settings = ['', '# Benchmark settings.', '[DEFAULT]',
+                'timing_store: %s' % self.timing_store_path]
+    for section in [None] + parser.sections():
+      if section:
+        settings.append('[%s]' % section)
+      settings.append('read_artifact_caches: %s' % caches)
+      settings.append('write_artifact_caches: %s' % caches)
+    with open(os.path.join(self._root, 'pants.ini'), 'a') as fp:
+      fp.write('\n'.join(settings) + '\n')
+
+  def _target_dir(self, index):
+    language = self._languages[index]
+    if language == 'python':
+      return 'src/python/bench/t%d' % index
+    return 'src/%s/com/pants/bench/t%d' % (language, index)
+
+  def _source_name(self, index, file_index):
+    language = self._languages[index]
+    if language == 'python':
+      return 'm%d.py' % file_index
+    return 'C%d_%d.%s' % (index, file_index, language)
+
+  def _write(self, relpath, content):
+    path = os.path.join(self._root, relpath)
+    safe_mkdir_for(path)
+    with open(path, 'w') as fp:
+      fp.write(content)
+
+  def _write_target(self, index):
+    target_dir = self._target_dir(index)
+    sources = [self._source_name(index, i) for i in range(self._files_per_target)]
+    if self._languages[index] == 'python':
+      sources.insert(0, '__init__.py')
+      self._write(os.path.join(target_dir, '__init__.py'), '')
+      self._write('src/python/bench/__init__.py', '')
+    dependencies = ''.join("    '%s',\n" % self.address(dep) for dep in self._dependencies[index])
+    self._write(os.path.join(target_dir, 'BUILD'),
+                "%s(name='t%d',\n"
+                "  sources=[%s],\n"
+                "  dependencies=[\n%s  ],\n"
+                ")\n" % (self._TARGET[self._languages[index]], index,
+                         ', '.join("'%s'" % source for source in sources), dependencies))
+    for file_index in range(self._files_per_target):
+      self._write_source(index, file_index)
+
+  def _write_source(self, index, file_index):
+    language = self._languages[index]
+    # Only the first source of a target references its dependencies.
+    deps = self._dependencies[index] if file_index == 0 else []
+    value = ' + '.join([str(self._edits[index] if file_index == 0 else file_index)] +
+                       [self._reference(index, dep) for dep in deps])
+    if language == 'java':
+      content = ('package com.pants.bench.t%d;\n\n'
+                 'public class C%d_%d {\n'
+                 '  public static int value() {\n'
+                 '    return %s;\n'
+                 '  }\n'
+                 '}\n' % (index, index, file_index, value))
+    elif language == 'scala':
+      content = ('package com.pants.bench.t%d\n\n'
+                 'object C%d_%d {\n'
+                 '  def value(): Int = %s\n'
+                 '}\n' % (index, index, file_index, value))
+    else:
+      content = ''.join('from bench.t%d import m0 as t%d\n' % (dep, dep) for dep in deps)
+      content += '\n\ndef value():\n  return %s\n' % value
+    self._write(os.path.join(self._target_dir(index), self._source_name(index, file_index)),
+                content)
+
+  def _reference(self, index, dep):
+    if self._languages[index] == 'python':
+      return 't%d.value()' % dep
+    return 'com.pants.bench.t%d.C%d_0.value()' % (dep, dep)
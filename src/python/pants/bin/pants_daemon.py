@@ -0,0 +1,583 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import namedtuple
+from contextlib import contextmanager
+import errno
+import logging
+import os
+import signal
+import socket
+import SocketServer
+import struct
+import sys
+import threading
+
+from pex.compatibility import to_bytes
+from twitter.common.dirutil import Lock
+
+from pants.base.build_file import BuildFile
+from pants.base.build_file_address_mapper import BuildFileAddressMapper
+from pants.base.build_file_parser import BuildFileParser
+from pants.base.build_graph import BuildGraph
+from pants.base.hash_utils import hash_file
+from pants.util.dirutil import safe_delete, safe_mkdir_for
+
+
+logger = logging.getLogger(__name__)
+
+
+def _signature(path):
+  stat = os.stat(path)
+  return stat.st_mtime, stat.st_size
+
+
+class BuildFileWatcher(object):
+  """Detects the BUILD files added, removed or edited under a root directory between polls.
+
+  Directories are tracked by mtime so that a poll only lists the directories whose entries changed,
+  and BUILD files are tracked by stat signature so that a poll only digests the BUILD files that
+  were touched.  A BUILD file whose digest is unchanged is not reported.
+  """
+
+  Changes = namedtuple('Changes', ['spec_paths', 'added_or_removed'])
+
+  def __init__(self, root_dir, ignore_dirs=()):
+    """
+    :param string root_dir: The directory to watch BUILD files under.
+    :param ignore_dirs: Directories under `root_dir` not to look for BUILD files in.  Hidden
+      directories are always ignored.
+    """
+    self._root_dir = os.path.realpath(root_dir)
+    self._ignore_dirs = set(os.path.realpath(path) for path in ignore_dirs)
+    self._mtime_by_dir = {}
+    self._entry_by_build_file = {}
+    self._list(self._root_dir, set())
+
+  @property
+  def spec_paths(self):
+    """The spec paths of all the BUILD files found as of the last poll."""
+    return set(self._spec_path(path) for path in self._entry_by_build_file)
+
+  def _spec_path(self, build_file_path):
+    return os.path.relpath(os.path.dirname(build_file_path), self._root_dir)
+
+  def _list(self, path, added):
+    try:
+      self._mtime_by_dir[path] = os.stat(path).st_mtime
+      names = os.listdir(path)
+    except OSError:
+      self._mtime_by_dir.pop(path, None)
+      return
+
+    for name in names:
+      child = os.path.join(path, name)
+      if name.startswith('.') or child in self._ignore_dirs or os.path.islink(child):
+        continue
+      if os.path.isdir(child):
+        if child not in self._mtime_by_dir:
+          self._list(child, added)
+      elif BuildFile._is_buildfile_name(name) and child not in self._entry_by_build_file:
+        try:
+          self._entry_by_build_file[child] = (_signature(child), hash_file(child))
+          added.add(child)
+        except (IOError, OSError):
+          pass
+
+  def poll(self):
+    """Returns the Changes to BUILD files since the last poll.
+
+    Changes are returned as the set of spec paths with added, removed or edited BUILD files and
+    whether any BUILD files were added or removed.
+    """
+    added = set()
+    for path, mtime in self._mtime_by_dir.items():
+      try:
+        current = os.stat(path).st_mtime
+      except OSError:
+        del self._mtime_by_dir[path]
+        continue
+      if current != mtime:
+        self._list(path, added)
+
+    changed = set(added)
+    removed = set()
+    for path, (signature, digest) in self._entry_by_build_file.items():
+      if path in added:
+        continue
+      try:
+        current = _signature(path)
+        if current != signature:
+          current_digest = hash_file(path)
+          self._entry_by_build_file[path] = (current, current_digest)
+          if current_digest != digest:
+            changed.add(path)
+      except (IOError, OSError):
+        del self._entry_by_build_file[path]
+        removed.add(path)
+
+    return self.Changes(spec_paths=set(self._spec_path(path) for path in changed | removed),
+                        added_or_removed=bool(added or removed))
+
+
+class WarmBuildGraph(object):
+  """A BuildGraph holding every target in a workspace, kept in sync with its BUILD files."""
+
+  def __init__(self, root_dir, build_configuration, ignore_dirs=()):
+    """
+    :param string root_dir: The root directory of the pants workspace.
+    :param build_configuration: The BuildConfiguration to parse BUILD files with.
+    :param ignore_dirs: Directories under `root_dir` whose BUILD files should not be kept warm.
+    """
+    self._watcher = BuildFileWatcher(root_dir, ignore_dirs=ignore_dirs)
+    self.build_file_parser = BuildFileParser(build_configuration=build_configuration,
+                                             root_dir=root_dir)
+    self.address_mapper = BuildFileAddressMapper(self.build_file_parser)
+    self.build_graph = BuildGraph(address_mapper=self.address_mapper)
+    self._inject_all()
+
+  def refresh(self):
+    """Re-parses the BUILD files that changed since the last refresh.
+
+    Returns the spec paths of the BUILD files that changed.
+    """
+    changes = self._watcher.poll()
+    if changes.spec_paths:
+      if changes.added_or_removed:
+        BuildFile.clear_cache()
+      for spec_path in changes.spec_paths:
+        self.address_mapper.invalidate(spec_path)
+      # Targets hold their dependencies and dependees, so any change can ripple through the whole
+      # graph; only the parsing of unchanged BUILD files is saved.
+      self.build_graph.reset()
+      self._inject_all()
+    return changes.spec_paths
+
+  def _inject_all(self):
+    for spec_path in sorted(self._watcher.spec_paths):
+      try:
+        for address in self.address_mapper.addresses_in_spec_path(spec_path):
+          self.build_graph.inject_address_closure(address)
+      except Exception as e:
+        # Runs that need these targets will re-attempt them and report the error.
+        logger.debug('Failed to warm {spec_path}: {error}'.format(spec_path=spec_path, error=e))
+
+
+class PantsDaemon(object):
+  """A resident pants process that serves pants runs from a warm build graph.
+
+  The daemon loads backends and parses every BUILD file of the workspace once.  Each run is then
+  served by a fork of the daemon, so runs start with the build graph in memory while any state a
+  run mutates dies with its fork.  Before forking, BUILD files that changed since the last run are
+  re-parsed.
+
+  Runs are requested over a unix domain socket using the nailgun chunk protocol: the client sends
+  its arguments, environment and working directory, and the daemon streams back the run's stdout,
+  stderr and exit code.  Standard input is not forwarded, so interactive goals should bypass the
+  daemon by setting PANTS_NO_DAEMON in the environment.
+  """
+
+  class Error(Exception):
+    """Indicates a failure to run pants in a daemon."""
+
+  class _Shutdown(Exception):
+    """Raised in the daemon to interrupt serving runs when killed."""
+
+  # The seconds to wait for detached processes spawned by a run to release its stdout and stderr.
+  _OUTPUT_DRAIN_TIMEOUT = 1.0
+
+  @staticmethod
+  def enabled(config):
+    """Returns True if runs in the workspace `config` describes should be served by a daemon."""
+    return (config.getbool('daemon', 'enabled', default=False)
+            and not os.environ.get('PANTS_NO_DAEMON'))
+
+  @staticmethod
+  def _paths(config):
+    workdir = os.path.join(config.getdefault('pants_workdir'), 'pantsd')
+    return (os.path.join(workdir, 'pantsd.sock'),
+            os.path.join(workdir, 'pantsd.pid'),
+            os.path.join(workdir, 'pantsd.log'))
+
+  @classmethod
+  def socket_path(cls, config):
+    """Returns the path of the socket the daemon for `config`'s workspace serves runs on."""
+    socket_path, _, _ = cls._paths(config)
+    return socket_path
+
+  @classmethod
+  def kill(cls, config):
+    """Kills the daemon serving `config`'s workspace and waits for it to exit.
+
+    Returns True if a daemon was running.
+    """
+    _, pid_path, _ = cls._paths(config)
+    killed = []
+
+    def terminate(pid):
+      try:
+        os.kill(pid, signal.SIGTERM)
+        killed.append(pid)
+      except OSError as e:
+        if e.errno != errno.ESRCH:
+          raise
+      # Block until the daemon exits and so releases its lock.
+      return True
+
+    safe_mkdir_for(pid_path)
+    Lock.acquire(pid_path, onwait=terminate).release()
+    return bool(killed)
+
+  @classmethod
+  def spawn(cls, config, runner, warm, watched_files=(), watched_packages=()):
+    """Forks a detached daemon for `config`'s workspace unless one is already running.
+
+    Returns immediately in the calling process.
+
+    :param config: The workspace Config.
+    :param runner: A callable that runs pants for the current `sys.argv` given a WarmBuildGraph.
+    :param warm: A callable that returns a new WarmBuildGraph for the workspace.
+    :param watched_files: Files whose modification makes the daemon exit instead of serving runs.
+    :param watched_packages: Packages whose loaded modules' modification makes the daemon exit
+      instead of serving runs.
+    """
+    socket_path, pid_path, log_path = cls._paths(config)
+    safe_mkdir_for(pid_path)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if os.fork() != 0:
+      return
+
+    try:
+      # Detach in a grandchild so the daemon does not die with the spawning run's session.
+      os.setsid()
+      if os.fork() != 0:
+        return
+      lock = Lock.acquire(pid_path, onwait=lambda pid: False)
+      if lock:
+        try:
+          with open(os.devnull, 'r') as devnull:
+            os.dup2(devnull.fileno(), 0)
+          with open(log_path, 'a') as log:
+            os.dup2(log.fileno(), 1)
+            os.dup2(log.fileno(), 2)
+          daemon = cls(socket_path, runner, warm,
+                       idle_timeout=config.getint('daemon', 'idle_timeout', default=3 * 60 * 60),
+                       watched_files=watched_files,
+                       watched_packages=watched_packages)
+          daemon.serve()
+        finally:
+          lock.release()
+    finally:
+      # Prevents finally blocks and atexit handlers of the spawning run from executing.
+      os._exit(0)
+
+  def __init__(self, socket_path, runner, warm, idle_timeout=None, watched_files=(),
+               watched_packages=()):
+    """
+    :param string socket_path: The path of the unix domain socket to serve runs on.
+    :param runner: A callable that runs pants for the current `sys.argv` given a WarmBuildGraph.
+    :param warm: A callable that returns a new WarmBuildGraph for the workspace.
+    :param int idle_timeout: The number of seconds to wait for a run before exiting; by default
+      the daemon serves runs until killed.
+    :param watched_files: Files whose modification makes the daemon exit instead of serving runs.
+    :param watched_packages: Packages whose loaded modules' modification makes the daemon exit
+      instead of serving runs.  The modules loaded once the daemon has warmed up are watched.
+    """
+    self._socket_path = socket_path
+    self._runner = runner
+    self._warm = warm
+    self._idle_timeout = idle_timeout
+    self._watched_files = dict((path, self._stat(path)) for path in watched_files)
+    self._watched_packages = tuple(watched_packages)
+    self._warm_build_graph = None
+    self._serving = False
+
+  @staticmethod
+  def _stat(path):
+    try:
+      return _signature(path)
+    except OSError:
+      return None
+
+  @staticmethod
+  def _module_files(packages):
+    """Returns the source files of the loaded modules in the given packages."""
+    for name, module in list(sys.modules.items()):
+      if module is not None and any(name == package or name.startswith(package + '.')
+                                    for package in packages):
+        path = getattr(module, '__file__', None)
+        if path:
+          base, ext = os.path.splitext(path)
+          yield base + '.py' if ext in ('.pyc', '.pyo') else path
+
+  def serve(self):
+    """Serves runs until idle for longer than the idle timeout, a watched file changes or killed."""
+    daemon = self
+
+    class RequestHandler(SocketServer.BaseRequestHandler):
+      def handle(self):
+        daemon._serve_run(self.request)
+
+    class Server(SocketServer.ForkingMixIn, SocketServer.UnixStreamServer):
+      def process_request(self, request, client_address):
+        if daemon._stale():
+          # Closing the connection without a response tells the client to run pants itself.
+          daemon._serving = False
+          self.shutdown_request(request)
+        else:
+          daemon._refresh()
+          SocketServer.ForkingMixIn.process_request(self, request, client_address)
+
+      def handle_timeout(self):
+        daemon._serving = False
+
+    def shutdown(signum, frame):
+      self._serving = False
+      raise self._Shutdown()
+
+    self._warm_build_graph = self._warm()
+    # Serving runs with code that has since been edited would silently ignore the edits.
+    for path in self._module_files(self._watched_packages):
+      self._watched_files.setdefault(path, self._stat(path))
+
+    safe_delete(self._socket_path)
+    server = Server(self._socket_path, RequestHandler)
+    server.timeout = self._idle_timeout
+    self._serving = True
+    signal.signal(signal.SIGTERM, shutdown)
+    logger.info('Serving pants runs on {path}'.format(path=self._socket_path))
+    try:
+      while self._serving:
+        try:
+          server.handle_request()
+        except self._Shutdown:
+          pass
+      logger.info('Shutting down.')
+    finally:
+      server.server_close()
+      safe_delete(self._socket_path)
+
+  def _stale(self):
+    return any(self._stat(path) != signature for path, signature in self._watched_files.items())
+
+  def _refresh(self):
+    changed = self._warm_build_graph.refresh()
+    if changed:
+      logger.info('Re-parsed BUILD files in: {spec_paths}'
+                  .format(spec_paths=', '.join(sorted(changed))))
+
+  def _serve_run(self, sock):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    session = DaemonSession(sock)
+    args, environment, workdir = session.read_request()
+    os.chdir(workdir)
+    os.environ.clear()
+    os.environ.update(environment)
+    sys.argv = [b'pants'] + args
+    with session.forwarded_output(drain_timeout=self._OUTPUT_DRAIN_TIMEOUT):
+      exit_code = self._run()
+    session.send_chunk(b'X', str(exit_code).encode())
+
+  def _run(self):
+    try:
+      try:
+        self._runner(self._warm_build_graph)
+      except Exception:
+        # Report the failure just as the run would have if it were not served by the daemon.
+        sys.excepthook(*sys.exc_info())
+        return 1
+    except SystemExit as e:
+      if e.code is None:
+        return 0
+      if isinstance(e.code, int):
+        return e.code
+      print(e.code, file=sys.stderr)
+      return 1
+    return 0
+
+
+class DaemonSession(object):
+  """One end of a pants run served by a PantsDaemon."""
+
+  # See: http://www.martiansoftware.com/nailgun/protocol.html
+  HEADER_FMT = b'>Ic'
+  HEADER_LENGTH = 5
+
+  BUFF_SIZE = 8096
+
+  class ProtocolError(Exception):
+    """Thrown if there is an error in the underlying protocol."""
+
+  def __init__(self, sock):
+    self._sock = sock
+    self._send_lock = threading.Lock()
+    self._buff = b''
+
+  def send_chunk(self, command, payload=b''):
+    header = struct.pack(self.HEADER_FMT, len(payload), command)
+    with self._send_lock:
+      self._sock.sendall(header + payload)
+
+  def read_chunk(self):
+    """Returns the next (command, payload) chunk.
+
+    :raises: ``DaemonSession.ProtocolError`` if the connection closes mid-chunk or before one.
+    """
+    while len(self._buff) < self.HEADER_LENGTH:
+      self._recv()
+    payload_length, command = struct.unpack(self.HEADER_FMT, self._buff[:self.HEADER_LENGTH])
+    end = self.HEADER_LENGTH + payload_length
+    while len(self._buff) < end:
+      self._recv()
+    payload = self._buff[self.HEADER_LENGTH:end]
+    self._buff = self._buff[end:]
+    return command, payload
+
+  def _recv(self):
+    data = self._sock.recv(self.BUFF_SIZE)
+    if not data:
+      raise self.ProtocolError('Connection closed.')
+    self._buff += data
+
+  def read_request(self):
+    """Returns the (args, environment, working directory) of the requested run."""
+    args = []
+    environment = {}
+    workdir = None
+    while True:
+      command, payload = self.read_chunk()
+      if command == b'A':
+        args.append(payload)
+      elif command == b'E':
+        key, _, value = payload.partition(b'=')
+        environment[key] = value
+      elif command == b'D':
+        workdir = payload
+      elif command == b'C':
+        return args, environment, workdir
+      else:
+        raise self.ProtocolError('Received unexpected chunk %s -> %s' % (command, payload))
+
+  @contextmanager
+  def forwarded_output(self, drain_timeout=None):
+    """Forwards everything written to stdout and stderr, including by subprocesses, as chunks.
+
+    If the other end goes away the run is interrupted.
+
+    :param float drain_timeout: The seconds to wait for output to be forwarded once the block
+      exits, which only runs out if detached processes still hold stdout or stderr open.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pumps = []
+    for fd, command in ((1, b'1'), (2, b'2')):
+      read_fd, write_fd = os.pipe()
+      os.dup2(write_fd, fd)
+      os.close(write_fd)
+      pump = threading.Thread(target=self._pump, args=(read_fd, command))
+      pump.daemon = True
+      pump.start()
+      pumps.append(pump)
+    # Route python level output through the redirected file descriptors too.
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    try:
+      yield
+    finally:
+      sys.stdout.flush()
+      sys.stderr.flush()
+      # Release our write ends of the pipes so the pumps see eof once they've forwarded everything.
+      devnull = os.open(os.devnull, os.O_WRONLY)
+      os.dup2(devnull, 1)
+      os.dup2(devnull, 2)
+      os.close(devnull)
+      for pump in pumps:
+        pump.join(drain_timeout)
+
+  def _pump(self, read_fd, command):
+    connected = True
+    while True:
+      data = os.read(read_fd, self.BUFF_SIZE)
+      if not data:
+        break
+      if connected:
+        try:
+          self.send_chunk(command, data)
+        except socket.error:
+          connected = False
+          os.kill(os.getpid(), signal.SIGINT)
+    os.close(read_fd)
+
+
+class PantsDaemonClient(object):
+  """Requests pants runs from a PantsDaemon."""
+
+  def __init__(self, socket_path, out=None, err=None):
+    """
+    :param string socket_path: The path of the unix domain socket the daemon serves runs on.
+    :param file out: A stream to write the run's stdout to (defaults to stdout).
+    :param file err: A stream to write the run's stderr to (defaults to stderr).
+    """
+    self._socket_path = socket_path
+    self._out = out or sys.stdout
+    self._err = err or sys.stderr
+
+  def try_connect(self):
+    """Returns a socket connected to the daemon or None if no daemon is serving runs."""
+    if not os.path.exists(self._socket_path):
+      return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if sock.connect_ex(self._socket_path) == 0:
+      return sock
+    sock.close()
+    return None
+
+  def execute(self, args, environment=None, workdir=None):
+    """Runs pants in the daemon.
+
+    :param list args: The pants command line arguments, not including the program name.
+    :param dict environment: The environment to run in; defaults to the current environment.
+    :param string workdir: The directory to run in; defaults to the current directory.
+    :returns: The exit code of the run or None if no daemon served the run.
+    :raises: ``PantsDaemon.Error`` if the daemon failed mid-run.
+    """
+    sock = self.try_connect()
+    if not sock:
+      return None
+
+    session = DaemonSession(sock)
+    started = False
+    try:
+      for arg in args:
+        session.send_chunk(b'A', to_bytes(arg))
+      environment = os.environ if environment is None else environment
+      for key, value in environment.items():
+        session.send_chunk(b'E', to_bytes(key) + b'=' + to_bytes(value))
+      session.send_chunk(b'D', to_bytes(workdir or os.getcwd()))
+      session.send_chunk(b'C', b'pants')
+
+      while True:
+        command, payload = session.read_chunk()
+        started = True
+        if command == b'1':
+          self._out.write(payload)
+          self._out.flush()
+        elif command == b'2':
+          self._err.write(payload)
+          self._err.flush()
+        elif command == b'X':
+          return int(payload)
+        else:
+          raise PantsDaemon.Error('Received unexpected chunk %s -> %s' % (command, payload))
+    except (socket.error, DaemonSession.ProtocolError) as e:
+      if not started:
+        # The daemon is shutting down.
+        return None
+      raise PantsDaemon.Error('Problem running pants in the daemon at %s: %s'
+                              % (self._socket_path, e))
+    finally:
+      sock.close()
@@ -14,7 +14,6 @@ import traceback
 import psutil
 from twitter.common.dirutil import Lock
 
-from pants.backend.jvm.tasks.nailgun_task import NailgunTask
 from pants.base.address import Address
 from pants.base.build_environment import get_buildroot, pants_version
 from pants.base.build_file_address_mapper import BuildFileAddressMapper
@@ -24,15 +23,18 @@ from pants.base.config import Config
 from pants.base.dev_backend_loader import load_build_configuration_from_source
 from pants.base.rcfile import RcFile
 from pants.base.workunit import WorkUnit
+from pants.bin.pants_daemon import PantsDaemon, PantsDaemonClient, WarmBuildGraph
 from pants.commands.command import Command
 from pants.goal.initialize_reporting import initial_reporting
 from pants.goal.run_tracker import RunTracker
+from pants.goal.workspace_lock import WorkspaceLock
 from pants.reporting.report import Report
 
 
 _BUILD_COMMAND = 'build'
 _LOG_EXIT_OPTION = '--log-exit'
 _VERSION_OPTION = '--version'
+_KILL_DAEMON_OPTION = '--kill-pantsd'
 _PRINT_EXCEPTION_STACKTRACE = '--print-exception-stacktrace'
 
 
@@ -101,7 +103,7 @@ def _process_info(pid):
   process = psutil.Process(pid)
   return '%d (%s)' % (pid, ' '.join(process.cmdline))
 
-def _run():
+def _run(warm_build_graph=None):
   # place the registration of the unhandled exception hook
   # as early as possible in the code
   sys.excepthook = _unhandled_exception_hook
@@ -150,13 +152,21 @@ def _run():
   else:
     run_tracker.log(Report.INFO, '(To run a reporting server: ./pants goal server)')
 
-  backend_packages = config.getlist('backends', 'packages')
-  build_configuration = load_build_configuration_from_source(additional_backends=backend_packages)
-  build_file_parser = BuildFileParser(build_configuration=build_configuration,
-                                      root_dir=root_dir,
-                                      run_tracker=run_tracker)
-  address_mapper = BuildFileAddressMapper(build_file_parser)
-  build_graph = BuildGraph(run_tracker=run_tracker, address_mapper=address_mapper)
+  if warm_build_graph:
+    build_file_parser = warm_build_graph.build_file_parser
+    build_file_parser.run_tracker = run_tracker
+    address_mapper = warm_build_graph.address_mapper
+    build_graph = warm_build_graph.build_graph
+    build_graph.run_tracker = run_tracker
+  else:
+    backend_packages = config.getlist('backends', 'packages')
+    build_configuration = load_build_configuration_from_source(
+        additional_backends=backend_packages)
+    build_file_parser = BuildFileParser(build_configuration=build_configuration,
+                                        root_dir=root_dir,
+                                        run_tracker=run_tracker)
+    address_mapper = BuildFileAddressMapper(build_file_parser)
+    build_graph = BuildGraph(run_tracker=run_tracker, address_mapper=address_mapper)
 
   command_class, command_args = _parse_command(root_dir, argv)
   command = command_class(run_tracker,
@@ -167,16 +177,22 @@ def _run():
                           address_mapper,
                           build_graph)
   try:
+    def onwait(pid):
+      try:
+        process_info = _process_info(pid)
+      except psutil.NoSuchProcess:
+        # The pid recorded by a shared lock holder can outlive it while other holders remain.
+        process_info = 'sharing the lock'
+      print('Waiting on pants process %s to complete' % process_info, file=sys.stderr)
+      return True
+    runfile = os.path.join(root_dir, '.pants.run')
     if command.serialized():
-      def onwait(pid):
-        process = psutil.Process(pid)
-        print('Waiting on pants process %d (%s) to complete' %
-              (pid, ' '.join(process.cmdline)), file=sys.stderr)
-        return True
-      runfile = os.path.join(root_dir, '.pants.run')
       lock = Lock.acquire(runfile, onwait=onwait)
     else:
-      lock = Lock.unlocked()
+      # Commands that don't serialize whole runs lock just the parts of the workspace they write.
+      lock = WorkspaceLock(runfile,
+                           lock_dir=os.path.join(config.getdefault('pants_workdir'), 'locks'),
+                           onwait=onwait)
     try:
       result = command.run(lock)
       if result:
@@ -193,13 +209,62 @@ def _run():
     # be pending background work that needs a nailgun.
     if (hasattr(command.options, 'cleanup_nailguns') and command.options.cleanup_nailguns) \
         or config.get('nailgun', 'autokill', default=False):
+      # NB: Imported here so that the jvm backend is only imported at startup when in use.
+      from pants.backend.jvm.tasks.nailgun_task import NailgunTask
       NailgunTask.killall(None)
 
-def main():
+def _main(warm_build_graph=None):
   try:
-    _run()
+    _run(warm_build_graph)
   except KeyboardInterrupt:
     _exit_and_fail('Interrupted by user.')
 
+
+def _warm_build_graph():
+  config = Config.load()
+  backend_packages = config.getlist('backends', 'packages')
+  build_configuration = load_build_configuration_from_source(additional_backends=backend_packages)
+  return WarmBuildGraph(get_buildroot(),
+                        build_configuration,
+                        ignore_dirs=[config.getdefault('pants_workdir'),
+                                     config.getdefault('pants_distdir')])
+
+
+def _run_in_daemon():
+  """Runs pants in the workspace's daemon if enabled, spawning the daemon if needed.
+
+  To enable the daemon:
+  [daemon]
+  enabled: True
+
+  Returns the exit code of the run or None if the run was not served by a daemon.
+  """
+  config = Config.load()
+  if not PantsDaemon.enabled(config):
+    return None
+  try:
+    exit_code = PantsDaemonClient(PantsDaemon.socket_path(config)).execute(sys.argv[1:])
+  except PantsDaemon.Error as e:
+    _exit_and_fail(str(e))
+  if exit_code is None:
+    # This run proceeds in-process while the daemon warms up for the next.
+    PantsDaemon.spawn(config,
+                      runner=_main,
+                      warm=_warm_build_graph,
+                      watched_files=[os.path.join(get_buildroot(), 'pants.ini')],
+                      watched_packages=['pants'] + config.getlist('backends', 'packages'))
+  return exit_code
+
+
+def main():
+  if len(sys.argv) == 2 and sys.argv[1] == _KILL_DAEMON_OPTION:
+    killed = PantsDaemon.kill(Config.load())
+    _do_exit(msg='Killed pants daemon.' if killed else 'No pants daemon running.', out=sys.stdout)
+
+  exit_code = _run_in_daemon()
+  if exit_code is not None:
+    sys.exit(exit_code)
+  _main()
+
 if __name__ == '__main__':
   main()
@@ -20,12 +20,12 @@ from twitter.common.lang import Compatibility
 from twitter.common.log.options import LogOptions
 
 from pants.backend.core.tasks.task import QuietTaskMixin, Task
-from pants.backend.jvm.tasks.nailgun_task import NailgunTask  # XXX(pl)
 from pants.base.build_environment import get_buildroot
 from pants.base.build_file import BuildFile
 from pants.base.cmd_line_spec_parser import CmdLineSpecParser
 from pants.base.config import Config
 from pants.base.rcfile import RcFile
+from pants.base.source_owner_index import SourceOwnerIndex
 from pants.base.workunit import WorkUnit
 from pants.commands.command import Command
 from pants.engine.engine import Engine
@@ -36,6 +36,8 @@ from pants.goal.help import print_help
 from pants.goal.initialize_reporting import update_reporting
 from pants.goal.option_helpers import add_global_options
 from pants.goal.goal import Goal
+from pants.goal.workspace import ScmWorkspace, Workspace
+from pants.goal.workspace_lock import WorkspaceLock
 from pants.util.dirutil import safe_mkdir
 
 
@@ -100,9 +102,9 @@ class GoalRunner(Command):
   # TODO(John Sirois): revisit wholesale locking when we move py support into pants new
   @classmethod
   def serialized(cls):
-    # Goal serialization is now handled in goal execution during group processing.
-    # The goal command doesn't need to hold the serialization lock; individual goals will
-    # acquire the lock if they need to be serialized.
+    # Goal serialization is now handled in goal execution: the goal command doesn't need to hold
+    # the serialization lock; the tasks of serialized goals lock the workspace resources they write
+    # as they execute.
     return False
 
   def __init__(self, *args, **kwargs):
@@ -256,6 +258,12 @@ class GoalRunner(Command):
     is_explain = self.options.explain
     update_reporting(self.options, is_quiet_task() or is_explain, self.run_tracker)
 
+    if self.options.changed_since:
+      with self.run_tracker.new_workunit(name='changed', labels=[WorkUnit.SETUP]):
+        targets = OrderedSet(self.targets)
+        targets.update(self._changed_targets(self.options.changed_since))
+        self.targets = list(targets)
+
     if self.options.target_excludes:
       excludes = self.options.target_excludes
       log.debug('excludes:\n  {excludes}'.format(excludes='\n  '.join(excludes)))
@@ -271,6 +279,8 @@ class GoalRunner(Command):
         log.debug('Targets excluded by pattern {pattern}\n  {targets}'.format(pattern=pattern,
             targets='\n  '.join(t.address.spec for t in by_pattern[pattern])))
 
+    if self.options.no_lock:
+      lock = WorkspaceLock.unlocked()
     context = Context(
       config=self.config,
       options=self.options,
@@ -291,12 +301,36 @@ class GoalRunner(Command):
       context.log.error('Unknown goal(s): %s\n' % ' '.join(goal.name for goal in unknown))
       return 1
 
+    # Hold the run lock shared across all the goals, so a clean in another run can't slip in between
+    # two of our tasks; the lock is released by our caller once the run is over.
+    lock.lock_run()
     engine = RoundEngine()
     return engine.execute(context, self.goals)
 
+  def _changed_targets(self, parent):
+    """Returns the targets owning files changed since the given parent tree-ish."""
+    try:
+      touched_files = list(ScmWorkspace(None).touched_files(parent))
+    except Workspace.WorkspaceError as e:
+      self.error('Failed to find files changed since %s: %s' % (parent, e), show_help=False)
+
+    index = SourceOwnerIndex.from_config(self.config, self.build_file_parser, self.build_graph)
+    owners_by_path = index.owners(touched_files)
+    index.save()
+
+    targets = OrderedSet()
+    for path in touched_files:
+      for spec in owners_by_path[path]:
+        address = self.address_mapper.spec_to_address(spec)
+        self.build_graph.inject_address_closure(address)
+        targets.add(self.build_graph.get_target(address))
+    return targets
+
   def cleanup(self):
     # TODO: This is JVM-specific and really doesn't belong here.
     # TODO: Make this more selective? Only kill nailguns that affect state? E.g., checkstyle
     # may not need to be killed.
+    # NB: Imported here so that runs not using the jvm backend need not pay to import it at startup.
+    from pants.backend.jvm.tasks.nailgun_task import NailgunTask  # XXX(pl)
     NailgunTask.killall(log.info)
     sys.exit(1)
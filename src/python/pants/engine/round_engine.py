@@ -15,18 +15,55 @@ from pants.base.exceptions import TaskError
 from pants.base.workunit import WorkUnit
 from pants.engine.engine import Engine
 from pants.engine.round_manager import RoundManager
+from pants.engine.task_scheduler import TaskScheduler
 
 
 class GoalExecutor(object):
-  def __init__(self, context, goal, tasks_by_name):
+  def __init__(self, context, goal, tasks_by_name, producers_by_task_name=None,
+               producer_tasks=None):
+    """
+    :param context: The context of the run.
+    :param goal: The goal to execute.
+    :param tasks_by_name: The goal's tasks by name, in reverse installed order.
+    :param producers_by_task_name: The (goal, task type) pairs producing the products each task
+      requires.
+    :param producer_tasks: The tasks of the run by (goal, task type) pair.
+    """
     self._context = context
     self._goal = goal
     self._tasks_by_name = tasks_by_name
+    self._producers_by_task_name = producers_by_task_name or {}
+    self._producer_tasks = producer_tasks or {}
 
   @property
   def goal(self):
     return self._goal
 
+  def ordered_tasks(self):
+    """Returns the goal's tasks in installed order.
+
+    Each task is returned as a (goal, task name, task, producers) tuple where producers is the set
+    of (goal, task type) pairs producing the products the task requires.
+    """
+    return [(self._goal, name, task, self._producers_by_task_name.get(name, frozenset()))
+            for name, task in reversed(self._tasks_by_name.items())]
+
+  def workspace_locked(self, name, task):
+    """Returns a context manager holding the workspace locks a task needs while it executes.
+
+    Tasks lock the resources they write, or the whole workspace if they require it, along with the
+    workdirs of the tasks producing the products they require for reading, unless they are
+    installed in a goal that does not serialize.
+    """
+    if not self._goal.serialize:
+      return self._context.lock.locked()
+    read_resources = [self._producer_tasks[producer].workdir
+                      for producer in self._producers_by_task_name.get(name, ())
+                      if producer in self._producer_tasks]
+    return self._context.lock.locked(task.locked_resources(),
+                                     exclusive=task.requires_exclusive_workspace(),
+                                     read_resources=read_resources)
+
   def attempt(self, explain):
     """Attempts to execute the goal's tasks in installed order.
 
@@ -39,7 +76,8 @@ class GoalExecutor(object):
           if explain:
             self._context.log.debug('Skipping execution of %s in explain mode' % name)
           else:
-            task.execute()
+            with self.workspace_locked(name, task):
+              task.execute()
 
       if explain:
         reversed_tasks_by_name = reversed(self._tasks_by_name.items())
@@ -64,7 +102,8 @@ class RoundEngine(Engine):
   class MissingProductError(DependencyError):
     """Indicates an expressed data dependency if not provided by any installed task."""
 
-  GoalInfo = namedtuple('GoalInfo', ['goal', 'tasks_by_name', 'goal_dependencies'])
+  GoalInfo = namedtuple('GoalInfo',
+                        ['goal', 'tasks_by_name', 'goal_dependencies', 'producers_by_task_name'])
 
   def _topological_sort(self, goal_info_by_goal):
     dependees_by_goal = OrderedDict()
@@ -108,6 +147,7 @@ class RoundEngine(Engine):
 
     tasks_by_name = OrderedDict()
     goal_dependencies = set()
+    producers_by_task_name = {}
     visited_task_types = set()
     for task_name in reversed(goal.ordered_task_names()):
       task_type = goal.task_type_by_name(task_name)
@@ -121,6 +161,8 @@ class RoundEngine(Engine):
       task.prepare(round_manager)
       try:
         dependencies = round_manager.get_dependencies()
+        producers_by_task_name[task_name] = frozenset((producer_info.goal, producer_info.task_type)
+                                                      for producer_info in dependencies)
         for producer_info in dependencies:
           producer_goal = producer_info.goal
           if producer_goal == goal:
@@ -147,7 +189,7 @@ class RoundEngine(Engine):
             "Could not satisfy data dependencies for goal '{name}' with action {action}: {error}"
             .format(name=task_name, action=task_type.__name__, error=e))
 
-    goal_info = self.GoalInfo(goal, tasks_by_name, goal_dependencies)
+    goal_info = self.GoalInfo(goal, tasks_by_name, goal_dependencies, producers_by_task_name)
     goal_info_by_goal[goal] = goal_info
 
     for goal_dependency in goal_dependencies:
@@ -161,8 +203,12 @@ class RoundEngine(Engine):
     for goal in reversed(OrderedSet(goals)):
       self._visit_goal(goal, context, goal_info_by_goal)
 
+    producer_tasks = dict(((goal_info.goal, type(task)), task)
+                          for goal_info in goal_info_by_goal.values()
+                          for task in goal_info.tasks_by_name.values())
     for goal_info in reversed(list(self._topological_sort(goal_info_by_goal))):
-      yield GoalExecutor(context, goal_info.goal, goal_info.tasks_by_name)
+      yield GoalExecutor(context, goal_info.goal, goal_info.tasks_by_name,
+                         goal_info.producers_by_task_name, producer_tasks)
 
   def attempt(self, context, goals):
     goal_executors = list(self._prepare(context, goals))
@@ -172,19 +218,31 @@ class RoundEngine(Engine):
     explain = getattr(context.options, 'explain', False)
     if explain:
       print('Goal Execution Order:\n\n%s\n' % execution_goals)
-      print('Goal [TaskRegistrar->Task] Order:\n')
 
-    serialized_goals_executors = [ge for ge in goal_executors if ge.goal.serialize]
-    outer_lock_holder = serialized_goals_executors[-1] if serialized_goals_executors else None
-
-    if outer_lock_holder:
-      context.acquire_lock()
-    try:
+    # Tasks that support concurrent execution are run concurrently with those they don't depend on
+    # when more than 1 worker is configured, otherwise all tasks run serially in goal order.
+    workers = context.config.getint('round-engine', 'workers', default=1)
+    scheduled_tasks = TaskScheduler.schedule(task for goal_executor in goal_executors
+                                             for task in goal_executor.ordered_tasks())
+    if explain:
+      print('Task Schedule:\n')
+      for scheduled_task in scheduled_tasks:
+        print('{task} [{type}]{concurrent}{dependencies}'
+              .format(task=scheduled_task,
+                      type=scheduled_task.task.__class__.__name__,
+                      concurrent=' (concurrent)' if scheduled_task.concurrent else '',
+                      dependencies=' <- {0}'.format(', '.join(str(dependency) for dependency
+                                                              in scheduled_task.dependencies))
+                                   if scheduled_task.dependencies else ''))
+      print('\nGoal [TaskRegistrar->Task] Order:\n')
+
+    if workers > 1 and not explain:
+      goal_executors_by_goal = dict((e.goal, e) for e in goal_executors)
+      capacity = {'worker': workers}
+      capacity.update(context.config.getdict('round-engine', 'resources', default={}))
+      TaskScheduler(context, capacity).execute(
+          scheduled_tasks,
+          locked=lambda st: goal_executors_by_goal[st.goal].workspace_locked(st.name, st.task))
+    else:
       for goal_executor in goal_executors:
         goal_executor.attempt(explain)
-        if goal_executor is outer_lock_holder:
-          context.release_lock()
-          outer_lock_holder = None
-    finally:
-      if outer_lock_holder:
-        context.release_lock()
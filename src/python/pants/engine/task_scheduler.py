@@ -0,0 +1,200 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict
+from contextlib import contextmanager
+import sys
+import threading
+
+from pants.base.workunit import WorkUnit
+
+
+@contextmanager
+def _unlocked():
+  yield
+
+
+class ScheduledTask(object):
+  """A task scheduled for execution along with the scheduled tasks it must execute after."""
+
+  def __init__(self, goal, name, task, dependencies):
+    self.goal = goal
+    self.name = name
+    self.task = task
+    self.dependencies = dependencies
+
+  @property
+  def concurrent(self):
+    return self.task.supports_concurrent_execution()
+
+  def demand(self, capacity):
+    """Returns the resources this task occupies out of the given capacity while executing.
+
+    Demands are capped at capacity so that every task can eventually execute, and resources with no
+    configured capacity are not accounted for.
+    """
+    if not self.concurrent:
+      return dict(capacity)
+    return dict((resource, min(units, capacity[resource]))
+                for resource, units in self.task.execution_resources().items()
+                if resource in capacity)
+
+  def __str__(self):
+    return '{goal}.{name}'.format(goal=self.goal.name, name=self.name)
+
+
+class TaskScheduler(object):
+  """Executes scheduled tasks concurrently as soon as the tasks they depend on have completed."""
+
+  @staticmethod
+  def schedule(ordered_tasks):
+    """Returns a ScheduledTask for each task, preserving order.
+
+    A task supporting concurrent execution depends on the tasks scheduled before it that produce
+    products it requires, and on the closest task before it that does not support concurrent
+    execution.  Any other task depends on every task scheduled before it.
+
+    :param ordered_tasks: An iterable of (goal, task name, task, producers) tuples in serial
+      execution order, where producers is a collection of the (goal, task type) pairs that produce
+      the products the task requires.
+    """
+    scheduled = []
+    fence = None
+    for goal, name, task, producers in ordered_tasks:
+      # Tasks scheduled before the fence are implied dependencies of those depending on the fence.
+      since_fence = scheduled if fence is None else scheduled[scheduled.index(fence) + 1:]
+      if task.supports_concurrent_execution():
+        dependencies = [st for st in since_fence if (st.goal, type(st.task)) in producers]
+        if fence:
+          dependencies.insert(0, fence)
+        scheduled.append(ScheduledTask(goal, name, task, dependencies))
+      else:
+        fence = ScheduledTask(goal, name, task, ([fence] if fence else []) + since_fence)
+        scheduled.append(fence)
+    return scheduled
+
+  def __init__(self, context, capacity):
+    """
+    :param context: The pants run context.
+    :param dict capacity: The units of each resource available to tasks executing concurrently.
+    """
+    self._context = context
+    self._capacity = capacity
+
+  def execute(self, scheduled_tasks, on_complete=None, locked=None):
+    """Executes the scheduled tasks, each under a workunit nested in a workunit for its goal.
+
+    If a task fails no further tasks are started, and the first failure is re-raised once the tasks
+    already executing complete.
+
+    :param scheduled_tasks: The ScheduledTasks to execute.
+    :param on_complete: An optional callable invoked on the calling thread with each ScheduledTask
+      that completes successfully.
+    :param locked: An optional callable returning a context manager to hold on the executing thread
+      while executing the given ScheduledTask; eg: to lock the resources it writes.
+    """
+    run_tracker = self._context.run_tracker
+    parent_workunit = run_tracker.current_workunit()
+
+    condition = threading.Condition()
+    pending = list(scheduled_tasks)
+    running = set()
+    completed = []
+    done = set()
+    failures = []
+    available = dict(self._capacity)
+
+    remaining_by_goal = defaultdict(int)
+    for scheduled_task in scheduled_tasks:
+      remaining_by_goal[scheduled_task.goal] += 1
+    goal_workunits = {}
+    failed_goals = {}
+
+    def open_goal_workunit(goal):
+      if goal not in goal_workunits:
+        workunit_context = run_tracker.new_workunit_under_parent(name=goal.name,
+                                                                 parent=parent_workunit,
+                                                                 labels=[WorkUnit.GOAL])
+        goal_workunits[goal] = (workunit_context, workunit_context.__enter__())
+      return goal_workunits[goal][1]
+
+    def close_goal_workunit(goal):
+      workunit_context, _ = goal_workunits.pop(goal)
+      workunit_context.__exit__(*failed_goals.get(goal, (None, None, None)))
+
+    def execute(scheduled_task, goal_workunit):
+      run_tracker.register_thread(goal_workunit)
+      failure = None
+      try:
+        with self._context.new_workunit(name=scheduled_task.name, labels=[WorkUnit.TASK]):
+          with locked(scheduled_task) if locked else _unlocked():
+            scheduled_task.task.execute()
+      except Exception:
+        failure = sys.exc_info()
+      finally:
+        with condition:
+          running.discard(scheduled_task)
+          for resource, units in scheduled_task.demand(self._capacity).items():
+            available[resource] += units
+          if failure:
+            failures.append((scheduled_task, failure))
+          else:
+            completed.append(scheduled_task)
+          condition.notify()
+
+    def fits(demand):
+      return all(available[resource] >= units for resource, units in demand.items())
+
+    def start_ready_tasks():
+      for scheduled_task in list(pending):
+        if not all(dependency in done for dependency in scheduled_task.dependencies):
+          continue
+        demand = scheduled_task.demand(self._capacity)
+        if not fits(demand):
+          continue
+        for resource, units in demand.items():
+          available[resource] -= units
+        pending.remove(scheduled_task)
+        running.add(scheduled_task)
+        thread = threading.Thread(target=execute,
+                                  args=(scheduled_task, open_goal_workunit(scheduled_task.goal)),
+                                  name=str(scheduled_task))
+        thread.daemon = True
+        thread.start()
+
+    try:
+      with condition:
+        while True:
+          while completed:
+            scheduled_task = completed.pop(0)
+            done.add(scheduled_task)
+            remaining_by_goal[scheduled_task.goal] -= 1
+            if remaining_by_goal[scheduled_task.goal] == 0:
+              close_goal_workunit(scheduled_task.goal)
+            if on_complete:
+              on_complete(scheduled_task)
+          for scheduled_task, failure in failures:
+            failed_goals.setdefault(scheduled_task.goal, failure)
+
+          if not failures and pending:
+            start_ready_tasks()
+          if not running:
+            break
+          # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when
+          # waiting on a condition variable, so we won't be able to ctrl-c out.
+          condition.wait(timeout=1)
+    finally:
+      for goal in list(goal_workunits):
+        close_goal_workunit(goal)
+
+    if failures:
+      # Re-raise the first failure with the traceback from the thread it was raised on.
+      _, (error_type, error, tb) = failures[0]
+      raise error_type, error, tb
+    if pending:
+      raise AssertionError('Could not schedule tasks: {tasks}'
+                           .format(tasks=', '.join(str(st) for st in pending)))
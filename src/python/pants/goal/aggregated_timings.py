@@ -14,7 +14,8 @@ from pants.util.dirutil import safe_mkdir_for
 class AggregatedTimings(object):
   """Aggregates timings over multiple invocations of 'similar' work.
 
-  If filepath is not none, stores the timings in that file. Useful for finding bottlenecks."""
+  If filepath is not none, stores the timings in that file on flush. Useful for finding
+  bottlenecks."""
   def __init__(self, path=None):
     # Map path -> timing in seconds (a float)
     self._timings_by_path = defaultdict(float)
@@ -31,12 +32,23 @@ class AggregatedTimings(object):
     self._timings_by_path[label] += secs
     if is_tool:
       self._tool_labels.add(label)
+
+  def flush(self):
+    """Writes the timings aggregated so far to the file, if any."""
     # Check existence in case we're a clean-all. We don't want to write anything in that case.
     if self._path and os.path.exists(os.path.dirname(self._path)):
       with open(self._path, 'w') as f:
         for x in self.get_all():
           f.write('%(label)s: %(timing)s\n' % x)
 
+  def get_tool_labels(self):
+    """Returns the set of labels that represent tool invocations."""
+    return set(self._tool_labels)
+
+  def get_timings_by_label(self):
+    """Returns a dict of label to aggregated timing in seconds."""
+    return dict(self._timings_by_path)
+
   def get_all(self):
     """Returns all the timings, sorted in decreasing order.
 
@@ -6,24 +6,37 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import os
-from collections import defaultdict, namedtuple
+import threading
+from collections import defaultdict, deque, namedtuple
 
 from pants.util.dirutil import safe_mkdir
 
 
-# Lists of target addresses.
+# Deques of the most recent hit and miss target addresses.
 CacheStat = namedtuple('CacheStat', ['hit_targets', 'miss_targets'])
 
 class ArtifactCacheStats(object):
   """Tracks the hits and misses in the artifact cache.
 
-  If dir is specified, writes the hits and misses to files in that dir."""
-  def __init__(self, dir=None):
+  Counts all hits and misses, but only keeps the target addresses of the most recent `retention`
+  hits and misses of each cache in memory, so that long runs don't grow without bound.  If dir is
+  specified, appends the addresses of all hits and misses to files in that dir, in batches as they
+  accrue and on flush."""
+
+  # The number of addresses to hold in memory before appending them to the files in dir.
+  _BATCH_SIZE = 1000
+
+  def __init__(self, dir=None, retention=None):
     def init_stat():
-      return CacheStat([],[])
+      return CacheStat(deque(maxlen=retention), deque(maxlen=retention))
     self.stats_per_cache = defaultdict(init_stat)
+    self._counts = defaultdict(lambda: [0, 0])  # cache name -> [num_hits, num_misses].
     self._dir = dir
     safe_mkdir(self._dir)
+    self._lock = threading.Lock()
+    # Map of stats file name -> target addresses not yet appended to it.
+    self._pending = defaultdict(list)
+    self._num_pending = 0
 
   def add_hit(self, cache_name, tgt):
     self._add_stat(0, cache_name, tgt)
@@ -32,23 +45,50 @@ class ArtifactCacheStats(object):
     self._add_stat(1, cache_name, tgt)
 
   def get_all(self):
-    """Returns the cache stats as a list of dicts."""
-    ret = []
-    for cache_name, stat in self.stats_per_cache.items():
-      ret.append({
-        'cache_name': cache_name,
-        'num_hits': len(stat.hit_targets),
-        'num_misses': len(stat.miss_targets),
-        'hits': stat.hit_targets,
-        'misses': stat.miss_targets
-      })
-    return ret
+    """Returns the cache stats as a list of dicts.
+
+    The hits and misses lists only hold the most recent addresses, up to the retention limit.
+    """
+    with self._lock:
+      ret = []
+      for cache_name, stat in self.stats_per_cache.items():
+        num_hits, num_misses = self._counts[cache_name]
+        ret.append({
+          'cache_name': cache_name,
+          'num_hits': num_hits,
+          'num_misses': num_misses,
+          'hits': list(stat.hit_targets),
+          'misses': list(stat.miss_targets)
+        })
+      return ret
+
+  def get_counts(self):
+    """Returns a dict of cache name to a [num_hits, num_misses] pair."""
+    with self._lock:
+      return dict((cache_name, list(counts)) for cache_name, counts in self._counts.items())
+
+  def flush(self):
+    """Appends the hits and misses recorded since the last flush to the files in dir, if any."""
+    with self._lock:
+      self._write()
+
+  def _write(self):
+    pending, self._pending = self._pending, defaultdict(list)
+    self._num_pending = 0
+    if self._dir and os.path.exists(self._dir):  # Check existence in case of a clean-all.
+      for name, addresses in pending.items():
+        with open(os.path.join(self._dir, name), 'a') as f:
+          f.write(''.join('%s\n' % address for address in addresses))
 
   # hit_or_miss is the appropriate index in CacheStat, i.e., 0 for hit, 1 for miss.
   def _add_stat(self, hit_or_miss, cache_name, tgt):
-    self.stats_per_cache[cache_name][hit_or_miss].append(tgt.address.reference())
-    if self._dir and os.path.exists(self._dir):  # Check existence in case of a clean-all.
-      suffix = 'misses' if hit_or_miss else 'hits'
-      with open(os.path.join(self._dir, '%s.%s' % (cache_name, suffix)), 'a') as f:
-        f.write(tgt.address.reference())
-        f.write('\n')
+    address = tgt.address.reference()
+    with self._lock:
+      self.stats_per_cache[cache_name][hit_or_miss].append(address)
+      self._counts[cache_name][hit_or_miss] += 1
+      if self._dir:
+        suffix = 'misses' if hit_or_miss else 'hits'
+        self._pending['%s.%s' % (cache_name, suffix)].append(address)
+        self._num_pending += 1
+        if self._num_pending >= self._BATCH_SIZE:
+          self._write()
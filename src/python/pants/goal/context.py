@@ -11,9 +11,6 @@ from collections import defaultdict
 from contextlib import contextmanager
 
 from twitter.common.collections import OrderedSet
-from twitter.common.dirutil import Lock
-from twitter.common.process import ProcessProviderFactory
-from twitter.common.process.process_provider import ProcessProvider
 
 from pants.base.address import SyntheticAddress
 from pants.base.build_environment import get_buildroot, get_scm
@@ -23,6 +20,7 @@ from pants.base.target import Target
 from pants.base.workunit import WorkUnit
 from pants.goal.products import Products
 from pants.goal.workspace import ScmWorkspace
+from pants.goal.workspace_lock import WorkspaceLock
 from pants.java.distribution.distribution import Distribution
 from pants.reporting.report import Report
 
@@ -30,17 +28,6 @@ from pants.reporting.report import Report
 # Override with ivy -> cache_dir
 _IVY_CACHE_DIR_DEFAULT=os.path.expanduser('~/.ivy2/pants')
 
-# Utility definition for grabbing process info for locking.
-def _process_info(pid):
-  try:
-    ps = ProcessProviderFactory.get()
-    ps.collect_set([pid])
-    handle = ps.get_handle(pid)
-    cmdline = handle.cmdline().replace('\0', ' ')
-    return '%d (%s)' % (pid, cmdline)
-  except ProcessProvider.UnknownPidError:
-    return '%d' % pid
-
 
 class Context(object):
   """Contains the context for a single run of pants.
@@ -83,7 +70,7 @@ class Context(object):
     self.build_file_parser = build_file_parser
     self.address_mapper = address_mapper
     self.run_tracker = run_tracker
-    self._lock = lock or Lock.unlocked()
+    self._lock = lock or WorkspaceLock.unlocked()
     self._log = log or Context.Log(run_tracker)
     self._target_base = target_base or Target
     self._products = Products()
@@ -108,7 +95,11 @@ class Context(object):
 
   @property
   def lock(self):
-    """Returns the global pants run lock so a goal can release it if needed."""
+    """Returns the WorkspaceLock tasks use to lock the resources they write.
+
+    Tasks that block for a long time without writing to the workspace, like those running tests or
+    binaries, can release the locks they hold with ``context.lock.release()``.
+    """
     return self._lock
 
   @property
@@ -209,30 +200,15 @@ class Context(object):
     with self.run_tracker.new_workunit(name=name, labels=labels, cmd=cmd) as workunit:
       yield workunit
 
-  def acquire_lock(self):
-    """ Acquire the global lock for the root directory associated with this context. When
-    a goal requires serialization, it will call this to acquire the lock.
-    """
-    def onwait(pid):
-      print('Waiting on pants process %s to complete' % _process_info(pid), file=sys.stderr)
-      return True
-    if self._lock.is_unlocked():
-      runfile = os.path.join(self._buildroot, '.pants.run')
-      self._lock = Lock.acquire(runfile, onwait=onwait)
-
   def release_lock(self):
-    """Release the global lock if it's held.
-    Returns True if the lock was held before this call.
+    """Releases the workspace locks held by the calling thread.
+
+    Returns True if any locks were held before this call.
     """
-    if self._lock.is_unlocked():
-      return False
-    else:
-      self._lock.release()
-      self._lock = Lock.unlocked()
-      return True
+    return self._lock.release()
 
   def is_unlocked(self):
-    """Whether the global lock object is actively holding the lock."""
+    """Whether the calling thread holds no workspace locks."""
     return self._lock.is_unlocked()
 
   def replace_targets(self, target_roots):
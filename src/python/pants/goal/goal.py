@@ -86,7 +86,7 @@ class _Goal(object):
     self.description = None
     self.dependencies = set()  # The Goals this Goal depends on.
     self.serialize = False
-    self._task_type_by_name = {}  # name -> Task subclass.
+    self._task_registrar_by_name = {}  # name -> TaskRegistrar, whose task type loads lazily.
     self._ordered_task_names = []  # The task names, in the order imposed by registration.
 
   def install(self, task_registrar, first=False, replace=False, before=None, after=None):
@@ -104,7 +104,7 @@ class _Goal(object):
       raise GoalError('Can only specify one of first, replace, before or after')
 
     task_name = task_registrar.name
-    self._task_type_by_name[task_name] = task_registrar.task_type
+    self._task_registrar_by_name[task_name] = task_registrar
 
     otn = self._ordered_task_names
     if replace:
@@ -140,8 +140,8 @@ class _Goal(object):
     TODO(benjy): Should it? We're moving away from explicit goal deps towards a
                  product consumption-production model anyway.
     """
-    if name in self._task_type_by_name:
-      del self._task_type_by_name[name]
+    if name in self._task_registrar_by_name:
+      del self._task_registrar_by_name[name]
       self._ordered_task_names = [x for x in self._ordered_task_names if x != name]
     else:
       raise GoalError('Cannot uninstall unknown task: {0}'.format(name))
@@ -152,12 +152,15 @@ class _Goal(object):
     return self._ordered_task_names
 
   def task_type_by_name(self, name):
-    """The task type registered under the given name."""
-    return self._task_type_by_name[name]
+    """The task type registered under the given name.
+
+    Importing the task type is deferred until this is first called for tasks registered by name.
+    """
+    return self._task_registrar_by_name[name].task_type
 
   def task_types(self):
     """Returns the task types in this goal, unordered."""
-    return self._task_type_by_name.values()
+    return [task_registrar.task_type for task_registrar in self._task_registrar_by_name.values()]
 
   def has_task_of_type(self, typ):
     """Returns True if this goal has a task of the given type (or a subtype of it)."""
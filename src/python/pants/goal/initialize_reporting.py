@@ -16,6 +16,7 @@ from pants.reporting.plaintext_reporter import PlainTextReporter
 from pants.reporting.quiet_reporter import QuietReporter
 from pants.reporting.report import Report, ReportingError
 from pants.reporting.reporting_server import ReportingServerManager
+from pants.reporting.trace_event_reporter import TraceEventReporter
 from pants.util.dirutil import safe_mkdir, safe_rmtree
 
 
@@ -55,14 +56,23 @@ def initial_reporting(config, run_tracker):
 
   # Set up HTML reporting. We always want that.
   template_dir = config.get('reporting', 'reports_template_dir')
+  refresh_interval_ms = config.getint('reporting', 'html_refresh_interval_ms', default=500)
   html_reporter_settings = HtmlReporter.Settings(log_level=Report.INFO,
                                                  html_dir=html_dir,
-                                                 template_dir=template_dir)
+                                                 template_dir=template_dir,
+                                                 refresh_interval_ms=refresh_interval_ms)
   html_reporter = HtmlReporter(run_tracker, html_reporter_settings)
   report.add_reporter('html', html_reporter)
 
+  # Also stream the workunit tree as trace events, for viewing in trace viewers.
+  trace_reporter_settings = TraceEventReporter.Settings(log_level=Report.INFO,
+                                                        trace_path=os.path.join(run_dir,
+                                                                                'trace.json'))
+  report.add_reporter('trace', TraceEventReporter(run_tracker, trace_reporter_settings))
+
   # Add some useful RunInfo.
   run_tracker.run_info.add_info('default_report', html_reporter.report_path())
+  run_tracker.run_info.add_info('trace_report', trace_reporter_settings.trace_path)
   port = ReportingServerManager.get_current_server_port()
   if port:
     run_tracker.run_info.add_info('report_url', 'http://localhost:%d/run/%s' % (port, run_id))
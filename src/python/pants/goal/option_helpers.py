@@ -39,9 +39,9 @@ GLOBAL_OPTIONS = [
   Option('--no-colors', dest='no_color', action='store_true', default=False,
          help='Do not colorize log messages.'),
   Option('--no-lock', dest='no_lock', action='store_true', default=False,
-         help="Don't attempt to grab the global lock. This lock prevents two concurrent pants "
-              "instances from stomping on each others data, so only use this if you know what "
-              "you're doing."),
+         help="Don't attempt to lock the workspace. Tasks lock the parts of the workspace they "
+              "write to prevent concurrent pants instances from stomping on each others data, so "
+              "only use this if you know what you're doing."),
   Option('--read-from-artifact-cache', '--no-read-from-artifact-cache', action='callback',
          callback=_set_bool, dest='read_from_artifact_cache', default=True,
          help='Read build artifacts from cache, if available.'),
@@ -49,6 +49,9 @@ GLOBAL_OPTIONS = [
          default=[], action='append',
          help='Regex pattern to exclude from the target list (useful in conjunction with ::). '
               'Multiple patterns may be specified by setting this flag multiple times.'),
+  Option('--changed-since', dest='changed_since', default=None,
+         help='Also target everything owning a file changed since this tree-ish, e.g. HEAD~1. '
+              'Uncommitted and untracked changes are included.'),
   Option('--write-to-artifact-cache', '--no-write-to-artifact-cache', action='callback',
          callback=_set_bool, dest='write_to_artifact_cache', default=True,
          help='Write build artifacts to cache, if possible.'),
@@ -11,18 +11,23 @@ import sys
 import threading
 import time
 import urllib
+from collections import deque
 from contextlib import contextmanager
 from urlparse import urlparse
 
 import httplib
 
 from pants.base.config import Config
+from pants.base.run_index import RunIndex
 from pants.base.run_info import RunInfo
+from pants.base.timing_store import TimingStore
 from pants.base.worker_pool import WorkerPool
 from pants.base.workunit import WorkUnit
 from pants.goal.aggregated_timings import AggregatedTimings
 from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.goal.workunit_log import WorkUnitLog
 from pants.reporting.report import Report
+from pants.reporting.sampling_profiler import SamplingProfiler
 
 
 class RunTracker(object):
@@ -50,6 +55,9 @@ class RunTracker(object):
   # The name of the tracking root for the background worker threads.
   BACKGROUND_ROOT_NAME = 'background'
 
+  # The label the time spent reporting on the run is recorded under, as if it were a root workunit.
+  REPORTING_NAME = 'reporting'
+
   @classmethod
   def from_config(cls, config):
     if not isinstance(config, Config):
@@ -59,17 +67,37 @@ class RunTracker(object):
     stats_upload_timeout = config.getdefault('stats_upload_timeout', default=2)
     num_foreground_workers = config.getdefault('num_foreground_workers', default=8)
     num_background_workers = config.getdefault('num_background_workers', default=8)
+    profiler_interval_ms = config.getdefault('sampling_profiler_interval_ms', type=int, default=0)
+    workunit_retention = config.getdefault('workunit_retention', type=int, default=1000)
+    cache_stats_retention = config.getdefault('artifact_cache_stats_retention', type=int,
+                                              default=100)
     return cls(info_dir,
                stats_upload_url=stats_upload_url,
                num_foreground_workers=num_foreground_workers,
-               num_background_workers=num_background_workers)
+               num_background_workers=num_background_workers,
+               timing_store=TimingStore.from_config(config),
+               profiler_interval_ms=profiler_interval_ms,
+               workunit_retention=workunit_retention,
+               cache_stats_retention=cache_stats_retention)
 
   def __init__(self,
                info_dir,
                stats_upload_url=None,
                stats_upload_timeout=2,
                num_foreground_workers=8,
-               num_background_workers=8):
+               num_background_workers=8,
+               timing_store=None,
+               profiler_interval_ms=0,
+               workunit_retention=None,
+               cache_stats_retention=None):
+    """
+    :param int workunit_retention: The number of ended workunits to keep in memory, most recently
+      ended first, or None to keep them all.  The summaries of all ended workunits are written to
+      the run's info dir regardless.
+    :param int cache_stats_retention: The number of most recent artifact cache hits and misses to
+      keep the targets of in memory, per cache, or None to keep them all.  All are counted, and
+      written to the run's info dir regardless.
+    """
     self.run_timestamp = time.time()  # A double, so we get subsecond precision for ids.
     cmd_line = ' '.join(['./pants'] + sys.argv[1:])
 
@@ -84,6 +112,10 @@ class RunTracker(object):
     self.run_info.add_info('cmd_line', cmd_line)
     self.stats_url = stats_upload_url
     self.stats_timeout = stats_upload_timeout
+    self._cmd_line = cmd_line
+
+    # Records this run's timings alongside those of previous runs, if specified.
+    self._timing_store = timing_store
 
     # Create a 'latest' symlink, after we add_infos, so we're guaranteed that the file exists.
     link_to_latest = os.path.join(os.path.dirname(self.info_dir), 'latest')
@@ -97,9 +129,27 @@ class RunTracker(object):
     # Time spent in a workunit, not including its children.
     self.self_timings = AggregatedTimings(os.path.join(self.info_dir, 'self_timings'))
 
+    # Samples the stacks of all threads, if enabled.  Started on start().
+    self.sampling_profiler = None
+    if profiler_interval_ms:
+      self.sampling_profiler = SamplingProfiler(os.path.join(self.info_dir, 'profile'),
+                                                interval_secs=profiler_interval_ms / 1000,
+                                                workunits_by_thread=self.current_workunits)
+      self.run_info.add_info('profile', self.sampling_profiler.path)
+
     # Hit/miss stats for the artifact cache.
     self.artifact_cache_stats = \
-      ArtifactCacheStats(os.path.join(self.info_dir, 'artifact_cache_stats'))
+      ArtifactCacheStats(os.path.join(self.info_dir, 'artifact_cache_stats'),
+                         retention=cache_stats_retention)
+
+    # Summaries of ended workunits, so we can forget them past the retention limit.
+    self.workunit_log = WorkUnitLog(os.path.join(self.info_dir, 'workunits.jsonl'))
+    self.run_info.add_info('workunits', self.workunit_log.path)
+    self._workunit_retention = workunit_retention
+    self._ended_workunits = deque()  # Least recently ended first.
+    # Guards the ended workunits and the children of all workunits.  Reentrant, as forgetting a
+    # child under it locks it again.
+    self.workunits_lock = threading.RLock()
 
     # Number of threads for foreground work.
     self._num_foreground_workers = num_foreground_workers
@@ -114,6 +164,11 @@ class RunTracker(object):
     # Note that multiple threads may share a name (e.g., all the threads in a pool).
     self._threadlocal = threading.local()
 
+    # The thread and its current workunit, by thread ident, for the sampling profiler to observe
+    # threads from its own.  Only maintained when profiling.
+    self._workunits_by_thread = {}
+    self._workunits_by_thread_lock = threading.Lock()
+
     # For main thread work. Created on start().
     self._main_root_workunit = None
 
@@ -132,7 +187,30 @@ class RunTracker(object):
 
     Multiple threads may have the same parent (e.g., all the threads in a pool).
     """
-    self._threadlocal.current_workunit = parent_workunit
+    self._set_current_workunit(parent_workunit)
+
+  def current_workunit(self):
+    """Returns the workunit any new work in the calling thread is parented under."""
+    return self._threadlocal.current_workunit
+
+  def current_workunits(self):
+    """Returns a dict of thread ident to the workunit that thread's work is parented under.
+
+    Only tracked when profiling; forgets threads that have exited.
+    """
+    with self._workunits_by_thread_lock:
+      for ident, (thread, _) in self._workunits_by_thread.items():
+        if not thread.is_alive():
+          del self._workunits_by_thread[ident]
+      return dict((ident, workunit)
+                  for ident, (_, workunit) in self._workunits_by_thread.items())
+
+  def _set_current_workunit(self, workunit):
+    self._threadlocal.current_workunit = workunit
+    if self.sampling_profiler:
+      thread = threading.current_thread()
+      with self._workunits_by_thread_lock:
+        self._workunits_by_thread[thread.ident] = (thread, workunit)
 
   def is_under_main_root(self, workunit):
     """Is the workunit running under the main thread's root."""
@@ -150,6 +228,8 @@ class RunTracker(object):
     self.register_thread(self._main_root_workunit)
     self._main_root_workunit.start()
     self.report.start_workunit(self._main_root_workunit)
+    if self.sampling_profiler:
+      self.sampling_profiler.start()
 
   def set_root_outcome(self, outcome):
     """Useful for setup code that doesn't have a reference to a workunit."""
@@ -177,11 +257,11 @@ class RunTracker(object):
     """
     parent = self._threadlocal.current_workunit
     with self.new_workunit_under_parent(name, parent=parent, labels=labels, cmd=cmd) as workunit:
-      self._threadlocal.current_workunit = workunit
+      self._set_current_workunit(workunit)
       try:
         yield workunit
       finally:
-        self._threadlocal.current_workunit = parent
+        self._set_current_workunit(parent)
 
   @contextmanager
   def new_workunit_under_parent(self, name, parent, labels=None, cmd=''):
@@ -213,6 +293,22 @@ class RunTracker(object):
     finally:
       self.report.end_workunit(workunit)
       workunit.end()
+      self._retire(workunit)
+
+  def _retire(self, workunit):
+    """Spills an ended workunit to disk, and forgets ended workunits past the retention limit.
+
+    Children always end before their parents, so forgetting ended workunits in the order they ended
+    forgets whole subtrees.
+    """
+    self.workunit_log.append(workunit)
+    if self._workunit_retention is None or workunit.parent is None:
+      return
+    with self.workunits_lock:
+      self._ended_workunits.append(workunit)
+      while len(self._ended_workunits) > self._workunit_retention:
+        forgotten = self._ended_workunits.popleft()
+        forgotten.parent.forget_child(forgotten)
 
   def log(self, level, *msg_elements):
     """Log a message against the current workunit."""
@@ -260,6 +356,7 @@ class RunTracker(object):
         self._background_worker_pool.shutdown()
       self.report.end_workunit(self._background_root_workunit)
       self._background_root_workunit.end()
+      self._retire(self._background_root_workunit)
 
     if self._foreground_worker_pool:
       if self._aborted:
@@ -271,6 +368,7 @@ class RunTracker(object):
 
     self.report.end_workunit(self._main_root_workunit)
     self._main_root_workunit.end()
+    self._retire(self._main_root_workunit)
 
     outcome = self._main_root_workunit.outcome()
     if self._background_root_workunit:
@@ -286,9 +384,50 @@ class RunTracker(object):
       except IOError:
         pass  # If the goal is clean-all then the run info dir no longer exists...
 
+    # Index the run's final info, so that listing runs need not read every run's info file.
+    if os.path.exists(self.info_dir):
+      run_index = RunIndex.for_info_dir(os.path.dirname(self.info_dir))
+      try:
+        run_index.append(self.run_info.get_as_dict())
+      except (IOError, OSError) as e:
+        print('WARNING: Failed to index run info in %s due to %s' % (run_index.path, e),
+              file=sys.stderr)
+
+    if self.sampling_profiler:
+      self.sampling_profiler.stop()
+
     self.report.close()
+    reporting_secs = self.report.overhead_secs()
+    self.cumulative_timings.add_timing(RunTracker.REPORTING_NAME, reporting_secs)
+    self.self_timings.add_timing(RunTracker.REPORTING_NAME, reporting_secs)
+    self.store_stats(outcome_str)
     self.upload_stats()
 
+  def store_stats(self, outcome_str):
+    """Writes out the timings and cache stats aggregated over this run."""
+    self.cumulative_timings.flush()
+    self.self_timings.flush()
+    self.artifact_cache_stats.flush()
+    self.workunit_log.flush()
+    if self.sampling_profiler:
+      self.sampling_profiler.flush()
+
+    if self._timing_store:
+      try:
+        self._timing_store.append({
+          'id': self.run_info.get_info('id'),
+          'timestamp': self.run_timestamp,
+          'cmd_line': self._cmd_line,
+          'outcome': outcome_str,
+          'cumulative': self.cumulative_timings.get_timings_by_label(),
+          'self': self.self_timings.get_timings_by_label(),
+          'tools': sorted(self.cumulative_timings.get_tool_labels()),
+          'cache': self.artifact_cache_stats.get_counts(),
+        })
+      except (IOError, OSError) as e:
+        print('WARNING: Failed to store stats to %s due to %s' % (self._timing_store.path, e),
+              file=sys.stderr)
+
   def foreground_worker_pool(self):
     if self._foreground_worker_pool is None:  # Initialize lazily.
       self._foreground_worker_pool = WorkerPool(parent_workunit=self._main_root_workunit,
@@ -8,16 +8,22 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
 import functools
 import inspect
 
+from twitter.common.lang import Compatibility
+
 from pants.goal.error import GoalError
 from pants.goal.goal import Goal
 from pants.backend.core.tasks.task import Task
+from pants.util.importutil import load_symbol
 
 
 class TaskRegistrar(object):
   def __init__(self, name, action, dependencies=None, serialize=True):
     """
     :param name: the name of the goal.
-    :param action: the goal action object to invoke this goal.
+    :param action: the goal action object to invoke this goal; either a Task subclass, a function
+      accepting no args or else a single Context object, or a '[package.]module:symbol' string naming
+      either.  A named action is not imported until its task type is needed, so backends can
+      register goals without paying to import the code implementing them.
     :param dependencies: the names of other goals which must be achieved before invoking this goal.
     :param serialize: a flag indicating whether or not the action to achieve this goal requires
       the global lock. If true, the action will block until it can acquire the lock.
@@ -26,37 +32,54 @@ class TaskRegistrar(object):
     self.name = name
     self.dependencies = [Goal.by_name(d) for d in dependencies] if dependencies else []
 
-    if isinstance(type(action), type) and issubclass(action, Task):
-      self._task = action
+    if isinstance(action, Compatibility.string):
+      self._action = action
+      self._task = None
     else:
-      args, varargs, keywords, defaults = inspect.getargspec(action)
-      if varargs or keywords or defaults:
-        raise GoalError('Invalid action supplied, cannot accept varargs, keywords or defaults')
-      if len(args) > 1:
-        raise GoalError('Invalid action supplied, must accept either no args or else a single '
-                        'Context object')
+      self._action = None
+      self._task = self._task_type_for(action)
+
+  @staticmethod
+  def _task_type_for(action):
+    if isinstance(type(action), type) and issubclass(action, Task):
+      return action
+
+    args, varargs, keywords, defaults = inspect.getargspec(action)
+    if varargs or keywords or defaults:
+      raise GoalError('Invalid action supplied, cannot accept varargs, keywords or defaults')
+    if len(args) > 1:
+      raise GoalError('Invalid action supplied, must accept either no args or else a single '
+                      'Context object')
 
-      class FuncTask(Task):
-        def __init__(self, *args, **kwargs):
-          super(FuncTask, self).__init__(*args, **kwargs)
+    class FuncTask(Task):
+      def __init__(self, *args, **kwargs):
+        super(FuncTask, self).__init__(*args, **kwargs)
 
-          if not args:
-            self.action = action
-          elif len(args) == 1:
-            self.action = functools.partial(action, self.context)
-          else:
-            raise AssertionError('Unexpected fallthrough')
+        if not args:
+          self.action = action
+        elif len(args) == 1:
+          self.action = functools.partial(action, self.context)
+        else:
+          raise AssertionError('Unexpected fallthrough')
 
-        def execute(self):
-          self.action()
+      def execute(self):
+        self.action()
 
-      self._task = FuncTask
+    return FuncTask
 
   def __repr__(self):
     return "TaskRegistrar(%s; %s)" % (self.name, ','.join(map(str, self.dependencies)))
 
   @property
   def task_type(self):
+    """The Task subclass implementing this task, importing it first if it was registered by name."""
+    if self._task is None:
+      try:
+        action = load_symbol(self._action)
+      except (ImportError, ValueError) as e:
+        raise GoalError('Failed to load the action for task {name} from {action}: {error}'
+                        .format(name=self.name, action=self._action, error=e))
+      self._task = self._task_type_for(action)
     return self._task
 
   def install(self, goal=None, first=False, replace=False, before=None, after=None):
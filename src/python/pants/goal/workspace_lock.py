@@ -0,0 +1,186 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import errno
+import fcntl
+from hashlib import sha1
+import os
+import threading
+
+from pants.util.dirutil import safe_mkdir_for
+
+
+class WorkspaceLock(object):
+  """Co-operative inter-process locks over the parts of a workspace that pants runs write to.
+
+  Instead of one lock serializing whole pants runs, tasks lock just the resources - directories -
+  they write while they execute, so that runs writing disjoint resources, and runs writing none at
+  all, proceed concurrently.  Tasks lock the resources they read shared, so that other runs can
+  read them too but can't rewrite them out from under the reading task.  A run holds the run lock
+  shared from `lock_run` until it releases, so that runs needing the whole workspace to themselves,
+  like a clean, which hold the run lock exclusively, can never interleave with the tasks of an
+  in-flight run.
+
+  Resource locks are held per-thread so that tasks executing concurrently within a run each hold
+  and release their own.
+  """
+
+  @classmethod
+  def unlocked(cls):
+    """Returns a WorkspaceLock that never locks anything."""
+    return cls(runfile=None, lock_dir=None)
+
+  def __init__(self, runfile, lock_dir, onwait=None):
+    """
+    :param string runfile: The path of the lock file for the whole workspace.  This is the same file
+      legacy commands lock exclusively for the duration of their run.
+    :param string lock_dir: The directory to hold the lock files for individual resources in.
+    :param onwait: An optional callable accepting the pid of a lock holder that is called before
+      blocking to wait for the holder to release its lock.
+    """
+    self._runfile = runfile
+    self._lock_dir = lock_dir
+    self._onwait = onwait
+    self._local = threading.local()
+    self._run_lock = threading.RLock()
+    self._run_lock_file = None
+    self._run_locked = False
+    self._exclusive_count = 0
+
+  def _held(self):
+    if not hasattr(self._local, 'held'):
+      self._local.held = OrderedDict()  # lock file path -> locked file object
+    return self._local.held
+
+  def lock_run(self):
+    """Holds the run lock shared for the run, until `release` is called.
+
+    This keeps other runs from locking the whole workspace between the tasks of this run.
+    """
+    with self._run_lock:
+      if self._runfile and not self._run_locked:
+        self._run_locked = True
+        if not self._exclusive_count:
+          self._run_lock_file = self._acquire(self._runfile, shared=True)
+
+  @contextmanager
+  def locked(self, resources=(), exclusive=False, read_resources=()):
+    """Holds locks on the given resources for the calling thread while the context is active.
+
+    Locks the calling thread already holds are neither re-acquired nor released on exit.  Locking
+    no resources non-exclusively locks nothing.
+
+    :param resources: The paths of the resources to lock for writing.
+    :param bool exclusive: ``True`` to lock the whole workspace, excluding all other pants runs.
+    :param read_resources: The paths of the resources to lock for reading.  These are locked shared,
+      keeping other runs from locking them for writing, unless they are also to be written.
+    """
+    acquired = []
+    excluding = False
+    try:
+      if self._runfile and (resources or read_resources or exclusive):
+        held = self._held()
+        if exclusive and self._runfile not in held:
+          # Our own shared hold on the run lock would keep us from ever locking it exclusively, so
+          # it is let go until the last of this run's exclusive locks is released.
+          self._begin_exclusive()
+          excluding = True
+        write_lock_files = set(self._lock_file(resource) for resource in resources)
+        read_lock_files = set(self._lock_file(resource) for resource in read_resources)
+        shared = read_lock_files - write_lock_files
+        if not exclusive:
+          shared.add(self._runfile)
+        # All locks are acquired in the same order, so runs locking overlapping resources can't each
+        # hold a lock the other is waiting on.
+        lock_files = sorted(write_lock_files | read_lock_files)
+        for path in [self._runfile] + lock_files:
+          if path not in held:
+            held[path] = self._acquire(path, shared=(path in shared))
+            acquired.append(path)
+      yield
+    finally:
+      for path in reversed(acquired):
+        self._release(self._held().pop(path, None))
+      if excluding:
+        self._end_exclusive()
+
+  def _begin_exclusive(self):
+    with self._run_lock:
+      self._exclusive_count += 1
+      if self._exclusive_count == 1:
+        self._release(self._run_lock_file)
+        self._run_lock_file = None
+
+  def _end_exclusive(self):
+    with self._run_lock:
+      self._exclusive_count -= 1
+      if self._exclusive_count == 0 and self._run_locked:
+        self._run_lock_file = self._acquire(self._runfile, shared=True)
+
+  def release(self):
+    """Releases all the locks held by the calling thread, and the run lock.
+
+    Returns ``True`` if any locks were held.
+    """
+    with self._run_lock:
+      was_locked = self._run_locked
+      self._run_locked = False
+      self._release(self._run_lock_file)
+      self._run_lock_file = None
+    held = self._held()
+    was_locked = was_locked or bool(held)
+    while held:
+      _, lock_file = held.popitem()
+      self._release(lock_file)
+    return was_locked
+
+  def is_unlocked(self):
+    """Returns ``True`` if neither the calling thread nor the run holds any locks."""
+    return not self._held() and not self._run_locked
+
+  def _lock_file(self, resource):
+    path = os.path.realpath(resource)
+    name = '{0}-{1}.lock'.format(os.path.basename(path), sha1(path.encode('utf-8')).hexdigest())
+    return os.path.join(self._lock_dir, name)
+
+  def _acquire(self, path, shared):
+    safe_mkdir_for(path)
+    lock_file = os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT), 'r+')
+    operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    try:
+      fcntl.flock(lock_file, operation | fcntl.LOCK_NB)
+    except IOError as e:
+      if e.errno not in (errno.EAGAIN, errno.EACCES):
+        lock_file.close()
+        raise
+      holder = self._holder(lock_file)
+      if self._onwait and holder:
+        self._onwait(holder)
+      fcntl.flock(lock_file, operation)
+
+    # Shared holders overwrite each other's pids in place, so we always write a fixed width record
+    # to ensure a reader never sees a mix.
+    lock_file.seek(0)
+    lock_file.write('{0:>10}\n'.format(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+  def _holder(self, lock_file):
+    lock_file.seek(0)
+    try:
+      return int(lock_file.read().strip())
+    except ValueError:
+      return None
+
+  def _release(self, lock_file):
+    if lock_file:
+      try:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+      finally:
+        lock_file.close()
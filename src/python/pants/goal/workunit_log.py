@@ -0,0 +1,85 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import json
+import os
+import threading
+
+from pants.base.workunit import WorkUnit
+from pants.util.dirutil import safe_mkdir_for
+
+
+class WorkUnitLog(object):
+  """Spills summaries of ended workunits to a file, one json record per line.
+
+  This keeps the detail of the whole workunit tree of a run on disk, so that the RunTracker need
+  only keep a bounded number of ended workunits in memory.  Records are appended to the file in
+  batches, and on flush.
+  """
+
+  @staticmethod
+  def load(path):
+    """Returns the workunit summaries in the given file, in the order the workunits ended."""
+    summaries = []
+    with open(path, 'r') as fp:
+      for line in fp:
+        try:
+          summaries.append(json.loads(line))
+        except ValueError:
+          pass  # A partially written record from an interrupted run.
+    return summaries
+
+  @staticmethod
+  def summarize(workunit):
+    """Returns a json-serializable summary of the given ended workunit."""
+    return {
+      'id': str(workunit.id),
+      'parent': str(workunit.parent.id) if workunit.parent else None,
+      'name': workunit.name,
+      'path': workunit.path(),
+      'labels': sorted(workunit.labels),
+      'cmd': workunit.cmd,
+      'start_time': workunit.start_time,
+      'end_time': workunit.end_time,
+      'outcome': WorkUnit.outcome_string(workunit.outcome()),
+      'outputs': workunit.output_paths(),
+    }
+
+  def __init__(self, path, batch_size=100):
+    """
+    :param string path: The file to append summaries to.
+    :param int batch_size: The number of summaries to hold in memory before appending them.
+    """
+    self._path = path
+    self._batch_size = batch_size
+    self._lock = threading.Lock()
+    self._pending = []
+    safe_mkdir_for(self._path)
+
+  @property
+  def path(self):
+    return self._path
+
+  def append(self, workunit):
+    """Records the summary of the given ended workunit."""
+    summary = self.summarize(workunit)
+    with self._lock:
+      self._pending.append(summary)
+      if len(self._pending) >= self._batch_size:
+        self._write()
+
+  def flush(self):
+    """Appends the summaries recorded since the last write to the file."""
+    with self._lock:
+      self._write()
+
+  def _write(self):
+    pending, self._pending = self._pending, []
+    # Check existence in case we're a clean-all. We don't want to write anything in that case.
+    if pending and os.path.exists(os.path.dirname(self._path)):
+      with open(self._path, 'a') as fp:
+        fp.write(''.join(json.dumps(summary, sort_keys=True) + '\n' for summary in pending))
@@ -0,0 +1,147 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from contextlib import closing
+import json
+import os
+import threading
+from zipfile import ZipFile
+
+from pex.compatibility import to_bytes
+
+from pants.util.dirutil import safe_mkdir_for
+
+
+class JarEntryIndex(object):
+  """A persistent index of the entry names of jar files.
+
+  Jars are indexed by path and validated against their stat signature - inode, mtime and size - so
+  a jar is only opened to list its entries when it is new or has changed.  Entry names are interned:
+  each distinct name is stored once and jars refer to their entries by integer id, so questions
+  spanning the entries of many jars can be answered with set operations over ids.  Jars that no
+  longer exist are forgotten, along with any names only they held, when the index is loaded.
+  """
+
+  # Bump this whenever the shape of the index changes.
+  VERSION = 1
+
+  _instances = {}
+  _instances_lock = threading.Lock()
+
+  @classmethod
+  def from_config(cls, config):
+    """Returns the index shared by all the jar consumers of the pants workdir in config."""
+    path = os.path.join(config.getdefault('pants_workdir'), 'jar_entry_index.json')
+    with cls._instances_lock:
+      index = cls._instances.get(path)
+      if index is None:
+        index = cls._instances[path] = cls(path)
+      return index
+
+  def __init__(self, path):
+    """
+    :param string path: The file the index is persisted to.
+    """
+    self._path = path
+    self._lock = threading.RLock()
+    self._dirty = False
+    self._names, self._jars = self._load()
+    self._ids = dict((name, entry_id) for entry_id, name in enumerate(self._names))
+    self._entry_sets = {}
+
+  def _load(self):
+    try:
+      with open(self._path, 'r') as fp:
+        index = json.load(fp)
+      if index.get('version') == self.VERSION:
+        jars = dict((path, record) for path, record in index['jars'].items()
+                    if os.path.exists(path))
+        if len(jars) < len(index['jars']):
+          self._dirty = True
+          return self._compact(index['names'], jars)
+        return index['names'], jars
+    except (IOError, ValueError, KeyError, AttributeError):
+      pass
+    return [], {}
+
+  @staticmethod
+  def _compact(names, jars):
+    """Drops the names no indexed jar refers to anymore, renumbering the ids of the rest."""
+    live = set()
+    for record in jars.values():
+      live.update(record['entries'])
+
+    renumbered = {}
+    compacted = []
+    for entry_id in sorted(live):
+      renumbered[entry_id] = len(compacted)
+      compacted.append(names[entry_id])
+    for record in jars.values():
+      record['entries'] = [renumbered[entry_id] for entry_id in record['entries']]
+    return compacted, jars
+
+  def save(self):
+    """Persists the index if it changed since it was loaded."""
+    with self._lock:
+      if not self._dirty:
+        return
+      safe_mkdir_for(self._path)
+      tmp_path = '%s.%d.tmp' % (self._path, os.getpid())
+      with open(tmp_path, 'w') as fp:
+        json.dump({'version': self.VERSION, 'names': self._names, 'jars': self._jars}, fp)
+      os.rename(tmp_path, self._path)
+      self._dirty = False
+
+  @staticmethod
+  def _signature(path):
+    stat = os.stat(path)
+    return [stat.st_ino, stat.st_mtime, stat.st_size]
+
+  def entry_ids(self, path):
+    """Returns the frozenset of interned ids of all the entry names in the jar at path.
+
+    :raises: ``IOError`` or ``OSError`` if the jar can't be read and ``zipfile.BadZipfile`` if it
+      is not a valid jar.
+    """
+    path = os.path.realpath(path)
+    signature = self._signature(path)
+    with self._lock:
+      record = self._jars.get(path)
+      if record is None or record['signature'] != signature:
+        record = self._jars[path] = dict(signature=signature,
+                                         entries=[self._intern(name) for name in self._list(path)])
+        self._entry_sets.pop(path, None)
+        self._dirty = True
+
+      entry_set = self._entry_sets.get(path)
+      if entry_set is None:
+        entry_set = self._entry_sets[path] = frozenset(record['entries'])
+      return entry_set
+
+  def entry_id(self, name):
+    """Returns the interned id of the given entry name or ``None`` if no indexed jar has it."""
+    return self._ids.get(name)
+
+  def name(self, entry_id):
+    """Returns the entry name with the given interned id."""
+    return self._names[entry_id]
+
+  def _intern(self, name):
+    entry_id = self._ids.get(name)
+    if entry_id is None:
+      entry_id = self._ids[name] = len(self._names)
+      self._names.append(name)
+    return entry_id
+
+  @staticmethod
+  def _list(path):
+    with closing(ZipFile(path)) as jar:
+      # Zip entry names can come in any encoding and in practice we find some jars that have utf-8
+      # encoded entry names, some not.  As a result we cannot simply decode in all cases and need
+      # to do this to_bytes(...).decode('utf-8') dance to stay safe across all entry name flavors
+      # and under all supported pythons.
+      return [to_bytes(name).decode('utf-8') for name in jar.namelist()]
@@ -8,6 +8,7 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
 import hashlib
 import os
 import re
+import threading
 import time
 
 from collections import namedtuple
@@ -51,6 +52,16 @@ class NailgunExecutor(Executor):
 
   _PANTS_FINGERPRINT_ARG_PREFIX = b'-Dpants.nailgun.fingerprint='
 
+  # Guards finding, killing and spawning the nailgun server for each workdir, since executors for
+  # the same workdir may be used from several threads at once.
+  _spawn_locks = {}
+  _spawn_locks_lock = threading.Lock()
+
+  @classmethod
+  def _spawn_lock(cls, workdir):
+    with cls._spawn_locks_lock:
+      return cls._spawn_locks.setdefault(workdir, threading.Lock())
+
   @staticmethod
   def _check_pid(pid):
     try:
@@ -197,7 +208,23 @@ class NailgunExecutor(Executor):
       log.debug('Found ng server launched with %s fingerprint %s @ pid:%d port:%d' % endpoint)
     return endpoint
 
+  def start(self, classpath, jvm_options=None):
+    """Ensures a nailgun server is up for the given classpath and jvm options.
+
+    Callers about to run java through this executor from several threads should call this first,
+    so that any server spawn happens once, on the calling thread.
+    """
+    try:
+      self._get_nailgun_client(jvm_options or [], classpath, None, None)
+    except NailgunClient.NailgunError as e:
+      self.kill()
+      raise self.Error('Problem starting ng server for %s: %s' % (' '.join(classpath), e))
+
   def _get_nailgun_client(self, jvm_args, classpath, stdout, stderr):
+    with self._spawn_lock(self._workdir):
+      return self._get_or_spawn_nailgun_client(jvm_args, classpath, stdout, stderr)
+
+  def _get_or_spawn_nailgun_client(self, jvm_args, classpath, stdout, stderr):
     classpath = self._nailgun_classpath + classpath
     new_fingerprint = self._fingerprint(jvm_args, classpath)
 
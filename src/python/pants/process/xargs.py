@@ -6,7 +6,51 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import errno
+import os
+import struct
 import subprocess
+import sys
+import threading
+from multiprocessing.pool import ThreadPool
+
+
+# The POSIX guaranteed minimum for ARG_MAX, used if the system won't tell us the real limit.
+_POSIX_ARG_MAX = 4096
+
+# Like xargs, leave some headroom for the loader and anything we fail to account for.
+_ARG_MAX_HEADROOM = 2048
+
+_POINTER_SIZE = struct.calcsize(b'P')
+
+
+def _arg_size(arg):
+  """Returns the number of bytes `arg` occupies in a new process' argument block."""
+  if isinstance(arg, unicode):
+    arg = arg.encode('utf-8')
+  return len(arg) + 1 + _POINTER_SIZE
+
+
+def args_size(args):
+  """Returns the number of bytes the given arguments occupy in a new process' argument block."""
+  return sum(_arg_size(arg) for arg in args)
+
+
+def arg_max(environ=None):
+  """Returns the number of bytes available for command line arguments in a new process.
+
+  This is the system `ARG_MAX` less the space taken by the environment the process will inherit.
+
+  :param dict environ: The environment the new process will see; `os.environ` by default.
+  """
+  try:
+    limit = os.sysconf(b'SC_ARG_MAX')
+  except (AttributeError, OSError, ValueError):
+    limit = -1
+  if limit <= 0:
+    limit = _POSIX_ARG_MAX
+  environ = os.environ if environ is None else environ
+  env_size = sum(_arg_size(key) + _arg_size(value) for key, value in environ.items())
+  return max(limit - env_size - _ARG_MAX_HEADROOM, 0)
 
 
 class Xargs(object):
@@ -15,43 +59,145 @@ class Xargs(object):
   Specifically allows encapsulated commands to be passed very large argument lists by chunking up
   the argument lists into a minimal set and then invoking the encapsulated command against each
   chunk in turn.
+
+  Arguments are packed into chunks up front against the system argument size limit, so the
+  common case never pays for a failed exec.  Should a chunk still be rejected as too big, it is
+  split in half and retried.  When configured with more than one worker, chunks are executed
+  concurrently.
   """
 
   @classmethod
-  def subprocess(cls, cmd, **kwargs):
+  def subprocess(cls, cmd, workers=1, **kwargs):
     """Creates an xargs engine that uses subprocess.call to execute the given cmd array with extra
     arg chunks.
+
+    When running with more than one worker, the output of each chunk is captured and emitted to
+    stdout in chunk order rather than interleaved.
     """
-    def call(args):
-      return subprocess.call(cmd + args, **kwargs)
-    return cls(call)
+    if workers <= 1:
+      def call(args):
+        return subprocess.call(cmd + args, **kwargs)
+    else:
+      def call(args):
+        process = subprocess.Popen(cmd + args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   **kwargs)
+        output, _ = process.communicate()
+        return process.returncode, output
+    return cls(call, workers=workers, reserved_size=args_size(cmd))
 
-  def __init__(self, cmd):
+  def __init__(self, cmd, workers=1, reserved_size=0, max_size=None):
     """Creates an xargs engine that calls cmd with argument chunks.
 
     :param cmd: A function that can execute a command line in the form of a list of strings
-      passed as its sole argument.
+      passed as its sole argument.  It should return the command's exit code or else a tuple of
+      the exit code and the command's output; output is written to stdout in chunk order.
+    :param int workers: The maximum number of chunks to execute concurrently.  Arguments are
+      spread over at least this many chunks when there are enough of them.
+    :param int reserved_size: The number of bytes of argument space cmd reserves for its own
+      fixed arguments.
+    :param int max_size: The number of bytes of argument space available to each chunk; the
+      system limit by default.
     """
     self._cmd = cmd
+    self._workers = max(1, workers)
+    self._reserved_size = reserved_size
+    self._max_size = max_size
+
+  def pack(self, args):
+    """Packs args into an ordered list of chunks that each fit within the argument size limit.
+
+    :param list args: The arguments to pack.
+    """
+    all_args = list(args)
+    if not all_args:
+      return [all_args]
+
+    max_size = arg_max() if self._max_size is None else self._max_size
+    budget = max(max_size - self._reserved_size, 1)
+    # Spread the args evenly enough that every worker gets a chunk.
+    max_count = -(-len(all_args) // self._workers)
+
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for arg in all_args:
+      size = _arg_size(arg)
+      if chunk and (chunk_size + size > budget or len(chunk) >= max_count):
+        chunks.append(chunk)
+        chunk = []
+        chunk_size = 0
+      chunk.append(arg)
+      chunk_size += size
+    chunks.append(chunk)
+    return chunks
 
   def _split_args(self, args):
     half = len(args) // 2
     return args[:half], args[half:]
 
+  def _call(self, args):
+    result = self._cmd(args)
+    if isinstance(result, tuple):
+      return result
+    return result, None
+
+  def _execute_chunk(self, args):
+    try:
+      return self._call(args)
+    except OSError as e:
+      if errno.E2BIG == e.errno and len(args) > 1:
+        args1, args2 = self._split_args(args)
+        result, output1 = self._execute_chunk(args1)
+        if result != 0:
+          return result, output1
+        result, output2 = self._execute_chunk(args2)
+        return result, b''.join(filter(None, (output1, output2))) or None
+      else:
+        raise e
+
+  def _emit(self, output):
+    if output:
+      sys.stdout.write(output)
+      sys.stdout.flush()
+
   def execute(self, args):
     """Executes the configured cmd passing args in one or more rounds xargs style.
 
+    Returns the exit code of the first chunk, in chunk order, that exited non-zero or else 0.
+    Once a chunk fails no new chunks are started.
+
     :param list args: Extra arguments to pass to cmd.
     """
-    all_args = list(args)
+    chunks = self.pack(args)
+    if self._workers == 1 or len(chunks) == 1:
+      for chunk in chunks:
+        result, output = self._execute_chunk(chunk)
+        self._emit(output)
+        if result != 0:
+          return result
+      return 0
+
+    failed = threading.Event()
+
+    def execute_chunk(chunk):
+      if failed.is_set():
+        return None
+      result, output = self._execute_chunk(chunk)
+      if result != 0:
+        failed.set()
+      return result, output
+
+    pool = ThreadPool(processes=min(self._workers, len(chunks)))
     try:
-      return self._cmd(all_args)
-    except OSError as e:
-      if errno.E2BIG == e.errno:
-        args1, args2 = self._split_args(all_args)
-        result = self.execute(args1)
+      # imap hands results back in chunk order regardless of completion order.
+      for outcome in pool.imap(execute_chunk, chunks):
+        if outcome is None:
+          continue
+        result, output = outcome
+        self._emit(output)
         if result != 0:
           return result
-        return self.execute(args2)
-      else:
-        raise e
+      return 0
+    finally:
+      pool.close()
+      pool.join()
@@ -72,7 +72,8 @@ pants = {
     }
   },
 
-  // Creates an object that knows how to poll multiple files by periodically hitting the server.
+  // Creates an object that knows how to poll multiple files by long-polling the server: the server
+  // holds each request until one of the files has new content, so idle files cost no requests.
   // Each polled file is associated with an id, so we can multiplex multiple pollings on
   // on a single server request.
   createPoller: function() {
@@ -87,6 +88,9 @@ pants = {
     // Only allow one request in-flight at a time.
     var inFlight = false;
 
+    // The in-flight request, so we can abort it when there's a new file to poll.
+    var currentRequest = undefined;
+
     function pollOnce() {
       function forgetId(id) {
         delete polledFileStates[id];
@@ -99,26 +103,29 @@ pants = {
       }
 
       function createRequestEntry(state, id) {
-        return { id: id, path: state.path, pos: state.pos };
+        return { id: id, path: state.path, pos: state.pos, version: state.version };
       }
 
       if (!inFlight) {
         inFlight = true;
-        $.ajax({
+        currentRequest = $.ajax({
           url: '/poll',
           type: 'GET',
-          data: { q: JSON.stringify($.map(polledFileStates, createRequestEntry))},
+          // Have the server wait for new content for up to this many seconds.
+          data: { q: JSON.stringify($.map(polledFileStates, createRequestEntry)), wait: 25 },
           dataType: 'json',
           success: function(data, textStatus, jqXHR) {
             function appendNewData() {
-              $.each(data, function(id, val) {
+              $.each(data, function(id, result) {
                 if (id in polledFileStates) {
                   var state = polledFileStates[id];
+                  var val = result.content;
                   // Execute the initFunc exactly once.
                   if (!state.hasBeenPolledAtLeastOnce) {
                     if (state.initFunc) { state.initFunc(); }
                     state.hasBeenPolledAtLeastOnce = true;
                   }
+                  // If we don't take the new content now, we'll be sent it again next time.
                   if (state.predicate ? state.predicate(val) : true) {
                     if (state.replace) {
                       // Replacing can reset view state, so only do it if we have to.
@@ -127,8 +134,9 @@ pants = {
                       }
                     } else {
                       $(state.selector).append(val);
-                      state.pos += val.length;
+                      state.pos = result.pos;
                     }
+                    state.version = result.version;
                     state.currentVal = val;
                   }
                 }
@@ -152,6 +160,7 @@ pants = {
           },
           complete: function(jqXHR, textStatus) {
             inFlight = false;
+            currentRequest = undefined;
           }
         });
       }
@@ -161,6 +170,7 @@ pants = {
       polledFileStates[id] = {
         path: path,  // Path of file on server to poll, relative to build root.
         pos: 0,  // Position to poll from.
+        version: undefined,  // The server's version of the file content we last took.
         replace: replace,  // Whether to append or replace the polled content.
         currentVal: '',
         selector: targetSelector,  // append or replace the polled content to this element.
@@ -169,6 +179,10 @@ pants = {
         hasBeenPolledAtLeastOnce: false,
         toBeStopped: false
       };
+      if (currentRequest) {
+        // Don't wait for the in-flight request to time out before polling the new file too.
+        currentRequest.abort();
+      }
       if (!pollingEvent) {
         pollingEvent = window.setInterval(pollOnce, 200);
       }
@@ -8,7 +8,10 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
 import cgi
 from collections import defaultdict, namedtuple
 import os
+import Queue
 import re
+import threading
+import time
 import uuid
 
 from pants.base.build_environment import get_buildroot
@@ -21,6 +24,94 @@ from pants.reporting.reporting_utils import items_to_report_element
 from pants.util.dirutil import safe_mkdir
 
 
+class _ReportWriter(object):
+  """Performs the file writes of an HtmlReporter in batches on a dedicated thread.
+
+  Reporting callbacks run under the Report lock, so rather than writing and flushing there they
+  just queue up writes.  The writer drains whatever has been queued since its last pass in one
+  batch, only flushing each file it appended to once per batch and only performing the last of
+  the batch's overwrites of any given file.
+  """
+
+  _APPEND, _OVERWRITE, _CLOSE = range(3)
+
+  def __init__(self, html_dir):
+    self._html_dir = html_dir
+    self._files = {}  # path -> fileobj.
+    self._queue = Queue.Queue()
+    self._thread = threading.Thread(target=self._run, name='html-report-writer')
+    self._thread.daemon = True
+
+  def start(self):
+    self._thread.start()
+
+  def append(self, path, s):
+    """Appends content to the file at path, truncating the file first if not yet open."""
+    self._queue.put((self._APPEND, path, s))
+
+  def overwrite(self, path, s):
+    """Replaces the contents of the file at path."""
+    self._queue.put((self._OVERWRITE, path, s))
+
+  def close_file(self, path):
+    """Closes the file at path, if open."""
+    self._queue.put((self._CLOSE, path, None))
+
+  def close(self):
+    """Completes all queued writes, closes all open files and stops the writer thread."""
+    self._queue.put(None)
+    self._thread.join()
+
+  def _run(self):
+    done = False
+    while not done:
+      batch = [self._queue.get()]
+      try:
+        while True:
+          batch.append(self._queue.get_nowait())
+      except Queue.Empty:
+        pass
+      if None in batch:
+        done = True
+        batch = batch[:batch.index(None)]
+      try:
+        self._write(batch)
+      except (IOError, OSError):
+        pass  # A clean-all may remove the html dir out from under us mid-batch.
+    for f in self._files.values():
+      f.close()
+    self._files.clear()
+
+  def _write(self, batch):
+    # Make sure we're not immediately after a clean-all.
+    if not os.path.exists(self._html_dir):
+      return
+
+    overwrites = {}
+    appended = set()
+    for op, path, s in batch:
+      if op == self._APPEND:
+        f = self._files.get(path)
+        if f is None:
+          f = open(path, 'w')
+          self._files[path] = f
+        f.write(s)
+        appended.add(path)
+      elif op == self._OVERWRITE:
+        overwrites[path] = s
+      else:
+        f = self._files.pop(path, None)
+        if f:
+          f.close()
+          appended.discard(path)
+
+    for path in appended:
+      self._files[path].flush()
+    for path, s in overwrites.items():
+      with open(path, 'w') as f:
+        f.write(s)
+
+
 class HtmlReporter(Reporter):
   """HTML reporting to files.
 
@@ -31,7 +122,9 @@ class HtmlReporter(Reporter):
   # HTML reporting settings.
   #   html_dir: Where the report files go.
   #   template_dir: Where to find mustache templates.
-  Settings = namedtuple('Settings', Reporter.Settings._fields + ('html_dir', 'template_dir'))
+  #   refresh_interval_ms: The least time between re-renderings of the timing and cache summaries.
+  Settings = namedtuple('Settings', Reporter.Settings._fields + ('html_dir', 'template_dir',
+                                                                 'refresh_interval_ms'))
 
   def __init__(self, run_tracker, settings):
     Reporter.__init__(self, run_tracker, settings)
@@ -45,11 +138,15 @@ class HtmlReporter(Reporter):
     self._buildroot = get_buildroot()
     self._html_path_base = os.path.relpath(self._html_dir, self._buildroot)
 
-    # We write the main report body to this file object.
-    self._report_file = None
+    # All our file writes are performed by this writer.  Created on open().
+    self._writer = None
 
     # We redirect stdout, stderr etc. of tool invocations to these files.
-    self._output_files = defaultdict(dict)  # workunit_id -> {path -> fileobj}.
+    self._output_files = defaultdict(set)  # workunit_id -> {path}.
+
+    # The timing and cache summaries are re-rendered at most once per refresh interval.
+    self._summaries_rendered_at = 0
+    self._summaries_stale = False
 
   def report_path(self):
     """The path to the main report file."""
@@ -58,15 +155,16 @@ class HtmlReporter(Reporter):
   def open(self):
     """Implementation of Reporter callback."""
     safe_mkdir(os.path.dirname(self._html_dir))
-    self._report_file = open(self.report_path(), 'w')
+    self._writer = _ReportWriter(self._html_dir)
+    self._writer.start()
+    self._emit('')  # Create the report file up front.
 
   def close(self):
     """Implementation of Reporter callback."""
-    self._report_file.close()
-    # Make sure everything's closed.
-    for files in self._output_files.values():
-      for f in files.values():
-        f.close()
+    if self._summaries_stale:
+      self._render_summaries()
+    # Completes all pending writes and makes sure everything's closed.
+    self._writer.close()
 
   def start_workunit(self, workunit):
     """Implementation of Reporter callback."""
@@ -133,6 +231,16 @@ class HtmlReporter(Reporter):
     s += self._renderer.render_name('workunit_end', args)
     self._emit(s)
 
+    for path in self._output_files.pop(workunit.id, ()):
+      self._writer.close_file(path)
+
+    self._summaries_stale = True
+    refresh_interval_secs = self.settings.refresh_interval_ms / 1000
+    if time.time() - self._summaries_rendered_at >= refresh_interval_secs:
+      self._render_summaries()
+
+  def _render_summaries(self):
+    """Re-renders the timing and cache summaries from the run tracker's current stats."""
     # Update the timings.
     def render_timings(timings):
       timings_dict = timings.get_all()
@@ -152,13 +260,16 @@ class HtmlReporter(Reporter):
         return e if isinstance(e, basestring) else e + (_id, )
 
       msg_elements = []
-      for cache_name, stat in artifact_cache_stats.stats_per_cache.items():
+      for stat in artifact_cache_stats.get_all():
+        # Only the most recent hits and misses are listed, so show the counts of all of them.
+        hits = items_to_report_element(stat['hits'], 'hit', count=stat['num_hits'])
+        misses = items_to_report_element(stat['misses'], 'miss', count=stat['num_misses'])
         msg_elements.extend([
-          cache_name + ' artifact cache: ',
+          stat['cache_name'] + ' artifact cache: ',
           # Explicitly set the detail ids, so their displayed/hidden state survives a refresh.
-          fix_detail_id(items_to_report_element(stat.hit_targets, 'hit'), 'cache-hit-details'),
+          fix_detail_id(hits, 'cache-hit-details'),
           ', ',
-          fix_detail_id(items_to_report_element(stat.miss_targets, 'miss'), 'cache-miss-details'),
+          fix_detail_id(misses, 'cache-miss-details'),
           '.'
         ])
       if not msg_elements:
@@ -168,22 +279,14 @@ class HtmlReporter(Reporter):
     self._overwrite('artifact_cache_stats',
                     render_cache_stats(self.run_tracker.artifact_cache_stats))
 
-    for f in self._output_files[workunit.id].values():
-      f.close()
+    self._summaries_rendered_at = time.time()
+    self._summaries_stale = False
 
   def handle_output(self, workunit, label, s):
     """Implementation of Reporter callback."""
-    if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-      path = os.path.join(self._html_dir, '%s.%s' % (workunit.id, label))
-      output_files = self._output_files[workunit.id]
-      if path not in output_files:
-        f = open(path, 'w')
-        output_files[path] = f
-      else:
-        f = output_files[path]
-      f.write(self._htmlify_text(s).encode('utf-8'))
-      # We must flush in the same thread as the write.
-      f.flush()
+    path = os.path.join(self._html_dir, '%s.%s' % (workunit.id, label))
+    self._output_files[workunit.id].add(path)
+    self._writer.append(path, self._htmlify_text(s).encode('utf-8'))
 
   _log_level_css_map = {
     Report.FATAL: 'fatal',
@@ -249,15 +352,11 @@ class HtmlReporter(Reporter):
 
   def _emit(self, s):
     """Append content to the main report file."""
-    if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-      self._report_file.write(s)
-      self._report_file.flush()  # We must flush in the same thread as the write.
+    self._writer.append(self.report_path(), s)
 
   def _overwrite(self, filename, s):
     """Overwrite a file with the specified contents."""
-    if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-      with open(os.path.join(self._html_dir, filename), 'w') as f:
-        f.write(s)
+    self._writer.overwrite(os.path.join(self._html_dir, filename), s)
 
   def _htmlify_text(self, s):
     """Make text HTML-friendly."""
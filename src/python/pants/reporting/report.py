@@ -5,7 +5,9 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+from contextlib import contextmanager
 import threading
+import time
 
 from twitter.common.threading import PeriodicThread
 
@@ -47,8 +49,25 @@ class Report(object):
     # We synchronize on this, to support parallel execution.
     self._lock = threading.Lock()
 
-  def open(self):
+    # The time spent in reporter callbacks, i.e., the overhead of reporting itself.
+    self._overhead_secs = 0.0
+
+  @contextmanager
+  def _reporting(self):
+    """Holds the lock while calling back reporters, accruing the time taken as overhead."""
     with self._lock:
+      start = time.time()
+      try:
+        yield
+      finally:
+        self._overhead_secs += time.time() - start
+
+  def overhead_secs(self):
+    """Returns the time spent reporting so far, in seconds."""
+    return self._overhead_secs
+
+  def open(self):
+    with self._reporting():
       for reporter in self._reporters.values():
         reporter.open()
     self._emitter_thread.start()
@@ -68,7 +87,7 @@ class Report(object):
       return ret
 
   def start_workunit(self, workunit):
-    with self._lock:
+    with self._reporting():
       self._workunits[workunit.id] = workunit
       for reporter in self._reporters.values():
         reporter.start_workunit(workunit)
@@ -78,12 +97,12 @@ class Report(object):
 
     Each element of msg_elements is either a message string or a (message, detail) pair.
     """
-    with self._lock:
+    with self._reporting():
       for reporter in self._reporters.values():
         reporter.handle_log(workunit, level, *msg_elements)
 
   def end_workunit(self, workunit):
-    with self._lock:
+    with self._reporting():
       self._notify()  # Make sure we flush everything reported until now.
       for reporter in self._reporters.values():
         reporter.end_workunit(workunit)
@@ -91,12 +110,12 @@ class Report(object):
         del self._workunits[workunit.id]
 
   def flush(self):
-    with self._lock:
+    with self._reporting():
       self._notify()
 
   def close(self):
     self._emitter_thread.stop()
-    with self._lock:
+    with self._reporting():
       self._notify()  # One final time.
       for reporter in self._reporters.values():
         reporter.close()
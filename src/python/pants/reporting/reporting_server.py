@@ -11,6 +11,9 @@ import json
 import os
 import pkgutil
 import re
+import SocketServer
+import stat
+import time
 import urllib
 import urlparse
 from collections import namedtuple
@@ -22,7 +25,11 @@ import pystache
 
 from pants.base.build_environment import get_buildroot
 from pants.base.mustache import MustacheRenderer
+from pants.base.run_index import RunIndex
 from pants.base.run_info import RunInfo
+from pants.base.timing_store import TimingStore
+from pants.reporting.sampling_profiler import SamplingProfiler
+from pants.reporting.trace_event_reporter import TraceEventReporter
 from pants.util.dirutil import safe_mkdir
 
 
@@ -33,15 +40,25 @@ PPP_RE=re.compile("""^lang-.*\.js$""")
 class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
   """A handler that demultiplexes various pants reporting URLs."""
 
-  def __init__(self, settings, renderer, request, client_address, server):
+  # The most time a poll request waits for new content before responding without any.
+  _MAX_POLL_WAIT_SECS = 30
+
+  # How often a waiting poll request checks the polled files for new content.
+  _POLL_CHECK_INTERVAL_SECS = 0.1
+
+  def __init__(self, settings, renderer, run_index, request, client_address, server):
     self._settings = settings  # An instance of ReportingServer.Settings.
     self._root = self._settings.root
     self._renderer = renderer
+    self._run_index = run_index  # Shared by all requests, so its caches persist across them.
     self._client_address = client_address
     # The underlying handlers for specific URL prefixes.
     self._GET_handlers = [
       ('/runs/', self._handle_runs),  # Show list of known pants runs.
       ('/run/', self._handle_run),  # Show a report for a single pants run.
+      ('/timings/', self._handle_timings),  # Show timings and cache hit rates across runs.
+      ('/trace/', self._handle_trace),  # Serve the trace events of a single pants run.
+      ('/profile/', self._handle_profile),  # Show the sampled profile of a single pants run.
       ('/browse/', self._handle_browse),  # Browse filesystem under build root.
       ('/content/', self._handle_content),  # Show content of file.
       ('/assets/', self._handle_assets),  # Statically serve assets (css, js etc.)
@@ -109,6 +126,119 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
       })
     self._send_content(self._renderer.render_name('base', args), 'text/html')
 
+  def _handle_timings(self, relpath, params):
+    """Show how workunit timings and artifact cache hit rates changed across recent runs."""
+    max_runs = self._number_param(params, 'runs', 100)
+    days = self._number_param(params, 'days', 7)
+    kind = 'self' if params.get('kind', [''])[0] == 'self' else 'cumulative'
+    runs = TimingStore(self._settings.timing_store).runs(limit=max_runs)
+
+    def secs_string(secs):
+      return '' if secs is None else '%.3f' % secs
+
+    trends = TimingStore.trends(runs, since=time.time() - days * 24 * 60 * 60, key=kind)
+    for trend in trends:
+      change = trend['change']
+      trend['recent_string'] = secs_string(trend['recent'])
+      trend['baseline_string'] = secs_string(trend['baseline'])
+      trend['change_string'] = '' if change is None else '%+.3f' % change
+      if change and trend['baseline']:
+        trend['change_string'] += ' (%+.0f%%)' % (100 * change / trend['baseline'])
+      trend['change_class'] = '' if not change else 'slower' if change > 0 else 'faster'
+      trend.update(self._sparkline(trend['series']))
+
+    caches = []
+    for cache_name, rates in sorted(TimingStore.cache_hit_rates(runs).items()):
+      latest = next((rate for rate in reversed(rates) if rate is not None), None)
+      cache = {'cache_name': cache_name,
+               'latest_string': '' if latest is None else '%.0f%%' % (100 * latest)}
+      cache.update(self._sparkline(rates))
+      caches.append(cache)
+
+    args = self._default_template_args('timings')
+    args.update({'num_runs': len(runs), 'max_runs': max_runs, 'days': days, 'kind': kind,
+                 'trends': trends, 'has_trends': bool(trends),
+                 'caches': caches, 'has_caches': bool(caches)})
+    self._send_content(self._renderer.render_name('base', args), 'text/html')
+
+  def _handle_trace(self, relpath, params):
+    """Serve the trace events of a single pants run, for loading into a trace viewer."""
+    run_info = self._get_run_info_dict(relpath)
+    trace_path = run_info and run_info.get('trace_report')
+    if not trace_path or not os.path.isfile(trace_path):
+      self._send_content('No trace found for run %s' % relpath, 'text/plain', code=404)
+    else:
+      with open(trace_path, 'r') as infile:
+        # The run may still be in progress, in which case the trace is not yet closed.
+        content = TraceEventReporter.close_trace(infile.read())
+      self._send_content(content, 'application/json')
+
+  def _handle_profile(self, relpath, params):
+    """Show a flame graph of the stacks sampled during a single pants run.
+
+    The graph can be limited to the samples of a single workunit and those under it with the
+    ``workunit`` param.  With ``format=folded`` the samples are instead served as folded stacks,
+    for use with external flame graph tools.
+    """
+    run_id = relpath
+    run_info = self._get_run_info_dict(run_id)
+    profile_path = run_info and run_info.get('profile')
+    if not profile_path or not os.path.isfile(profile_path):
+      self._send_content('No profile found for run %s' % run_id, 'text/plain', code=404)
+      return
+
+    samples = SamplingProfiler.load(profile_path)
+    workunit = params.get('workunit', [None])[0]
+    folded = SamplingProfiler.folded(samples, prefix=workunit)
+    if params.get('format', [''])[0] == 'folded':
+      self._send_content('\n'.join(folded) + '\n', 'text/plain')
+      return
+
+    def profile_link(**link_params):
+      if workunit:
+        link_params.setdefault('workunit', workunit)
+      return '/profile/%s?%s' % (run_id, urllib.urlencode(link_params))
+
+    workunits = [{'path': path, 'samples': sum(stacks.values()),
+                  'link': profile_link(workunit=path)} for path, stacks in samples.items()]
+    workunits.sort(key=lambda w: w['samples'], reverse=True)
+
+    width = 1200
+    row_height = 16
+    boxes = SamplingProfiler.flame_graph(folded, width=width, row_height=row_height)
+    for box in boxes:
+      # Only label boxes wide enough to fit their label.
+      box['label'] = box['name'] if box['width'] > 7 * len(box['name']) else ''
+    depth = max(box['depth'] for box in boxes) + 1 if boxes else 0
+
+    args = self._default_template_args('profile')
+    args.update({'run_id': run_id, 'workunit': workunit, 'workunits': workunits,
+                 'boxes': boxes, 'has_boxes': bool(boxes),
+                 'graph_width': width, 'graph_height': depth * row_height,
+                 'folded_link': profile_link(format='folded')})
+    self._send_content(self._renderer.render_name('base', args), 'text/html')
+
+  @staticmethod
+  def _number_param(params, name, default):
+    """Returns the named param as a number of the default's type, or the default if it's not one."""
+    try:
+      return type(default)(params[name][0])
+    except (KeyError, IndexError, ValueError):
+      return default
+
+  @staticmethod
+  def _sparkline(series, width=200, height=20):
+    """Returns template args for an svg polyline plotting the non-None values of series."""
+    values = [value for value in series if value is not None]
+    top = max(values) if values else 0
+    step = width / max(len(series) - 1, 1)
+    points = []
+    for index, value in enumerate(series):
+      if value is not None:
+        y = height - (height * value / top if top else 0)
+        points.append('%.1f,%.1f' % (index * step, y))
+    return {'sparkline': ' '.join(points), 'sparkline_width': width, 'sparkline_height': height}
+
   def _handle_browse(self, relpath, params):
     """Handle requests to browse the filesystem under the build root."""
     abspath = os.path.normpath(os.path.join(self._root, relpath))
@@ -160,26 +290,52 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     self._send_content(content, content_type)
 
   def _handle_poll(self, relpath, params):
-    """Handle poll requests for raw file contents."""
+    """Handle poll requests for raw file contents.
+
+    Responds with only the files that have new content.  If the ``wait`` param is specified, waits
+    up to that many seconds for one of the files to have new content before responding, so that
+    clients can long-poll for content rather than repeatedly polling for nothing.
+    """
     request = json.loads(params.get('q')[0])
+    wait_secs = min(self._number_param(params, 'wait', 0.0), self._MAX_POLL_WAIT_SECS)
+    deadline = time.time() + wait_secs
+    ret = self._poll(request)
+    while not ret and time.time() < deadline:
+      time.sleep(self._POLL_CHECK_INTERVAL_SECS)
+      ret = self._poll(request)
+    self._send_content(json.dumps(ret), 'application/json')
+
+  def _poll(self, request):
     ret = {}
     # request is a polling request for multiple files. For each file:
     #  - id is some identifier assigned by the client, used to differentiate the results.
     #  - path is the file to poll.
     #  - pos is the last byte position in that file seen by the client.
+    #  - version is the version of the file last seen by the client, if any.
+    # The result for each file with new content holds the content from pos onwards, and the
+    # position and version to poll from next time.  Files are only read when their version - their
+    # modification time and size - changed, so idle files cost just a stat.
     for poll in request:
       _id = poll.get('id', None)
       path = poll.get('path', None)
       pos = poll.get('pos', 0)
+      version = poll.get('version', None)
       if path:
         abspath = os.path.normpath(os.path.join(self._root, path))
-        if os.path.isfile(abspath):
-          with open(abspath, 'r') as infile:
-            if pos:
-              infile.seek(pos)
-            content = infile.read()
-            ret[_id] = content
-    self._send_content(json.dumps(ret), 'application/json')
+        try:
+          st = os.stat(abspath)
+        except OSError:
+          continue
+        current_version = '%r-%d' % (st.st_mtime, st.st_size)
+        if not stat.S_ISREG(st.st_mode) or current_version == version:
+          continue
+        with open(abspath, 'r') as infile:
+          if pos:
+            infile.seek(pos)
+          content = infile.read()
+        if content or version is None:
+          ret[_id] = {'content': content, 'pos': pos + len(content), 'version': current_version}
+    return ret
 
   def _handle_latest_runid(self, relpath, params):
     """Handle request for the latest run id.
@@ -228,16 +384,8 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
 
   def _get_all_run_infos(self):
     """Find the RunInfos for all runs since the last clean-all."""
-    info_dir = self._settings.info_dir
-    if not os.path.isdir(info_dir):
-      return []
-    paths = [os.path.join(info_dir, x) for x in os.listdir(info_dir)]
-
-    # We copy the RunInfo as a dict, so we can add stuff to it to pass to the template.
-    # We filter only those that have a timestamp, to avoid a race condition with writing
-    # that field.
-    return filter(lambda d: 'timestamp' in d, [RunInfo(os.path.join(p, 'info')).get_as_dict()
-            for p in paths if os.path.isdir(p) and not os.path.islink(p)])
+    # The RunInfos are copied as dicts, so we can add stuff to them to pass to the template.
+    return self._run_index.runs()
 
   def _serve_dir(self, abspath, params):
     """Show a directory listing."""
@@ -331,17 +479,23 @@ class ReportingServer(object):
   #               embedded in our package are used.
   #   root: build root.
   #   allowed_clients: list of ips or ['ALL'].
+  #   timing_store: path to the TimingStore file holding timings across runs.
   Settings = namedtuple('Settings',
-    ['info_dir', 'template_dir', 'assets_dir', 'root', 'allowed_clients'])
+    ['info_dir', 'template_dir', 'assets_dir', 'root', 'allowed_clients', 'timing_store'])
+
+  class _ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # Long-poll requests wait on a thread of their own, so they don't hold up other requests.
+    daemon_threads = True
 
   def __init__(self, port, settings):
     renderer = MustacheRenderer(settings.template_dir, __name__)
+    run_index = RunIndex.for_info_dir(settings.info_dir)
 
     class MyHandler(PantsHandler):
       def __init__(self, request, client_address, server):
-        PantsHandler.__init__(self, settings, renderer, request, client_address, server)
+        PantsHandler.__init__(self, settings, renderer, run_index, request, client_address, server)
 
-    self._httpd = BaseHTTPServer.HTTPServer(('', port), MyHandler)
+    self._httpd = self._ThreadingHTTPServer(('', port), MyHandler)
     self._httpd.timeout = 0.1  # Not the network timeout, but how often handle_request yields.
 
   def server_port(self):
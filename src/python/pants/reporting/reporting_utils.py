@@ -6,11 +6,12 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 
-def items_to_report_element(items, item_type):
+def items_to_report_element(items, item_type, count=None):
   """Converts an iterable of items to a (message, detail) pair.
 
   - items: a list of items (e.g., Target instances) that can be str()-ed.
   - item_type: a string describing the type of item (e.g., 'target').
+  - count: the total number of items, if only some of them are given.
 
   Returns (message, detail) where message is the count of items (e.g., '26 targets')
   and detail is the text representation of the list of items, one per line.
@@ -27,10 +28,12 @@ def items_to_report_element(items, item_type):
       return x + 's'
 
   items = [str(x) for x in items]
-  n = len(items)
+  n = len(items) if count is None else count
   text = '%d %s' % (n, item_type if n == 1 else pluralize(item_type))
   if n == 0:
     return text
   else:
+    if n > len(items):
+      items.append('... and %d more' % (n - len(items)))
     detail = '\n'.join(items)
     return text, detail
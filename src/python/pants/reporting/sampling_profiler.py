@@ -0,0 +1,146 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict
+import json
+import os
+import sys
+import threading
+
+
+class SamplingProfiler(object):
+  """Periodically samples the python stacks of all threads, attributing samples to workunits.
+
+  Each sample of a thread is attributed to the workunit the thread was working under at the time,
+  as reported by the ``workunits_by_thread`` callable, or else to the thread's name for threads not
+  doing work tracked by workunits, like the reporting threads.  On flush, the sampled stacks are
+  written to a json file mapping each workunit path to a map of folded stacks - ';' separated
+  frames from outermost to innermost - to sample counts.
+  """
+
+  @staticmethod
+  def load(path):
+    """Returns the samples recorded in the given profile file, as written by ``flush``."""
+    with open(path, 'r') as fp:
+      return json.load(fp)
+
+  @staticmethod
+  def folded(samples, prefix=None):
+    """Returns samples as lines of folded stacks, as consumed by flamegraph.pl and speedscope.
+
+    Each stack is prefixed with the frames of the path of the workunit it is attributed to.
+
+    :param dict samples: Samples as returned by ``load``.
+    :param string prefix: If specified, only includes samples attributed to the workunit with this
+      path or to workunits under it.
+    """
+    lines = []
+    for path, stacks in sorted(samples.items()):
+      if prefix and not (path == prefix or path.startswith(prefix + ':')):
+        continue
+      frames = path.replace(':', ';')
+      for stack, count in sorted(stacks.items()):
+        lines.append('{0};{1} {2}'.format(frames, stack, count))
+    return lines
+
+  @staticmethod
+  def flame_graph(folded, width=1200, row_height=16, min_width=0.5):
+    """Lays out folded stacks as a flame graph.
+
+    Returns a list of boxes, one per distinct frame of each distinct stack prefix, as dicts with
+    keys ``name``, ``samples``, ``depth``, ``x``, ``y``, ``width`` and ``height``.  Boxes narrower
+    than ``min_width`` are left out.
+    """
+    root = {'samples': 0, 'children': {}}
+    for line in folded:
+      stack, _, count = line.rpartition(' ')
+      count = int(count)
+      root['samples'] += count
+      node = root
+      for frame in stack.split(';'):
+        node = node['children'].setdefault(frame, {'samples': 0, 'children': {}})
+        node['samples'] += count
+
+    boxes = []
+    scale = width / root['samples'] if root['samples'] else 0
+
+    def layout(node, depth, x):
+      for name, child in sorted(node['children'].items()):
+        child_width = child['samples'] * scale
+        if child_width >= min_width:
+          boxes.append({'name': name, 'samples': child['samples'], 'depth': depth, 'x': x,
+                        'y': depth * row_height, 'width': child_width, 'height': row_height - 1})
+          layout(child, depth + 1, x)
+        x += child_width
+
+    layout(root, 0, 0)
+    return boxes
+
+  def __init__(self, path, interval_secs, workunits_by_thread):
+    """
+    :param string path: The file to write the samples to on flush.
+    :param float interval_secs: The time to wait between samples.
+    :param workunits_by_thread: A callable returning a dict of thread ident to the workunit that
+      thread is currently working under.
+    """
+    self._path = path
+    self._interval_secs = interval_secs
+    self._workunits_by_thread = workunits_by_thread
+    self._samples = defaultdict(lambda: defaultdict(int))  # workunit path -> stack -> count.
+    self._stopped = threading.Event()
+    self._thread = threading.Thread(target=self._run, name='sampling-profiler')
+    self._thread.daemon = True
+
+  @property
+  def path(self):
+    return self._path
+
+  def start(self):
+    self._thread.start()
+
+  def stop(self):
+    """Stops sampling, waiting for any sample in progress to complete."""
+    self._stopped.set()
+    if self._thread.is_alive():
+      self._thread.join()
+
+  def flush(self):
+    """Writes the samples recorded so far to the file."""
+    # Check existence in case we're a clean-all. We don't want to write anything in that case.
+    if os.path.exists(os.path.dirname(self._path)):
+      with open(self._path, 'w') as fp:
+        json.dump(self.get_samples(), fp)
+
+  def get_samples(self):
+    """Returns a dict of workunit path to a dict of folded stack to sample count."""
+    return dict((path, dict(stacks)) for path, stacks in self._samples.items())
+
+  def _run(self):
+    while not self._stopped.wait(self._interval_secs):
+      self.sample()
+
+  def sample(self):
+    """Records one sample of the stack of every thread other than the calling one."""
+    workunits = self._workunits_by_thread()
+    thread_names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+    sampler = threading.current_thread().ident
+    for ident, frame in sys._current_frames().items():
+      if ident == sampler:
+        continue
+      workunit = workunits.get(ident)
+      path = workunit.path() if workunit else '[{0}]'.format(thread_names.get(ident, ident))
+      self._samples[path][self._fold(frame)] += 1
+
+  @staticmethod
+  def _fold(frame):
+    frames = []
+    while frame is not None:
+      code = frame.f_code
+      frames.append('{0} ({1}:{2})'.format(code.co_name, os.path.basename(code.co_filename),
+                                           code.co_firstlineno).replace(';', ','))
+      frame = frame.f_back
+    return ';'.join(reversed(frames))
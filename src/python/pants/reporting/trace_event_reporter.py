@@ -0,0 +1,164 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from collections import defaultdict, namedtuple
+import itertools
+import json
+import os
+import threading
+import time
+
+from pants.base.workunit import WorkUnit
+from pants.reporting.reporter import Reporter
+from pants.util.dirutil import safe_mkdir_for
+
+
+class TraceEventReporter(Reporter):
+  """Streams the workunit tree as Chrome trace events.
+
+  The trace can be loaded into chrome://tracing or Perfetto.  Each root workunit - the main root
+  and the background root - is rendered as a process whose threads are the threads its workunits
+  ran on: the main thread and the worker pool threads.  Tool invocations are rendered on tool
+  process tracks of their own, one per concurrently running tool, so that time spent waiting on
+  tools is distinguishable from time spent in pants itself.
+
+  Goals are rendered as async slices rather than as slices of the thread that opens them: the
+  task scheduler opens and closes the workunits of concurrently running goals on the main thread
+  in any order, so they need not nest.
+
+  Events are appended to a JSON array as workunits start and end.  The closing bracket is only
+  written on close, which trace viewers permit, so that the trace of a run still in progress can
+  be viewed.
+  """
+
+  # Trace event reporting settings.
+  #   trace_path: The file to write the trace events to.
+  Settings = namedtuple('Settings', Reporter.Settings._fields + ('trace_path',))
+
+  # Buffered events are flushed at most this often, so that the trace of a run in progress stays
+  # reasonably fresh without flushing on every event.
+  _FLUSH_INTERVAL_SECS = 0.5
+
+  @staticmethod
+  def close_trace(content):
+    """Returns the given content of a possibly still-open trace as a complete JSON array."""
+    content = content.rstrip()
+    if content.endswith(']'):
+      return content
+
+    # The trace file is block buffered, so an open trace may end part way through an event, in
+    # which case we drop that event.  Events are written one per line, separated by ',\n'.
+    content = content.rstrip(',')
+    head, separator, last = content.rpartition(',\n')
+    if not separator:
+      head, last = '[', content[1:]
+    try:
+      json.loads(last)
+      return content + ']'
+    except ValueError:
+      return head + ']'
+
+  def __init__(self, run_tracker, settings):
+    Reporter.__init__(self, run_tracker, settings)
+    self._trace_file = None
+    self._flushed_at = 0
+    self._first_event = True
+
+    self._pids = {}  # root workunit id -> pid.
+    self._tids = {}  # (pid, thread ident) -> tid.
+    self._next_tid = itertools.count(1)
+
+    # Tool invocations each get a track, re-used once the invocation ends.
+    self._tool_tracks = {}  # workunit id -> (pid, tid).
+    self._free_tool_tids = defaultdict(list)  # pid -> [tid].
+
+  def open(self):
+    """Implementation of Reporter callback."""
+    safe_mkdir_for(self.settings.trace_path)
+    self._trace_file = open(self.settings.trace_path, 'w')
+    self._trace_file.write('[\n')
+
+  def close(self):
+    """Implementation of Reporter callback."""
+    self._trace_file.write('\n]\n')
+    self._trace_file.close()
+
+  def start_workunit(self, workunit):
+    """Implementation of Reporter callback."""
+    args = {'path': workunit.path()}
+    if workunit.cmd:
+      args['cmd'] = workunit.cmd
+    ts = self._micros(workunit.start_time)
+    if workunit.has_label(WorkUnit.GOAL):
+      self._emit(ph='b', cat='goal', id=str(workunit.id), name=workunit.name,
+                 pid=self._pid(workunit), ts=ts, args=args)
+    else:
+      pid, tid = self._track(workunit)
+      self._emit(ph='B', name=workunit.name, pid=pid, tid=tid, ts=ts, args=args)
+
+  def end_workunit(self, workunit):
+    """Implementation of Reporter callback."""
+    # The run tracker only marks a workunit's end time after reporting its end.
+    ts = self._micros(time.time())
+    args = {'outcome': WorkUnit.outcome_string(workunit.outcome())}
+    if workunit.has_label(WorkUnit.GOAL):
+      self._emit(ph='e', cat='goal', id=str(workunit.id), name=workunit.name,
+                 pid=self._pid(workunit), ts=ts, args=args)
+    else:
+      pid, tid = self._tool_tracks.pop(workunit.id, None) or self._thread_track(workunit)
+      self._emit(ph='E', pid=pid, tid=tid, ts=ts, args=args)
+      if workunit.has_label(WorkUnit.TOOL):
+        self._free_tool_tids[pid].append(tid)
+
+    if time.time() - self._flushed_at >= self._FLUSH_INTERVAL_SECS:
+      self._trace_file.flush()
+      self._flushed_at = time.time()
+
+  def _track(self, workunit):
+    if not workunit.has_label(WorkUnit.TOOL):
+      return self._thread_track(workunit)
+
+    pid = self._pid(workunit)
+    free_tids = self._free_tool_tids[pid]
+    if free_tids:
+      tid = free_tids.pop()
+    else:
+      tid = next(self._next_tid)
+      self._emit(ph='M', name='thread_name', pid=pid, tid=tid,
+                 args={'name': 'tool process {0}'.format(tid)})
+    self._tool_tracks[workunit.id] = (pid, tid)
+    return pid, tid
+
+  def _thread_track(self, workunit):
+    pid = self._pid(workunit)
+    thread = threading.current_thread()
+    key = (pid, thread.ident)
+    tid = self._tids.get(key)
+    if tid is None:
+      tid = self._tids[key] = next(self._next_tid)
+      self._emit(ph='M', name='thread_name', pid=pid, tid=tid, args={'name': thread.name})
+    return pid, tid
+
+  def _pid(self, workunit):
+    root = workunit.root()
+    pid = self._pids.get(root.id)
+    if pid is None:
+      pid = self._pids[root.id] = len(self._pids) + 1
+      self._emit(ph='M', name='process_name', pid=pid, args={'name': root.name})
+    return pid
+
+  @staticmethod
+  def _micros(secs):
+    return int(secs * 1000000)
+
+  def _emit(self, **event):
+    if not os.path.exists(os.path.dirname(self.settings.trace_path)):
+      return  # Make sure we're not immediately after a clean-all.
+    if not self._first_event:
+      self._trace_file.write(',\n')
+    self._first_event = False
+    self._trace_file.write(json.dumps(event, sort_keys=True))
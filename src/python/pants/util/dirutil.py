@@ -8,6 +8,8 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
 import atexit
 from collections import defaultdict
 import errno
+import fcntl
+import json
 import os
 import shutil
 import stat
@@ -96,6 +98,28 @@ def safe_open(filename, *args, **kwargs):
   return open(filename, *args, **kwargs)
 
 
+def safe_append_jsonl(filename, record):
+  """Appends a json-serializable record to a json lines file as a line of its own.
+
+  The file is locked while appending so that records appended concurrently by other processes
+  never interleave, and a last record truncated by an interrupted process is terminated first so
+  that it doesn't swallow this one.
+  """
+  safe_mkdir_for(filename)
+  line = (json.dumps(record, sort_keys=True) + '\n').encode('utf-8')
+  fd = os.open(filename, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+  try:
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    if os.lseek(fd, 0, os.SEEK_END):
+      os.lseek(fd, -1, os.SEEK_END)
+      if os.read(fd, 1) != b'\n':
+        line = b'\n' + line
+    while line:
+      line = line[os.write(fd, line):]
+  finally:
+    os.close(fd)  # Also releases the lock.
+
+
 def safe_delete(filename):
   """
     Delete a file safely. If it's not present, no-op.
@@ -0,0 +1,25 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+
+def load_symbol(descriptor):
+  """Imports and returns the module level symbol named by the given descriptor.
+
+  :param string descriptor: A '[package.]module:symbol' string, eg:
+    'pants.backend.core.tasks.listtargets:ListTargets'.
+  :raises: ``ValueError`` if the descriptor is malformed and ``ImportError`` if the module cannot be
+    imported or does not define the symbol.
+  """
+  module_name, _, symbol = descriptor.partition(':')
+  if not module_name or not symbol:
+    raise ValueError('Expected a descriptor of the form [package.]module:symbol, given: '
+                     '{0}'.format(descriptor))
+  module = __import__(str(module_name), fromlist=[str(symbol)])
+  try:
+    return getattr(module, symbol)
+  except AttributeError:
+    raise ImportError('Module {0} has no symbol {1}'.format(module_name, symbol))
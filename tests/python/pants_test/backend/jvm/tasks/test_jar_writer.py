@@ -0,0 +1,232 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+import zipfile
+
+import mock
+
+from pants.backend.jvm.targets.jvm_binary import Duplicate, JarRule, JarRules, Skip
+from pants.backend.jvm.tasks.jar_writer import JarWriter
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_open
+
+
+class JarWriterTest(unittest.TestCase):
+  def create_jar(self, path, entries):
+    with open_zip(path, 'w') as zf:
+      for name, contents in entries:
+        zf.writestr(name, contents)
+    return path
+
+  def assert_listing(self, path, *expected_items):
+    with open_zip(path) as jar:
+      self.assertEqual(set(['META-INF/', 'META-INF/MANIFEST.MF']) | set(expected_items),
+                       set(jar.namelist()))
+
+  def read(self, path, name):
+    with open_zip(path) as jar:
+      return jar.read(name)
+
+  def test_files_and_directories(self):
+    with temporary_dir() as root:
+      with safe_open(os.path.join(root, 'classes', 'a', 'B.class'), 'w') as fp:
+        fp.write('B')
+      with safe_open(os.path.join(root, 'README'), 'w') as fp:
+        fp.write('42')
+
+      writer = JarWriter()
+      writer.add_directory(os.path.join(root, 'classes'))
+      writer.add_file(os.path.join(root, 'README'), 'docs/README')
+      writer.add_bytes('c/d.txt', b'e')
+      jar = os.path.join(root, 'out.jar')
+      writer.write(jar, overwrite=True)
+
+      self.assert_listing(jar, 'a/', 'a/B.class', 'docs/', 'docs/README', 'c/', 'c/d.txt')
+      self.assertEqual(b'B', self.read(jar, 'a/B.class'))
+      self.assertEqual(b'42', self.read(jar, 'docs/README'))
+      self.assertEqual(b'e', self.read(jar, 'c/d.txt'))
+      self.assertIn(b'Manifest-Version: 1.0', self.read(jar, 'META-INF/MANIFEST.MF'))
+
+  def test_manifest(self):
+    with temporary_dir() as root:
+      jar = os.path.join(root, 'out.jar')
+      writer = JarWriter()
+      writer.main('com.example.Main')
+      writer.classpath(['a.jar', 'b.jar'])
+      writer.write(jar, overwrite=True)
+      manifest = self.read(jar, 'META-INF/MANIFEST.MF')
+      self.assertIn(b'Main-Class: com.example.Main', manifest)
+      self.assertIn(b'Class-Path: a.jar b.jar', manifest)
+
+      writer = JarWriter()
+      writer.main('com.example.Other')
+      writer.write(jar)
+      manifest = self.read(jar, 'META-INF/MANIFEST.MF')
+      self.assertIn(b'Main-Class: com.example.Other', manifest)
+      self.assertNotIn(b'com.example.Main', manifest)
+      self.assertIn(b'Class-Path: a.jar b.jar', manifest)
+
+      contents = b'Manifest-Version: 1.0\r\nCreated-By: test\r\n\r\n'
+      writer = JarWriter()
+      writer.manifest(contents)
+      writer.write(jar)
+      self.assertEqual(contents, self.read(jar, 'META-INF/MANIFEST.MF'))
+
+  def test_update(self):
+    with temporary_dir() as root:
+      jar = self.create_jar(os.path.join(root, 'out.jar'), [('a/b', 'old'), ('c', 'c')])
+      writer = JarWriter()
+      writer.add_bytes('a/b', b'new')
+      writer.add_bytes('d', b'd')
+      writer.write(jar)
+
+      self.assert_listing(jar, 'a/', 'a/b', 'c', 'd')
+      self.assertEqual(b'new', self.read(jar, 'a/b'))
+      self.assertEqual(b'c', self.read(jar, 'c'))
+
+      writer = JarWriter()
+      writer.add_bytes('e', b'e')
+      writer.write(jar, overwrite=True)
+      self.assert_listing(jar, 'e')
+
+  def test_nested_jars_and_rules(self):
+    with temporary_dir() as root:
+      first = self.create_jar(os.path.join(root, 'first.jar'),
+                              [('META-INF/MANIFEST.MF', 'Created-By: first\n'),
+                               ('a', 'first-a'),
+                               ('b', 'first-b'),
+                               ('c', 'first-c'),
+                               ('skipped/F.SF', 'signature')])
+      second = self.create_jar(os.path.join(root, 'second.jar'),
+                               [('a', 'second-a'), ('b', 'second-b'), ('c', 'second-c')])
+
+      jar_rules = JarRules(rules=[Skip(r'^skipped/'),
+                                  Duplicate(r'^b$', Duplicate.REPLACE),
+                                  Duplicate(r'^c$', Duplicate.CONCAT)],
+                           default_dup_action=Duplicate.SKIP)
+      writer = JarWriter(jar_rules)
+      writer.add_jar(first)
+      writer.add_jar(second)
+      jar = os.path.join(root, 'out.jar')
+      writer.write(jar, overwrite=True)
+
+      self.assert_listing(jar, 'a', 'b', 'c')
+      self.assertEqual(b'first-a', self.read(jar, 'a'))
+      self.assertEqual(b'second-b', self.read(jar, 'b'))
+      self.assertEqual(b'first-csecond-c', self.read(jar, 'c'))
+      self.assertNotIn(b'first', self.read(jar, 'META-INF/MANIFEST.MF'))
+
+  def test_duplicate_fail(self):
+    with temporary_dir() as root:
+      writer = JarWriter(JarRules(rules=[], default_dup_action=Duplicate.FAIL))
+      writer.add_bytes('a', b'1')
+      writer.add_bytes('a', b'2')
+      jar = os.path.join(root, 'out.jar')
+      with self.assertRaises(Duplicate.Error):
+        writer.write(jar, overwrite=True)
+      self.assertFalse(os.path.exists(jar))
+
+  def test_parallel_compression(self):
+    with temporary_dir() as root:
+      entries = dict(('f%d' % i, (b'%d' % i) * 1000) for i in range(100))
+      jars = []
+      for workers in (1, 4):
+        writer = JarWriter(workers=workers)
+        for name, contents in sorted(entries.items()):
+          writer.add_bytes(name, contents)
+        jar = os.path.join(root, '%d.jar' % workers)
+        writer.write(jar, overwrite=True)
+        jars.append(jar)
+
+      for jar in jars:
+        with open_zip(jar) as zf:
+          self.assertIsNone(zf.testzip())
+          for name, contents in entries.items():
+            self.assertEqual(zipfile.ZIP_DEFLATED, zf.getinfo(name).compress_type)
+            self.assertEqual(contents, zf.read(name))
+      with open(jars[0], 'rb') as one, open(jars[1], 'rb') as four:
+        self.assertEqual(one.read(), four.read())
+
+  def test_unrecognized_rule(self):
+    class Custom(JarRule):
+      pass
+
+    with self.assertRaises(ValueError):
+      JarWriter(JarRules(rules=[Custom(r'.*')]))
+
+  def test_copies_compressed_entries(self):
+    with temporary_dir() as root:
+      nested = os.path.join(root, 'nested.jar')
+      with open_zip(nested, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('a/deflated', b'a' * 1000)
+      with open_zip(nested, 'a', zipfile.ZIP_STORED) as zf:
+        zf.writestr('stored', b'b' * 1000)
+
+      writer = JarWriter()
+      writer.add_jar(nested)
+      jar = os.path.join(root, 'out.jar')
+      writer.write(jar, overwrite=True)
+
+      with open_zip(nested) as original, open_zip(jar) as zf:
+        self.assertIsNone(zf.testzip())
+        self.assertEqual(original.getinfo('a/deflated').CRC, zf.getinfo('a/deflated').CRC)
+        self.assertEqual(original.getinfo('a/deflated').date_time,
+                         zf.getinfo('a/deflated').date_time)
+        self.assertEqual(b'a' * 1000, zf.read('a/deflated'))
+        self.assertEqual(zipfile.ZIP_DEFLATED, zf.getinfo('stored').compress_type)
+        self.assertEqual(b'b' * 1000, zf.read('stored'))
+
+  def test_without_raw_writes(self):
+    with temporary_dir() as root:
+      nested = os.path.join(root, 'nested.jar')
+      with open_zip(nested, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('a/deflated', b'a' * 1000)
+      with open_zip(nested, 'a', zipfile.ZIP_STORED) as zf:
+        zf.writestr('stored', b'b' * 1000)
+
+      def write(path):
+        writer = JarWriter(workers=4)
+        writer.add_jar(nested)
+        writer.add_bytes('c/generated', b'c' * 1000)
+        writer.write(path, overwrite=True)
+        return path
+
+      raw_jar = write(os.path.join(root, 'raw.jar'))
+      with mock.patch.object(JarWriter, '_RAW_WRITES', False):
+        with mock.patch.object(JarWriter, '_write_compressed') as write_compressed:
+          jar = write(os.path.join(root, 'out.jar'))
+      self.assertFalse(write_compressed.called)
+
+      with open_zip(raw_jar) as raw, open_zip(jar) as zf:
+        self.assertIsNone(zf.testzip())
+        self.assertEqual(raw.namelist(), zf.namelist())
+        for info in zf.infolist():
+          self.assertEqual(raw.read(info.filename), zf.read(info))
+          if not info.filename.endswith('/'):
+            self.assertEqual(zipfile.ZIP_DEFLATED, info.compress_type)
+
+  def test_fingerprint(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'a.txt')
+      with safe_open(path, 'w') as fp:
+        fp.write('a')
+
+      def fingerprint(**kwargs):
+        writer = JarWriter(**kwargs)
+        writer.add_file(path, 'a.txt')
+        return writer.fingerprint()
+
+      first = fingerprint()
+      self.assertEqual(first, fingerprint())
+      self.assertNotEqual(first, fingerprint(compressed=False))
+      self.assertNotEqual(first, fingerprint(jar_rules=JarRules(rules=[Skip(r'^b')])))
+
+      with safe_open(path, 'w') as fp:
+        fp.write('ab')
+      self.assertNotEqual(first, fingerprint())
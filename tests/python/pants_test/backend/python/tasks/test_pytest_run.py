@@ -0,0 +1,143 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from contextlib import contextmanager
+import os
+
+import mock
+from pex.interpreter import PythonInterpreter
+
+from pants.backend.python.interpreter_cache import PythonInterpreterCache
+from pants.backend.python.targets.python_tests import PythonTests
+from pants.backend.python.tasks import pytest_run
+from pants.backend.python.tasks.pytest_run import PytestRun
+from pants.backend.python.test_builder import PythonTestBuilder, PythonTestResult
+from pants.base.build_file_aliases import BuildFileAliases
+from pants.base.exceptions import TaskError
+from pants.util.contextutil import environment_as
+from pants.util.dirutil import safe_open, safe_rmtree
+from pants_test.base_test import BaseTest
+
+
+class PytestRunTest(BaseTest):
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(targets={'python_tests': PythonTests})
+
+  def setUp(self):
+    super(PytestRunTest, self).setUp()
+    self.pants_workdir = os.path.join(self.build_root, '.pants.d')
+    self.cache_dir = os.path.join(self.build_root, 'artifact_cache')
+    self.xml_base = os.path.join(self.build_root, 'junit-xml')
+
+    self.create_file('tests/test_passing.py', 'def test_passing(): pass\n')
+    self.create_file('tests/test_failing.py', 'def test_failing(): assert False\n')
+    self.add_to_build_file('tests', "python_tests(name='passing', sources=['test_passing.py'])\n"
+                                    "python_tests(name='failing', sources=['test_failing.py'])\n")
+    self.passing = self.target('tests:passing')
+    self.failing = self.target('tests:failing')
+
+    self.interpreter = PythonInterpreter.get()
+    self.failing_targets = set([self.failing])
+    self.ran = []
+
+  def recording_test_builder(self):
+    """Returns a PythonTestBuilder type that records the targets it runs instead of running pytest.
+    """
+    test = self
+
+    class RecordingTestBuilder(PythonTestBuilder):
+      def _run_tests(self, targets, stdout, stderr):
+        target = targets[0]
+        test.ran.append(target)
+        xml_path = PythonTestBuilder.junit_xml_path(targets)
+        if xml_path:
+          with safe_open(xml_path, 'w') as fp:
+            fp.write(target.id)
+        return PythonTestResult.rc(1 if target in test.failing_targets else 0)
+
+      @contextmanager
+      def _maybe_combine_coverage(self, stdout, stderr):
+        yield
+
+    return RecordingTestBuilder
+
+  def execute(self, force=False, coverage=False):
+    """Runs the tests of both targets, returning the targets whose tests ran."""
+    config = ('[DEFAULT]\n'
+              'pants_workdir: %(workdir)s\n'
+              '[pytest-run]\n'
+              'read_artifact_caches: ["%(cache)s"]\n'
+              'write_artifact_caches: ["%(cache)s"]\n'
+              % dict(workdir=self.pants_workdir, cache=self.cache_dir))
+    context = self.context(config=config,
+                           options=dict(interpreter=[],
+                                        python_conn_timeout=0,
+                                        log_level='info',
+                                        pytest_run_fast=False,
+                                        pytest_run_workers=1,
+                                        pytest_run_options=[],
+                                        pytest_run_force=force,
+                                        read_from_artifact_cache=True,
+                                        write_to_artifact_cache=True),
+                           target_roots=[self.passing, self.failing])
+    # The tests always run under the current interpreter, rather than one set up for the run.
+    with mock.patch.object(PythonInterpreterCache, 'setup'):
+      with mock.patch.object(PytestRun, 'select_interpreter', return_value=self.interpreter):
+        task = PytestRun(context, os.path.join(self.pants_workdir, 'pytest'))
+    self.ran = []
+    environment = dict(JUNIT_XML_BASE=self.xml_base, PANTS_PYTHON_TEST_FAILSOFT='1',
+                       PANTS_PY_COVERAGE='1' if coverage else None)
+    with mock.patch.object(pytest_run, 'PythonTestBuilder', self.recording_test_builder()):
+      with environment_as(**environment):
+        try:
+          task.execute()
+        except TaskError:
+          self.assertTrue(self.failing_targets & set(self.ran))
+        else:
+          self.assertFalse(self.failing_targets & set(self.ran))
+        finally:
+          context.background_worker_pool().shutdown()
+    return set(self.ran)
+
+  def junit_xml(self, target):
+    with environment_as(JUNIT_XML_BASE=self.xml_base):
+      return PythonTestBuilder.junit_xml_path([target])
+
+  def test_only_failures_rerun(self):
+    self.assertEqual(set([self.passing, self.failing]), self.execute())
+    self.assertEqual(set([self.failing]), self.execute())
+
+    self.failing_targets.clear()
+    self.assertEqual(set([self.failing]), self.execute())
+    self.assertEqual(set(), self.execute())
+
+  def test_force(self):
+    self.execute()
+    self.assertEqual(set([self.passing, self.failing]), self.execute(force=True))
+    self.assertEqual(set([self.failing]), self.execute())
+
+  def test_coverage_reruns_all(self):
+    self.execute()
+    self.assertEqual(set([self.passing, self.failing]), self.execute(coverage=True))
+
+  def test_junit_xml_restored(self):
+    self.execute()
+    safe_rmtree(self.xml_base)
+
+    self.assertEqual(set([self.failing]), self.execute())
+    with open(self.junit_xml(self.passing)) as fp:
+      self.assertEqual(self.passing.id, fp.read())
+
+  def test_passes_restored_from_artifact_cache(self):
+    self.execute()
+    safe_rmtree(self.pants_workdir)
+    safe_rmtree(self.xml_base)
+
+    self.assertEqual(set([self.failing]), self.execute())
+    with open(self.junit_xml(self.passing)) as fp:
+      self.assertEqual(self.passing.id, fp.read())
@@ -0,0 +1,115 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+import zipfile
+
+import mock
+from pex.interpreter import PythonInterpreter
+from pex.pex_builder import PEXBuilder
+from pex.util import CacheHelper, DistributionHelper
+
+from pants.backend.python.distribution_store import DistributionStore
+from pants.backend.python.python_requirement import PythonRequirement
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open
+
+
+class DistributionStoreTest(unittest.TestCase):
+  class FakeConfig(object):
+    def getlist(self, section, option, default=None):
+      return default
+
+  def setUp(self):
+    self.interpreter = PythonInterpreter.get()
+    self.config = self.FakeConfig()
+
+  def create_egg(self, root, name='foo', version='1.0'):
+    egg = os.path.join(root, '%s-%s-py2.7.egg' % (name, version))
+    with zipfile.ZipFile(egg, 'w') as zf:
+      zf.writestr('EGG-INFO/PKG-INFO', 'Metadata-Version: 1.0\nName: %s\nVersion: %s\n'
+                                       % (name, version))
+      zf.writestr('%s/__init__.py' % name, 'VALUE = 42\n')
+    return egg
+
+  def test_add_zipped_egg(self):
+    with temporary_dir() as root:
+      store = DistributionStore(os.path.join(root, 'store'))
+      egg = self.create_egg(root)
+      dist = DistributionHelper.distribution_from_path(egg)
+      for _ in range(2):
+        builder = PEXBuilder(path=os.path.join(root, 'chroot'), interpreter=self.interpreter)
+        store.add(builder, dist)
+
+        with zipfile.ZipFile(egg) as zf:
+          self.assertEqual(CacheHelper.zip_hash(zf),
+                           builder.info.distributions[os.path.basename(egg)])
+        init_py = os.path.join(builder.path(), builder.info.internal_cache,
+                               os.path.basename(egg), 'foo', '__init__.py')
+        with open(init_py) as fp:
+          self.assertEqual('VALUE = 42\n', fp.read())
+        os.unlink(init_py)
+
+  def test_add_egg_dir(self):
+    with temporary_dir() as root:
+      store = DistributionStore(os.path.join(root, 'store'))
+      egg = os.path.join(root, 'bar-1.0-py2.7.egg')
+      with safe_open(os.path.join(egg, 'EGG-INFO', 'PKG-INFO'), 'w') as fp:
+        fp.write('Metadata-Version: 1.0\nName: bar\nVersion: 1.0\n')
+      with safe_open(os.path.join(egg, 'bar', '__init__.py'), 'w') as fp:
+        fp.write('VALUE = 42\n')
+      dist = DistributionHelper.distribution_from_path(egg)
+
+      builder = PEXBuilder(path=os.path.join(root, 'chroot'), interpreter=self.interpreter)
+      store.add(builder, dist)
+      self.assertEqual(CacheHelper.dir_hash(egg), builder.info.distributions['bar-1.0-py2.7.egg'])
+      self.assertTrue(os.path.exists(os.path.join(builder.path(), builder.info.internal_cache,
+                                                  'bar-1.0-py2.7.egg', 'bar', '__init__.py')))
+
+  def test_resolve_memoized(self):
+    with temporary_dir() as root:
+      store = DistributionStore(os.path.join(root, 'store'))
+      dist = DistributionHelper.distribution_from_path(self.create_egg(root))
+      with mock.patch('pants.backend.python.distribution_store.resolve_multi') as resolve_multi:
+        resolve_multi.return_value = {'linux-x86_64': [dist]}
+        reqs = [PythonRequirement('foo==1.0')]
+        for _ in range(2):
+          resolved = store.resolve(self.config, reqs, self.interpreter, platforms=['linux-x86_64'])
+          self.assertEqual([dist.location],
+                           [d.location for d in resolved['linux-x86_64']])
+        self.assertEqual(1, resolve_multi.call_count)
+
+        # A different requirement set is resolved on its own.
+        store.resolve(self.config, [PythonRequirement('foo==1.1')], self.interpreter,
+                      platforms=['linux-x86_64'])
+        self.assertEqual(2, resolve_multi.call_count)
+
+  def test_resolve_open_ended_expires(self):
+    with temporary_dir() as root:
+      store = DistributionStore(os.path.join(root, 'store'), ttl=-1)
+      dist = DistributionHelper.distribution_from_path(self.create_egg(root))
+      with mock.patch('pants.backend.python.distribution_store.resolve_multi') as resolve_multi:
+        resolve_multi.return_value = {'linux-x86_64': [dist]}
+        for _ in range(2):
+          store.resolve(self.config, [PythonRequirement('foo>=1.0')], self.interpreter,
+                        platforms=['linux-x86_64'])
+        self.assertEqual(2, resolve_multi.call_count)
+
+  def test_resolve_missing_distribution(self):
+    with temporary_dir() as root:
+      store = DistributionStore(os.path.join(root, 'store'))
+      egg = self.create_egg(root)
+      dist = DistributionHelper.distribution_from_path(egg)
+      with mock.patch('pants.backend.python.distribution_store.resolve_multi') as resolve_multi:
+        resolve_multi.return_value = {'linux-x86_64': [dist]}
+        store.resolve(self.config, [PythonRequirement('foo==1.0')], self.interpreter,
+                      platforms=['linux-x86_64'])
+        os.unlink(egg)
+        store.resolve(self.config, [PythonRequirement('foo==1.0')], self.interpreter,
+                      platforms=['linux-x86_64'])
+        self.assertEqual(2, resolve_multi.call_count)
@@ -0,0 +1,70 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import subprocess
+from textwrap import dedent
+
+from pex.interpreter import PythonInterpreter
+from pex.pex import PEX
+
+from pants.backend.python.python_chroot_cache import PythonChrootCache
+from pants.backend.python.targets.python_library import PythonLibrary
+from pants.base.build_file_aliases import BuildFileAliases
+from pants.util.contextutil import temporary_dir
+from pants_test.base_test import BaseTest
+
+
+class PythonChrootCacheTest(BaseTest):
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(targets={'python_library': PythonLibrary})
+
+  def setUp(self):
+    super(PythonChrootCacheTest, self).setUp()
+    self.create_file('lib/core.py', 'from util import answer\nprint(answer())\n')
+    self.create_file('lib/util.py', 'def answer():\n  return 42\n')
+    self.add_to_build_file('lib', "python_library(name='core', sources=['core.py', 'util.py'])\n")
+    self.core = self.target('lib:core')
+    self.interpreter = PythonInterpreter.get()
+
+  def chroot(self, cache_dir):
+    return PythonChrootCache(cache_dir).chroot('lib.core', [self.core], self.interpreter, 'core')
+
+  def run_chroot(self, path):
+    process = PEX(path, interpreter=self.interpreter).run(blocking=False, stdout=subprocess.PIPE)
+    stdout, _ = process.communicate()
+    self.assertEqual(0, process.returncode)
+    return stdout.strip()
+
+  def inode(self, path):
+    return os.stat(path).st_ino
+
+  def test_reuse(self):
+    with temporary_dir() as cache_dir:
+      path = self.chroot(cache_dir)
+      self.assertEqual('42', self.run_chroot(path))
+      core_pyc = self.inode(os.path.join(path, 'core.pyc'))
+
+      self.assertEqual(path, self.chroot(cache_dir))
+      self.assertEqual(core_pyc, self.inode(os.path.join(path, 'core.pyc')))
+      self.assertEqual(['chroot', 'manifest.json'], sorted(os.listdir(os.path.dirname(path))))
+
+  def test_update_by_source_diff(self):
+    with temporary_dir() as cache_dir:
+      path = self.chroot(cache_dir)
+      core_pyc = self.inode(os.path.join(path, 'core.pyc'))
+      util_pyc = self.inode(os.path.join(path, 'util.pyc'))
+
+      self.create_file('lib/util.py', dedent('''
+        def answer():
+          return 43
+      '''))
+      self.assertEqual(path, self.chroot(cache_dir))
+      self.assertEqual('43', self.run_chroot(path))
+      self.assertEqual(core_pyc, self.inode(os.path.join(path, 'core.pyc')))
+      self.assertNotEqual(util_pyc, self.inode(os.path.join(path, 'util.pyc')))
@@ -8,15 +8,18 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import glob
 import os
 from textwrap import dedent
+import threading
 import xml.dom.minidom as DOM
 
 import coverage
+import mock
 
 from pants.backend.python.targets.python_library import PythonLibrary
 from pants.backend.python.targets.python_tests import PythonTests
-from pants.backend.python.test_builder import PythonTestBuilder
+from pants.backend.python.test_builder import PythonTestBuilder, PythonTestResult
 from pants.base.build_file_aliases import BuildFileAliases
-from pants.util.contextutil import pushd, environment_as
+from pants.util.contextutil import environment_as, pushd, temporary_file
+from pants.util.dirutil import safe_open, safe_rmtree
 from pants_test.base_test import BaseTest
 
 
@@ -32,6 +35,107 @@ class PythonTestBuilderTestEmpty(PythonTestBuilderTestBase):
     self.assertEqual(0, self.run_tests(targets=[]))
 
 
+class PythonTestBuilderConcurrencyTest(BaseTest):
+  class RecordingTestBuilder(PythonTestBuilder):
+    def __init__(self, failing, *args, **kwargs):
+      super(PythonTestBuilderConcurrencyTest.RecordingTestBuilder, self).__init__(*args, **kwargs)
+      self.failing = failing
+      self.ran = []
+      self.concurrent = 0
+      self.max_concurrent = 0
+      self._lock = threading.Lock()
+
+    def _run_tests(self, targets, stdout, stderr):
+      with self._lock:
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+      try:
+        target = targets[0]
+        print('ran %s' % target.id, file=stdout)
+        self.ran.append(target)
+        return PythonTestResult.rc(1 if target in self.failing else 0)
+      finally:
+        with self._lock:
+          self.concurrent -= 1
+
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(targets={'python_tests': PythonTests})
+
+  def setUp(self):
+    super(PythonTestBuilderConcurrencyTest, self).setUp()
+    names = 'abcdefgh'
+    self.add_to_build_file('tests', ''.join("python_tests(name='%s', sources=[])\n" % name
+                                            for name in names))
+    self.targets = [self.target('tests:%s' % name) for name in names]
+
+  def test_all_targets_run(self):
+    builder = self.RecordingTestBuilder([], self.targets, [], workers=4)
+    with temporary_file() as stdout:
+      self.assertEqual(0, builder.run(stdout=stdout))
+      stdout.seek(0)
+      output = stdout.read()
+    self.assertEqual(set(self.targets), set(builder.ran))
+    self.assertTrue(builder.max_concurrent <= 4)
+    for target in self.targets:
+      self.assertIn('ran %s' % target.id, output)
+
+  def test_failure_cancels_pending_targets(self):
+    builder = self.RecordingTestBuilder([self.targets[0]], self.targets, [], workers=1)
+    self.assertEqual(1, builder.run())
+    self.assertEqual([self.targets[0]], builder.ran)
+
+  def test_failsoft(self):
+    builder = self.RecordingTestBuilder([self.targets[0]], self.targets, [], workers=2)
+    with environment_as(PANTS_PYTHON_TEST_FAILSOFT='1'):
+      self.assertEqual(1, builder.run())
+    self.assertEqual(set(self.targets), set(builder.ran))
+
+  def test_on_result(self):
+    builder = self.RecordingTestBuilder([self.targets[0]], self.targets, [], workers=4)
+    results = {}
+    with environment_as(PANTS_PYTHON_TEST_FAILSOFT='1'):
+      builder.run(on_result=lambda target, result: results.update({target: result.success}))
+    self.assertEqual(dict((target, target != self.targets[0]) for target in self.targets), results)
+
+  def test_on_result_fast(self):
+    builder = self.RecordingTestBuilder([self.targets[0]], self.targets, [], fast=True)
+    results = {}
+    builder.run(on_result=lambda target, result: results.update({target: result.success}))
+    self.assertEqual(dict((target, False) for target in self.targets), results)
+
+
+class PythonTestBuilderCoverageChrootTest(BaseTest):
+  class FakeChroot(object):
+    """Deletes its builder's chroot when collected, like PythonChroot, but resolves nothing."""
+    def __init__(self, builder, **kwargs):
+      self._builder = builder
+
+    def dump(self):
+      return self
+
+    def freeze(self):
+      with safe_open(os.path.join(self._builder.path(), 'PEX-INFO'), 'w') as fp:
+        fp.write(self._builder.info.dump())
+
+    def __del__(self):
+      safe_rmtree(self._builder.path())
+
+  def test_uncached_chroot_outlives_report(self):
+    builder = PythonTestBuilder([], [])
+    reported = []
+
+    def report_coverage(pex, coverage_dir, stdout, stderr):
+      reported.append(os.path.exists(os.path.join(coverage_dir, 'chroot', 'PEX-INFO')))
+
+    with environment_as(PANTS_PY_COVERAGE='1'):
+      with mock.patch('pants.backend.python.test_builder.PythonChroot', self.FakeChroot):
+        with mock.patch.object(builder, '_report_coverage', side_effect=report_coverage):
+          with builder._maybe_combine_coverage(stdout=None, stderr=None):
+            builder._coverage_runs.append(([], 'unused'))
+    self.assertEqual([True], reported)
+
+
 class PythonTestBuilderTest(PythonTestBuilderTestBase):
   @property
   def alias_groups(self):
@@ -0,0 +1,87 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+from textwrap import dedent
+
+from pants.base.build_configuration import BuildConfiguration
+from pants.base.build_file import BuildFile
+from pants.base.build_file_address_mapper import BuildFileAddressMapper
+from pants.base.build_file_parser import BuildFileParser
+from pants.base.build_graph import BuildGraph
+from pants.base.dependee_index import DependeeIndex
+from pants_test.base_test import BaseTest
+
+
+class RecordingDependeeIndex(DependeeIndex):
+  def __init__(self, *args, **kwargs):
+    super(RecordingDependeeIndex, self).__init__(*args, **kwargs)
+    self.extracted = []
+
+  def extract(self, build_file, targets):
+    self.extracted.append(build_file.relpath)
+    return super(RecordingDependeeIndex, self).extract(build_file, targets)
+
+
+class DependeeIndexTest(BaseTest):
+  def setUp(self):
+    super(DependeeIndexTest, self).setUp()
+    self.build_configuration = BuildConfiguration()
+    self.build_configuration.register_aliases(self.alias_groups)
+    self.index_path = os.path.join(self.build_root, '.pants.d', 'indexes', 'dependees.json')
+
+    self.add_to_build_file('a', "target(name='a', dependencies=['b'])\n")
+    self.add_to_build_file('b', "target(name='b', dependencies=['c'])\n")
+    self.add_to_build_file('c', "target(name='c')\n")
+    self.add_to_build_file('d', "target(name='d', dependencies=['c', 'a'])\n")
+
+  def index(self):
+    # A fresh parser and graph per index mimics a new pants run.
+    build_file_parser = BuildFileParser(self.build_configuration, self.build_root)
+    build_graph = BuildGraph(address_mapper=BuildFileAddressMapper(build_file_parser))
+    return RecordingDependeeIndex(self.index_path, build_file_parser, build_graph)
+
+  def build_files(self):
+    return BuildFile.scan_buildfiles(self.build_root)
+
+  def test_direct(self):
+    self.assertEqual(set(['b:b', 'd:d']), self.index().dependees(self.build_files(), ['c:c']))
+
+  def test_transitive(self):
+    self.assertEqual(set(['a:a', 'b:b', 'd:d']),
+                     self.index().dependees(self.build_files(), ['c:c'], transitive=True))
+
+  def test_excludes_roots(self):
+    self.assertEqual(set(['a:a', 'd:d']),
+                     self.index().dependees(self.build_files(), ['b:b', 'c:c'], transitive=True))
+
+  def test_unknown_spec(self):
+    self.assertEqual(set(), self.index().dependees(self.build_files(), ['e:e']))
+
+  def test_incremental(self):
+    index = self.index()
+    index.dependees(self.build_files(), ['c:c'])
+    self.assertEqual(['a/BUILD', 'b/BUILD', 'c/BUILD', 'd/BUILD'], sorted(index.extracted))
+    index.save()
+
+    index = self.index()
+    self.assertEqual(set(['b:b', 'd:d']), index.dependees(self.build_files(), ['c:c']))
+    self.assertEqual([], index.extracted)
+
+    build_file = self.create_file('a/BUILD', dedent('''
+      target(name='a', dependencies=['c'])
+    '''))
+    # Ensure the edit is not masked by BUILD file bytecode compiled within the same second.
+    mtime = os.path.getmtime(build_file) + 10
+    os.utime(build_file, (mtime, mtime))
+    index = self.index()
+    self.assertEqual(set(['a:a', 'b:b', 'd:d']), index.dependees(self.build_files(), ['c:c']))
+    self.assertEqual(['a/BUILD'], index.extracted)
+
+  def test_corrupt_index(self):
+    self.create_file(self.index_path, 'not json')
+    self.assertEqual(set(['b:b', 'd:d']), self.index().dependees(self.build_files(), ['c:c']))
@@ -0,0 +1,85 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+
+from pants.base.run_index import RunIndex
+from pants.base.run_info import RunInfo
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_rmtree
+
+
+class RunIndexTest(unittest.TestCase):
+  def add_run(self, info_dir, run_id, timestamp, **infos):
+    run_info = RunInfo(os.path.join(info_dir, run_id, 'info'))
+    run_info.add_infos(('id', run_id), ('timestamp', timestamp), *infos.items())
+    return run_info
+
+  def ids(self, run_index):
+    return sorted(info['id'] for info in run_index.runs())
+
+  def test_indexed_and_unindexed(self):
+    with temporary_dir() as info_dir:
+      run_index = RunIndex.for_info_dir(info_dir)
+      self.assertEqual([], run_index.runs())
+
+      ended = self.add_run(info_dir, 'ended', 1)
+      ended.add_info('outcome', 'SUCCESS')
+      run_index.append(ended.get_as_dict())
+      in_progress = self.add_run(info_dir, 'in_progress', 2)
+      RunInfo(os.path.join(info_dir, 'no_timestamp_yet', 'info')).add_info('id', 'no_timestamp_yet')
+      os.symlink(os.path.join(info_dir, 'ended'), os.path.join(info_dir, 'latest'))
+
+      self.assertEqual(['ended', 'in_progress'], self.ids(run_index))
+
+      # Indexed runs are not read from their info files.
+      with open(ended.path(), 'w') as fp:
+        fp.write('id: ended\n')
+      self.assertEqual({'id': 'ended', 'timestamp': '1', 'outcome': 'SUCCESS'},
+                       next(info for info in run_index.runs() if info['id'] == 'ended'))
+
+      # Unindexed runs are re-read when their info changes.
+      in_progress.add_info('outcome', 'FAILURE')
+      self.assertEqual('FAILURE', next(info for info in run_index.runs()
+                                       if info['id'] == 'in_progress')['outcome'])
+
+      # Newly indexed runs are picked up incrementally, and returned copies are independent.
+      run_index.append(in_progress.get_as_dict())
+      runs = run_index.runs()
+      self.assertEqual(['ended', 'in_progress'], sorted(info['id'] for info in runs))
+      runs[0]['extra'] = True
+      self.assertTrue(all('extra' not in info for info in run_index.runs()))
+
+  def test_removed_runs(self):
+    with temporary_dir() as info_dir:
+      run_index = RunIndex.for_info_dir(info_dir)
+      for run_id in ('a', 'b', 'c'):
+        self.add_run(info_dir, run_id, 1)
+      run_index.append(RunInfo(os.path.join(info_dir, 'a', 'info')).get_as_dict())
+      self.assertEqual(['a', 'b', 'c'], self.ids(run_index))
+
+      safe_rmtree(os.path.join(info_dir, 'a'))
+      safe_rmtree(os.path.join(info_dir, 'b'))
+      self.assertEqual(['c'], self.ids(run_index))
+
+      # As by a clean-all.
+      safe_rmtree(info_dir)
+      self.assertEqual([], run_index.runs())
+      run_index.append(self.add_run(info_dir, 'd', 2).get_as_dict())
+      self.assertEqual(['d'], self.ids(run_index))
+
+  def test_skips_truncated_record(self):
+    with temporary_dir() as info_dir:
+      run_index = RunIndex.for_info_dir(info_dir)
+      run_index.append(self.add_run(info_dir, 'a', 1).get_as_dict())
+      self.add_run(info_dir, 'b', 2)
+      with open(run_index.path, 'a') as fp:
+        fp.write('{"id": "b", "time')
+      self.assertEqual(['a', 'b'], self.ids(run_index))
+      run_index.append(self.add_run(info_dir, 'c', 3).get_as_dict())
+      self.assertEqual(['a', 'b', 'c'], self.ids(run_index))
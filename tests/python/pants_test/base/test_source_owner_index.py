@@ -0,0 +1,143 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+from textwrap import dedent
+
+from pants.backend.core.targets.resources import Resources
+from pants.backend.core.wrapped_globs import Globs, RGlobs
+from pants.backend.python.targets.python_library import PythonLibrary
+from pants.base.build_configuration import BuildConfiguration
+from pants.base.build_file import BuildFile
+from pants.base.build_file_address_mapper import BuildFileAddressMapper
+from pants.base.build_file_aliases import BuildFileAliases
+from pants.base.build_file_parser import BuildFileParser
+from pants.base.build_graph import BuildGraph
+from pants.base.source_owner_index import SourceOwnerIndex
+from pants_test.base_test import BaseTest
+
+
+class RecordingSourceOwnerIndex(SourceOwnerIndex):
+  def __init__(self, *args, **kwargs):
+    super(RecordingSourceOwnerIndex, self).__init__(*args, **kwargs)
+    self.extracted = []
+    self.digested = []
+
+  def extract(self, build_file, targets):
+    self.extracted.append(build_file.relpath)
+    return super(RecordingSourceOwnerIndex, self).extract(build_file, targets)
+
+  def digest(self, build_file, record):
+    self.digested.append(build_file.relpath)
+    return super(RecordingSourceOwnerIndex, self).digest(build_file, record)
+
+
+class SourceOwnerIndexTest(BaseTest):
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(targets={'python_library': PythonLibrary,
+                                            'resources': Resources},
+                                   context_aware_object_factories={'globs': Globs,
+                                                                   'rglobs': RGlobs})
+
+  def setUp(self):
+    super(SourceOwnerIndexTest, self).setUp()
+    self.build_configuration = BuildConfiguration()
+    self.build_configuration.register_aliases(self.alias_groups)
+    self.index_path = os.path.join(self.build_root, '.pants.d', 'indexes', 'source_owners.json')
+
+    self.create_file('a/one.py')
+    self.create_file('a/b/two.py')
+    self.create_file('a/data.txt')
+    self.create_file('a/c/README')
+    self.add_to_build_file('a', dedent('''
+      python_library(name='a', sources=globs('*.py'), resources=['data.txt'])
+      python_library(name='all', sources=rglobs('*.py'))
+    '''))
+    self.create_file('a/b/BUILD', "python_library(name='b', sources=['two.py'])\n")
+
+  def index(self):
+    # A fresh parser and graph per index mimics a new pants run.
+    build_file_parser = BuildFileParser(self.build_configuration, self.build_root)
+    build_graph = BuildGraph(address_mapper=BuildFileAddressMapper(build_file_parser))
+    return RecordingSourceOwnerIndex(self.index_path, build_file_parser, build_graph)
+
+  def test_owners(self):
+    self.assertEqual({'a/one.py': ['a:a', 'a:all'],
+                      'a/b/two.py': ['a/b:b', 'a:all'],
+                      'a/data.txt': ['a:a'],
+                      'a/BUILD': ['a:a', 'a:all'],
+                      'c/unowned.py': []},
+                     self.index().owners(['a/one.py', 'a/b/two.py', 'a/data.txt', 'a/BUILD',
+                                          'c/unowned.py']))
+
+  def test_incremental(self):
+    index = self.index()
+    index.owners(['a/b/two.py'])
+    self.assertEqual(['a/BUILD', 'a/b/BUILD'], sorted(index.extracted))
+    index.save()
+
+    index = self.index()
+    self.assertEqual({'a/one.py': ['a:a', 'a:all']}, index.owners(['a/one.py']))
+    self.assertEqual([], index.extracted)
+
+    # A new file matched by an existing glob must be picked up even though no BUILD file changed.
+    self.create_file('a/b/three.py')
+    index = self.index()
+    self.assertEqual({'a/b/three.py': ['a:all']}, index.owners(['a/b/three.py']))
+    self.assertEqual(['a/BUILD', 'a/b/BUILD'], sorted(index.extracted))
+
+    # As must one in a directory an rglobs walked but found no matches in.
+    index.save()
+    self.create_file('a/c/four.py')
+    index = self.index()
+    self.assertEqual({'a/c/four.py': ['a:all']}, index.owners(['a/c/four.py']))
+    self.assertEqual(['a/BUILD'], index.extracted)
+
+  def test_hidden_dirs_not_recorded(self):
+    self.create_file('a/.hidden/notes.txt')
+    build_file = BuildFile(self.build_root, 'a/BUILD')
+    dirs = self.index().records([build_file])['a/BUILD']['dirs']
+    self.assertEqual(['a', 'a/b', 'a/c'], dirs)
+
+  def test_only_source_dirs_recorded_without_recursive_globs(self):
+    self.create_file('d/one.py')
+    self.create_file('d/e/f/two.py')
+    self.create_file('d/unrelated/notes.txt')
+    self.add_to_build_file('d', dedent('''
+      # Not rglobs('*.py'), which would walk all of d.
+      python_library(name='d', sources=globs('*.py') + ['e/f/two.py'])
+    '''))
+    build_file = BuildFile(self.build_root, 'd/BUILD')
+    index = self.index()
+    self.assertEqual(['d', 'd/e', 'd/e/f'], index.records([build_file])['d/BUILD']['dirs'])
+    index.save()
+
+    # Churn in directories no glob reads does not force a re-index.
+    self.create_file('d/unrelated/more.txt')
+    index = self.index()
+    self.assertEqual({'d/one.py': ['d:d']}, index.owners(['d/one.py']))
+    self.assertEqual([], index.extracted)
+
+    # But a new match of the glob does.
+    self.create_file('d/three.py')
+    index = self.index()
+    self.assertEqual({'d/three.py': ['d:d']}, index.owners(['d/three.py']))
+    self.assertEqual(['d/BUILD'], index.extracted)
+
+  def test_digested_once_per_reindex(self):
+    build_file = BuildFile(self.build_root, 'a/b/BUILD')
+    index = self.index()
+    index.records([build_file])
+    self.assertEqual(['a/b/BUILD'], index.digested)
+    index.save()
+
+    self.create_file('a/b/three.py')
+    index = self.index()
+    index.records([build_file])
+    self.assertEqual(['a/b/BUILD'], index.extracted)
+    self.assertEqual(['a/b/BUILD'], index.digested)
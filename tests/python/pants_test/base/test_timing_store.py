@@ -0,0 +1,66 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+
+from pants.base.timing_store import TimingStore
+from pants.util.contextutil import temporary_dir
+
+
+def run(timestamp, cumulative, tools=(), cache=None):
+  return {'timestamp': timestamp, 'cumulative': cumulative, 'tools': list(tools),
+          'cache': cache or {}}
+
+
+class TimingStoreTest(unittest.TestCase):
+  def test_append_and_read(self):
+    with temporary_dir() as tmpdir:
+      store = TimingStore(os.path.join(tmpdir, 'stats', 'timings.jsonl'))
+      self.assertEqual([], store.runs())
+      for timestamp in range(3):
+        store.append(run(timestamp, {'main': timestamp}))
+      self.assertEqual([0, 1, 2], [r['timestamp'] for r in store.runs()])
+      self.assertEqual([1, 2], [r['timestamp'] for r in store.runs(limit=2)])
+
+  def test_skips_truncated_record(self):
+    with temporary_dir() as tmpdir:
+      store = TimingStore(os.path.join(tmpdir, 'timings.jsonl'))
+      store.append(run(1, {'main': 1}))
+      with open(store.path, 'a') as fp:
+        fp.write('{"timestamp": 2, "cumu')
+      store.append(run(3, {'main': 3}))
+      self.assertEqual([1, 3], [r['timestamp'] for r in store.runs()])
+
+  def test_trends(self):
+    runs = [run(1, {'main': 10.0, 'main:compile': 4.0}, tools=['main:compile']),
+            run(2, {'main': 12.0, 'main:compile': 6.0}, tools=['main:compile']),
+            run(3, {'main': 11.0, 'main:test': 1.0}),
+            run(4, {'main': 20.0, 'main:compile': 9.0}, tools=['main:compile'])]
+    trends = TimingStore.trends(runs, since=3)
+    self.assertEqual(['main', 'main:compile', 'main:test'], [t['label'] for t in trends])
+
+    main, compile, test = trends
+    self.assertEqual([10.0, 12.0, 11.0, 20.0], main['series'])
+    self.assertEqual(15.5, main['recent'])
+    self.assertEqual(11.0, main['baseline'])
+    self.assertEqual(4.5, main['change'])
+    self.assertFalse(main['is_tool'])
+
+    self.assertEqual([4.0, 6.0, None, 9.0], compile['series'])
+    self.assertEqual(4.0, compile['change'])
+    self.assertTrue(compile['is_tool'])
+
+    self.assertIsNone(test['baseline'])
+    self.assertIsNone(test['change'])
+
+  def test_cache_hit_rates(self):
+    runs = [run(1, {}, cache={'default': [1, 3]}),
+            run(2, {}),
+            run(3, {}, cache={'default': [0, 0]}),
+            run(4, {}, cache={'default': [2, 0]})]
+    self.assertEqual({'default': [0.25, None, None, 1.0]}, TimingStore.cache_hit_rates(runs))
@@ -0,0 +1,99 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import sys
+import unittest
+from textwrap import dedent
+
+from pants.benchmark.harness import BenchmarkHarness
+from pants.benchmark.synthetic_repo import SyntheticRepo
+from pants.util.contextutil import temporary_dir
+
+
+# Stands in for pants, storing timings much as the RunTracker would and logging its args.
+FAKE_PANTS = dedent("""
+  import json
+  import os
+  import sys
+
+  root = os.environ['PANTS_BUILD_ROOT']
+  with open(os.path.join(root, 'args.log'), 'a') as fp:
+    fp.write(' '.join(sys.argv[1:]) + '\\n')
+  if sys.argv[1] == 'explode':
+    sys.exit(1)
+  with open(os.path.join(root, '.benchmark', 'timings.jsonl'), 'a') as fp:
+    fp.write(json.dumps({'outcome': 'SUCCESS', 'cumulative': {'main': 2.0, 'main:compile': 1.5},
+                         'self': {'main': 0.5, 'main:compile': 1.5}}) + '\\n')
+""")
+
+
+class BenchmarkHarnessTest(unittest.TestCase):
+  def harness(self, root, goals=('compile',), iterations=2):
+    repo = SyntheticRepo(os.path.join(root, 'repo'), targets=3, files_per_target=1)
+    repo.generate(os.path.join(root, 'host'))
+    fake_pants = os.path.join(root, 'fake_pants.py')
+    with open(fake_pants, 'w') as fp:
+      fp.write(FAKE_PANTS)
+    return BenchmarkHarness(repo, [sys.executable, fake_pants], goals, iterations=iterations)
+
+  def args(self, harness):
+    with open(os.path.join(harness.repo.root, 'args.log')) as fp:
+      return fp.read().splitlines()
+
+  def test_run_scenario(self):
+    with temporary_dir() as root:
+      harness = self.harness(root)
+      summary = harness.run_scenario(BenchmarkHarness.scenario('edit_leaf'))
+      self.assertEqual(['compile src::'] * 3, self.args(harness))
+      self.assertEqual(['SUCCESS', 'SUCCESS'], summary['outcomes'])
+      self.assertEqual(2, len(summary['wall']['runs']))
+      self.assertGreater(summary['wall']['median'], 0)
+      self.assertEqual({'runs': [1.5, 1.5], 'median': 1.5}, summary['cumulative']['main:compile'])
+      self.assertEqual({'runs': [0.5, 0.5], 'median': 0.5}, summary['self']['main'])
+      with open(os.path.join(harness.repo.root, 'src/python/bench/t2/m0.py')) as fp:
+        self.assertIn('return 2', fp.read())
+
+  def test_cold(self):
+    with temporary_dir() as root:
+      harness = self.harness(root, iterations=1)
+      os.makedirs(harness.repo.artifact_cache_dir)
+      harness.run_scenario(BenchmarkHarness.scenario('cold'))
+      self.assertEqual(['compile src::', 'clean-all', 'compile src::'], self.args(harness))
+      self.assertFalse(os.path.exists(harness.repo.artifact_cache_dir))
+
+  def test_failed_run(self):
+    with temporary_dir() as root:
+      harness = self.harness(root, goals=['explode'], iterations=1)
+      summary = harness.run_scenario(BenchmarkHarness.scenario('noop'))
+      self.assertEqual(['FAILURE'], summary['outcomes'])
+      self.assertEqual({}, summary['cumulative'])
+
+  def test_unknown_scenario(self):
+    with self.assertRaises(ValueError):
+      BenchmarkHarness.scenario('nope')
+
+  def test_compare(self):
+    def results(wall, compile_secs, outcomes=('SUCCESS',)):
+      return {'scenarios': {'noop': {
+        'outcomes': list(outcomes),
+        'wall': {'median': wall},
+        'cumulative': {'main:compile': {'median': compile_secs}, 'main:new': {'median': 9.0}},
+      }}}
+
+    baseline = results(10.0, 0.2)
+    baseline['scenarios']['noop']['cumulative'].pop('main:new')
+    self.assertEqual([], BenchmarkHarness.compare(results(10.5, 0.25), baseline))
+    self.assertEqual([], BenchmarkHarness.compare(results(12.0, 0.2), {}))
+    self.assertEqual(['noop: wall time regressed from 10.000s to 12.000s',
+                      'noop: main:compile regressed from 0.200s to 0.400s'],
+                     BenchmarkHarness.compare(results(12.0, 0.4), baseline))
+    self.assertEqual([], BenchmarkHarness.compare(results(12.0, 0.4), baseline, threshold=0.5,
+                                                  min_secs=0.5))
+    self.assertEqual(['noop: 1 of 2 runs did not succeed: FAILURE'],
+                     BenchmarkHarness.compare(results(10.0, 0.2, outcomes=['SUCCESS', 'FAILURE']),
+                                              baseline))
@@ -0,0 +1,96 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+
+from pants.base.config import Config
+from pants.benchmark.synthetic_repo import SyntheticRepo
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir
+
+
+class SyntheticRepoTest(unittest.TestCase):
+  def generate(self, root, **kwargs):
+    support_root = os.path.join(root, 'host')
+    safe_mkdir(os.path.join(support_root, 'build-support'))
+    with open(os.path.join(support_root, 'pants.ini'), 'w') as fp:
+      fp.write('[DEFAULT]\nread_artifact_caches: []\n\n'
+               '[java-compile]\nwrite_artifact_caches: [\'/shared/cache\']\n')
+    repo = SyntheticRepo(os.path.join(root, 'repo'), **kwargs)
+    repo.generate(support_root)
+    return repo
+
+  def read(self, repo, relpath):
+    with open(os.path.join(repo.root, relpath)) as fp:
+      return fp.read()
+
+  def test_dependencies(self):
+    repo = SyntheticRepo('unused', targets=30, fan_out=2)
+    self.assertEqual(['java', 'scala', 'python', 'java'], [repo.language(i) for i in range(4)])
+    self.assertEqual([], repo.dependencies(0))
+    for index in range(repo.targets):
+      dependencies = repo.dependencies(index)
+      self.assertLessEqual(len(dependencies), 2)
+      self.assertTrue(all(dep < index for dep in dependencies))
+      if repo.language(index) != 'scala':
+        self.assertTrue(all(repo.language(dep) == repo.language(index) for dep in dependencies))
+    self.assertEqual(2, len(repo.dependencies(29)))
+
+    same = SyntheticRepo('unused', targets=30, fan_out=2)
+    other = SyntheticRepo('unused', targets=30, fan_out=2, seed=1)
+    self.assertEqual([repo.dependencies(i) for i in range(30)],
+                     [same.dependencies(i) for i in range(30)])
+    self.assertNotEqual([repo.dependencies(i) for i in range(30)],
+                        [other.dependencies(i) for i in range(30)])
+
+  def test_generate(self):
+    with temporary_dir() as root:
+      repo = self.generate(root, targets=6, files_per_target=2, fan_out=1)
+      self.assertTrue(os.path.islink(os.path.join(repo.root, 'build-support')))
+      self.assertFalse(os.path.lexists(os.path.join(repo.root, '3rdparty')))
+      self.assertIn("source_root('src/scala', scala_library)", self.read(repo, 'BUILD'))
+
+      self.assertEqual('src/java/com/pants/bench/t3:t3', repo.address(3))
+      build = self.read(repo, 'src/java/com/pants/bench/t3/BUILD')
+      self.assertIn("java_library(name='t3'", build)
+      self.assertIn("sources=['C3_0.java', 'C3_1.java']", build)
+      self.assertIn("'src/java/com/pants/bench/t0:t0'", build)
+      self.assertIn('com.pants.bench.t0.C0_0.value()',
+                    self.read(repo, 'src/java/com/pants/bench/t3/C3_0.java'))
+
+      build = self.read(repo, 'src/python/bench/t5/BUILD')
+      self.assertIn("sources=['__init__.py', 'm0.py', 'm1.py']", build)
+      self.assertIn("'src/python/bench/t2:t2'", build)
+      self.assertIn('from bench.t2 import m0 as t2', self.read(repo, 'src/python/bench/t5/m0.py'))
+      self.assertTrue(os.path.exists(os.path.join(repo.root, 'src/python/bench/__init__.py')))
+
+      config = Config.load(os.path.join(repo.root, 'pants.ini'))
+      self.assertEqual(repo.timing_store_path, config.getdefault('timing_store'))
+      for section in (Config.DEFAULT_SECTION, 'java-compile'):
+        for option in ('read_artifact_caches', 'write_artifact_caches'):
+          self.assertEqual([repo.artifact_cache_dir], config.getlist(section, option))
+
+  def test_edit(self):
+    with temporary_dir() as root:
+      repo = self.generate(root, targets=2, files_per_target=2)
+      source = 'src/scala/com/pants/bench/t1/C1_0.scala'
+      original = self.read(repo, source)
+      unedited = self.read(repo, 'src/scala/com/pants/bench/t1/C1_1.scala')
+      repo.edit(1)
+      edited = self.read(repo, source)
+      self.assertNotEqual(original, edited)
+      self.assertIn('com.pants.bench.t0.C0_0.value()', edited)
+      self.assertEqual(unedited, self.read(repo, 'src/scala/com/pants/bench/t1/C1_1.scala'))
+      repo.edit(1)
+      self.assertNotEqual(edited, self.read(repo, source))
+
+  def test_invalid(self):
+    with self.assertRaises(ValueError):
+      SyntheticRepo('unused', languages=['go'])
+    with self.assertRaises(ValueError):
+      SyntheticRepo('unused', targets=0)
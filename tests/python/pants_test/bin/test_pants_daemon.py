@@ -0,0 +1,182 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from contextlib import contextmanager
+import os
+import signal
+import subprocess
+import sys
+import time
+import unittest
+
+from twitter.common.lang import Compatibility
+
+from pants.base.address import SyntheticAddress
+from pants.base.build_configuration import BuildConfiguration
+from pants.base.build_graph import BuildGraph
+from pants.bin.pants_daemon import BuildFileWatcher, PantsDaemon, PantsDaemonClient, WarmBuildGraph
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open
+from pants_test.base_test import BaseTest
+
+
+StringIO = Compatibility.StringIO
+
+
+def write(path, contents=''):
+  with safe_open(path, 'w') as fp:
+    fp.write(contents)
+
+
+class BuildFileWatcherTest(unittest.TestCase):
+  def test_poll(self):
+    with temporary_dir() as root:
+      write(os.path.join(root, 'a', 'BUILD'), 'a')
+      write(os.path.join(root, 'a', 'b', 'BUILD.tools'), 'b')
+      write(os.path.join(root, 'ignored', 'BUILD'))
+      write(os.path.join(root, '.hidden', 'BUILD'))
+      watcher = BuildFileWatcher(root, ignore_dirs=[os.path.join(root, 'ignored')])
+      self.assertEqual(set(['a', 'a/b']), watcher.spec_paths)
+      self.assertEqual(set(), watcher.poll().spec_paths)
+
+      # Rewriting a BUILD file with the same contents is not a change.
+      write(os.path.join(root, 'a', 'BUILD'), 'a')
+      os.utime(os.path.join(root, 'a', 'BUILD'), (time.time() + 10, time.time() + 10))
+      self.assertEqual(set(), watcher.poll().spec_paths)
+
+      write(os.path.join(root, 'a', 'BUILD'), 'edited')
+      self.assertEqual(BuildFileWatcher.Changes(spec_paths=set(['a']), added_or_removed=False),
+                       watcher.poll())
+
+      write(os.path.join(root, 'c', 'd', 'BUILD'))
+      os.unlink(os.path.join(root, 'a', 'b', 'BUILD.tools'))
+      self.assertEqual(BuildFileWatcher.Changes(spec_paths=set(['a/b', 'c/d']),
+                                                added_or_removed=True),
+                       watcher.poll())
+      self.assertEqual(set(['a', 'c/d']), watcher.spec_paths)
+
+
+class WarmBuildGraphTest(BaseTest):
+  def warm(self):
+    build_configuration = BuildConfiguration()
+    build_configuration.register_aliases(self.alias_groups)
+    return WarmBuildGraph(self.build_root, build_configuration)
+
+  def test_refresh(self):
+    self.add_to_build_file('a', 'target(name="a", dependencies=["b"])')
+    self.add_to_build_file('b', 'target(name="b")')
+    warm_build_graph = self.warm()
+    build_graph = warm_build_graph.build_graph
+    a = SyntheticAddress.parse('a')
+    b = SyntheticAddress.parse('b')
+    self.assertEqual([b], [t.address for t in build_graph.get_target(a).dependencies])
+
+    self.create_file('b/BUILD', 'target(name="b", dependencies=["c"])')
+    self.add_to_build_file('c', 'target(name="c")')
+    self.assertEqual(set(['b', 'c']), warm_build_graph.refresh())
+    self.assertEqual([SyntheticAddress.parse('c')],
+                     [t.address for t in build_graph.get_target(b).dependencies])
+    self.assertEqual(set(), warm_build_graph.refresh())
+
+  def test_broken_build_files_are_skipped(self):
+    self.add_to_build_file('a', 'target(name="a", dependencies=["missing"])')
+    self.add_to_build_file('b', 'target(name="b")')
+    warm_build_graph = self.warm()
+    build_graph = warm_build_graph.build_graph
+    self.assertIsNotNone(build_graph.get_target(SyntheticAddress.parse('b')))
+    self.assertIsNone(build_graph.get_target(SyntheticAddress.parse('a')))
+
+    # A run re-attempting the broken target fails just as it would with a cold graph.
+    with self.assertRaises(BuildGraph.TransitiveLookupError):
+      build_graph.inject_address_closure(SyntheticAddress.parse('a'))
+
+
+class PantsDaemonTest(unittest.TestCase):
+  class FakeWarmBuildGraph(object):
+    def refresh(self):
+      return set()
+
+    def __str__(self):
+      return 'warm'
+
+  @contextmanager
+  def daemon(self, runner, watched_files=(), watched_packages=()):
+    with temporary_dir() as root:
+      socket_path = os.path.join(root, 'pantsd.sock')
+      pid = os.fork()
+      if pid == 0:
+        try:
+          PantsDaemon(socket_path, runner, warm=self.FakeWarmBuildGraph,
+                      watched_files=watched_files, watched_packages=watched_packages).serve()
+        finally:
+          os._exit(0)
+      try:
+        while not os.path.exists(socket_path):
+          time.sleep(0.01)
+        yield socket_path
+      finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+  def execute(self, socket_path, args):
+    out = StringIO()
+    err = StringIO()
+    exit_code = PantsDaemonClient(socket_path, out=out, err=err).execute(args,
+                                                                          environment={'A': 'B'})
+    return exit_code, out.getvalue(), err.getvalue()
+
+  def test_run(self):
+    def runner(warm_build_graph):
+      print('{0} {1} {2}'.format(warm_build_graph, ' '.join(sys.argv[1:]), os.environ['A']))
+      subprocess.check_call(['sh', '-c', 'echo subprocess >&2'])
+      sys.exit(42)
+
+    with self.daemon(runner) as socket_path:
+      exit_code, out, err = self.execute(socket_path, ['goal', 'list'])
+      self.assertEqual(42, exit_code)
+      self.assertEqual('warm goal list B\n', out)
+      self.assertEqual('subprocess\n', err)
+
+  def test_failure(self):
+    def runner(warm_build_graph):
+      raise ValueError('Unhandled.')
+
+    with self.daemon(runner) as socket_path:
+      exit_code, _, err = self.execute(socket_path, [])
+      self.assertEqual(1, exit_code)
+      self.assertIn('Unhandled.', err)
+
+  def test_watched_file_changed(self):
+    with temporary_dir() as root:
+      ini = os.path.join(root, 'pants.ini')
+      write(ini, '[DEFAULT]')
+      with self.daemon(lambda warm_build_graph: None, watched_files=[ini]) as socket_path:
+        self.assertEqual((0, '', ''), self.execute(socket_path, []))
+        write(ini, '[DEFAULT]\n[daemon]')
+        self.assertEqual((None, '', ''), self.execute(socket_path, []))
+
+  def test_watched_module_changed(self):
+    with temporary_dir() as root:
+      module = os.path.join(root, 'daemon_plugin', 'tasks.py')
+      write(os.path.join(root, 'daemon_plugin', '__init__.py'))
+      write(module, 'VALUE = 1\n')
+      sys.path.insert(0, root)
+      try:
+        __import__('daemon_plugin.tasks')
+        with self.daemon(lambda warm_build_graph: None,
+                         watched_packages=['daemon_plugin']) as socket_path:
+          self.assertEqual((0, '', ''), self.execute(socket_path, []))
+          write(module, 'VALUE = 42\n')
+          self.assertEqual((None, '', ''), self.execute(socket_path, []))
+      finally:
+        sys.path.remove(root)
+        for name in ('daemon_plugin.tasks', 'daemon_plugin'):
+          sys.modules.pop(name, None)
+
+  def test_no_daemon(self):
+    with temporary_dir() as root:
+      self.assertIsNone(self.execute(os.path.join(root, 'pantsd.sock'), [])[0])
@@ -6,9 +6,14 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import itertools
+import os
+import threading
 
 from pants.backend.core.tasks.task import Task
+from pants.base.exceptions import TaskError
 from pants.engine.round_engine import RoundEngine
+from pants.goal.workspace_lock import WorkspaceLock
+from pants.util.contextutil import temporary_dir
 from pants_test.base_test import BaseTest
 from pants_test.engine.base_engine_test import EngineTestBase
 
@@ -36,7 +41,7 @@ class RoundEngineTest(EngineTestBase, BaseTest):
   def execute_action(self, tag):
     return 'execute', tag, self._context
 
-  def record(self, tag, product_types=None, required_data=None):
+  def record(self, tag, product_types=None, required_data=None, concurrent=False, action=None):
     class RecordingTask(Task):
       def __init__(me, *args, **kwargs):
         super(RecordingTask, me).__init__(*args, **kwargs)
@@ -46,18 +51,27 @@ class RoundEngineTest(EngineTestBase, BaseTest):
       def product_types(cls):
         return product_types or []
 
+      @classmethod
+      def supports_concurrent_execution(cls):
+        return concurrent
+
       def prepare(me, round_manager):
         for requirement in (required_data or ()):
           round_manager.require_data(requirement)
         self.actions.append(self.prepare_action(tag))
 
       def execute(me):
+        if action:
+          action()
         self.actions.append(self.execute_action(tag))
 
+    # Tasks lock build invalidation state by class name, so each gets its own like real tasks do.
+    RecordingTask.__name__ = str('RecordingTask_{0}'.format(tag))
     return RecordingTask
 
-  def install_task(self, name, product_types=None, goal=None, required_data=None):
-    task = self.record(name, product_types, required_data)
+  def install_task(self, name, product_types=None, goal=None, required_data=None, concurrent=False,
+                   action=None):
+    task = self.record(name, product_types, required_data, concurrent, action)
     return super(RoundEngineTest, self).install_task(name=name, action=task, goal=goal)
 
   def assert_actions(self, *expected_execute_ordering):
@@ -184,3 +198,113 @@ class RoundEngineTest(EngineTestBase, BaseTest):
     self.assert_actions('task1', 'task2', 'task3')
 
 
+
+  def rendezvous(self, *names):
+    """Returns an action per name that only completes once all the actions are executing."""
+    arrived = dict((name, threading.Event()) for name in names)
+
+    def action(name):
+      def wait_for_others():
+        arrived[name].set()
+        for event in arrived.values():
+          if not event.wait(10):
+            raise TaskError('Tasks did not execute concurrently.')
+      return wait_for_others
+
+    return [action(name) for name in names]
+
+  def test_concurrent_tasks(self):
+    self._context = self.context(config='[round-engine]\nworkers: 2\n')
+    task2_action, task3_action = self.rendezvous('task2', 'task3')
+    self.install_task('task1', goal='goal1', product_types=['1'])
+    self.install_task('task2', goal='goal2', required_data=['1'], concurrent=True,
+                      action=task2_action)
+    self.install_task('task3', goal='goal3', required_data=['1'], concurrent=True,
+                      action=task3_action)
+    self.install_task('task4', goal='goal4')
+
+    self.engine.attempt(self._context, self.as_goals('goal2', 'goal3', 'goal4'))
+
+    executed = [tag for action, tag, _ in self.actions if action == 'execute']
+    self.assertEqual('task1', executed[0])
+    self.assertEqual(set(['task2', 'task3']), set(executed[1:3]))
+    self.assertEqual('task4', executed[3])
+
+  def test_concurrent_tasks_wait_for_products(self):
+    self._context = self.context(config='[round-engine]\nworkers: 2\n')
+    self.install_task('task1', goal='goal1', product_types=['1'], concurrent=True)
+    self.install_task('task2', goal='goal2', required_data=['1'], concurrent=True)
+
+    self.engine.attempt(self._context, self.as_goals('goal2'))
+
+    self.assert_actions('task1', 'task2')
+
+  def test_concurrent_task_failure(self):
+    self._context = self.context(config='[round-engine]\nworkers: 2\n')
+
+    def fail():
+      raise TaskError('Failed.')
+
+    self.install_task('task1', goal='goal1', product_types=['1'], concurrent=True, action=fail)
+    self.install_task('task2', goal='goal2', required_data=['1'], concurrent=True)
+    self.install_task('task3', goal='goal3')
+
+    with self.assertRaises(TaskError):
+      self.engine.attempt(self._context, self.as_goals('goal2', 'goal3'))
+    self.assertEqual([], [tag for action, tag, _ in self.actions if action == 'execute'])
+
+  def test_tasks_lock_workspace(self):
+    with temporary_dir() as root:
+      lock = WorkspaceLock(os.path.join(root, '.pants.run'), os.path.join(root, 'locks'))
+      self._context = self.context(lock=lock)
+      locked = []
+      self.install_task('task1', goal='goal1', action=lambda: locked.append(not lock.is_unlocked()))
+
+      self.engine.attempt(self._context, self.as_goals('goal1'))
+
+      self.assertEqual([True], locked)
+
+  def test_consumers_lock_products_against_other_runs(self):
+    with temporary_dir() as root:
+      def new_context():
+        return self.context(lock=WorkspaceLock(os.path.join(root, '.pants.run'),
+                                               os.path.join(root, 'locks')))
+
+      events = []
+      reading = threading.Event()
+      done_reading = threading.Event()
+
+      def read():
+        reading.set()
+        done_reading.wait(10)
+        events.append('read')
+
+      self.install_task('task1', goal='goal1', product_types=['1'],
+                        action=lambda: events.append('write'))
+      self.install_task('task2', goal='goal2', required_data=['1'], action=read)
+
+      def attempt(context, goal):
+        root_workunit = context.run_tracker.current_workunit()
+
+        def run():
+          context.run_tracker.register_thread(root_workunit)
+          self.engine.attempt(context, self.as_goals(goal))
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+      self._context = new_context()
+      reading_run = attempt(self._context, 'goal2')
+      self.assertTrue(reading.wait(10))
+
+      # Another run can't rewrite task1's products while this run's task2 reads them.
+      writing_run = attempt(new_context(), 'goal1')
+      writing_run.join(0.2)
+      self.assertEqual(['write'], events)
+
+      done_reading.set()
+      reading_run.join(10)
+      writing_run.join(10)
+      self.assertEqual(['write', 'read', 'write'], events)
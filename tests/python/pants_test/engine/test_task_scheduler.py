@@ -0,0 +1,135 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import sys
+import threading
+import time
+import traceback
+import unittest
+
+from pants.engine.task_scheduler import TaskScheduler
+from pants.goal.goal import Goal
+from pants_test.base.context_utils import create_context
+
+
+class TaskSchedulerTest(unittest.TestCase):
+  def setUp(self):
+    self.context = create_context()
+    self.lock = threading.Lock()
+    self.executing = 0
+    self.max_executing = 0
+    self.executed = []
+
+  def tearDown(self):
+    Goal.clear()
+
+  def task(self, name, concurrent=False, resources=None, duration=0):
+    test = self
+
+    class FakeTask(object):
+      @classmethod
+      def supports_concurrent_execution(cls):
+        return concurrent
+
+      def execution_resources(self):
+        return resources or {'worker': 1}
+
+      def execute(self):
+        with test.lock:
+          test.executing += 1
+          test.max_executing = max(test.max_executing, test.executing)
+        time.sleep(duration)
+        with test.lock:
+          test.executing -= 1
+          test.executed.append(name)
+
+    FakeTask.__name__ = str(name)
+    return FakeTask()
+
+  def schedule(self, *tasks):
+    """Schedules (name, task, required names) tuples, each installed in a goal of the same name."""
+    goals = dict((name, Goal.by_name(name)) for name, _, _ in tasks)
+    types = dict((name, type(task)) for name, task, _ in tasks)
+    return TaskScheduler.schedule((goals[name], name, task,
+                                   set((goals[producer], types[producer]) for producer in requires))
+                                  for name, task, requires in tasks)
+
+  def dependencies(self, scheduled_tasks):
+    return dict((st.name, [dependency.name for dependency in st.dependencies])
+                for st in scheduled_tasks)
+
+  def test_schedule(self):
+    scheduled_tasks = self.schedule(('a', self.task('a', concurrent=True), ()),
+                                    ('b', self.task('b'), ()),
+                                    ('c', self.task('c', concurrent=True), ()),
+                                    ('d', self.task('d', concurrent=True), ('c',)),
+                                    ('e', self.task('e'), ()),
+                                    ('f', self.task('f', concurrent=True), ('a', 'c')))
+
+    self.assertEqual(['a', 'b', 'c', 'd', 'e', 'f'], [st.name for st in scheduled_tasks])
+    self.assertEqual({'a': [],
+                      'b': ['a'],
+                      'c': ['b'],
+                      'd': ['b', 'c'],
+                      'e': ['b', 'c', 'd'],
+                      'f': ['e']},
+                     self.dependencies(scheduled_tasks))
+
+  def test_execute_concurrently(self):
+    scheduled_tasks = self.schedule(('a', self.task('a'), ()),
+                                    ('b', self.task('b', concurrent=True, duration=0.1), ()),
+                                    ('c', self.task('c', concurrent=True, duration=0.1), ()),
+                                    ('d', self.task('d', concurrent=True), ('b',)))
+    completed = []
+    TaskScheduler(self.context, {'worker': 2}).execute(scheduled_tasks,
+                                                       on_complete=lambda st: completed.append(st))
+
+    self.assertEqual(2, self.max_executing)
+    self.assertEqual('a', self.executed[0])
+    self.assertLess(self.executed.index('b'), self.executed.index('d'))
+    self.assertEqual(set(scheduled_tasks), set(completed))
+
+  def test_demand(self):
+    exclusive, concurrent = self.schedule(
+        ('a', self.task('a'), ()),
+        ('b', self.task('b', concurrent=True, resources={'worker': 8, 'memory': 2, 'gpu': 1}), ()))
+    capacity = {'worker': 4, 'memory': 3}
+
+    self.assertEqual(capacity, exclusive.demand(capacity))
+    self.assertEqual({'worker': 4, 'memory': 2}, concurrent.demand(capacity))
+
+  def test_execute_respects_resources(self):
+    scheduled_tasks = self.schedule(
+        ('a', self.task('a', concurrent=True, resources={'worker': 1, 'memory': 2}, duration=0.05),
+         ()),
+        ('b', self.task('b', concurrent=True, resources={'worker': 1, 'memory': 2}, duration=0.05),
+         ()))
+    TaskScheduler(self.context, {'worker': 4, 'memory': 3}).execute(scheduled_tasks)
+
+    self.assertEqual(set(['a', 'b']), set(self.executed))
+    self.assertEqual(1, self.max_executing)
+
+  def test_execute_failure(self):
+    class Failure(Exception):
+      pass
+
+    def fail():
+      raise Failure()
+
+    failing = self.task('a', concurrent=True)
+    failing.execute = fail
+    scheduled_tasks = self.schedule(('a', failing, ()),
+                                    ('b', self.task('b', concurrent=True, duration=0.1), ()),
+                                    ('c', self.task('c'), ()))
+
+    try:
+      TaskScheduler(self.context, {'worker': 2}).execute(scheduled_tasks)
+      self.fail('Expected the failure to be raised.')
+    except Failure:
+      # The traceback of the failure reaches back to where it was raised.
+      self.assertEqual('fail', traceback.extract_tb(sys.exc_info()[2])[-1][2])
+    self.assertNotIn('c', self.executed)
@@ -0,0 +1,64 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import unittest
+
+from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.reporting.reporting_utils import items_to_report_element
+from pants.util.contextutil import temporary_dir
+
+
+class FakeAddress(object):
+  def __init__(self, spec):
+    self._spec = spec
+
+  def reference(self):
+    return self._spec
+
+
+class FakeTarget(object):
+  def __init__(self, spec):
+    self.address = FakeAddress(spec)
+
+
+class ArtifactCacheStatsTest(unittest.TestCase):
+  def read_lines(self, path):
+    with open(path) as fp:
+      return fp.read().splitlines()
+
+  def test_retention(self):
+    with temporary_dir() as stats_dir:
+      stats = ArtifactCacheStats(stats_dir, retention=2)
+      for i in range(5):
+        stats.add_hit('default', FakeTarget('a:%d' % i))
+      stats.add_miss('default', FakeTarget('b:0'))
+
+      self.assertEqual({'default': [5, 1]}, stats.get_counts())
+      self.assertEqual([{'cache_name': 'default', 'num_hits': 5, 'num_misses': 1,
+                         'hits': ['a:3', 'a:4'], 'misses': ['b:0']}],
+                       stats.get_all())
+
+      stats.flush()
+      self.assertEqual(['a:%d' % i for i in range(5)],
+                       self.read_lines(os.path.join(stats_dir, 'default.hits')))
+      self.assertEqual(['b:0'], self.read_lines(os.path.join(stats_dir, 'default.misses')))
+
+  def test_batched_writes(self):
+    with temporary_dir() as stats_dir:
+      stats = ArtifactCacheStats(stats_dir, retention=0)
+      hits_path = os.path.join(stats_dir, 'default.hits')
+      for i in range(ArtifactCacheStats._BATCH_SIZE - 1):
+        stats.add_hit('default', FakeTarget('a:%d' % i))
+      self.assertFalse(os.path.exists(hits_path))
+      stats.add_hit('default', FakeTarget('a:last'))
+      self.assertEqual(ArtifactCacheStats._BATCH_SIZE, len(self.read_lines(hits_path)))
+
+  def test_report_element(self):
+    self.assertEqual(('5 hits', 'a:3\na:4\n... and 3 more'),
+                     items_to_report_element(['a:3', 'a:4'], 'hit', count=5))
+    self.assertEqual('0 misses', items_to_report_element([], 'miss', count=0))
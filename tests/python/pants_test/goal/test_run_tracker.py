@@ -0,0 +1,90 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import threading
+import time
+import unittest
+
+from pants.goal.run_tracker import RunTracker
+from pants.goal.workunit_log import WorkUnitLog
+from pants.reporting.report import Report
+from pants.util.contextutil import temporary_dir
+
+
+class RunTrackerTest(unittest.TestCase):
+  def run_tracker(self, info_dir, workunit_retention):
+    run_tracker = RunTracker(info_dir, workunit_retention=workunit_retention)
+    run_tracker.start(Report())
+    return run_tracker
+
+  def test_workunit_retention(self):
+    with temporary_dir() as info_dir:
+      run_tracker = self.run_tracker(info_dir, workunit_retention=2)
+      with run_tracker.new_workunit('compile') as compile_workunit:
+        for name in ('a', 'b', 'c'):
+          with run_tracker.new_workunit(name):
+            with run_tracker.new_workunit('tool'):
+              time.sleep(0.01)
+        # Only the two most recently ended workunits, c's tool and c, are retained.
+        self.assertEqual(['c'], [child.name for child in compile_workunit.children])
+        self.assertEqual(['tool'], [child.name for child in compile_workunit.children[0].children])
+      run_tracker.end()
+
+      # Self times still account for the forgotten children.
+      self.assertGreaterEqual(run_tracker.cumulative_timings.get_timings_by_label()['main:compile'],
+                              0.03)
+      self.assertLess(run_tracker.self_timings.get_timings_by_label()['main:compile'], 0.01)
+      self.assertGreater(compile_workunit.unaccounted_time(), 0)
+
+      # All of the workunits are on disk.
+      summaries = WorkUnitLog.load(run_tracker.run_info.get_info('workunits'))
+      self.assertEqual(['main:compile:a:tool', 'main:compile:a', 'main:compile:b:tool',
+                        'main:compile:b', 'main:compile:c:tool', 'main:compile:c', 'main:compile',
+                        'main'],
+                       [summary['path'] for summary in summaries])
+      by_path = dict((summary['path'], summary) for summary in summaries)
+      self.assertEqual(by_path['main:compile']['id'], by_path['main:compile:b']['parent'])
+      self.assertIsNone(by_path['main']['parent'])
+      self.assertEqual('SUCCESS', by_path['main:compile:a:tool']['outcome'])
+
+  def test_no_retention_limit(self):
+    with temporary_dir() as info_dir:
+      run_tracker = self.run_tracker(info_dir, workunit_retention=None)
+      with run_tracker.new_workunit('compile') as compile_workunit:
+        for name in ('a', 'b', 'c'):
+          with run_tracker.new_workunit(name):
+            pass
+      run_tracker.end()
+      self.assertEqual(['a', 'b', 'c'], [child.name for child in compile_workunit.children])
+
+  def test_workunit_retention_concurrent(self):
+    with temporary_dir() as info_dir:
+      run_tracker = self.run_tracker(info_dir, workunit_retention=3)
+      with run_tracker.new_workunit('compile') as compile_workunit:
+        errors = []
+
+        def run(parent):
+          try:
+            run_tracker.register_thread(parent)
+            for _ in range(200):
+              with run_tracker.new_workunit('tool'):
+                compile_workunit.unaccounted_time()
+          except Exception as e:
+            errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(compile_workunit,)) for _ in range(4)]
+        for thread in threads:
+          thread.start()
+        for thread in threads:
+          thread.join()
+        self.assertEqual([], errors)
+        self.assertLessEqual(len(compile_workunit.children), 3)
+      run_tracker.end()
+
+      summaries = WorkUnitLog.load(run_tracker.run_info.get_info('workunits'))
+      self.assertEqual(800, len([summary for summary in summaries
+                                 if summary['path'] == 'main:compile:tool']))
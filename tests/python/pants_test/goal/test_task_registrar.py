@@ -0,0 +1,54 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import unittest
+
+from pants.backend.core.tasks.task import Task
+from pants.goal.error import GoalError
+from pants.goal.goal import Goal
+from pants.goal.task_registrar import TaskRegistrar as task
+
+
+class NamedTask(Task):
+  def execute(self):
+    pass
+
+
+def named_action():
+  pass
+
+
+class TaskRegistrarTest(unittest.TestCase):
+  def tearDown(self):
+    Goal.clear()
+
+  def test_task_type(self):
+    self.assertIs(NamedTask, task(name='a', action=NamedTask).task_type)
+
+    func_task_type = task(name='b', action=named_action).task_type
+    self.assertTrue(issubclass(func_task_type, Task))
+
+  def test_named_task_type(self):
+    goal = task(name='a', action='pants_test.goal.test_task_registrar:NamedTask').install()
+    self.assertIs(NamedTask, goal.task_type_by_name('a'))
+    self.assertTrue(goal.has_task_of_type(Task))
+
+    func_task = task(name='b', action='pants_test.goal.test_task_registrar:named_action')
+    self.assertTrue(issubclass(func_task.task_type, Task))
+
+  def test_named_task_type_loaded_lazily(self):
+    goal = task(name='a', action='pants_test.goal.does_not_exist:NamedTask').install()
+    task(name='b', action=NamedTask).install('a')
+    self.assertEqual(['a', 'b'], goal.ordered_task_names())
+    self.assertIs(NamedTask, goal.task_type_by_name('b'))
+
+    with self.assertRaises(GoalError):
+      goal.task_type_by_name('a')
+    with self.assertRaises(GoalError):
+      task(name='c', action='pants_test.goal.test_task_registrar:Missing').task_type
+    with self.assertRaises(GoalError):
+      task(name='d', action='pants_test.goal.test_task_registrar.NamedTask').task_type
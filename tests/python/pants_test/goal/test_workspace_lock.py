@@ -0,0 +1,166 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from contextlib import contextmanager
+import os
+import threading
+import unittest
+
+from pants.goal.workspace_lock import WorkspaceLock
+from pants.util.contextutil import temporary_dir
+
+
+class WorkspaceLockTest(unittest.TestCase):
+  @contextmanager
+  def workspace_lock(self, onwait=None):
+    with temporary_dir() as root:
+      yield self.new_lock(root, onwait=onwait)
+
+  def new_lock(self, root, onwait=None):
+    return WorkspaceLock(os.path.join(root, '.pants.run'), os.path.join(root, 'locks'),
+                         onwait=onwait)
+
+  def locked_in_thread(self, lock, resources=(), exclusive=False, read_resources=()):
+    """Returns an Event set once another thread acquires the given locks, and a release callable."""
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def hold():
+      with lock.locked(resources, exclusive=exclusive, read_resources=read_resources):
+        acquired.set()
+        release.wait(10)
+
+    thread = threading.Thread(target=hold)
+    thread.daemon = True
+    thread.start()
+
+    def join():
+      release.set()
+      thread.join(10)
+    return acquired, join
+
+  def test_resources_exclude(self):
+    with self.workspace_lock() as lock:
+      with lock.locked(['a']):
+        acquired, join = self.locked_in_thread(lock, ['b'])
+        self.assertTrue(acquired.wait(10))
+        join()
+
+        acquired, join = self.locked_in_thread(lock, ['a'])
+        self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(acquired.wait(10))
+      join()
+
+  def test_readers_exclude_writers(self):
+    with temporary_dir() as root:
+      lock = self.new_lock(root)
+      with lock.locked(read_resources=['a']):
+        acquired, join = self.locked_in_thread(self.new_lock(root), read_resources=['a'])
+        self.assertTrue(acquired.wait(10))
+        join()
+
+        acquired, join = self.locked_in_thread(self.new_lock(root), ['a'])
+        self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(acquired.wait(10))
+      join()
+
+  def test_written_resources_not_shared(self):
+    with temporary_dir() as root:
+      lock = self.new_lock(root)
+      with lock.locked(['a'], read_resources=['a']):
+        acquired, join = self.locked_in_thread(self.new_lock(root), read_resources=['a'])
+        self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(acquired.wait(10))
+      join()
+
+  def test_exclusive_excludes(self):
+    with self.workspace_lock() as lock:
+      with lock.locked(['a']):
+        acquired, join = self.locked_in_thread(lock, exclusive=True)
+        self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(acquired.wait(10))
+      join()
+
+  def test_onwait(self):
+    waited_on = []
+    with self.workspace_lock(onwait=waited_on.append) as lock:
+      with lock.locked(['a']):
+        acquired, join = self.locked_in_thread(lock, ['a'])
+        self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(acquired.wait(10))
+      join()
+      self.assertEqual([os.getpid()], waited_on)
+
+  def test_nested(self):
+    with self.workspace_lock() as lock:
+      self.assertTrue(lock.is_unlocked())
+      with lock.locked(['a']):
+        with lock.locked(['a', 'b']):
+          self.assertFalse(lock.is_unlocked())
+        # The outer lock on 'a' is still held.
+        acquired, join = self.locked_in_thread(lock, ['a'])
+        self.assertFalse(acquired.wait(0.2))
+        self.assertFalse(lock.is_unlocked())
+      self.assertTrue(acquired.wait(10))
+      join()
+      self.assertTrue(lock.is_unlocked())
+
+  def test_release(self):
+    with self.workspace_lock() as lock:
+      self.assertFalse(lock.release())
+      with lock.locked(['a']):
+        self.assertTrue(lock.release())
+        self.assertTrue(lock.is_unlocked())
+        acquired, join = self.locked_in_thread(lock, ['a'])
+        self.assertTrue(acquired.wait(10))
+        join()
+
+  def test_nothing_locked(self):
+    with self.workspace_lock() as lock:
+      with lock.locked():
+        self.assertTrue(lock.is_unlocked())
+
+    lock = WorkspaceLock.unlocked()
+    with lock.locked(['a'], exclusive=True):
+      self.assertTrue(lock.is_unlocked())
+
+  def test_run_lock_held_between_tasks(self):
+    with temporary_dir() as root:
+      lock = self.new_lock(root)
+      lock.lock_run()
+      with lock.locked(['a']):
+        pass
+      self.assertFalse(lock.is_unlocked())
+
+      # Another run can't clean between this run's tasks.
+      acquired, join = self.locked_in_thread(self.new_lock(root), exclusive=True)
+      self.assertFalse(acquired.wait(0.2))
+      self.assertTrue(lock.release())
+      self.assertTrue(lock.is_unlocked())
+      self.assertTrue(acquired.wait(10))
+      join()
+
+  def test_exclusive_within_run(self):
+    with temporary_dir() as root:
+      lock = self.new_lock(root)
+      lock.lock_run()
+      acquired, join = self.locked_in_thread(lock, exclusive=True)
+      self.assertTrue(acquired.wait(10))
+
+      # Other tasks of the run are excluded while the exclusive task runs.
+      resource_acquired, resource_join = self.locked_in_thread(lock, ['a'])
+      self.assertFalse(resource_acquired.wait(0.2))
+      join()
+      self.assertTrue(resource_acquired.wait(10))
+      resource_join()
+
+      # And the run lock is held again once it's done.
+      acquired, join = self.locked_in_thread(self.new_lock(root), exclusive=True)
+      self.assertFalse(acquired.wait(0.2))
+      lock.release()
+      self.assertTrue(acquired.wait(10))
+      join()
@@ -0,0 +1,83 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+import time
+import unittest
+
+import mock
+
+from pants.java.jar.jar_index import JarEntryIndex
+from pants.util.contextutil import open_zip, temporary_dir
+
+
+class JarEntryIndexTest(unittest.TestCase):
+  def create_jar(self, path, *names):
+    with open_zip(path, 'w') as jar:
+      for name in names:
+        jar.writestr(name, b'')
+    return path
+
+  def names(self, index, entry_ids):
+    return set(index.name(entry_id) for entry_id in entry_ids)
+
+  def test_entry_ids(self):
+    with temporary_dir() as root:
+      index = JarEntryIndex(os.path.join(root, 'index.json'))
+      a = self.create_jar(os.path.join(root, 'a.jar'), 'com/', 'com/A.class', 'com/Dup.class')
+      b = self.create_jar(os.path.join(root, 'b.jar'), 'com/B.class', 'com/Dup.class')
+
+      a_ids = index.entry_ids(a)
+      b_ids = index.entry_ids(b)
+      self.assertEqual(set(['com/', 'com/A.class', 'com/Dup.class']), self.names(index, a_ids))
+      self.assertEqual(set(['com/Dup.class']), self.names(index, a_ids & b_ids))
+      self.assertEqual(index.entry_id('com/Dup.class'), list(a_ids & b_ids)[0])
+      self.assertIsNone(index.entry_id('com/C.class'))
+
+  def test_persisted(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'index.json')
+      jar = self.create_jar(os.path.join(root, 'a.jar'), 'A.class')
+      index = JarEntryIndex(path)
+      index.entry_ids(jar)
+      index.save()
+
+      index = JarEntryIndex(path)
+      with mock.patch.object(JarEntryIndex, '_list') as list_entries:
+        self.assertEqual(set(['A.class']), self.names(index, index.entry_ids(jar)))
+        self.assertFalse(list_entries.called)
+
+  def test_changed_jar_reindexed(self):
+    with temporary_dir() as root:
+      index = JarEntryIndex(os.path.join(root, 'index.json'))
+      jar = self.create_jar(os.path.join(root, 'a.jar'), 'A.class')
+      self.assertEqual(set(['A.class']), self.names(index, index.entry_ids(jar)))
+
+      self.create_jar(jar, 'A.class', 'B.class')
+      os.utime(jar, (time.time() + 10, time.time() + 10))
+      self.assertEqual(set(['A.class', 'B.class']), self.names(index, index.entry_ids(jar)))
+
+  def test_missing_jars_forgotten(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'index.json')
+      a = self.create_jar(os.path.join(root, 'a.jar'), 'A.class')
+      b = self.create_jar(os.path.join(root, 'b.jar'), 'B.class')
+      index = JarEntryIndex(path)
+      index.entry_ids(a)
+      index.entry_ids(b)
+      index.save()
+
+      os.unlink(a)
+      index = JarEntryIndex(path)
+      self.assertIsNone(index.entry_id('A.class'))
+      self.assertEqual(set(['B.class']), self.names(index, index.entry_ids(b)))
+      index.save()
+
+      with mock.patch.object(JarEntryIndex, '_list') as list_entries:
+        index = JarEntryIndex(path)
+        self.assertEqual(set(['B.class']), self.names(index, index.entry_ids(b)))
+        self.assertFalse(list_entries.called)
@@ -0,0 +1,53 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import threading
+import time
+import unittest2 as unittest
+
+import mock
+
+from pants.java.distribution.distribution import Distribution
+from pants.java.nailgun_executor import NailgunExecutor
+from pants.util.contextutil import temporary_dir
+
+
+class NailgunExecutorTest(unittest.TestCase):
+  def executor(self, workdir):
+    distribution = mock.Mock(spec=Distribution)
+    distribution.java = '/fake/java'
+    return NailgunExecutor(workdir, ['nailgun.jar'], distribution=distribution)
+
+  def test_concurrent_start_spawns_once(self):
+    with temporary_dir() as workdir:
+      endpoints = []
+      spawning = []
+      overlaps = []
+
+      def spawn(fingerprint, jvm_args, classpath, stdout, stderr):
+        if spawning:
+          overlaps.append(fingerprint)
+        spawning.append(fingerprint)
+        time.sleep(0.05)
+        endpoints.append(NailgunExecutor.Endpoint('/fake/java', fingerprint, 1, 1234))
+        spawning.pop()
+
+      # Each thread uses its own executor for the shared workdir, as each xargs chunk would.
+      executors = [self.executor(workdir) for _ in range(4)]
+      with mock.patch.object(NailgunExecutor, '_get_nailgun_endpoint',
+                             side_effect=lambda: endpoints[-1] if endpoints else None):
+        with mock.patch.object(NailgunExecutor, '_check_pid', return_value=True):
+          with mock.patch.object(NailgunExecutor, '_spawn_nailgun_server', side_effect=spawn):
+            threads = [threading.Thread(target=executor.start, args=(['tool.jar'],))
+                       for executor in executors]
+            for thread in threads:
+              thread.start()
+            for thread in threads:
+              thread.join()
+
+      self.assertEqual([], overlaps)
+      self.assertEqual(1, len(endpoints))
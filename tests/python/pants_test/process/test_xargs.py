@@ -5,13 +5,17 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+from StringIO import StringIO
 import errno
 import os
+import threading
 
+import mock
 import mox
 import pytest
+import unittest2 as unittest
 
-from pants.process.xargs import Xargs
+from pants.process.xargs import Xargs, args_size
 
 
 class XargsTest(mox.MoxTestBase):
@@ -87,3 +91,86 @@ class XargsTest(mox.MoxTestBase):
     self.mox.ReplayAll()
 
     self.assertEqual(42, self.xargs.execute(['one', 'two', 'three', 'four']))
+
+  def test_execute_packed(self):
+    self.xargs = Xargs(self.call, max_size=args_size(['three', 'four']))
+    self.call(['one', 'two']).AndReturn(0)
+    self.call(['three', 'four']).AndReturn(0)
+    self.mox.ReplayAll()
+
+    self.assertEqual(0, self.xargs.execute(['one', 'two', 'three', 'four']))
+
+  def test_execute_packed_fail_fast(self):
+    self.xargs = Xargs(self.call, max_size=args_size(['three', 'four']))
+    self.call(['one', 'two']).AndReturn(42)
+    self.mox.ReplayAll()
+
+    self.assertEqual(42, self.xargs.execute(['one', 'two', 'three', 'four']))
+
+
+class XargsPackTest(unittest.TestCase):
+  def test_pack_unbounded(self):
+    self.assertEqual([['one', 'two', 'three']], Xargs(None).pack(['one', 'two', 'three']))
+
+  def test_pack_empty(self):
+    self.assertEqual([[]], Xargs(None).pack([]))
+
+  def test_pack_reserved(self):
+    xargs = Xargs(None, reserved_size=args_size(['cmd']),
+                  max_size=args_size(['cmd', 'one', 'two']))
+    self.assertEqual([['one', 'two'], ['three']], xargs.pack(['one', 'two', 'three']))
+
+  def test_pack_oversized_arg(self):
+    xargs = Xargs(None, max_size=args_size(['a']))
+    self.assertEqual([['a'], ['bbbbbbbbbb'], ['c']], xargs.pack(['a', 'bbbbbbbbbb', 'c']))
+
+  def test_pack_spreads_over_workers(self):
+    xargs = Xargs(None, workers=2)
+    self.assertEqual([['one', 'two'], ['three']], xargs.pack(['one', 'two', 'three']))
+
+
+class ParallelXargsTest(unittest.TestCase):
+  def test_execute_parallel(self):
+    calls = []
+    def call(args):
+      calls.append(args)
+      return 0
+    self.assertEqual(0, Xargs(call, workers=4).execute(['1', '2', '3', '4', '5', '6', '7', '8']))
+    self.assertEqual([['1', '2'], ['3', '4'], ['5', '6'], ['7', '8']], sorted(calls))
+
+  def test_execute_parallel_first_failure_in_chunk_order(self):
+    def call(args):
+      return int(args[0])
+    self.assertEqual(2, Xargs(call, workers=4).execute(['0', '2', '3', '0']))
+
+  def test_execute_parallel_raise(self):
+    exception = Exception()
+    def call(args):
+      if args == ['two']:
+        raise exception
+      return 0
+    with pytest.raises(Exception) as raised:
+      Xargs(call, workers=2).execute(['one', 'two'])
+    self.assertTrue(exception is raised.value)
+
+  def test_execute_parallel_output_in_chunk_order(self):
+    ready = threading.Event()
+    def call(args):
+      if args == ['one']:
+        # Make sure the first chunk completes last.
+        ready.wait(5)
+      else:
+        ready.set()
+      return 0, b'%s\n' % args[0]
+
+    stdout = StringIO()
+    with mock.patch('sys.stdout', stdout):
+      self.assertEqual(0, Xargs(call, workers=2).execute(['one', 'two']))
+    self.assertEqual(b'one\ntwo\n', stdout.getvalue())
+
+  def test_subprocess_parallel(self):
+    stdout = StringIO()
+    with mock.patch('sys.stdout', stdout):
+      xargs = Xargs.subprocess(['echo'], workers=3)
+      self.assertEqual(0, xargs.execute(['one', 'two', 'three']))
+    self.assertEqual(b'one\ntwo\nthree\n', stdout.getvalue())
@@ -6,12 +6,15 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import contextlib
+import os
 import shutil
 import tempfile
 import unittest2 as unittest
 
-from pants.backend.python.interpreter_cache import PythonInterpreter, PythonInterpreterCache
+from pants.backend.python.interpreter_cache import (InterpreterIndex, PythonInterpreter,
+                                                    PythonInterpreterCache)
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import touch
 
 import mock
 
@@ -86,3 +89,103 @@ class TestInterpreterCache(unittest.TestCase):
       cache._setup_cached = mock.Mock(side_effect=set_interpreters)
 
       self.assertEqual(cache.setup(filters=(str(interpreter.identity.requirement),)), [interpreter])
+
+
+class TestInterpreterIndex(unittest.TestCase):
+  def setUp(self):
+    self.interpreter = PythonInterpreter.get()
+
+  @contextlib.contextmanager
+  def index_and_binary(self):
+    with temporary_dir() as root:
+      binary = os.path.join(root, 'bin', 'python2.7')
+      touch(binary)
+      yield os.path.join(root, 'index.json'), binary
+
+  def test_identity_persisted(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary',
+                             return_value=self.interpreter) as from_binary:
+        index = InterpreterIndex(index_path)
+        identified = index.identify(binary)
+        index.save()
+        self.assertEqual(1, from_binary.call_count)
+
+        identified_again = InterpreterIndex(index_path).identify(binary)
+        self.assertEqual(1, from_binary.call_count)
+
+      for interpreter in identified, identified_again:
+        self.assertEqual(binary, interpreter.binary)
+        self.assertEqual(str(self.interpreter.identity), str(interpreter.identity))
+        self.assertEqual(self.interpreter.extras, interpreter.extras)
+
+  def test_changed_binary_reidentified(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary',
+                             return_value=self.interpreter) as from_binary:
+        index = InterpreterIndex(index_path)
+        index.identify(binary)
+        with open(binary, 'w') as fp:
+          fp.write('upgraded')
+        index.identify(binary)
+        self.assertEqual(2, from_binary.call_count)
+
+  def identify(self, index_path, binary):
+    index = InterpreterIndex(index_path)
+    identified = index.identify(binary)
+    index.save()
+    return identified
+
+  def test_unidentifiable_binary_remembered(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary',
+                             side_effect=PythonInterpreter.IdentificationError()) as from_binary:
+        index = InterpreterIndex(index_path)
+        self.assertIsNone(index.identify(binary))
+        self.assertIsNone(index.identify(binary))
+        index.save()
+        self.assertEqual(1, from_binary.call_count)
+
+        # The failure is only trusted once it recurs on a later run.
+        self.assertIsNone(self.identify(index_path, binary))
+        self.assertEqual(2, from_binary.call_count)
+        self.assertIsNone(self.identify(index_path, binary))
+        self.assertEqual(2, from_binary.call_count)
+
+  def test_changed_binary_failures_not_remembered(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary',
+                             side_effect=PythonInterpreter.IdentificationError()) as from_binary:
+        self.assertIsNone(self.identify(index_path, binary))
+        with open(binary, 'w') as fp:
+          fp.write('upgraded')
+        self.assertIsNone(self.identify(index_path, binary))
+        self.assertIsNone(self.identify(index_path, binary))
+        self.assertEqual(3, from_binary.call_count)
+
+      with mock.patch.object(PythonInterpreter, 'from_binary', return_value=self.interpreter):
+        with open(binary, 'w') as fp:
+          fp.write('fixed')
+        self.assertEqual(binary, self.identify(index_path, binary).binary)
+
+  def test_launch_failure_not_remembered(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary', side_effect=OSError()):
+        self.assertIsNone(self.identify(index_path, binary))
+      with mock.patch.object(PythonInterpreter, 'from_binary', return_value=self.interpreter):
+        self.assertEqual(binary, self.identify(index_path, binary).binary)
+
+  def test_unexpected_error_raised(self):
+    with self.index_and_binary() as (index_path, binary):
+      with mock.patch.object(PythonInterpreter, 'from_binary', side_effect=KeyError()):
+        with self.assertRaises(KeyError):
+          InterpreterIndex(index_path).identify(binary)
+
+  def test_find(self):
+    with self.index_and_binary() as (index_path, binary):
+      touch(os.path.join(os.path.dirname(binary), 'pip'))
+      with mock.patch.object(PythonInterpreter, 'from_binary',
+                             return_value=self.interpreter) as from_binary:
+        interpreters = InterpreterIndex(index_path).find([os.path.dirname(binary)])
+        from_binary.assert_called_once_with(binary)
+      self.assertEqual([binary], [interpreter.binary for interpreter in interpreters])
@@ -5,13 +5,21 @@
 from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
                         print_function, unicode_literals)
 
+from textwrap import dedent
+import threading
 import unittest2 as unittest
 
+import mock
+from pex.http.http import FetchError
+from pex.interpreter import PythonInterpreter
 from pex.platforms import Platform
 
-from pants.backend.python.resolver import get_platforms
+from pants.backend.python.python_requirement import PythonRequirement
+from pants.backend.python.resolver import (get_platforms, PantsCrawler, PantsObtainer,
+                                           resolve_multi)
 from pants.base.config import Config
-from pants.util.contextutil import temporary_file
+from pants.util.contextutil import temporary_dir, temporary_file
+from pants_test.base.context_utils import create_config
 
 
 class ResolverTest(unittest.TestCase):
@@ -31,3 +39,101 @@ platforms: [
     expected_platforms = [Platform.current(), 'linux-x86_64']
     self.assertEqual(set(expected_platforms),
                      set(get_platforms(self.config.getlist('python-setup', 'platforms'))))
+
+
+class ResolveMultiTest(unittest.TestCase):
+  def config(self, root):
+    return create_config(dedent('''
+      [python-setup]
+      cache_root: %s
+      resolver_workers: 4
+      ''' % root))
+
+  def test_platforms_resolved_concurrently(self):
+    requirements = [PythonRequirement('foo==1.0'), PythonRequirement('bar==2.0')]
+    platforms = ['linux-x86_64', 'macosx-10.4-x86_64']
+    lock = threading.Lock()
+    obtained = []
+    resolving = []
+    all_resolving = threading.Event()
+
+    def obtain(obtainer, requirement):
+      with lock:
+        obtained.append(str(requirement.requirement))
+
+    def resolve(requirements, obtainer, interpreter, platform):
+      # Each platform's resolve waits on the other, so this only succeeds if they run concurrently.
+      with lock:
+        resolving.append(platform)
+        if len(resolving) == len(platforms):
+          all_resolving.set()
+      all_resolving.wait(10)
+      return set([platform]) if all_resolving.is_set() else set()
+
+    with temporary_dir() as root:
+      with mock.patch.object(PantsObtainer, 'obtain', autospec=True, side_effect=obtain):
+        with mock.patch('pants.backend.python.resolver.resolve', side_effect=resolve):
+          distributions = resolve_multi(self.config(root), requirements,
+                                        interpreter=PythonInterpreter.get(), platforms=platforms)
+
+    self.assertEqual(dict((platform, set([platform])) for platform in platforms), distributions)
+    self.assertEqual(sorted(['foo==1.0', 'bar==2.0'] * 2), sorted(obtained))
+
+  def test_prefetch_failures_left_to_resolve(self):
+    with temporary_dir() as root:
+      with mock.patch.object(PantsObtainer, 'obtain', side_effect=FetchError('boom')):
+        with mock.patch('pants.backend.python.resolver.resolve', return_value=set()):
+          distributions = resolve_multi(self.config(root), [PythonRequirement('foo')],
+                                        interpreter=PythonInterpreter.get(),
+                                        platforms=['linux-x86_64'])
+    self.assertEqual({'linux-x86_64': set()}, distributions)
+
+  def test_prefetch_bugs_raised(self):
+    with temporary_dir() as root:
+      with mock.patch.object(PantsObtainer, 'obtain', side_effect=ValueError('boom')):
+        with mock.patch('pants.backend.python.resolver.resolve', return_value=set()):
+          with self.assertRaises(ValueError):
+            resolve_multi(self.config(root), [PythonRequirement('foo')],
+                          interpreter=PythonInterpreter.get(), platforms=['linux-x86_64'])
+
+  def test_pages_scoped_to_resolve(self):
+    crawlers = []
+
+    def resolve(requirements, obtainer, interpreter, platform):
+      crawlers.append(obtainer._crawler)
+      return set()
+
+    with temporary_dir() as root:
+      with mock.patch('pants.backend.python.resolver.resolve', side_effect=resolve):
+        for _ in range(2):
+          resolve_multi(self.config(root), [], interpreter=PythonInterpreter.get(),
+                        platforms=['linux-x86_64', 'macosx-10.4-x86_64'])
+
+    pages = [crawler._pages for crawler in crawlers]
+    self.assertIs(pages[0], pages[1])
+    self.assertIs(pages[2], pages[3])
+    self.assertIsNot(pages[0], pages[2])
+
+
+class PantsCrawlerTest(unittest.TestCase):
+  def test_remote_pages_shared(self):
+    page = (set(['http://example.com/foo-1.0.tar.gz']), set())
+    pages = PantsCrawler.Pages()
+    with temporary_dir() as cache:
+      with mock.patch('pex.http.crawler.Crawler._remote_execute', return_value=page) as execute:
+        for _ in range(2):
+          crawler = PantsCrawler(pages=pages, cache=cache)
+          self.assertEqual(page, crawler.execute('http://example.com/simple/foo'))
+        self.assertEqual(1, execute.call_count)
+
+        # Crawlers with pages of their own don't share them.
+        PantsCrawler(cache=cache).execute('http://example.com/simple/foo')
+        self.assertEqual(2, execute.call_count)
+
+  def test_failed_fetches_retried(self):
+    with temporary_dir() as cache:
+      with mock.patch('pex.http.crawler.Crawler._remote_execute',
+                      return_value=(set(), set())) as execute:
+        PantsCrawler(cache=cache).execute('http://example.com/simple/foo')
+        PantsCrawler(cache=cache).execute('http://example.com/simple/foo')
+        self.assertEqual(2, execute.call_count)
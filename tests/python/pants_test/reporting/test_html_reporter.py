@@ -0,0 +1,87 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from contextlib import contextmanager
+import os
+import unittest
+
+from pants.goal.run_tracker import RunTracker
+from pants.reporting.html_reporter import HtmlReporter
+from pants.reporting.report import Report
+from pants.util.contextutil import temporary_dir
+
+
+class CountingHtmlReporter(HtmlReporter):
+  def __init__(self, *args, **kwargs):
+    super(CountingHtmlReporter, self).__init__(*args, **kwargs)
+    self.renders = 0
+
+  def _render_summaries(self):
+    self.renders += 1
+    super(CountingHtmlReporter, self)._render_summaries()
+
+
+class HtmlReporterTest(unittest.TestCase):
+  @contextmanager
+  def run_tracker(self, refresh_interval_ms):
+    with temporary_dir() as root:
+      html_dir = os.path.join(root, 'html')
+      os.mkdir(html_dir)
+      run_tracker = RunTracker(os.path.join(root, 'info'))
+      settings = HtmlReporter.Settings(log_level=Report.INFO, html_dir=html_dir, template_dir=None,
+                                       refresh_interval_ms=refresh_interval_ms)
+      reporter = CountingHtmlReporter(run_tracker, settings)
+      report = Report()
+      report.add_reporter('html', reporter)
+      run_tracker.start(report)
+      yield run_tracker, reporter
+
+  def read(self, reporter, filename):
+    with open(os.path.join(reporter.settings.html_dir, filename)) as f:
+      return f.read()
+
+  def test_summaries_throttled(self):
+    with self.run_tracker(refresh_interval_ms=60 * 60 * 1000) as (run_tracker, reporter):
+      for name in ('compile', 'test', 'bundle'):
+        with run_tracker.new_workunit(name):
+          pass
+      self.assertEqual(1, reporter.renders)
+
+      run_tracker.end()
+      self.assertEqual(2, reporter.renders)
+      cumulative_timings = self.read(reporter, 'cumulative_timings')
+      for name in ('compile', 'test', 'bundle'):
+        self.assertIn('main:{0}'.format(name), cumulative_timings)
+      self.assertIn('No artifact cache use.', self.read(reporter, 'artifact_cache_stats'))
+
+  def test_summaries_unthrottled(self):
+    with self.run_tracker(refresh_interval_ms=0) as (run_tracker, reporter):
+      for name in ('compile', 'test', 'bundle'):
+        with run_tracker.new_workunit(name):
+          pass
+      self.assertEqual(3, reporter.renders)
+      run_tracker.end()
+      self.assertEqual(4, reporter.renders)
+
+  def test_output(self):
+    with self.run_tracker(refresh_interval_ms=0) as (run_tracker, reporter):
+      with run_tracker.new_workunit('tool') as workunit:
+        workunit.output('stdout').write('line1\n')
+        run_tracker.report.flush()
+        workunit.output('stdout').write('line2\n')
+      run_tracker.end()
+
+      self.assertEqual('line1</br>line2</br>',
+                       self.read(reporter, '{0}.stdout'.format(workunit.id)))
+      self.assertIn(str(workunit.id), self.read(reporter, 'build.html'))
+
+  def test_reporting_timed(self):
+    with self.run_tracker(refresh_interval_ms=0) as (run_tracker, reporter):
+      run_tracker.end()
+      self.assertIn(RunTracker.REPORTING_NAME, run_tracker.self_timings.get_timings_by_label())
+      self.assertIn(RunTracker.REPORTING_NAME,
+                    run_tracker.cumulative_timings.get_timings_by_label())
@@ -0,0 +1,125 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import json
+import os
+import threading
+import time
+import unittest
+import urllib
+import urllib2
+
+from pants.base.run_index import RunIndex
+from pants.base.run_info import RunInfo
+from pants.reporting.reporting_server import PantsHandler, ReportingServer
+from pants.util.contextutil import temporary_dir
+
+
+class ReportingServerTest(unittest.TestCase):
+  def setUp(self):
+    self._root_context = temporary_dir()
+    self.root = self._root_context.__enter__()
+    self.info_dir = os.path.join(self.root, 'runs')
+    settings = ReportingServer.Settings(info_dir=self.info_dir, template_dir=None, assets_dir=None,
+                                        root=self.root, allowed_clients=['ALL'],
+                                        timing_store=os.path.join(self.root, 'timings.jsonl'))
+    self.server = ReportingServer(0, settings)
+    thread = threading.Thread(target=self.server.start)
+    thread.daemon = True
+    thread.start()
+
+  def tearDown(self):
+    self._root_context.__exit__(None, None, None)
+
+  def get(self, path, **params):
+    url = 'http://localhost:%d%s?%s' % (self.server.server_port(), path, urllib.urlencode(params))
+    return urllib2.urlopen(url).read()
+
+  def poll(self, wait=0, **polls):
+    """Polls the given files, each an (id, path, pos, version) tuple."""
+    request = [dict(id=_id, path=path, pos=pos, version=version)
+               for _id, (path, pos, version) in polls.items()]
+    return json.loads(self.get('/poll', q=json.dumps(request), wait=wait))
+
+  def write(self, relpath, content, mode='a'):
+    with open(os.path.join(self.root, relpath), mode) as fp:
+      fp.write(content)
+
+  def test_poll(self):
+    self.write('report', 'abc')
+    self.write('stats', 'x')
+
+    result = self.poll(tail=('report', 0, None), whole=('stats', 0, None),
+                       missing=('nope', 0, None))
+    self.assertEqual(set(['tail', 'whole']), set(result))
+    self.assertEqual('abc', result['tail']['content'])
+    self.assertEqual(3, result['tail']['pos'])
+    self.assertEqual('x', result['whole']['content'])
+    tail_version = result['tail']['version']
+    whole_version = result['whole']['version']
+
+    # Nothing changed.
+    self.assertEqual({}, self.poll(tail=('report', 3, tail_version),
+                                   whole=('stats', 0, whole_version)))
+
+    self.write('report', 'de')
+    self.write('stats', 'yz', mode='w')
+    result = self.poll(tail=('report', 3, tail_version), whole=('stats', 0, whole_version))
+    self.assertEqual('de', result['tail']['content'])
+    self.assertEqual(5, result['tail']['pos'])
+    self.assertEqual('yz', result['whole']['content'])
+
+  def test_long_poll(self):
+    self.write('report', 'abc')
+    version = self.poll(tail=('report', 0, None))['tail']['version']
+
+    start = time.time()
+    self.assertEqual({}, self.poll(wait=0.3, tail=('report', 3, version)))
+    self.assertGreaterEqual(time.time() - start, 0.3)
+
+    def append():
+      time.sleep(0.2)
+      self.write('report', 'def')
+    writer = threading.Thread(target=append)
+    writer.start()
+    try:
+      # Other requests are served while a long-poll waits.
+      long_poll = []
+      poller = threading.Thread(
+        target=lambda: long_poll.append(self.poll(wait=10, tail=('report', 3, version))))
+      poller.start()
+      self.assertIn('<html', self.get('/runs/'))
+      poller.join(10)
+      self.assertEqual('def', long_poll[0]['tail']['content'])
+    finally:
+      writer.join()
+
+  def test_number_param(self):
+    params = {'runs': ['5'], 'days': ['many']}
+    self.assertEqual(5, PantsHandler._number_param(params, 'runs', 100))
+    self.assertEqual(7, PantsHandler._number_param(params, 'days', 7))
+    self.assertEqual(3, PantsHandler._number_param(params, 'missing', 3))
+    self.assertEqual(0.5, PantsHandler._number_param({'wait': ['0.5']}, 'wait', 0.0))
+    self.assertEqual(0.0, PantsHandler._number_param({'wait': ['soon']}, 'wait', 0.0))
+
+  def test_poll_bad_wait(self):
+    self.write('report', 'abc')
+    self.assertEqual('abc', self.poll(wait='soon', tail=('report', 0, None))['tail']['content'])
+
+  def test_timings_bad_params(self):
+    self.assertIn('<html', self.get('/timings/', runs='all', days='-'))
+
+  def test_runs(self):
+    for run_id, timestamp in (('pants_run_1', 1000000000), ('pants_run_2', 1100000000)):
+      run_info = RunInfo(os.path.join(self.info_dir, run_id, 'info'))
+      run_info.add_basic_info(run_id, timestamp)
+    RunIndex.for_info_dir(self.info_dir).append(
+      RunInfo(os.path.join(self.info_dir, 'pants_run_1', 'info')).get_as_dict())
+
+    runs_page = self.get('/runs/')
+    self.assertIn('pants_run_1', runs_page)
+    self.assertIn('pants_run_2', runs_page)
@@ -0,0 +1,131 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import sys
+import threading
+import time
+import unittest
+
+from pants.goal.run_tracker import RunTracker
+from pants.reporting.report import Report
+from pants.reporting.sampling_profiler import SamplingProfiler
+from pants.util.contextutil import temporary_dir
+
+
+class FakeWorkUnit(object):
+  def __init__(self, path):
+    self._path = path
+
+  def path(self):
+    return self._path
+
+
+def blocked_in_test(event):
+  event.wait(10)
+
+
+def wait_until_blocked(*threads):
+  """Waits until each of the given threads is blocked waiting on an event."""
+  while not all(sys._current_frames()[thread.ident].f_code.co_name == 'wait'
+                for thread in threads):
+    time.sleep(0.001)
+
+
+class SamplingProfilerTest(unittest.TestCase):
+  def test_sample(self):
+    release = threading.Event()
+    attributed = threading.Thread(target=blocked_in_test, args=(release,))
+    unattributed = threading.Thread(target=blocked_in_test, args=(release,), name='reporter')
+    for thread in (attributed, unattributed):
+      thread.start()
+    try:
+      wait_until_blocked(attributed, unattributed)
+      workunits = {attributed.ident: FakeWorkUnit('main:compile')}
+      profiler = SamplingProfiler('unused', interval_secs=1, workunits_by_thread=lambda: workunits)
+      profiler.sample()
+      profiler.sample()
+    finally:
+      release.set()
+      for thread in (attributed, unattributed):
+        thread.join()
+
+    samples = profiler.get_samples()
+    for path in ('main:compile', '[reporter]'):
+      stacks = samples[path]
+      self.assertEqual([2], stacks.values())
+      frames = stacks.keys()[0].split(';')
+      self.assertTrue(frames[-1].startswith('wait '), frames)
+      self.assertIn('blocked_in_test (test_sampling_profiler.py', ';'.join(frames))
+    # The calling thread does not sample itself.
+    self.assertFalse(any('test_sample (test_sampling_profiler.py' in stack
+                         for stacks in samples.values() for stack in stacks))
+
+  def test_folded(self):
+    samples = {'main:compile': {'a;b': 2, 'a': 1}, 'main:compile:java': {'c': 3}, 'main:test': {}}
+    self.assertEqual(['main;compile;a 1', 'main;compile;a;b 2', 'main;compile;java;c 3'],
+                     SamplingProfiler.folded(samples))
+    self.assertEqual(['main;compile;java;c 3'],
+                     SamplingProfiler.folded(samples, prefix='main:compile:java'))
+    self.assertEqual([], SamplingProfiler.folded(samples, prefix='main:comp'))
+
+  def test_flame_graph(self):
+    boxes = SamplingProfiler.flame_graph(['main;a;b 3', 'main;a 1', 'main;c 4', 'main;d 0'],
+                                         width=80, row_height=10)
+    self.assertEqual([('main', 8, 0, 0, 80),
+                      ('a', 4, 1, 0, 40),
+                      ('b', 3, 2, 0, 30),
+                      ('c', 4, 1, 40, 40)],
+                     [(box['name'], box['samples'], box['depth'], box['x'], box['width'])
+                      for box in boxes])
+    self.assertEqual([], SamplingProfiler.flame_graph([]))
+
+  def test_run_tracker(self):
+    with temporary_dir() as info_dir:
+      run_tracker = RunTracker(info_dir, profiler_interval_ms=1)
+      run_tracker.start(Report())
+      with run_tracker.new_workunit('sleep'):
+        time.sleep(0.1)
+      run_tracker.end()
+
+      profile_path = run_tracker.run_info.get_info('profile')
+      self.assertEqual(run_tracker.sampling_profiler.path, profile_path)
+      samples = SamplingProfiler.load(profile_path)
+      self.assertIn('main:sleep', samples)
+      self.assertTrue(any('test_run_tracker (test_sampling_profiler.py' in stack
+                          for stack in samples['main:sleep']))
+
+  def test_run_tracker_disabled(self):
+    with temporary_dir() as info_dir:
+      run_tracker = RunTracker(info_dir)
+      self.assertIsNone(run_tracker.sampling_profiler)
+      self.assertIsNone(run_tracker.run_info.get_info('profile'))
+
+      run_tracker.start(Report())
+      with run_tracker.new_workunit('compile'):
+        self.assertEqual({}, run_tracker.current_workunits())
+      run_tracker.end()
+
+  def test_run_tracker_forgets_exited_threads(self):
+    with temporary_dir() as info_dir:
+      run_tracker = RunTracker(info_dir, profiler_interval_ms=1000)
+      run_tracker.start(Report())
+      main = run_tracker.current_workunit()
+      release = threading.Event()
+
+      def worker():
+        run_tracker.register_thread(main)
+        blocked_in_test(release)
+      thread = threading.Thread(target=worker)
+      thread.start()
+      try:
+        wait_until_blocked(thread)
+        self.assertEqual(main, run_tracker.current_workunits()[thread.ident])
+      finally:
+        release.set()
+        thread.join()
+      self.assertNotIn(thread.ident, run_tracker.current_workunits())
+      run_tracker.end()
@@ -0,0 +1,136 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import json
+import os
+import threading
+import unittest
+
+from pants.base.workunit import WorkUnit
+from pants.goal.run_tracker import RunTracker
+from pants.reporting.report import Report
+from pants.reporting.trace_event_reporter import TraceEventReporter
+from pants.util.contextutil import temporary_dir
+
+
+class TraceEventReporterTest(unittest.TestCase):
+  def trace(self, work):
+    with temporary_dir() as root:
+      trace_path = os.path.join(root, 'trace.json')
+      run_tracker = RunTracker(os.path.join(root, 'info'))
+      settings = TraceEventReporter.Settings(log_level=Report.INFO, trace_path=trace_path)
+      report = Report()
+      report.add_reporter('trace', TraceEventReporter(run_tracker, settings))
+      run_tracker.start(report)
+      work(run_tracker)
+
+      with open(trace_path) as fp:
+        # The trace is readable while the run is still in progress.
+        json.loads(TraceEventReporter.close_trace(fp.read()))
+
+      run_tracker.end()
+      with open(trace_path) as fp:
+        return json.load(fp)
+
+  def metadata(self, events, name):
+    return dict(((event['pid'], event.get('tid')), event['args']['name'])
+                for event in events if event['ph'] == 'M' and event['name'] == name)
+
+  def slices(self, events):
+    """Returns the names of the slices on each track, checking that B and E events pair up."""
+    open_slices = {}
+    slices = {}
+    for event in events:
+      track = (event['pid'], event['tid']) if event['ph'] in ('B', 'E') else None
+      if event['ph'] == 'B':
+        open_slices.setdefault(track, []).append(event)
+      elif event['ph'] == 'E':
+        begin = open_slices[track].pop()
+        self.assertLessEqual(begin['ts'], event['ts'])
+        slices.setdefault(track, []).append(begin['name'])
+    self.assertEqual([], [s for s in open_slices.values() if s])
+    return slices
+
+  def test_threads(self):
+    def work(run_tracker):
+      with run_tracker.new_workunit('compile') as compile_workunit:
+        def worker():
+          with run_tracker.new_workunit_under_parent('java', parent=compile_workunit):
+            pass
+        thread = threading.Thread(target=worker, name='worker-1')
+        thread.start()
+        thread.join()
+
+    events = self.trace(work)
+    thread_names = self.metadata(events, 'thread_name')
+    self.assertEqual(['main'], self.metadata(events, 'process_name').values())
+    self.assertEqual(set(['MainThread', 'worker-1']), set(thread_names.values()))
+
+    slices = self.slices(events)
+    self.assertEqual(2, len(slices))
+    for track, names in slices.items():
+      if thread_names[track] == 'worker-1':
+        self.assertEqual(['java'], names)
+      else:
+        self.assertEqual(['compile', 'main'], names)
+
+  def test_tools(self):
+    def work(run_tracker):
+      with run_tracker.new_workunit('compile'):
+        with run_tracker.new_workunit('javac', labels=[WorkUnit.TOOL], cmd='javac A.java'):
+          with run_tracker.new_workunit('jar', labels=[WorkUnit.TOOL]):
+            pass
+        with run_tracker.new_workunit('scalac', labels=[WorkUnit.TOOL]):
+          pass
+
+    events = self.trace(work)
+    thread_names = self.metadata(events, 'thread_name')
+    self.assertEqual(set(['MainThread', 'tool process 2', 'tool process 3']),
+                     set(thread_names.values()))
+
+    slices = dict((thread_names[track], names) for track, names in self.slices(events).items())
+    self.assertEqual({'MainThread': ['compile', 'main'],
+                      'tool process 2': ['javac', 'scalac'],
+                      'tool process 3': ['jar']},
+                     slices)
+    javac = next(event for event in events if event.get('name') == 'javac')
+    self.assertEqual({'path': 'main:compile:javac', 'cmd': 'javac A.java'}, javac['args'])
+
+  def test_goals(self):
+    def work(run_tracker):
+      main = run_tracker.current_workunit()
+      # Concurrently running goals open and close on the main thread without nesting.
+      compile_goal = run_tracker.new_workunit_under_parent('compile', parent=main,
+                                                           labels=[WorkUnit.GOAL])
+      compile_goal.__enter__()
+      resolve_goal = run_tracker.new_workunit_under_parent('resolve', parent=main,
+                                                           labels=[WorkUnit.GOAL])
+      resolve_goal.__enter__()
+      compile_goal.__exit__(None, None, None)
+      resolve_goal.__exit__(None, None, None)
+
+    events = self.trace(work)
+    self.assertEqual({'MainThread': ['main']},
+                     dict((self.metadata(events, 'thread_name')[track], names)
+                          for track, names in self.slices(events).items()))
+    goal_events = [(event['ph'], event['name']) for event in events if event.get('cat') == 'goal']
+    self.assertEqual([('b', 'compile'), ('b', 'resolve'), ('e', 'compile'), ('e', 'resolve')],
+                     goal_events)
+    compile_events = [event for event in events if event.get('name') == 'compile']
+    self.assertEqual(1, len(set(event['id'] for event in compile_events)))
+
+  def test_close_trace(self):
+    self.assertEqual('[]', TraceEventReporter.close_trace('[\n'))
+    self.assertEqual('[\n{}]', TraceEventReporter.close_trace('[\n{}'))
+    self.assertEqual('[\n{}\n]', TraceEventReporter.close_trace('[\n{}\n]\n'))
+    self.assertEqual('[\n{}]', TraceEventReporter.close_trace('[\n{},\n'))
+
+    # Events cut off part way through by a buffered write are dropped.
+    self.assertEqual('[]', TraceEventReporter.close_trace('[\n{"ph": "B",'))
+    self.assertEqual('[\n{"a": 1}]', TraceEventReporter.close_trace('[\n{"a": 1},\n{"b": 2'))
+    self.assertEqual('[\n{"a": 1},\n{"b": 2}]',
+                     TraceEventReporter.close_trace('[\n{"a": 1},\n{"b": 2}'))
@@ -6,6 +6,7 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import itertools, uuid
+import unittest
 
 from pants.backend.core.tasks.check_exclusives import ExclusivesMapping
 from pants.backend.core.tasks.group_task import GroupMember, GroupIterator, GroupTask
@@ -273,3 +274,30 @@ class TransitiveGroupTaskTest(BaseGroupTaskTest):
     # expecting construct/prepare for java/scalac, then pre-execute/prepare_execute for
     # javac/scalac: ignore 8 Finally, compare the remaining items.
     self.assertEqual(expected_execute_actions, recorded[8:])
+
+
+class NamedMember(GroupMember):
+  def select(self, target):
+    return True
+
+  def execute_chunk(self, targets):
+    pass
+
+
+class NamedGroupMemberTest(unittest.TestCase):
+  def test_named_member(self):
+    group_task = GroupTask.named('named-%s' % uuid.uuid4().hex, product_type=['classes'])
+    group_task.add_member('pants_test.tasks.test_group_task:NamedMember')
+    self.assertEqual([NamedMember], group_task._member_types())
+
+  def test_named_member_loaded_lazily(self):
+    group_task = GroupTask.named('named-%s' % uuid.uuid4().hex, product_type=['classes'])
+    group_task.add_member('pants_test.tasks.does_not_exist:NamedMember')
+    with self.assertRaises(ImportError):
+      group_task._member_types()
+
+  def test_named_member_invalid(self):
+    group_task = GroupTask.named('named-%s' % uuid.uuid4().hex, product_type=['classes'])
+    group_task.add_member('pants_test.tasks.test_group_task:NamedGroupMemberTest')
+    with self.assertRaises(ValueError):
+      group_task._member_types()
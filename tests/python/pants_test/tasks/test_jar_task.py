@@ -10,7 +10,9 @@ import os
 import re
 from textwrap import dedent
 
-from pants.backend.jvm.tasks.jar_task import JarTask
+import mock
+
+from pants.backend.jvm.tasks.jar_task import Jar, JarTask
 from pants.goal.products import MultipleRootedProducts
 from pants.util.contextutil import open_zip, temporary_dir, temporary_file
 from pants.util.dirutil import safe_mkdir, safe_mkdtemp, safe_rmtree
@@ -129,6 +131,30 @@ class JarTaskTest(BaseJarTaskTest):
         self.assertEquals(contents, jar.read('META-INF/MANIFEST.MF'))
 
 
+  def test_segment_jar(self):
+    segment_dir = os.path.join(self.workdir, 'segments', 'a')
+    jar = Jar()
+    jar.writestr('README', b'42')
+    path = self.jar_task.segment_jar(jar, segment_dir)
+    with open_zip(path) as segment:
+      self.assert_listing(segment, 'README')
+
+    # An unchanged segment is reused as is.
+    mtime = os.path.getmtime(path)
+    self.assertEqual(path, self.jar_task.segment_jar(jar, segment_dir))
+    self.assertEqual(mtime, os.path.getmtime(path))
+    self.assertIsNone(self.jar_task.segment_jar(Jar(), segment_dir))
+
+  def test_segment_jar_not_native(self):
+    jar_task = self.prepare_jar_task(self.context(config='[jar-tool]\nnative: False\n'))
+    jar = Jar()
+    jar.writestr('README', b'42')
+    with mock.patch.object(jar_task, '_write_with_jar_tool') as write_with_jar_tool:
+      path = jar_task.segment_jar(jar, os.path.join(self.workdir, 'segments', 'a'))
+    write_with_jar_tool.assert_called_once_with(jar, path, overwrite=True, compressed=True,
+                                                jar_rules=mock.ANY)
+
+
 class JarBuilderTest(BaseJarTaskTest):
   def test_agent_manifest(self):
     self.add_to_build_file('src/java/pants/agents', dedent('''
@@ -176,3 +202,40 @@ class JarBuilderTest(BaseJarTaskTest):
         }
         self.assertEquals(set(expected_entries.items()),
                           set(expected_entries.items()).intersection(set(all_entries.items())))
+
+  def test_agent_manifest_excluded(self):
+    self.add_to_build_file('src/java/pants/agents', dedent('''
+        java_agent(
+          name='fake_agent',
+          premain='bob',
+        )''').strip())
+    java_agent = self.target('src/java/pants/agents:fake_agent')
+
+    context = self.context(target_roots=java_agent)
+    jar_task = self.prepare_jar_task(context)
+
+    class_products = context.products.get_data('classes_by_target',
+                                               lambda: defaultdict(MultipleRootedProducts))
+    java_agent_products = MultipleRootedProducts()
+    self.create_file('.pants.d/javac/classes/FakeAgent.class', '0xCAFEBABE')
+    java_agent_products.add_rel_paths(os.path.join(self.build_root, '.pants.d/javac/classes'),
+                                      ['FakeAgent.class'])
+    class_products[java_agent] = java_agent_products
+
+    context.products.safe_create_data('resources_by_target',
+                                      lambda: defaultdict(MultipleRootedProducts))
+
+    jar_builder = jar_task.prepare_jar_builder()
+    with self.jarfile() as existing_jarfile:
+      with jar_task.open_jar(existing_jarfile) as jar:
+        jar_builder.add_target(jar, java_agent, agent_manifest=False)
+
+      with open_zip(existing_jarfile) as jar:
+        self.assert_listing(jar, 'FakeAgent.class')
+        self.assertNotIn('Premain-Class', jar.read('META-INF/MANIFEST.MF'))
+
+      with jar_task.open_jar(existing_jarfile) as jar:
+        jar_builder.write_agent_manifest(java_agent, jar)
+
+      with open_zip(existing_jarfile) as jar:
+        self.assertIn('Premain-Class: bob', jar.read('META-INF/MANIFEST.MF'))
@@ -0,0 +1,101 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import threading
+import time
+
+import mock
+
+from pants.backend.jvm.tasks.nailgun_task import NailgunTask
+from pants.engine.task_scheduler import TaskScheduler
+from pants.goal.goal import Goal
+from pants.java.distribution.distribution import Distribution
+from pants.java.nailgun_executor import NailgunExecutor
+from pants_test.base_test import BaseTest
+
+
+class XargsTask(NailgunTask):
+  @property
+  def config_section(self):
+    return 'xargs-task'
+
+  def execute(self):
+    pass
+
+
+class ConcurrentXargsTask(XargsTask):
+  @classmethod
+  def supports_concurrent_execution(cls):
+    return True
+
+
+class NailgunTaskTest(BaseTest):
+  def tearDown(self):
+    Goal.clear()
+    super(NailgunTaskTest, self).tearDown()
+
+  def create_task(self, task_type, nailgun_daemon=True):
+    context = self.context(config='[xargs-task]\nxargs_workers: 2\n',
+                           options=dict(nailgun_daemon=nailgun_daemon))
+    with mock.patch.object(Distribution, 'cached'):
+      return task_type(context, self.build_root)
+
+  def test_execution_resources(self):
+    self.assertEqual({'worker': 2, 'jvm': 1}, self.create_task(XargsTask).execution_resources())
+    self.assertEqual({'worker': 2, 'jvm': 2},
+                     self.create_task(XargsTask, nailgun_daemon=False).execution_resources())
+
+  def test_scheduler_limits_xargs_workers(self):
+    lock = threading.Lock()
+    executing = [0]
+    max_executing = [0]
+
+    def execute():
+      with lock:
+        executing[0] += 1
+        max_executing[0] = max(max_executing[0], executing[0])
+      time.sleep(0.05)
+      with lock:
+        executing[0] -= 1
+
+    scheduled = []
+    for name in ('a', 'b'):
+      task = self.create_task(ConcurrentXargsTask)
+      task.execute = execute
+      scheduled.append((Goal.by_name(name), name, task, frozenset()))
+    scheduled_tasks = TaskScheduler.schedule(scheduled)
+
+    # Each task runs 2 jvm invocations at once, so only one of them fits in 3 workers.
+    TaskScheduler(self.context(), {'worker': 3}).execute(scheduled_tasks)
+    self.assertEqual(1, max_executing[0])
+
+    TaskScheduler(self.context(), {'worker': 4}).execute(scheduled_tasks)
+    self.assertEqual(2, max_executing[0])
+  def test_runjava_xargs_starts_nailgun_once(self):
+    context = self.context(config='[xargs-task]\nxargs_workers: 3\n',
+                           options=dict(nailgun_daemon=True))
+    with mock.patch.object(Distribution, 'cached'):
+      task = XargsTask(context, self.build_root)
+
+    executor = mock.create_autospec(NailgunExecutor, instance=True)
+    executors = []
+    threads = set()
+
+    def runjava(executor=None, **kwargs):
+      self.assertTrue(executor.start.called)
+      executors.append(executor)
+      threads.add(threading.current_thread())
+      return 0
+
+    with mock.patch.object(task, 'create_java_executor', return_value=executor):
+      with mock.patch.object(task, 'runjava', side_effect=runjava):
+        result = task.runjava_xargs(['tool.jar'], 'Main', ['a', 'b', 'c', 'd', 'e', 'f'])
+    self.assertEqual(0, result)
+
+    executor.start.assert_called_once_with(['tool.jar'], jvm_options=[])
+    self.assertEqual([executor] * 3, executors)
+    self.assertNotIn(threading.current_thread(), threads)
@@ -0,0 +1,49 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+from pants.backend.core.tasks.paths import PathFinder
+from pants_test.base_test import BaseTest
+
+
+class PathFinderTest(BaseTest):
+  def setUp(self):
+    super(PathFinderTest, self).setUp()
+
+    # a -> b -> d -> e
+    # a -> c -> d
+    # a -> e
+    # f
+    self.e = self.make_target('e')
+    self.d = self.make_target('d', dependencies=[self.e])
+    self.b = self.make_target('b', dependencies=[self.d])
+    self.c = self.make_target('c', dependencies=[self.d])
+    self.a = self.make_target('a', dependencies=[self.b, self.c, self.e])
+    self.f = self.make_target('f')
+
+  def paths(self, from_target, to_target):
+    return sorted(tuple(t.address.spec for t in path)
+                  for path in PathFinder._iter_paths(from_target, to_target))
+
+  def test_iter_paths(self):
+    self.assertEqual([('a:a', 'b:b', 'd:d', 'e:e'),
+                      ('a:a', 'c:c', 'd:d', 'e:e'),
+                      ('a:a', 'e:e')],
+                     self.paths(self.a, self.e))
+    self.assertEqual([('b:b', 'd:d')], self.paths(self.b, self.d))
+
+  def test_iter_paths_self(self):
+    self.assertEqual([('a:a',)], self.paths(self.a, self.a))
+
+  def test_iter_paths_none(self):
+    self.assertEqual([], self.paths(self.e, self.a))
+    self.assertEqual([], self.paths(self.a, self.f))
+
+  def test_count_paths(self):
+    self.assertEqual(3, PathFinder._count_paths(self.a, self.e))
+    self.assertEqual(2, PathFinder._count_paths(self.a, self.d))
+    self.assertEqual(1, PathFinder._count_paths(self.a, self.a))
+    self.assertEqual(0, PathFinder._count_paths(self.e, self.a))
@@ -0,0 +1,67 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os
+
+from pants.backend.core.tasks.task import Task
+from pants.base.target import Target
+from pants.util.dirutil import safe_rmtree
+from pants_test.base_test import BaseTest
+
+
+class LintTask(Task):
+  def __init__(self, *args, **kwargs):
+    super(LintTask, self).__init__(*args, **kwargs)
+    self.setup_artifact_cache_from_config(config_section='lint-task')
+    self.linted = []
+
+  def execute(self):
+    with self.invalidated(self.context.targets()) as invalidation_check:
+      invalid_vts = invalidation_check.invalid_vts
+      self.linted.extend(vt.target for vt in invalid_vts)
+      self.update_artifact_cache_with_markers(invalid_vts)
+    self.context.background_worker_pool().shutdown()
+
+
+class TaskTest(BaseTest):
+  def setUp(self):
+    super(TaskTest, self).setUp()
+    self.pants_workdir = os.path.join(self.build_root, '.pants.d')
+    self.cache_dir = os.path.join(self.build_root, 'artifact_cache')
+
+  def execute(self, target):
+    config = ('[DEFAULT]\n'
+              'pants_workdir: %(workdir)s\n'
+              '[lint-task]\n'
+              'read_artifact_caches: ["%(cache)s"]\n'
+              'write_artifact_caches: ["%(cache)s"]\n'
+              % dict(workdir=self.pants_workdir, cache=self.cache_dir))
+    context = self.context(config=config,
+                           options=dict(read_from_artifact_cache=True,
+                                        write_to_artifact_cache=True),
+                           target_roots=[target])
+    task = LintTask(context, os.path.join(self.pants_workdir, 'lint'))
+    task.execute()
+    return task
+
+  def test_update_artifact_cache_with_markers(self):
+    self.create_file('a/a.txt', 'a')
+    target = self.make_target('a', Target)
+
+    task = self.execute(target)
+    self.assertEqual([target], task.linted)
+    results_dir = os.path.join(task.workdir, 'results')
+    markers = os.listdir(results_dir)
+    self.assertEqual(1, len(markers))
+
+    # A valid target is skipped.
+    self.assertEqual([], self.execute(target).linted)
+
+    # With the local state gone, the target is skipped on a cache hit and its marker restored.
+    safe_rmtree(self.pants_workdir)
+    self.assertEqual([], self.execute(target).linted)
+    self.assertEqual(markers, os.listdir(results_dir))
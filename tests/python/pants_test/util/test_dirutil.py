@@ -6,13 +6,16 @@ from __future__ import (nested_scopes, generators, division, absolute_import, wi
                         print_function, unicode_literals)
 
 import atexit
+import json
 import os
 import tempfile
+import threading
 
 import mox
 import unittest2 as unittest
 
 from pants.util import dirutil
+from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import _mkdtemp_unregister_cleaner
 
 
@@ -59,3 +62,28 @@ class DirutilTest(unittest.TestCase):
       dirutil._mkdtemp_unregister_cleaner()
 
     self._mox.VerifyAll()
+
+  def test_safe_append_jsonl(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'a', 'records.jsonl')
+      dirutil.safe_append_jsonl(path, {'a': 1})
+      with open(path, 'a') as fp:
+        fp.write('{"trunc')
+      dirutil.safe_append_jsonl(path, {'b': 2})
+      with open(path) as fp:
+        self.assertEqual(['{"a": 1}\n', '{"trunc\n', '{"b": 2}\n'], fp.readlines())
+
+  def test_safe_append_jsonl_concurrent(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'records.jsonl')
+      # Records far larger than a pipe or stdio buffer.
+      records = [{'id': i, 'data': 'x' * 256 * 1024} for i in range(8)]
+      threads = [threading.Thread(target=dirutil.safe_append_jsonl, args=(path, record))
+                 for record in records]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+      with open(path) as fp:
+        appended = [json.loads(line) for line in fp]
+      self.assertEqual(records, sorted(appended, key=lambda record: record['id']))
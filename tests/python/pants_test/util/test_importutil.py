@@ -0,0 +1,27 @@
+# coding=utf-8
+# Copyright 2014 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (nested_scopes, generators, division, absolute_import, with_statement,
+                        print_function, unicode_literals)
+
+import os.path
+import unittest
+
+from pants.util.importutil import load_symbol
+
+
+class ImportUtilTest(unittest.TestCase):
+  def test_load_symbol(self):
+    self.assertIs(os.path.join, load_symbol('os.path:join'))
+    self.assertIs(load_symbol, load_symbol('pants.util.importutil:load_symbol'))
+
+  def test_load_symbol_invalid(self):
+    with self.assertRaises(ValueError):
+      load_symbol('os.path.join')
+    with self.assertRaises(ValueError):
+      load_symbol(':join')
+    with self.assertRaises(ImportError):
+      load_symbol('os.path:does_not_exist')
+    with self.assertRaises(ImportError):
+      load_symbol('pants.util.does_not_exist:symbol')